@@ -16,6 +16,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import settings
 from api.auth import require_auth, UserInfo
 from services.kdrg_codebook_service import codebook_service
+from services.spreadsheet_reader import is_excel, iter_excel
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -256,15 +257,17 @@ async def get_kdrg_codebook(
     search: Optional[str] = None,
     aadrg: Optional[str] = None,
     mdc: Optional[str] = None,
+    version: Optional[str] = None,
     user: UserInfo = Depends(require_auth)
 ):
-    """KDRG 코드북 조회 (DB에서)"""
+    """KDRG 코드북 조회 (DB에서, version 미지정 시 모든 버전)"""
     result = codebook_service.get_codebook(
         page=page,
         per_page=per_page,
         search=search,
         aadrg=aadrg,
-        mdc=mdc
+        mdc=mdc,
+        version=version
     )
     
     return {
@@ -333,10 +336,10 @@ async def upload_kdrg_codebook(
             
             new_codes = parse_dataframe_codebook(df, version)
             
-        elif file.filename.lower().endswith(('.xlsx', '.xls')):
-            # Excel 파일 처리
-            df = pd.read_excel(file_path)
-            new_codes = parse_dataframe_codebook(df, version)
+        elif is_excel(file.filename):
+            # Excel 파일 처리 (청크 단위 스트리밍 읽기)
+            for chunk in iter_excel(file_path):
+                new_codes.extend(parse_dataframe_codebook(chunk, version))
             
         else:
             raise HTTPException(status_code=400, detail="CSV, Excel, 또는 PDF 파일만 지원합니다.")
@@ -375,7 +378,7 @@ async def upload_kdrg_codebook(
 def parse_dataframe_codebook(df: pd.DataFrame, version: str) -> List[Dict]:
     """DataFrame에서 KDRG 코드북 데이터 파싱"""
     logger.info(f"Uploaded file columns: {df.columns.tolist()}")
-    logger.info(f"Total rows: {len(df)}")
+    logger.info(f"Rows: {len(df)}")
     
     # 컬럼명 매핑 (다양한 형식 지원)
     column_mapping = {
@@ -13,6 +13,7 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import settings
 from services.privacy_service import privacy_protector
+from services.spreadsheet_reader import is_excel, iter_excel
 from services.profit_service import profit_optimizer, OptimizationRecommendation, LossAlert
 from api.auth import require_auth, UserInfo
 
@@ -272,18 +273,19 @@ async def import_patients(
         with open(file_path, 'wb') as f:
             f.write(content)
         
-        # 파일 읽기
+        # 파일 읽기 (Excel은 시트 전체를 올리지 않고 청크 단위로 읽으며 처리)
         if file.filename.endswith('.csv'):
-            df = pd.read_csv(file_path, encoding='utf-8')
-        elif file.filename.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(file_path)
+            chunks = [pd.read_csv(file_path, encoding='utf-8')]
+        elif is_excel(file.filename):
+            chunks = iter_excel(file_path)
         else:
             raise HTTPException(status_code=400, detail="CSV 또는 Excel 파일만 지원합니다.")
         
         errors = []
         imported_count = 0
         
-        for idx, row in df.iterrows():
+        rows = (item for chunk in chunks for item in chunk.iterrows())
+        for idx, row in rows:
             try:
                 PATIENT_ID_COUNTER += 1
                 
@@ -4,32 +4,47 @@ KDRG Pre-Grouper API 라우터
 - 청구 전 KDRG 예측 및 검증
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query
-from fastapi.responses import JSONResponse
-from typing import Optional, List, Dict, Any
+from fastapi import APIRouter, UploadFile, File, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Optional, List, Dict, Any, Tuple
 from pydantic import BaseModel, Field
 from datetime import datetime
-from dataclasses import asdict
 import logging
 import io
+import csv
+import gzip
+import json
+import brotli
 import pandas as pd
 
 from config import settings
-from services.pregrouper_service import (
-    KDRGPreGrouper,
-    pre_grouper,
-    GrouperInput,
-    GrouperResult,
-    PatientInfo,
-    DiagnosisInfo,
-    ProcedureInfo,
-)
+from services.pregrouper_service import DetailLevel, pre_grouper
+from services.grouper_batch import LAYOUTS, RESULT_COLUMNS, ROWS, GrouperResultBatch, dumps, dumps_with_results
 from services.grouping_store import grouping_store
+from services.grouping_jobs import grouping_jobs
+from services.history_writer import history_writer
+from services.history_retention import history_retention
+from services.grouper_compare import VersionComparison
+from services.spreadsheet_reader import is_excel, iter_excel, read_excel
+from services.grouper_arrow import (
+    MEDIA_TYPES,
+    ResultStreamWriter,
+    claims_frame,
+    file_format,
+    is_claims_frame,
+    iter_claim_frames,
+    read_table,
+    results_table,
+    write_table,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Pre-Grouper"])
 
+LAYOUT_PATTERN = f"^({'|'.join(LAYOUTS)})$"
+
 
 # ===== Pydantic Models =====
 
@@ -85,9 +100,379 @@ class BatchGroupingRequest(BaseModel):
     records: List[SimpleGroupingRequest]
 
 
+class ExpandDetailRequest(BaseModel):
+    """codes-only 결과 상세 복원 요청"""
+    results: List[Dict[str, Any]] = Field(..., description="codes-only 그루핑 결과 목록")
+
+
+class CompareVersionsRequest(BaseModel):
+    """규칙/코드북 버전 비교 요청"""
+    records: List[SimpleGroupingRequest]
+    versions: List[str] = Field(..., description="비교 버전 ('<규칙 세트>@<코드북 버전>', 첫 번째가 기준)")
+
+
+class ActivateRulesRequest(BaseModel):
+    """규칙 세트 활성화 요청"""
+    version: str = Field(..., description="규칙 세트 버전 (builtin 또는 GROUPER_RULES_DIR의 파일 이름)")
+
+
 # ===== 저장소 (SQLite via grouping_store) =====
 
 
+def _request_row(request: SimpleGroupingRequest) -> Tuple:
+    """간편 요청 → 그루핑 입력 행 튜플 (CLAIM_FIELDS 순서, 중간 dict/입력 객체 미생성)"""
+    return (
+        request.patient_id, request.age, request.sex, request.admission_date, request.discharge_date,
+        request.los, request.main_diagnosis, request.sub_diagnoses, request.procedures, request.claim_id,
+    )
+
+
+def _upload_row_record(row: pd.Series, columns: pd.Index) -> Dict[str, Any]:
+    """업로드 파일 한 행을 그루핑 입력 딕셔너리로 변환"""
+    # 부진단 처리
+    sub_diagnoses = []
+    if 'sub_diagnoses' in columns and pd.notna(row.get('sub_diagnoses')):
+        sub_dx = str(row['sub_diagnoses'])
+        sub_diagnoses = [s.strip() for s in sub_dx.split(',') if s.strip()]
+    
+    # 수술/처치 처리
+    procedures = []
+    if 'procedures' in columns and pd.notna(row.get('procedures')):
+        procs = str(row['procedures'])
+        procedures = [p.strip() for p in procs.split(',') if p.strip()]
+    
+    return {
+        'patient_id': str(row['patient_id']),
+        'age': int(row['age']),
+        'sex': str(row['sex']).upper(),
+        'admission_date': str(row['admission_date'])[:10],
+        'discharge_date': str(row['discharge_date'])[:10],
+        'los': int(row['los']),
+        'main_diagnosis': str(row['main_diagnosis']),
+        'sub_diagnoses': sub_diagnoses,
+        'procedures': procedures,
+        'claim_id': str(row.get('claim_id', '')),
+    }
+
+
+def _group_upload_rows(df: pd.DataFrame,
+                       detail_level: DetailLevel = DetailLevel.FULL) -> Tuple[GrouperResultBatch, List[Dict[str, Any]]]:
+    """업로드 DataFrame 행 단위 그루핑 (행별 오류 수집)"""
+    results = GrouperResultBatch()
+    errors = []
+    
+    for idx, row in df.iterrows():
+        try:
+            data = _upload_row_record(row, df.columns)
+            results.append(pre_grouper.group_from_dict(data, detail_level))
+            
+        except Exception as e:
+            errors.append({
+                'row': idx + 2,  # 헤더 + 0-인덱스
+                'patient_id': str(row.get('patient_id', 'unknown')),
+                'error': str(e),
+            })
+    
+    return results, errors
+
+
+def _normalize_upload_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """업로드 DataFrame을 그루핑 입력 컬럼으로 일괄 변환 (변환 실패 시 TypeError/ValueError)"""
+    if is_claims_frame(df):
+        # Parquet/Arrow 입력은 읽을 때 Arrow 타입으로 변환 완료
+        return df
+    
+    def code_lists(name: str) -> List[List[str]]:
+        if name not in df.columns:
+            return [[] for _ in range(len(df))]
+        return [
+            [c.strip() for c in str(v).split(',') if c.strip()] if pd.notna(v) else []
+            for v in df[name]
+        ]
+    
+    return pd.DataFrame({
+        'patient_id': df['patient_id'].map(str),
+        'age': df['age'].map(int),
+        'sex': df['sex'].map(lambda v: str(v).upper()),
+        'admission_date': df['admission_date'].map(lambda v: str(v)[:10]),
+        'discharge_date': df['discharge_date'].map(lambda v: str(v)[:10]),
+        'los': df['los'].map(int),
+        'main_diagnosis': df['main_diagnosis'].map(str),
+        'sub_diagnoses': code_lists('sub_diagnoses'),
+        'procedures': code_lists('procedures'),
+        'claim_id': df['claim_id'].map(str) if 'claim_id' in df.columns else '',
+    })
+
+
+def _group_upload_frame(df: pd.DataFrame,
+                        detail_level: DetailLevel = DetailLevel.FULL) -> Tuple[GrouperResultBatch, List[Dict[str, Any]]]:
+    """업로드 DataFrame 컬럼 단위 그루핑
+    
+    값 변환에 실패하는 행이 있으면 행 단위 처리로 전환해 행별 오류를 수집합니다.
+    """
+    try:
+        frame = _normalize_upload_frame(df)
+    except (TypeError, ValueError):
+        return _group_upload_rows(df, detail_level)
+    
+    return GrouperResultBatch.from_frame(pre_grouper.group_frame(frame, detail_level=detail_level)), []
+
+
+def _upload_records(df: pd.DataFrame) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """업로드 DataFrame을 그루핑 입력 딕셔너리 목록으로 변환
+    
+    Returns:
+        (입력 목록, 입력별 식별 정보(row, patient_id), 변환 오류 목록)
+    """
+    try:
+        frame = _normalize_upload_frame(df)
+    except (TypeError, ValueError):
+        frame = None
+    
+    if frame is not None:
+        records = frame.to_dict('records')
+        refs = [
+            {'row': idx + 2, 'patient_id': record['patient_id']}
+            for idx, record in zip(df.index, records)
+        ]
+        return records, refs, []
+    
+    records, refs, errors = [], [], []
+    for idx, row in df.iterrows():
+        ref = {'row': idx + 2, 'patient_id': str(row.get('patient_id', 'unknown'))}
+        try:
+            records.append(_upload_row_record(row, df.columns))
+            refs.append(ref)
+        except Exception as e:
+            errors.append({**ref, 'error': str(e)})
+    return records, refs, errors
+
+
+UPLOAD_REQUIRED_COLUMNS = ['patient_id', 'age', 'sex', 'admission_date', 'discharge_date', 'los', 'main_diagnosis']
+
+
+def _batch_from_dicts(rows: List[Dict[str, Any]]) -> GrouperResultBatch:
+    """저장된 결과 dict 목록을 배치 결과로 변환"""
+    batch = GrouperResultBatch()
+    for row in rows:
+        batch.append_dict(row)
+    return batch
+
+
+def _arrow_response(batch: GrouperResultBatch, fmt: str, name: str,
+                    headers: Optional[Dict[str, str]] = None) -> Response:
+    """배치 결과를 Parquet/Arrow 파일 응답으로 변환"""
+    content = write_table(results_table(batch), fmt)
+    return Response(
+        content=content,
+        media_type=MEDIA_TYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{name}.{fmt}"', **(headers or {})},
+    )
+
+
+def _json_response(content: Dict[str, Any]) -> Response:
+    """orjson으로 직렬화한 JSON 응답 (GrouperResult는 asdict 없이 그대로 직렬화)"""
+    return Response(content=dumps(content), media_type="application/json")
+
+
+def _accepted_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Accept-Encoding에서 사용할 압축 방식 (br 우선, q=0은 제외)"""
+    accepted = set()
+    for item in (accept_encoding or '').lower().split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        q = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(coding)
+    for coding in ('br', 'gzip'):
+        if coding in accepted:
+            return coding
+    return None
+
+
+def _compressed_json_response(content: bytes, accept_encoding: Optional[str]) -> Response:
+    """JSON 응답 (RESPONSE_COMPRESS_MIN_BYTES 이상이면 클라이언트가 허용한 br/gzip으로 압축)"""
+    headers = {'Vary': 'Accept-Encoding'}
+    min_bytes = settings.RESPONSE_COMPRESS_MIN_BYTES
+    coding = _accepted_encoding(accept_encoding) if 0 < min_bytes <= len(content) else None
+    if coding == 'br':
+        content = brotli.compress(content, quality=4)
+    elif coding == 'gzip':
+        content = gzip.compress(content, compresslevel=6, mtime=0)
+    if coding:
+        headers['Content-Encoding'] = coding
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def _batch_csv(batch: GrouperResultBatch, header: bool) -> str:
+    """배치 결과를 CSV 텍스트로 변환 (목록 컬럼은 ' | '로 연결)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow([name for name, _ in RESULT_COLUMNS])
+    for row in batch.iter_rows():
+        writer.writerow([' | '.join(v) if isinstance(v, list) else v for v in row])
+    return buffer.getvalue()
+
+
+async def _read_upload_frame(file: UploadFile, max_rows: Optional[int]) -> pd.DataFrame:
+    """업로드 파일(CSV/Excel)을 DataFrame으로 읽고 크기/건수/필수 컬럼 확인"""
+    # 파일 읽기 (크기 제한)
+    max_bytes = settings.MAX_UPLOAD_BYTES
+    content = await file.read(max_bytes + 1)
+    if len(content) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"파일 크기가 제한({settings.MAX_UPLOAD_SIZE_MB}MB)를 초과했습니다.")
+
+    filename = file.filename.lower()
+    arrow_format = file_format(filename)
+    
+    if filename.endswith('.csv'):
+        df = await run_in_threadpool(pd.read_csv, io.BytesIO(content), encoding='utf-8-sig')
+    elif is_excel(filename):
+        df = await run_in_threadpool(read_excel, content, filename, None, max_rows)
+    elif arrow_format is not None:
+        try:
+            table = await run_in_threadpool(read_table, content, arrow_format)
+            df = await run_in_threadpool(claims_frame, table)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"파일을 읽을 수 없습니다: {str(e)}")
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="지원하지 않는 파일 형식입니다. CSV, Excel, Parquet 또는 Arrow 파일만 가능합니다.",
+        )
+    
+    # 행 수 제한
+    if max_rows is not None and len(df) > max_rows:
+        raise HTTPException(status_code=413, detail=f"업로드 건수가 제한({max_rows}건)를 초과했습니다.")
+    
+    # 필수 컬럼 확인
+    missing_cols = [col for col in UPLOAD_REQUIRED_COLUMNS if col not in df.columns]
+    
+    if missing_cols:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"필수 컬럼이 누락되었습니다: {', '.join(missing_cols)}"
+        )
+    
+    return df
+
+
+def _compare_versions(frame: pd.DataFrame, versions: List[str], limit: int) -> Dict[str, Any]:
+    """버전 비교 그루핑 (변경 청구는 limit건까지 반환)"""
+    with VersionComparison(versions) as comparison:
+        comparison.add_frame(frame)
+        changes = comparison.labeled(comparison.changes(limit=limit))
+        return {
+            'versions': comparison.versions(),
+            'totals': comparison.totals(),
+            'mdc_summary': comparison.mdc_summary(),
+            'changed_count': comparison.changed_count,
+            'changes': json.loads(changes.to_json(orient='records', force_ascii=False)),
+        }
+
+
+async def _regroup(records: List[Dict[str, Any]], refs: List[Dict[str, Any]],
+                   errors: List[Dict[str, Any]], force: bool, extra: Dict[str, Any],
+                   layout: str = ROWS, accept_encoding: Optional[str] = None) -> Response:
+    """입력 지문 비교 후 변경된 청구만 재그루핑
+    
+    Args:
+        records: 그루핑 입력 딕셔너리 목록
+        refs: records와 같은 순서의 오류 표시용 식별 정보 (index/row, patient_id)
+        errors: 입력 변환 단계에서 이미 발생한 오류
+        force: 저장된 결과를 무시하고 전부 재계산
+        extra: 응답/이력에 추가할 항목 (파일명 등)
+        layout: 응답 결과 레이아웃 (rows/columns/compact, 이력은 항상 rows로 저장)
+        accept_encoding: 요청 Accept-Encoding 헤더 (응답 압축 협상)
+    """
+    regroup_id = f"regroup_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    created_at = datetime.now().isoformat()
+    rule_version = pre_grouper.rule_version
+    total = len(records) + len(errors)
+    claim_ids = [str(record.get('claim_id') or '') for record in records]
+    
+    fingerprints = await run_in_threadpool(pre_grouper.fingerprint_records, records)
+    stored = {} if force else await grouping_store.get_claim_fingerprints([c for c in claim_ids if c])
+    
+    # 입력 지문과 규칙 버전(분류표 + 코드표 내용)이 모두 같은 청구는 저장된 결과 재사용
+    reused: Dict[int, Dict[str, Any]] = {}
+    recompute: List[int] = []
+    for idx, (fingerprint, error) in enumerate(fingerprints):
+        previous = stored.get(claim_ids[idx]) if claim_ids[idx] and error is None else None
+        if (previous and previous['fingerprint'] == fingerprint
+                and previous['rule_version'] == rule_version):
+            result = json.loads(previous['result_json'])
+            result['patient_id'] = str(records[idx].get('patient_id', ''))
+            reused[idx] = result
+        else:
+            recompute.append(idx)
+    
+    outcomes = await run_in_threadpool(pre_grouper.group_records, [records[i] for i in recompute])
+    recomputed = dict(zip(recompute, outcomes))
+    
+    # 재계산 결과는 그루핑 시점의 규칙 버전으로 저장/보고 (조회 후 규칙이 교체될 수 있음)
+    results = GrouperResultBatch()
+    fingerprint_rows = []
+    versions = {rule_version} if reused else set()
+    grouped_version = rule_version
+    for idx in range(len(records)):
+        if idx in reused:
+            results.append_dict(reused[idx])
+            continue
+        result, error = recomputed[idx]
+        if error is not None:
+            errors.append({**refs[idx], 'error': error})
+            continue
+        results.append(result)
+        grouped_version = result.rule_version
+        versions.add(grouped_version)
+        if claim_ids[idx]:
+            fingerprint_rows.append((
+                claim_ids[idx], fingerprints[idx][0], grouped_version,
+                dumps(result).decode('utf-8'), regroup_id, created_at,
+            ))
+    
+    await grouping_store.save_claim_fingerprints(fingerprint_rows)
+    
+    counts = {
+        'total': total,
+        'success_count': len(results),
+        'error_count': len(errors),
+        'reused_count': len(reused),
+        'recomputed_count': len(recompute),
+        'rule_version': grouped_version,
+        'rule_versions': sorted(versions),  # 재사용 결과와 버전이 다르면 2개 이상
+    }
+    payload = {
+        'history_id': regroup_id,
+        'created_at': created_at,
+        'type': 'regroup',
+        **extra,
+        **counts,
+        'results': results,
+        'errors': errors,
+    }
+    await grouping_store.save_history(regroup_id, "regroup", payload)
+    
+    content = dumps_with_results({
+        'success': True,
+        'regroup_id': regroup_id,
+        **extra,
+        **counts,
+        'layout': layout,
+        'results': results,
+        'errors': errors if errors else None,
+        'message': f"총 {total}건 중 {len(reused)}건 재사용, {len(recompute)}건 재계산",
+    }, 'results', results, layout)
+    return await run_in_threadpool(_compressed_json_response, content, accept_encoding)
+
+
 # ===== API Endpoints =====
 
 @router.post("/group")
@@ -98,40 +483,15 @@ async def group_single(request: GroupingRequest):
     환자 정보, 진단 정보, 수술/처치 정보를 입력받아 KDRG 코드를 생성합니다.
     """
     try:
-        # 입력 데이터 변환
-        patient = PatientInfo(
-            patient_id=request.patient.patient_id,
-            age=request.patient.age,
-            sex=request.patient.sex,
-            admission_date=request.patient.admission_date,
-            discharge_date=request.patient.discharge_date,
-            los=request.patient.los,
-            birth_weight=request.patient.birth_weight,
-            discharge_status=request.patient.discharge_status,
-        )
+        # 요청 필드를 입력 행 튜플로 바로 전달 (출생체중/퇴원 상태/주수술은 분류에 쓰이지 않음)
+        patient = request.patient
+        result = pre_grouper.group_row((
+            patient.patient_id, patient.age, patient.sex, patient.admission_date, patient.discharge_date,
+            patient.los, request.diagnosis.main_diagnosis, request.diagnosis.sub_diagnoses,
+            request.procedure.procedures, request.claim_id,
+        ))
         
-        diagnosis = DiagnosisInfo(
-            main_diagnosis=request.diagnosis.main_diagnosis,
-            sub_diagnoses=request.diagnosis.sub_diagnoses,
-            admission_diagnosis=request.diagnosis.admission_diagnosis,
-        )
-        
-        procedure = ProcedureInfo(
-            procedures=request.procedure.procedures,
-            main_procedure=request.procedure.main_procedure,
-        )
-        
-        input_data = GrouperInput(
-            patient=patient,
-            diagnosis=diagnosis,
-            procedure=procedure,
-            claim_id=request.claim_id,
-        )
-        
-        # 그루핑 실행
-        result = pre_grouper.group(input_data)
-        
-        # 히스토리 저장 (SQLite)
+        # 히스토리 저장 (지연 저장 대기열, SQLite commit을 기다리지 않고 응답)
         history_id = f"grp_{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
         created_at = datetime.now().isoformat()
         payload = {
@@ -141,15 +501,15 @@ async def group_single(request: GroupingRequest):
                 'patient_id': request.patient.patient_id,
                 'main_diagnosis': request.diagnosis.main_diagnosis,
             },
-            'result': asdict(result),
+            'result': result,
         }
-        await grouping_store.save_history(history_id, "single", payload)
+        await history_writer.save(history_id, "single", payload)
         
-        return {
+        return _json_response({
             'success': True,
             'history_id': history_id,
-            'result': asdict(result),
-        }
+            'result': result,
+        })
         
     except Exception as e:
         logger.error(f"그루핑 오류: {e}")
@@ -164,25 +524,12 @@ async def group_simple(request: SimpleGroupingRequest):
     플랫 구조로 데이터를 입력받아 KDRG 코드를 생성합니다.
     """
     try:
-        data = {
-            'patient_id': request.patient_id,
-            'age': request.age,
-            'sex': request.sex,
-            'admission_date': request.admission_date,
-            'discharge_date': request.discharge_date,
-            'los': request.los,
-            'main_diagnosis': request.main_diagnosis,
-            'sub_diagnoses': request.sub_diagnoses,
-            'procedures': request.procedures,
-            'claim_id': request.claim_id,
-        }
-        
-        result = pre_grouper.group_from_dict(data)
+        result = pre_grouper.group_row(_request_row(request))
         
-        return {
+        return _json_response({
             'success': True,
-            'result': asdict(result),
-        }
+            'result': result,
+        })
         
     except Exception as e:
         logger.error(f"간편 그루핑 오류: {e}")
@@ -190,38 +537,40 @@ async def group_simple(request: SimpleGroupingRequest):
 
 
 @router.post("/group-batch")
-async def group_batch(request: BatchGroupingRequest):
+async def group_batch(
+    request: BatchGroupingRequest,
+    detail_level: DetailLevel = Query(DetailLevel.FULL, description="결과 상세 수준 (full/codes-only)"),
+    output: str = Query("json", pattern="^(json|parquet|arrow)$", description="결과 형식 (json/parquet/arrow)"),
+    layout: str = Query(ROWS, pattern=LAYOUT_PATTERN, description="JSON 결과 레이아웃 (rows: 행별 객체 배열, columns: 컬럼별 값 배열, compact: 컬럼별 + 반복 문자열 dictionary 인코딩)"),
+    accept_encoding: Optional[str] = Header(None, include_in_schema=False),
+):
     """
     배치 KDRG 그루핑
     
     여러 건의 데이터를 한 번에 그루핑합니다.
+    detail_level=codes-only이면 분류 경로는 비우고 경고는 코드(W01 등)로 반환합니다 (/expand-detail로 복원).
+    output=parquet/arrow이면 성공한 결과를 Parquet / Arrow IPC stream 파일로 반환합니다 (오류 건수는 X-Error-Count 헤더).
+    layout=columns이면 results를 {컬럼명: [값, ...]} 형태로 반환합니다 (행마다 키를 반복하지 않아 응답이 작고 빠름).
+    layout=compact이면 columns에 더해 반복 문자열 컬럼을 {"dictionary", "indices"}로,
+    목록 컬럼을 {"dictionary", "offsets", "indices"}로 인코딩합니다 (고유값이 많은 claim_id 등은 값 배열).
+    JSON 응답은 Accept-Encoding에 따라 br/gzip으로 압축합니다 (RESPONSE_COMPRESS_MIN_BYTES 이상).
     """
     try:
-        results = []
-        errors = []
+        rows = [_request_row(record) for record in request.records]
         
-        for idx, record in enumerate(request.records):
-            try:
-                data = {
-                    'patient_id': record.patient_id,
-                    'age': record.age,
-                    'sex': record.sex,
-                    'admission_date': record.admission_date,
-                    'discharge_date': record.discharge_date,
-                    'los': record.los,
-                    'main_diagnosis': record.main_diagnosis,
-                    'sub_diagnoses': record.sub_diagnoses,
-                    'procedures': record.procedures,
-                    'claim_id': record.claim_id,
-                }
-                result = pre_grouper.group_from_dict(data)
-                results.append(asdict(result))
-            except Exception as e:
-                errors.append({
-                    'index': idx,
-                    'patient_id': record.patient_id,
-                    'error': str(e),
-                })
+        # 그루핑은 스레드풀(대량 배치는 프로세스 풀)에서 실행 - 이벤트 루프 비차단
+        # 결과는 컬럼 저장소(GrouperResultBatch)에 담아 행 객체/dict 사본을 만들지 않음
+        results, failed = await run_in_threadpool(
+            pre_grouper.group_rows_batch, rows, None, detail_level
+        )
+        errors = [
+            {
+                'index': idx,
+                'patient_id': request.records[idx].patient_id,
+                'error': error,
+            }
+            for idx, error in failed
+        ]
         
         # 배치 결과 저장
         batch_id = f"batch_{datetime.now().strftime('%Y%m%d%H%M%S')}"
@@ -230,6 +579,7 @@ async def group_batch(request: BatchGroupingRequest):
             'history_id': batch_id,
             'created_at': created_at,
             'type': 'batch',
+            'detail_level': detail_level.value,
             'total': len(request.records),
             'success_count': len(results),
             'error_count': len(errors),
@@ -238,24 +588,95 @@ async def group_batch(request: BatchGroupingRequest):
         }
         await grouping_store.save_history(batch_id, "batch", payload)
         
-        return {
+        if output != 'json':
+            return _arrow_response(results, output, batch_id, {'X-Error-Count': str(len(errors))})
+        
+        content = dumps_with_results({
             'success': True,
             'batch_id': batch_id,
+            'detail_level': detail_level.value,
             'total': len(request.records),
             'success_count': len(results),
             'error_count': len(errors),
+            'layout': layout,
             'results': results,
             'errors': errors if errors else None,
-        }
+        }, 'results', results, layout)
+        return await run_in_threadpool(_compressed_json_response, content, accept_encoding)
         
     except Exception as e:
         logger.error(f"배치 그루핑 오류: {e}")
         raise HTTPException(status_code=500, detail=f"배치 그루핑 중 오류 발생: {str(e)}")
 
 
+@router.post("/expand-detail")
+async def expand_detail(request: ExpandDetailRequest):
+    """
+    codes-only 결과 상세 복원
+    
+    결과별 분류 경로와 경고 문장을 full 모드와 같은 형태로 다시 만들어 반환합니다.
+    """
+    try:
+        return {
+            'success': True,
+            'details': [pre_grouper.expand_detail(result) for result in request.results],
+        }
+    except (KeyError, TypeError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"결과 형식이 올바르지 않습니다: {str(e)}")
+
+
+@router.post("/regroup")
+async def regroup_batch(
+    request: BatchGroupingRequest,
+    force: bool = Query(False, description="저장된 결과를 무시하고 전부 재계산"),
+    layout: str = Query(ROWS, pattern=LAYOUT_PATTERN, description="JSON 결과 레이아웃 (rows: 행별 객체 배열, columns: 컬럼별 값 배열, compact: 컬럼별 + 반복 문자열 dictionary 인코딩)"),
+    accept_encoding: Optional[str] = Header(None, include_in_schema=False),
+):
+    """
+    증분 재그루핑
+    
+    claim_id별로 마지막 그루핑 입력의 지문(정규화된 입력값 해시)과 규칙 버전을 저장해 두고,
+    입력이나 규칙 버전이 바뀐 청구만 다시 그루핑합니다. 나머지는 저장된 결과를 재사용합니다.
+    claim_id가 없는 건은 항상 재계산합니다.
+    """
+    try:
+        records = [record.model_dump() for record in request.records]
+        refs = [{'index': idx, 'patient_id': record.patient_id} for idx, record in enumerate(request.records)]
+        return await _regroup(records, refs, [], force, {}, layout, accept_encoding)
+    except Exception as e:
+        logger.error(f"증분 재그루핑 오류: {e}")
+        raise HTTPException(status_code=500, detail=f"재그루핑 중 오류 발생: {str(e)}")
+
+
+@router.post("/regroup-upload")
+async def regroup_upload(
+    file: UploadFile = File(..., description="CSV 또는 Excel 파일"),
+    force: bool = Query(False, description="저장된 결과를 무시하고 전부 재계산"),
+    layout: str = Query(ROWS, pattern=LAYOUT_PATTERN, description="JSON 결과 레이아웃 (rows: 행별 객체 배열, columns: 컬럼별 값 배열, compact: 컬럼별 + 반복 문자열 dictionary 인코딩)"),
+    accept_encoding: Optional[str] = Header(None, include_in_schema=False),
+):
+    """
+    파일 업로드 증분 재그루핑
+    
+    /upload와 같은 형식의 파일을 받아 /regroup과 같은 방식으로 변경된 청구만 재그루핑합니다.
+    건수 제한은 적용하지 않습니다 (파일 크기 제한은 적용).
+    """
+    try:
+        df = await _read_upload_frame(file, max_rows=None)
+        records, refs, errors = await run_in_threadpool(_upload_records, df)
+        return await _regroup(records, refs, errors, force, {'filename': file.filename}, layout, accept_encoding)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"파일 재그루핑 오류: {e}")
+        raise HTTPException(status_code=500, detail=f"파일 처리 중 오류 발생: {str(e)}")
+
+
 @router.post("/upload")
 async def upload_and_group(
-    file: UploadFile = File(..., description="CSV 또는 Excel 파일")
+    file: UploadFile = File(..., description="CSV, Excel, Parquet 또는 Arrow 파일"),
+    detail_level: DetailLevel = Query(DetailLevel.FULL, description="결과 상세 수준 (full/codes-only)"),
+    output: str = Query("json", pattern="^(json|parquet|arrow)$", description="결과 형식 (json/parquet/arrow)"),
 ):
     """
     파일 업로드 후 일괄 그루핑
@@ -272,78 +693,15 @@ async def upload_and_group(
     - main_diagnosis: 주진단
     
     선택 컬럼:
-    - sub_diagnoses: 부진단 (쉼표로 구분)
-    - procedures: 수술/처치 코드 (쉼표로 구분)
+    - sub_diagnoses: 부진단 (쉼표로 구분, Parquet/Arrow는 list<string>도 가능)
+    - procedures: 수술/처치 코드 (쉼표로 구분, Parquet/Arrow는 list<string>도 가능)
+    
+    output=parquet/arrow이면 미리보기 대신 전체 결과를 파일로 반환합니다 (오류 건수는 X-Error-Count 헤더).
     """
     try:
-        # 파일 읽기 (크기 제한)
-        max_bytes = settings.MAX_UPLOAD_BYTES
-        content = await file.read(max_bytes + 1)
-        if len(content) > max_bytes:
-            raise HTTPException(status_code=413, detail=f"파일 크기가 제한({settings.MAX_UPLOAD_SIZE_MB}MB)를 초과했습니다.")
-
-        filename = file.filename.lower()
+        df = await _read_upload_frame(file, max_rows=settings.MAX_UPLOAD_ROWS)
         
-        if filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(content), encoding='utf-8-sig')
-        elif filename.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(io.BytesIO(content))
-        else:
-            raise HTTPException(status_code=400, detail="지원하지 않는 파일 형식입니다. CSV 또는 Excel 파일만 가능합니다.")
-        
-        # 행 수 제한
-        if len(df) > settings.MAX_UPLOAD_ROWS:
-            raise HTTPException(status_code=413, detail=f"업로드 건수가 제한({settings.MAX_UPLOAD_ROWS}건)를 초과했습니다.")
-        
-        # 필수 컬럼 확인
-        required_cols = ['patient_id', 'age', 'sex', 'admission_date', 'discharge_date', 'los', 'main_diagnosis']
-        missing_cols = [col for col in required_cols if col not in df.columns]
-        
-        if missing_cols:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"필수 컬럼이 누락되었습니다: {', '.join(missing_cols)}"
-            )
-        
-        results = []
-        errors = []
-        
-        for idx, row in df.iterrows():
-            try:
-                # 부진단 처리
-                sub_diagnoses = []
-                if 'sub_diagnoses' in df.columns and pd.notna(row.get('sub_diagnoses')):
-                    sub_dx = str(row['sub_diagnoses'])
-                    sub_diagnoses = [s.strip() for s in sub_dx.split(',') if s.strip()]
-                
-                # 수술/처치 처리
-                procedures = []
-                if 'procedures' in df.columns and pd.notna(row.get('procedures')):
-                    procs = str(row['procedures'])
-                    procedures = [p.strip() for p in procs.split(',') if p.strip()]
-                
-                data = {
-                    'patient_id': str(row['patient_id']),
-                    'age': int(row['age']),
-                    'sex': str(row['sex']).upper(),
-                    'admission_date': str(row['admission_date'])[:10],
-                    'discharge_date': str(row['discharge_date'])[:10],
-                    'los': int(row['los']),
-                    'main_diagnosis': str(row['main_diagnosis']),
-                    'sub_diagnoses': sub_diagnoses,
-                    'procedures': procedures,
-                    'claim_id': str(row.get('claim_id', '')),
-                }
-                
-                result = pre_grouper.group_from_dict(data)
-                results.append(asdict(result))
-                
-            except Exception as e:
-                errors.append({
-                    'row': idx + 2,  # 헤더 + 0-인덱스
-                    'patient_id': str(row.get('patient_id', 'unknown')),
-                    'error': str(e),
-                })
+        results, errors = await run_in_threadpool(_group_upload_frame, df, detail_level)
         
         # 업로드 결과 저장
         upload_id = f"upload_{datetime.now().strftime('%Y%m%d%H%M%S')}"
@@ -352,6 +710,7 @@ async def upload_and_group(
             'history_id': upload_id,
             'created_at': created_at,
             'type': 'upload',
+            'detail_level': detail_level.value,
             'filename': file.filename,
             'total': len(df),
             'success_count': len(results),
@@ -361,24 +720,28 @@ async def upload_and_group(
         }
         await grouping_store.save_history(upload_id, "upload", payload)
         
+        if output != 'json':
+            return _arrow_response(results, output, upload_id, {'X-Error-Count': str(len(errors))})
+        
         # DRG군별 통계
         drg_stats = {}
-        for r in results:
-            drg_type = r.get('drg_type', '행위별')
+        for drg_type, amount in zip(results.column('drg_type'), results.column('estimated_amount')):
             if drg_type not in drg_stats:
                 drg_stats[drg_type] = {'count': 0, 'total_amount': 0}
             drg_stats[drg_type]['count'] += 1
-            drg_stats[drg_type]['total_amount'] += r.get('estimated_amount', 0)
+            drg_stats[drg_type]['total_amount'] += amount
         
+        preview = [results.row_dict(i) for i in range(min(len(results), settings.MAX_RESULT_PREVIEW))]
         return {
             'success': True,
             'upload_id': upload_id,
+            'detail_level': detail_level.value,
             'filename': file.filename,
             'total': len(df),
             'success_count': len(results),
             'error_count': len(errors),
             'drg_statistics': drg_stats,
-            'results': results[:settings.MAX_RESULT_PREVIEW],
+            'results': preview,
             'errors': errors[:settings.MAX_ERROR_PREVIEW] if errors else None,
             'message': f"총 {len(df)}건 중 {len(results)}건 그루핑 완료"
         }
@@ -390,6 +753,222 @@ async def upload_and_group(
         raise HTTPException(status_code=500, detail=f"파일 처리 중 오류 발생: {str(e)}")
 
 
+@router.post("/upload-stream")
+async def upload_and_group_stream(
+    file: UploadFile = File(..., description="CSV, Excel, Parquet 또는 Arrow 파일"),
+    output: str = Query("ndjson", pattern="^(ndjson|csv|parquet|arrow)$", description="출력 형식 (ndjson/csv/parquet/arrow)"),
+    detail_level: DetailLevel = Query(DetailLevel.FULL, description="결과 상세 수준 (full/codes-only)"),
+):
+    """
+    대용량 파일 스트리밍 그루핑
+    
+    CSV/Excel/Parquet를 청크 단위(GROUPER_CHUNK_SIZE행)로 읽어 그루핑하고, 결과를 즉시 스트리밍합니다.
+    Arrow IPC 파일은 파일에 저장된 레코드 배치 단위로 읽습니다.
+    건수 제한이 없으며 메모리 사용량은 파일 크기와 무관하게 청크 크기로 유지됩니다.
+    
+    - ndjson: 결과 1건당 한 줄, 오류 행은 {"row", "patient_id", "error"}, 마지막 줄은 {"summary": {...}}
+    - csv: 성공한 결과만 출력 (목록 컬럼은 ' | '로 연결), 오류는 이력 요약에 저장
+    - parquet / arrow: 성공한 결과만 출력 (청크별 row group / 레코드 배치), 오류는 이력 요약에 저장
+    
+    필수/선택 컬럼은 /upload와 같습니다.
+    """
+    arrow_format = file_format(file.filename)
+    excel = is_excel(file.filename)
+    if arrow_format is None and not excel and not file.filename.lower().endswith('.csv'):
+        raise HTTPException(status_code=400, detail="스트리밍 업로드는 CSV, Excel, Parquet 또는 Arrow 파일만 지원합니다.")
+    
+    chunk_size = max(settings.GROUPER_CHUNK_SIZE, 1)
+    try:
+        if arrow_format is not None:
+            reader = iter_claim_frames(file.file, arrow_format, chunk_size)
+        elif excel:
+            reader = iter_excel(file.file, file.filename, chunk_rows=chunk_size)
+        else:
+            reader = await run_in_threadpool(pd.read_csv, file.file, encoding='utf-8-sig', chunksize=chunk_size)
+        first = await run_in_threadpool(next, reader, None)
+    except Exception as e:
+        logger.error(f"스트리밍 업로드 읽기 오류: {e}")
+        raise HTTPException(status_code=400, detail=f"파일을 읽을 수 없습니다: {str(e)}")
+    
+    columns = list(first.columns) if first is not None else []
+    missing_cols = [col for col in UPLOAD_REQUIRED_COLUMNS if col not in columns]
+    if missing_cols:
+        reader.close()
+        raise HTTPException(
+            status_code=400,
+            detail=f"필수 컬럼이 누락되었습니다: {', '.join(missing_cols)}"
+        )
+    
+    upload_id = f"upload_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    
+    async def stream():
+        total = 0
+        success_count = 0
+        errors: List[Dict[str, Any]] = []
+        error_count = 0
+        drg_stats: Dict[str, Dict[str, Any]] = {}
+        writer = ResultStreamWriter(output) if output in MEDIA_TYPES else None
+        chunk = first
+        try:
+            while chunk is not None:
+                batch, chunk_errors = await run_in_threadpool(_group_upload_frame, chunk, detail_level)
+                total += len(chunk)
+                success_count += len(batch)
+                error_count += len(chunk_errors)
+                if len(errors) < settings.MAX_ERROR_PREVIEW:
+                    errors.extend(chunk_errors[:settings.MAX_ERROR_PREVIEW - len(errors)])
+                for drg_type, amount in zip(batch.column('drg_type'), batch.column('estimated_amount')):
+                    stat = drg_stats.setdefault(drg_type, {'count': 0, 'total_amount': 0})
+                    stat['count'] += 1
+                    stat['total_amount'] += amount
+                
+                if output == 'csv':
+                    yield _batch_csv(batch, header=total == len(chunk))
+                elif writer is not None:
+                    yield await run_in_threadpool(writer.write, batch)
+                else:
+                    lines = list(batch.iter_json())
+                    lines.extend(map(dumps, chunk_errors))
+                    if lines:
+                        yield b'\n'.join(lines) + b'\n'
+                
+                del batch, chunk_errors
+                chunk = await run_in_threadpool(next, reader, None)
+            if writer is not None:
+                yield writer.close()
+        finally:
+            reader.close()
+        
+        # 이력에는 요약만 저장 (개별 결과 미저장)
+        summary = {
+            'history_id': upload_id,
+            'created_at': datetime.now().isoformat(),
+            'type': 'upload',
+            'streamed': True,
+            'detail_level': detail_level.value,
+            'filename': file.filename,
+            'total': total,
+            'success_count': success_count,
+            'error_count': error_count,
+            'drg_statistics': drg_stats,
+            'errors': errors,
+        }
+        await grouping_store.save_history(upload_id, "upload", summary)
+        
+        if output == 'ndjson':
+            yield dumps({'summary': summary}) + b'\n'
+    
+    if output == 'csv':
+        return StreamingResponse(
+            stream(),
+            media_type="text/csv; charset=utf-8",
+            headers={'Content-Disposition': f'attachment; filename="{upload_id}.csv"'},
+        )
+    if output in MEDIA_TYPES:
+        return StreamingResponse(
+            stream(),
+            media_type=MEDIA_TYPES[output],
+            headers={'Content-Disposition': f'attachment; filename="{upload_id}.{output}"'},
+        )
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.post("/jobs")
+async def submit_grouping_job(
+    request: BatchGroupingRequest,
+    detail_level: DetailLevel = Query(DetailLevel.FULL, description="결과 상세 수준 (full/codes-only)"),
+):
+    """
+    비동기 배치 그루핑 작업 등록
+    
+    입력을 저장하고 즉시 job_id를 반환합니다. 그루핑은 백그라운드에서 청크 단위로 진행되며
+    GET /jobs/{job_id}로 진행률을, GET /jobs/{job_id}/results로 결과를 조회합니다.
+    서버가 재시작되면 마지막으로 저장된 청크 다음부터 이어서 처리합니다.
+    """
+    try:
+        records = [record.model_dump() for record in request.records]
+        refs = [{'index': idx, 'patient_id': record.patient_id} for idx, record in enumerate(request.records)]
+        job = await grouping_jobs.submit(records, refs, 'batch', detail_level)
+        return {'success': True, **job}
+    except Exception as e:
+        logger.error(f"그루핑 작업 등록 오류: {e}")
+        raise HTTPException(status_code=500, detail=f"작업 등록 중 오류 발생: {str(e)}")
+
+
+@router.post("/jobs/upload")
+async def submit_upload_job(
+    file: UploadFile = File(..., description="CSV 또는 Excel 파일"),
+    detail_level: DetailLevel = Query(DetailLevel.FULL, description="결과 상세 수준 (full/codes-only)"),
+):
+    """
+    파일 업로드 비동기 그루핑 작업 등록
+    
+    /upload와 같은 형식의 파일을 받아 작업으로 등록합니다. 건수 제한은 적용하지 않습니다 (파일 크기 제한은 적용).
+    """
+    try:
+        df = await _read_upload_frame(file, max_rows=None)
+        records, refs, errors = await run_in_threadpool(_upload_records, df)
+        job = await grouping_jobs.submit(records, refs, 'upload', detail_level, file.filename, errors)
+        return {'success': True, **job}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"업로드 작업 등록 오류: {e}")
+        raise HTTPException(status_code=500, detail=f"작업 등록 중 오류 발생: {str(e)}")
+
+
+@router.get("/jobs/{job_id}")
+async def get_grouping_job(job_id: str):
+    """
+    그루핑 작업 상태 / 진행률 조회
+    """
+    job = await grouping_jobs.get_status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return {'success': True, **job}
+
+
+@router.get("/jobs/{job_id}/results")
+async def get_grouping_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="시작 위치 (성공 결과 기준)"),
+    limit: int = Query(1000, ge=1, le=10000, description="조회 건수"),
+):
+    """
+    그루핑 작업 결과 페이지 조회
+    
+    작업이 진행 중이면 지금까지 저장된 청크의 결과까지 조회됩니다.
+    """
+    job = await grouping_jobs.get_status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    
+    results = await grouping_jobs.get_results(job_id, offset, limit)
+    return {
+        'success': True,
+        'job_id': job_id,
+        'status': job['status'],
+        'success_count': job['success_count'],
+        'offset': offset,
+        'limit': limit,
+        'results': results,
+    }
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_grouping_job(job_id: str):
+    """
+    그루핑 작업 취소
+    
+    대기 중인 작업은 즉시, 실행 중인 작업은 처리 중인 청크가 끝난 뒤 취소됩니다.
+    이미 저장된 청크의 결과는 계속 조회할 수 있습니다.
+    """
+    job = await grouping_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return {'success': True, **job}
+
+
 @router.get("/history")
 async def get_grouping_history(
     limit: int = Query(50, ge=1, le=200, description="조회 건수")
@@ -397,15 +976,23 @@ async def get_grouping_history(
     """
     그루핑 히스토리 조회 (SQLite)
     """
+    await history_writer.flush()
     return await grouping_store.list_history(limit)
 
 
 @router.get("/history/{history_id}")
-async def get_grouping_result(history_id: str):
+async def get_grouping_result(
+    history_id: str,
+    offset: int = Query(0, ge=0, description="결과 시작 위치 (배치/업로드 이력)"),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="결과 조회 건수 (생략하면 전체)"),
+):
     """
     특정 그루핑 결과 상세 조회
+    
+    배치/업로드 이력은 offset/limit으로 결과를 페이지 단위로 조회할 수 있습니다 (전체 건수는 result_count).
     """
-    result = await grouping_store.get_history(history_id)
+    await history_writer.flush()
+    result = await grouping_store.get_history(history_id, offset, limit)
     if not result:
         raise HTTPException(status_code=404, detail="결과를 찾을 수 없습니다.")
     
@@ -415,6 +1002,32 @@ async def get_grouping_result(history_id: str):
     }
 
 
+@router.get("/history/{history_id}/export")
+async def export_grouping_result(
+    history_id: str,
+    format: str = Query("parquet", pattern="^(parquet|arrow)$", description="파일 형식 (parquet/arrow)"),
+):
+    """
+    그루핑 결과 Parquet / Arrow IPC stream 내보내기
+    
+    배치/업로드 이력은 저장된 결과를, 비동기 작업 이력은 작업 결과 전체를 내보냅니다.
+    """
+    await history_writer.flush()
+    result = await grouping_store.get_history(history_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="결과를 찾을 수 없습니다.")
+    
+    if result.get('job'):
+        rows = await grouping_store.get_job_results(history_id, 0, result.get('success_count', 0))
+    elif 'result' in result:
+        rows = [result['result']]
+    else:
+        rows = result.get('results') or []
+    
+    batch = await run_in_threadpool(_batch_from_dicts, rows)
+    return await run_in_threadpool(_arrow_response, batch, format, history_id)
+
+
 @router.post("/optimize")
 async def get_optimization(request: SimpleGroupingRequest):
     """
@@ -423,27 +1036,14 @@ async def get_optimization(request: SimpleGroupingRequest):
     현재 KDRG 분류 결과에서 개선 가능한 항목을 분석합니다.
     """
     try:
-        data = {
-            'patient_id': request.patient_id,
-            'age': request.age,
-            'sex': request.sex,
-            'admission_date': request.admission_date,
-            'discharge_date': request.discharge_date,
-            'los': request.los,
-            'main_diagnosis': request.main_diagnosis,
-            'sub_diagnoses': request.sub_diagnoses,
-            'procedures': request.procedures,
-            'claim_id': request.claim_id,
-        }
-        
-        result = pre_grouper.group_from_dict(data)
+        result = pre_grouper.group_row(_request_row(request))
         optimization = pre_grouper.estimate_optimization(result)
         
-        return {
+        return _json_response({
             'success': True,
-            'grouping_result': asdict(result),
+            'grouping_result': result,
             'optimization': optimization,
-        }
+        })
         
     except Exception as e:
         logger.error(f"최적화 분석 오류: {e}")
@@ -455,8 +1055,9 @@ async def get_drg7_info():
     """
     7개 DRG군 정보 조회
     """
+    rule_set = pre_grouper.rule_set
     drg7_info = []
-    for code, info in KDRGPreGrouper.DRG7_SURGERY_CODES.items():
+    for code, info in rule_set.drg7_surgery_codes.items():
         drg7_info.append({
             'code': code,
             'name': info['name'],
@@ -469,6 +1070,7 @@ async def get_drg7_info():
     
     return {
         'success': True,
+        'rule_version': pre_grouper.rule_version,
         'total': len(drg7_info),
         'drg7': drg7_info,
     }
@@ -480,7 +1082,7 @@ async def get_mdc_info():
     MDC (주진단범주) 정보 조회
     """
     mdc_info = []
-    for code, (name, prefixes) in KDRGPreGrouper.MDC_DEFINITIONS.items():
+    for code, (name, prefixes) in pre_grouper.rule_set.mdc_definitions.items():
         mdc_info.append({
             'code': code,
             'name': name,
@@ -489,6 +1091,7 @@ async def get_mdc_info():
     
     return {
         'success': True,
+        'rule_version': pre_grouper.rule_version,
         'total': len(mdc_info),
         'mdc': mdc_info,
     }
@@ -499,18 +1102,173 @@ async def get_cc_codes():
     """
     CC/MCC 코드 목록 조회
     """
+    cc_codes = pre_grouper.rule_set.cc_codes
+    return {
+        'success': True,
+        'rule_version': pre_grouper.rule_version,
+        'mcc': cc_codes['MCC'],
+        'cc': cc_codes['CC'],
+    }
+
+
+@router.get("/rules")
+async def get_rules():
+    """
+    활성/직전 규칙 세트 및 사용 가능한 버전 조회
+    """
     return {
         'success': True,
-        'mcc': KDRGPreGrouper.CC_CODES['MCC'],
-        'cc': KDRGPreGrouper.CC_CODES['CC'],
+        **pre_grouper.rule_set_info(),
     }
 
 
+@router.post("/rules/activate")
+async def activate_rules(request: ActivateRulesRequest):
+    """
+    규칙 세트 활성화
+    
+    컴파일이 끝난 뒤 원자적으로 교체하므로 처리 중인 요청은 기존 규칙으로 끝까지 처리됩니다.
+    다른 워커 프로세스는 GROUPER_RULES_CHECK_SECONDS 이내에 같은 버전으로 전환합니다.
+    """
+    try:
+        info = await run_in_threadpool(pre_grouper.activate_rule_set, request.version)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"규칙 세트를 찾을 수 없습니다: {request.version}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {'success': True, **info}
+
+
+@router.post("/rules/reload")
+async def reload_rules():
+    """
+    활성 규칙 세트 파일 다시 읽기 (같은 버전 파일을 수정한 경우)
+    """
+    try:
+        await run_in_threadpool(pre_grouper.reload_rules)
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"규칙 세트를 다시 읽을 수 없습니다: {e}")
+    return {'success': True, **pre_grouper.rule_set_info()}
+
+
+@router.post("/rules/rollback")
+async def rollback_rules():
+    """
+    직전 규칙 세트로 되돌리기
+    """
+    try:
+        info = await run_in_threadpool(pre_grouper.rollback_rules)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {'success': True, **info}
+
+
+@router.post("/compare-versions")
+async def compare_versions(
+    request: CompareVersionsRequest,
+    limit: int = Query(1000, ge=0, le=100000, description="반환할 변경 청구 최대 건수"),
+):
+    """
+    규칙/코드북 버전 비교 그루핑
+    
+    같은 청구 목록을 여러 버전으로 그루핑해 KDRG/상대가치점수/예상 금액이 달라진 청구와
+    MDC별 합계를 반환합니다. 첫 번째 버전이 기준입니다 (예: ["2025.1@V4.6", "2025.1@V4.7"]).
+    """
+    frame = pd.DataFrame([record.model_dump() for record in request.records])
+    try:
+        result = await run_in_threadpool(_compare_versions, frame, request.versions, limit)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"규칙 세트를 찾을 수 없습니다: {e.filename or e}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {'success': True, 'total': len(request.records), **result}
+
+
+@router.post("/compare-versions/upload")
+async def compare_versions_upload(
+    file: UploadFile = File(..., description="CSV 또는 Excel 파일"),
+    versions: str = Query(..., description="비교 버전 (쉼표 구분, 첫 번째가 기준)"),
+    limit: int = Query(1000, ge=0, le=100000, description="반환할 변경 청구 최대 건수"),
+):
+    """
+    파일 업로드 버전 비교 그루핑
+    
+    /upload와 같은 형식의 파일을 받아 /compare-versions와 같은 방식으로 비교합니다.
+    건수 제한은 적용하지 않습니다. 1년치 청구 파일은 services.grouper_compare CLI를 사용하세요.
+    """
+    version_list = [v.strip() for v in versions.split(',') if v.strip()]
+    df = await _read_upload_frame(file, max_rows=None)
+    records, _, errors = await run_in_threadpool(_upload_records, df)
+    try:
+        result = await run_in_threadpool(_compare_versions, pd.DataFrame(records), version_list, limit)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"규칙 세트를 찾을 수 없습니다: {e.filename or e}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        'success': True,
+        'filename': file.filename,
+        'total': len(df),
+        **result,
+        'errors': errors[:settings.MAX_ERROR_PREVIEW] if errors else None,
+    }
+
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """
+    Pre-Grouper 결과 캐시 통계 조회
+    """
+    return {
+        'success': True,
+        'cache': pre_grouper.cache_info(),
+    }
+
+
+@router.get("/history-queue")
+async def get_history_queue_stats():
+    """
+    이력 지연 저장 대기열 지표 조회 (대기 건수, 저장/실패 건수, 마지막 저장 건수/시간)
+    """
+    return {
+        'success': True,
+        'queue': history_writer.info(),
+    }
+
+
+@router.get("/history-retention")
+async def get_history_retention(limit: int = Query(20, ge=1, le=200, description="보관 파일 기록 최대 건수")):
+    """
+    이력 보관 설정 / 마지막 실행 결과 / 최근 보관 파일 기록 조회
+    """
+    return {
+        'success': True,
+        'retention': history_retention.info(),
+        'archives': await grouping_store.list_archives(limit),
+    }
+
+
+@router.post("/history-retention/run")
+async def run_history_retention(
+    days: Optional[int] = Query(None, ge=1, description="보관 기간 일수 (기본값 HISTORY_RETENTION_DAYS)"),
+):
+    """
+    이력 보관 즉시 실행 (기준일 이전 이력을 Parquet로 옮긴 뒤 삭제 + 빈 페이지 반납)
+    """
+    await history_writer.flush()
+    try:
+        report = await history_retention.run_once(days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {'success': True, **report}
+
+
 @router.delete("/history/{history_id}")
 async def delete_history(history_id: str):
     """
     그루핑 히스토리 삭제
     """
+    await history_writer.flush()
     deleted = await grouping_store.delete_history(history_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="결과를 찾을 수 없습니다.")
@@ -526,4 +1284,19 @@ async def get_grouping_statistics():
     """
     전체 그루핑 통계 조회
     """
+    await history_writer.flush()
     return await grouping_store.get_statistics()
+
+
+@router.get("/statistics/daily")
+async def get_daily_grouping_statistics(
+    start: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$", description="시작일 (YYYY-MM-DD)"),
+    end: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$", description="종료일 (YYYY-MM-DD, 포함)"),
+):
+    """
+    일자별 그루핑 통계 조회
+    
+    이력 저장일 기준 일자별 유형/DRG군별 건수와 예상 금액을 반환합니다.
+    """
+    await history_writer.flush()
+    return await grouping_store.get_daily_statistics(start, end)
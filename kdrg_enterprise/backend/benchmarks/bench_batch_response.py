@@ -0,0 +1,56 @@
+"""
+배치 그루핑 JSON 응답 레이아웃/압축 벤치마크
+- 레이아웃: rows / columns / compact (dictionary 인코딩)
+- 압축: 없음 / gzip(6) / br(4) - /group-batch 응답과 같은 설정
+- 응답 크기, 서버 인코딩+압축 시간, 클라이언트 json.loads 시간 비교
+
+실행: python benchmarks/bench_batch_response.py [건수]
+"""
+
+import gzip
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import brotli
+
+from benchmarks.claim_generator import generate_claims
+from services.grouper_batch import LAYOUTS
+from services.pregrouper_service import KDRGPreGrouper
+
+COMPRESSORS = {
+    'identity': lambda data: data,
+    'gzip': lambda data: gzip.compress(data, compresslevel=6, mtime=0),
+    'br': lambda data: brotli.compress(data, quality=4),
+}
+
+
+def best_of(func, repeat: int = 3) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main(n: int = 100000):
+    grouper = KDRGPreGrouper(cache_size=0)
+    batch, _ = grouper.group_records_batch(list(generate_claims(n)), workers=1)
+
+    report = {}
+    for layout in LAYOUTS:
+        encode_s = best_of(lambda: batch.to_json_bytes(layout))
+        content = batch.to_json_bytes(layout)
+        report[layout] = {
+            'encode_ms': round(encode_s * 1000, 1),
+            'parse_ms': round(best_of(lambda: json.loads(content)) * 1000, 1),
+        }
+        for name, compress in COMPRESSORS.items():
+            report[layout][f'{name}_kib'] = round(len(compress(content)) / 1024, 1)
+            if name != 'identity':
+                report[layout][f'{name}_ms'] = round(best_of(lambda: compress(content)) * 1000, 1)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,47 @@
+"""
+결과 상세 수준(full / codes-only) 벤치마크
+- 행 단위(group_records_batch) / 컬럼 단위(group_frame) 처리량 비교
+- 결과 JSON 크기 비교
+
+실행: python benchmarks/bench_detail_level.py [건수]
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from benchmarks.claim_generator import generate_claims
+from services.grouper_batch import GrouperResultBatch
+from services.pregrouper_service import KDRGPreGrouper, DetailLevel
+
+
+def best_of(func, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main(n: int = 20000):
+    records = list(generate_claims(n))
+    frame = pd.DataFrame(records)
+    grouper = KDRGPreGrouper(cache_size=0)
+
+    report = {}
+    for level in DetailLevel:
+        rows = best_of(lambda: grouper.group_records_batch(records, workers=1, detail_level=level))
+        columnar = best_of(lambda: grouper.group_frame(frame, workers=1, detail_level=level))
+        batch = GrouperResultBatch.from_frame(grouper.group_frame(frame, workers=1, detail_level=level))
+        report[level.value] = {
+            'records_batch_rows_per_s': round(n / rows),
+            'group_frame_rows_per_s': round(n / columnar),
+            'json_bytes_per_row': round(len(batch.to_json().encode('utf-8')) / n, 1),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
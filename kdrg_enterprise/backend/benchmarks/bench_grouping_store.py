@@ -0,0 +1,74 @@
+"""
+그루핑 이력 저장소(GroupingStore) 동시 부하 벤치마크
+- 동시 클라이언트 N개가 단건 그루핑 요청과 같은 순서로 이력 저장/조회를 반복
+  (save_history → get_history, 10회마다 list_history)
+- 호출별 지연시간 p50 / p99와 초당 처리 호출 수
+
+실행: python benchmarks/bench_grouping_store.py [동시 클라이언트 수] [클라이언트당 요청 수]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.claim_generator import generate_claims
+from services.grouping_store import GroupingStore
+from services.pregrouper_service import KDRGPreGrouper
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def run(store: GroupingStore, payloads, clients: int, requests: int):
+    latencies = {'save_history': [], 'get_history': [], 'list_history': []}
+
+    async def timed(name, coro):
+        start = time.perf_counter()
+        await coro
+        latencies[name].append((time.perf_counter() - start) * 1000)
+
+    async def client(index: int):
+        for i in range(requests):
+            history_id = f"grp_{index}_{i}"
+            payload = dict(payloads[(index * requests + i) % len(payloads)], history_id=history_id)
+            await timed('save_history', store.save_history(history_id, "single", payload))
+            await timed('get_history', store.get_history(history_id))
+            if i % 10 == 0:
+                await timed('list_history', store.list_history(50))
+
+    await store.open()
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    await store.close()
+
+    calls = sum(len(v) for v in latencies.values())
+    report = {'calls_per_s': round(calls / elapsed)}
+    for name, values in latencies.items():
+        report[name] = {'p50_ms': round(percentile(values, 0.5), 2), 'p99_ms': round(percentile(values, 0.99), 2)}
+    report['all_p99_ms'] = round(percentile([v for values in latencies.values() for v in values], 0.99), 2)
+    return report
+
+
+def main(clients: int = 32, requests: int = 50):
+    grouper = KDRGPreGrouper(cache_size=0)
+    payloads = [
+        {'created_at': '2024-01-01T00:00:00', 'input': {'patient_id': r['patient_id']},
+         'result': grouper.group_from_dict(r)}
+        for r in generate_claims(200)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = GroupingStore(os.path.join(tmp, 'bench.db'))
+        print(json.dumps(asyncio.run(run(store, payloads, clients, requests)), indent=2))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,72 @@
+"""
+그루핑 이력 결과 압축 벤치마크
+- 배치 이력 N개(이력당 결과 M건)를 압축 수준 0(TEXT) / HISTORY_COMPRESS_LEVEL로 저장해 비교
+- DB 파일 크기, 결과 행당 저장 바이트, 이력 저장 시간, 상세 페이지 / 상세 전체 조회 시간
+
+실행: python benchmarks/bench_history_compression.py [이력 수] [이력당 결과 건수]
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.claim_generator import generate_claims
+from config import settings
+from services.grouping_store import GroupingStore
+from services.pregrouper_service import KDRGPreGrouper
+
+
+async def best_of(factory, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await factory()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+async def run(db_path: str, batch, histories: int):
+    store = GroupingStore(db_path)
+    start = time.perf_counter()
+    for i in range(histories):
+        await store.save_history(f"batch_{i:04d}", "batch", {
+            'history_id': f"batch_{i:04d}", 'created_at': f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}",
+            'type': 'batch', 'total': len(batch), 'success_count': len(batch), 'error_count': 0,
+            'results': batch, 'errors': [],
+        })
+    save = (time.perf_counter() - start) / histories
+    report = {
+        'save_history_ms': round(save * 1000, 1),
+        'get_history_page_100_ms': round(await best_of(lambda: store.get_history("batch_0001", 0, 100)) * 1000, 2),
+        'get_history_all_ms': round(await best_of(lambda: store.get_history("batch_0001")) * 1000, 2),
+    }
+    await store.close()
+    with sqlite3.connect(db_path) as conn:
+        stored = conn.execute("SELECT SUM(LENGTH(result_json)), COUNT(*) FROM grouping_results").fetchone()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+    report['result_bytes_per_row'] = round(stored[0] / stored[1], 1)
+    report['db_size_mb'] = round(os.path.getsize(db_path) / 1024 / 1024, 2)
+    return report
+
+
+def main(histories: int = 20, results: int = 2000):
+    grouper = KDRGPreGrouper(cache_size=0)
+    batch, _ = grouper.group_records_batch(list(generate_claims(results)), workers=1)
+    report = {'histories': histories, 'results_per_history': results}
+    for name, level in (('text', 0), ('compressed', settings.HISTORY_COMPRESS_LEVEL or 6)):
+        settings.HISTORY_COMPRESS_LEVEL = level
+        with tempfile.TemporaryDirectory() as tmp:
+            report[name] = asyncio.run(run(os.path.join(tmp, 'bench.db'), batch, histories))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
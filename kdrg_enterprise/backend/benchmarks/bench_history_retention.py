@@ -0,0 +1,89 @@
+"""
+그루핑 이력 보관 벤치마크
+- D일 동안 하루 N건씩 배치 이력(이력당 결과 M건)을 저장한 뒤 최근 K일만 남기고 보관
+- 보관 전/후: DB 파일 크기, 목록 / 통계 / 일자별 통계 조회 시간
+- 보관 시간, 보관 Parquet 파일 크기
+
+실행: python benchmarks/bench_history_retention.py [일수] [하루 이력 수] [이력당 결과 건수] [남길 일수]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.claim_generator import generate_claims
+from services.grouping_store import GroupingStore
+from services.pregrouper_service import KDRGPreGrouper
+
+
+async def best_of(factory, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await factory()
+        timings.append(time.perf_counter() - start)
+    return round(min(timings) * 1000, 2)
+
+
+def db_size_mb(path: str) -> float:
+    size = sum(os.path.getsize(p) for p in (path, path + '-wal') if os.path.exists(p))
+    return round(size / 1024 / 1024, 2)
+
+
+async def queries(store: GroupingStore, db_path: str):
+    return {
+        'db_size_mb': db_size_mb(db_path),
+        'list_history_ms': await best_of(lambda: store.list_history(50)),
+        'get_statistics_ms': await best_of(store.get_statistics),
+        'get_daily_statistics_ms': await best_of(store.get_daily_statistics),
+    }
+
+
+async def run(tmp: str, batch, days: int, per_day: int, keep: int):
+    db_path = os.path.join(tmp, 'bench.db')
+    store = GroupingStore(db_path)
+    first = date(2024, 1, 1)
+    for day in range(days):
+        created_at = (first + timedelta(days=day)).isoformat()
+        await store.save_histories([
+            (f"batch_{day:03d}_{i}", "batch", {
+                'history_id': f"batch_{day:03d}_{i}", 'created_at': f"{created_at}T09:00:{i % 60:02d}",
+                'type': 'batch', 'total': len(batch), 'success_count': len(batch), 'error_count': 0,
+                'results': batch, 'errors': [],
+            })
+            for i in range(per_day)
+        ])
+    report = {'before': await queries(store, db_path)}
+
+    archive_dir = os.path.join(tmp, 'archive')
+    start = time.perf_counter()
+    result = await store.archive_history((first + timedelta(days=days - keep)).isoformat(), archive_dir)
+    report['archive_s'] = round(time.perf_counter() - start, 2)
+    report['archived_histories'] = result['histories']
+    report['freed_pages'] = result['freed_pages']
+    report['archive_files_mb'] = round(
+        sum(os.path.getsize(os.path.join(archive_dir, f)) for f in os.listdir(archive_dir)) / 1024 / 1024, 2
+    )
+    report['after'] = await queries(store, db_path)
+    await store.close()
+    return report
+
+
+def main(days: int = 60, per_day: int = 10, results: int = 200, keep: int = 7):
+    grouper = KDRGPreGrouper(cache_size=0)
+    batch, _ = grouper.group_records_batch(list(generate_claims(results)), workers=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        report = asyncio.run(run(tmp, batch, days, per_day, keep))
+    print(json.dumps({'days': days, 'histories_per_day': per_day, 'results_per_history': results,
+                      'keep_days': keep, **report}, indent=2))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:5]]
+    main(*args)
@@ -0,0 +1,66 @@
+"""
+그루핑 이력 조회 벤치마크
+- 배치 이력 N개(이력당 결과 M건)를 저장한 뒤 통계 / 상세 페이지 / 상세 전체 / 목록 조회 시간
+- 통계는 SQL 집계, 상세 페이지는 결과 행 offset/limit 조회
+
+실행: python benchmarks/bench_history_store.py [이력 수] [이력당 결과 건수]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.claim_generator import generate_claims
+from services.grouping_store import GroupingStore
+from services.pregrouper_service import KDRGPreGrouper
+
+
+async def best_of(factory, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await factory()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+async def run(store: GroupingStore, batch, histories: int):
+    start = time.perf_counter()
+    for i in range(histories):
+        await store.save_history(f"batch_{i:04d}", "batch", {
+            'history_id': f"batch_{i:04d}", 'created_at': f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}",
+            'type': 'batch', 'total': len(batch), 'success_count': len(batch), 'error_count': 0,
+            'results': batch, 'errors': [],
+        })
+    save = (time.perf_counter() - start) / histories
+
+    report = {
+        'save_history_ms': round(save * 1000, 1),
+        'get_statistics_ms': await best_of(store.get_statistics),
+        'get_history_page_100_ms': await best_of(lambda: store.get_history("batch_0000", 0, 100)),
+        'get_history_all_ms': await best_of(lambda: store.get_history("batch_0000")),
+        'list_history_ms': await best_of(lambda: store.list_history(50)),
+    }
+    for name in list(report)[1:]:
+        report[name] = round(report[name] * 1000, 2)
+    await store.close()
+    return report
+
+
+def main(histories: int = 50, results: int = 2000):
+    grouper = KDRGPreGrouper(cache_size=0)
+    batch, _ = grouper.group_records_batch(list(generate_claims(results)), workers=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = GroupingStore(os.path.join(tmp, 'bench.db'))
+        report = asyncio.run(run(store, batch, histories))
+    print(json.dumps({'histories': histories, 'results_per_history': results, **report}, indent=2))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
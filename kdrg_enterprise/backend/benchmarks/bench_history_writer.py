@@ -0,0 +1,84 @@
+"""
+단건 그루핑 이력 지연 저장(write-behind) 벤치마크
+- 동시 클라이언트 N개가 /group과 같은 순서로 그루핑 + 이력 저장을 반복
+- 요청마다 바로 저장(HISTORY_QUEUE_MAX=0) / 대기열 저장 비교: 요청 지연 p50 / p99, 초당 요청 수
+- 대기열 저장은 종료 시 남은 이력 저장(flush) 시간과 저장된 이력 수도 확인
+
+실행: python benchmarks/bench_history_writer.py [동시 클라이언트 수] [클라이언트당 요청 수]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.claim_generator import generate_claims
+from config import settings
+from services.grouping_store import GroupingStore
+from services.history_writer import HistoryWriter
+from services.pregrouper_service import KDRGPreGrouper
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def run(db_path: str, grouper: KDRGPreGrouper, claims, clients: int, requests: int):
+    store = GroupingStore(db_path)
+    writer = HistoryWriter(store)
+    await store.open()
+    await writer.start()
+    latencies = []
+
+    async def client(index: int):
+        for i in range(requests):
+            start = time.perf_counter()
+            claim = claims[(index * requests + i) % len(claims)]
+            result = grouper.group_from_dict(claim)
+            history_id = f"grp_{index}_{i}"
+            await writer.save(history_id, "single", {
+                'history_id': history_id,
+                'created_at': datetime.now().isoformat(),
+                'input': {'patient_id': claim['patient_id'], 'main_diagnosis': claim['main_diagnosis']},
+                'result': result,
+            })
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    flush_start = time.perf_counter()
+    await writer.stop()
+    flush = time.perf_counter() - flush_start
+    saved = (await store.get_statistics())['total_groupings']
+    await store.close()
+    return {
+        'requests_per_s': round(len(latencies) / elapsed),
+        'p50_ms': round(percentile(latencies, 0.5), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'shutdown_flush_ms': round(flush * 1000, 1),
+        'saved': saved,
+        'flushes': writer.info()['flushes'],
+    }
+
+
+def main(clients: int = 32, requests: int = 100):
+    grouper = KDRGPreGrouper(cache_size=0)
+    claims = list(generate_claims(500))
+    report = {}
+    for name, queue_max in (('direct', 0), ('write_behind', 10000)):
+        settings.HISTORY_QUEUE_MAX = queue_max
+        with tempfile.TemporaryDirectory() as tmp:
+            report[name] = asyncio.run(run(os.path.join(tmp, 'bench.db'), grouper, claims, clients, requests))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
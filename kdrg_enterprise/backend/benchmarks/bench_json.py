@@ -0,0 +1,52 @@
+"""
+그루핑 결과 JSON 직렬화 벤치마크
+- GrouperResult 목록: json.dumps(asdict) / orjson 직접 직렬화
+- GrouperResultBatch: json.dumps(to_dicts) / to_json_bytes(rows) / to_json_bytes(columns)
+- 결과 1만 건당 직렬화 시간(ms)과 JSON 크기 비교
+
+실행: python benchmarks/bench_json.py [건수]
+"""
+
+import json
+import os
+import sys
+import timeit
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.claim_generator import generate_claims
+from services.grouper_batch import COLUMNS, ROWS, GrouperResultBatch, dumps
+from services.pregrouper_service import KDRGPreGrouper
+
+
+def best_of(func, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main(n: int = 20000):
+    records = list(generate_claims(n))
+    grouper = KDRGPreGrouper(cache_size=0)
+    results = [grouper.group_from_dict(record) for record in records]
+    batch = GrouperResultBatch.from_results(results)
+
+    cases = {
+        'results_json_asdict': lambda: json.dumps([asdict(r) for r in results], ensure_ascii=False).encode('utf-8'),
+        'results_orjson': lambda: dumps(results),
+        'batch_json_to_dicts': lambda: json.dumps(batch.to_dicts(), ensure_ascii=False).encode('utf-8'),
+        'batch_orjson_rows': lambda: batch.to_json_bytes(ROWS),
+        'batch_orjson_columns': lambda: batch.to_json_bytes(COLUMNS),
+    }
+    report = {}
+    for name, func in cases.items():
+        seconds = best_of(func)
+        report[name] = {
+            'ms_per_10k': round(seconds * 10000 / n * 1000, 2),
+            'bytes_per_row': round(len(func()) / n, 1),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,222 @@
+"""
+Pre-Grouper 벤치마크
+- 대상: group / group_from_dict / group_batch 메서드, /group-batch · /upload 엔드포인트
+- 규모: 1k / 100k / 1M 건 (합성 청구, 고정 seed)
+- 측정: 처리량(claims/sec), 지연시간 p50/p99, 최대 RSS
+- (대상, 규모)마다 별도 프로세스에서 실행해 최대 RSS가 서로 섞이지 않도록 함
+- 결과는 JSON으로 출력 (커밋 간 회귀 추적용)
+
+실행:
+    python benchmarks/bench_pregrouper.py                       # 전체 (1k, 100k, 1M)
+    python benchmarks/bench_pregrouper.py --sizes 1000,100000 --targets group,api_upload
+    python benchmarks/bench_pregrouper.py --output bench.json
+
+지연시간 단위:
+    group, group_from_dict          → 청구 1건당
+    group_batch, api_group_batch, api_upload → 요청(배치) 1건당 (--batch-size 건)
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import numpy as np
+
+from benchmarks.claim_generator import CLAIM_COLUMNS, generate_claims, upload_row
+
+TARGETS = ['group', 'group_from_dict', 'group_batch', 'api_group_batch', 'api_upload']
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+
+def _peak_rss_mb(who: int) -> float:
+    """최대 RSS (MB, Linux ru_maxrss는 KB / macOS는 bytes)"""
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _chunks(claims: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for claim in claims:
+        chunk.append(claim)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _timed(func: Callable[[], Any], latencies: List[int]):
+    start = time.perf_counter_ns()
+    func()
+    latencies.append(time.perf_counter_ns() - start)
+
+
+def _measure(target: str, size: int, seed: int, batch_size: int, workers: int) -> Dict[str, Any]:
+    """현재 프로세스에서 대상 1개 측정 (입력 생성/직렬화 시간은 제외)"""
+    from services.pregrouper_service import pre_grouper
+
+    latencies: List[int] = []
+    claims = generate_claims(size, seed)
+    batch_workers = workers or None
+
+    if target == 'group':
+        for claim in claims:
+            input_data = pre_grouper.input_from_dict(claim)
+            _timed(lambda: pre_grouper.group(input_data), latencies)
+    elif target == 'group_from_dict':
+        for claim in claims:
+            _timed(lambda: pre_grouper.group_from_dict(claim), latencies)
+    elif target == 'group_batch':
+        for chunk in _chunks(claims, batch_size):
+            inputs = [pre_grouper.input_from_dict(c) for c in chunk]
+            _timed(lambda: pre_grouper.group_batch(inputs, workers=batch_workers), latencies)
+        pre_grouper.shutdown_pool()
+    else:
+        _measure_api(target, claims, batch_size, latencies)
+
+    total_ns = sum(latencies)
+    values = np.array(latencies, dtype=np.float64) / 1e6
+    return {
+        'target': target,
+        'claims': size,
+        'requests': len(latencies),
+        'seconds': round(total_ns / 1e9, 3),
+        'claims_per_sec': round(size / (total_ns / 1e9), 1) if total_ns else None,
+        'latency_unit': 'claim' if target in ('group', 'group_from_dict') else 'request',
+        'latency_ms': {
+            'p50': round(float(np.percentile(values, 50)), 4),
+            'p99': round(float(np.percentile(values, 99)), 4),
+            'max': round(float(values.max()), 4),
+        },
+        'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_SELF),
+        'children_peak_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def _measure_api(target: str, claims: Iterator[Dict[str, Any]], batch_size: int, latencies: List[int]):
+    """엔드포인트 측정 (TestClient, 임시 SQLite 이력 DB)"""
+    import pandas as pd
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from api.pregrouper import router
+    from config import settings
+    from services.grouping_store import grouping_store
+
+    settings.MAX_UPLOAD_ROWS = max(settings.MAX_UPLOAD_ROWS, batch_size)
+    settings.MAX_UPLOAD_SIZE_MB = max(settings.MAX_UPLOAD_SIZE_MB, 1024)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        grouping_store.db_path = os.path.join(tmp, 'bench.db')
+        grouping_store._initialized = False
+        app = FastAPI()
+        app.include_router(router, prefix="/api/pregrouper")
+
+        with TestClient(app) as client:
+            for chunk in _chunks(claims, batch_size):
+                if target == 'api_group_batch':
+                    body = json.dumps({'records': chunk}).encode('utf-8')
+                    request = lambda: client.post(
+                        "/api/pregrouper/group-batch", content=body,
+                        headers={'Content-Type': 'application/json'},
+                    )
+                else:
+                    buffer = io.StringIO()
+                    pd.DataFrame([upload_row(c) for c in chunk], columns=CLAIM_COLUMNS).to_csv(buffer, index=False)
+                    files = {'file': ('claims.csv', buffer.getvalue().encode('utf-8'), 'text/csv')}
+                    request = lambda: client.post("/api/pregrouper/upload", files=files)
+
+                start = time.perf_counter_ns()
+                response = request()
+                latencies.append(time.perf_counter_ns() - start)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{target}: HTTP {response.status_code} {response.text[:200]}")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def _run_isolated(target: str, size: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """별도 프로세스에서 측정 (최대 RSS 분리)"""
+    command = [
+        sys.executable, os.path.abspath(__file__), '--single', target, str(size),
+        '--seed', str(args.seed), '--batch-size', str(args.batch_size), '--workers', str(args.workers),
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True, cwd=BACKEND_DIR)
+    if completed.returncode != 0:
+        return {'target': target, 'claims': size, 'error': completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-Grouper 벤치마크")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help="청구 건수 (쉼표 구분)")
+    parser.add_argument('--targets', default=','.join(TARGETS), help="측정 대상 (쉼표 구분)")
+    parser.add_argument('--seed', type=int, default=0, help="합성 청구 seed")
+    parser.add_argument('--batch-size', type=int, default=10_000, help="배치/요청 1건당 청구 수")
+    parser.add_argument('--workers', type=int, default=0, help="group_batch 워커 수 (0이면 설정값)")
+    parser.add_argument('--output', help="결과 JSON 파일 경로 (없으면 표준 출력)")
+    parser.add_argument('--single', nargs=2, metavar=('TARGET', 'SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        target, size = args.single[0], int(args.single[1])
+        print(json.dumps(_measure(target, size, args.seed, args.batch_size, args.workers)))
+        return
+
+    targets = [t.strip() for t in args.targets.split(',') if t.strip()]
+    unknown = sorted(set(targets) - set(TARGETS))
+    if unknown:
+        parser.error(f"알 수 없는 대상: {', '.join(unknown)}")
+
+    from config import settings
+
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': args.seed,
+            'batch_size': args.batch_size,
+            'workers': args.workers or settings.GROUPER_WORKERS,
+            'cache_size': settings.GROUPER_CACHE_SIZE,
+        },
+        'results': [],
+    }
+    for size in (int(s) for s in args.sizes.split(',') if s.strip()):
+        for target in targets:
+            result = _run_isolated(target, size, args)
+            report['results'].append(result)
+            print(f"{target:>16} {size:>9,}건: {result.get('claims_per_sec') or result.get('error')}", file=sys.stderr)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+입력 행 튜플 그루핑 커널 벤치마크
+- 입력 객체 경로: dict → PatientInfo/DiagnosisInfo/ProcedureInfo/GrouperInput → group
+- 행 튜플 경로: 요청 필드 → 튜플 → group_row (/group-simple, /group-batch와 같은 경로)
+- 입력 1건당 할당 블록 수(입력 보관분 + 그루핑 중 임시 할당)와 처리량 비교
+
+실행: python benchmarks/bench_row_kernel.py [건수]
+"""
+
+import gc
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.claim_generator import generate_claims
+from services.pregrouper_service import CLAIM_FIELDS, KDRGPreGrouper
+
+
+def best_of(func, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def blocks_per_claim(build, n: int) -> float:
+    """build()가 만든 객체를 유지한 채 늘어난 메모리 블록 수 / 건수"""
+    gc.collect()
+    before = sys.getallocatedblocks()
+    kept = build()
+    blocks = sys.getallocatedblocks() - before
+    del kept
+    return round(blocks / n, 1)
+
+
+def peak_kib(func) -> float:
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def main(n: int = 20000):
+    records = list(generate_claims(n))
+    grouper = KDRGPreGrouper(cache_size=0)
+    rules = grouper.rules
+
+    def request_dicts():
+        # 기존 배치 엔드포인트: 요청 모델 → dict 사본
+        return [{name: record[name] for name in CLAIM_FIELDS} for record in records]
+
+    def request_rows():
+        return [tuple(record[name] for name in CLAIM_FIELDS) for record in records]
+
+    dicts = request_dicts()
+    rows = [grouper.row_from_dict(d) for d in dicts]
+
+    cases = {
+        'input_objects': (
+            lambda: [grouper.input_from_dict(d) for d in dicts],
+            lambda: [grouper.group(grouper.input_from_dict(d), rules=rules) for d in dicts],
+        ),
+        'row_tuples': (
+            lambda: [grouper.row_from_dict(d) for d in dicts],
+            lambda: [grouper.group_row(row, rules=rules) for row in rows],
+        ),
+    }
+    report = {
+        'request_copy_blocks_per_claim': {
+            'dict': blocks_per_claim(request_dicts, n),
+            'tuple': blocks_per_claim(request_rows, n),
+        },
+    }
+    for name, (build, run) in cases.items():
+        report[name] = {
+            'input_blocks_per_claim': blocks_per_claim(build, n),
+            'grouping_peak_kib': peak_kib(run),
+            'claims_per_s': round(n / best_of(run)),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
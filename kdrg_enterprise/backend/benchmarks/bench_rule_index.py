@@ -0,0 +1,76 @@
+"""
+규칙 인덱스 마이크로 벤치마크
+- MDC / CC·MCC / 7개 DRG군 조회 1건당 소요 시간 측정
+- 기존 선형 탐색 vs 컴파일된 접두어 인덱스 비교
+
+실행: python benchmarks/bench_rule_index.py
+"""
+
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.pregrouper_service import KDRGPreGrouper, DiagnosisInfo, PatientInfo, ProcedureInfo
+
+
+def legacy_determine_mdc(main_diagnosis):
+    dx = main_diagnosis.upper().replace('.', '')
+    for mdc_code, (mdc_name, prefixes) in KDRGPreGrouper.MDC_DEFINITIONS.items():
+        for prefix in prefixes:
+            if dx.startswith(prefix.replace('.', '')):
+                return (mdc_code, mdc_name)
+    return ('W', '기타')
+
+
+def legacy_cc_level(diagnoses):
+    for dx in diagnoses:
+        dx_clean = dx.upper().replace('.', '')
+        for mcc in KDRGPreGrouper.CC_CODES['MCC']:
+            if dx_clean.startswith(mcc.replace('.', '')):
+                return 3
+    for dx in diagnoses:
+        dx_clean = dx.upper().replace('.', '')
+        for cc in KDRGPreGrouper.CC_CODES['CC']:
+            if dx_clean.startswith(cc.replace('.', '')):
+                return 2
+    return 0
+
+
+def main(n: int = 20000):
+    rng = random.Random(42)
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    codes = [f"{rng.choice(letters)}{rng.randint(0, 99):02d}.{rng.randint(0, 9)}" for _ in range(n)]
+    claims = [codes[i:i + 4] for i in range(0, n, 4)]
+    grouper = KDRGPreGrouper()
+    patient = PatientInfo('P', 40, 'M', '2024-01-01', '2024-01-05', 4)
+    diagnoses = [DiagnosisInfo(main_diagnosis=c[0], sub_diagnoses=c[1:]) for c in claims]
+    procedure = ProcedureInfo(procedures=['Q2161', 'Q7651'])
+
+    timings = {
+        'determine_mdc_legacy_us': timeit.timeit(lambda: [legacy_determine_mdc(c) for c in codes], number=1) / n * 1e6,
+        'determine_mdc_index_us': timeit.timeit(lambda: [grouper.determine_mdc(c) for c in codes], number=1) / n * 1e6,
+        'severity_legacy_us': timeit.timeit(lambda: [legacy_cc_level(c) for c in claims], number=1) / len(claims) * 1e6,
+        'severity_index_us': timeit.timeit(
+            lambda: [grouper.calculate_severity(d, patient) for d in diagnoses], number=1
+        ) / len(claims) * 1e6,
+        'check_drg7_index_us': timeit.timeit(
+            lambda: [grouper.check_drg7(d, procedure) for d in diagnoses], number=1
+        ) / len(claims) * 1e6,
+    }
+
+    # 코드 길이별 조회 비용 (O(코드 길이) 확인)
+    for length in (3, 5, 8):
+        sample = [(c.replace('.', '') * 3)[:length] for c in codes]
+        timings[f'determine_mdc_index_len{length}_us'] = timeit.timeit(
+            lambda: [grouper.determine_mdc(c) for c in sample], number=1
+        ) / n * 1e6
+
+    print(json.dumps({k: round(v, 3) for k, v in timings.items()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
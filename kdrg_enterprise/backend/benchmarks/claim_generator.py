@@ -0,0 +1,225 @@
+"""
+합성 청구 데이터 생성기
+- 같은 seed이면 항상 같은 청구 목록 생성 (벤치마크/테스트 재현용)
+- 주진단은 MDC_DEFINITIONS 접두어에서 MDC별 빈도 가중치로 선택 (모든 MDC 포함)
+- 부진단은 MCC/CC/일반 동반질환을 일정 비율로 혼합, 수술 코드는 7개 DRG군 수술 + 일반 처치 코드 혼합
+- 나이/성별/재원일수는 MDC 특성 반영 (산과, 신생아, 남녀 생식기 등)
+- 소량의 이상치(장기 재원, 날짜 오류, 주진단 누락) 포함
+
+사용:
+    from benchmarks.claim_generator import generate_claims
+    for claim in generate_claims(1000, seed=1): ...
+
+    python benchmarks/claim_generator.py 100000 claims.csv
+"""
+
+import csv
+import os
+import random
+import sys
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from services.pregrouper_service import KDRGPreGrouper
+
+# MDC별 상대 빈도 (입원 청구 분포를 단순화한 값)
+MDC_WEIGHTS = {
+    'A': 6, 'B': 3, 'C': 5, 'D': 9, 'E': 10, 'F': 12, 'G': 5, 'H': 8, 'I': 3,
+    'J': 3, 'K': 4, 'L': 1, 'M': 3, 'N': 5, 'O': 2, 'P': 1, 'Q': 1, 'R': 3,
+    'S': 2, 'T': 1, 'U': 6, 'V': 0.3, 'W': 0.5, 'X': 6, 'Y': 0.1, 'Z': 0.3,
+}
+
+# 흔한 동반질환 (CC/MCC 아님)
+COMMON_COMORBIDITIES = ['Z95.1', 'E03.9', 'R51', 'H52.1', 'M54.5', 'K59.0', 'J30.4', 'Z87.8', 'L30.9', 'E55.9']
+
+# 부진단 1건이 MCC / CC일 확률
+MCC_RATE = 0.07
+CC_RATE = 0.28
+
+# 일반 수술/처치 코드 (7개 DRG군 외)
+GENERAL_PROCEDURES = [
+    'N0711', 'N0712', 'N2072', 'N1611', 'O1641', 'O1642', 'M6561', 'M6562',
+    'Q0251', 'Q1261', 'Q2671', 'Q2751', 'Q7551', 'R4121', 'R3341', 'S4641',
+]
+
+# 접두어가 없는 MDC (기타)
+_UNMATCHED_DIAGNOSES = ['Z00.0', 'Z01.8', 'Z51.1', 'U07.1']
+
+CLAIM_COLUMNS = [
+    'claim_id', 'patient_id', 'age', 'sex', 'admission_date', 'discharge_date', 'los',
+    'main_diagnosis', 'sub_diagnoses', 'procedures',
+]
+
+
+def _expand_prefix(rng: random.Random, prefix: str) -> str:
+    """접두어를 완전한 ICD-10 코드 형태로 확장 (예: 'I' → 'I21.4', 'J3' → 'J35.0')"""
+    code = prefix.replace('.', '')
+    while len(code) < 3:
+        code += str(rng.randint(0, 9))
+    if rng.random() < 0.7:
+        code = f"{code[:3]}.{rng.randint(0, 9)}"
+    return code
+
+
+def _diagnosis_pools() -> Dict[str, List[str]]:
+    """MDC별 주진단 접두어 목록"""
+    pools = {}
+    for mdc, (_, prefixes) in KDRGPreGrouper.MDC_DEFINITIONS.items():
+        pools[mdc] = list(prefixes) or _UNMATCHED_DIAGNOSES
+    return pools
+
+
+def _mdc_of(prefix: str) -> str:
+    """접두어가 속하는 MDC (정의 순서상 첫 번째 일치)"""
+    for mdc, (_, prefixes) in KDRGPreGrouper.MDC_DEFINITIONS.items():
+        if any(prefix.startswith(p.replace('.', '')) for p in prefixes):
+            return mdc
+    return 'W'
+
+
+def _drg7_by_prefix() -> List[Tuple[str, str, List[str]]]:
+    """7개 DRG군 (진단 접두어, MDC, 수술 코드 목록)"""
+    return [
+        (dx, _mdc_of(dx), info['procedures'])
+        for info in KDRGPreGrouper.DRG7_SURGERY_CODES.values()
+        for dx in info['diagnoses']
+    ]
+
+
+def _demographics(rng: random.Random, mdc: str) -> Tuple[int, str]:
+    """MDC 특성을 반영한 나이/성별"""
+    if mdc == 'N':
+        return rng.randint(20, 45), 'F'
+    if mdc == 'O':
+        return 0, rng.choice(['M', 'F'])
+    if mdc == 'M':
+        return int(rng.triangular(15, 90, 50)), 'F'
+    if mdc == 'L':
+        return int(rng.triangular(20, 95, 68)), 'M'
+    return int(rng.triangular(0, 98, 62)), rng.choice(['M', 'F'])
+
+
+def _length_of_stay(rng: random.Random, mdc: str, drg7: bool) -> int:
+    """재원일수 (대부분 단기, 꼬리가 긴 분포)"""
+    roll = rng.random()
+    if roll < 0.001:
+        return rng.randint(366, 500)  # 장기 재원 이상치
+    if drg7 or mdc == 'N':
+        return max(1, int(rng.expovariate(1 / 3)))
+    return min(int(rng.expovariate(1 / 5)) + 2, 120)
+
+
+def generate_claims(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """합성 청구 생성 (group_from_dict 입력 형식, 같은 seed면 같은 결과)
+
+    Args:
+        count: 생성 건수
+        seed: 난수 시드
+    """
+    rng = random.Random(seed)
+    pools = _diagnosis_pools()
+    mdcs = list(MDC_WEIGHTS)
+    weights = [MDC_WEIGHTS[m] for m in mdcs]
+    drg7_prefixes = _drg7_by_prefix()
+    mcc_codes = KDRGPreGrouper.CC_CODES['MCC']
+    cc_codes = KDRGPreGrouper.CC_CODES['CC']
+    start = date(2024, 1, 1)
+    patients = max(count // 3, 1)
+
+    for i in range(count):
+        procedures: List[str] = []
+        if rng.random() < 0.15:
+            # 7개 DRG군 진단 (대부분 해당 수술 동반)
+            prefix, mdc, drg_procs = rng.choice(drg7_prefixes)
+            main_dx = _expand_prefix(rng, prefix)
+            drg7 = True
+            if drg_procs and rng.random() < 0.85:
+                procedures.append(rng.choice(drg_procs))
+        else:
+            mdc = rng.choices(mdcs, weights)[0]
+            main_dx = _expand_prefix(rng, rng.choice(pools[mdc]))
+            drg7 = False
+            if rng.random() < 0.3:
+                procedures.append(rng.choice(GENERAL_PROCEDURES))
+        if rng.random() < 0.1:
+            procedures.append(rng.choice(GENERAL_PROCEDURES))
+
+        age, sex = _demographics(rng, mdc)
+        los = _length_of_stay(rng, mdc, drg7)
+        admission = start + timedelta(days=rng.randint(0, 365))
+        admission_date = admission.isoformat()
+        discharge_date = (admission + timedelta(days=los)).isoformat()
+
+        noise = rng.random()
+        if noise < 0.002:
+            discharge_date = discharge_date.replace('-', '/')  # 날짜 형식 오류
+        elif noise < 0.003:
+            main_dx = ''  # 주진단 누락
+
+        sub_count = min(int(rng.expovariate(1 / 1.5)), 8)
+        if age >= 65:
+            sub_count += 1
+        sub_diagnoses = []
+        for _ in range(sub_count):
+            roll = rng.random()
+            if roll < MCC_RATE:
+                sub_diagnoses.append(_expand_prefix(rng, rng.choice(mcc_codes)))
+            elif roll < MCC_RATE + CC_RATE:
+                sub_diagnoses.append(_expand_prefix(rng, rng.choice(cc_codes)))
+            else:
+                sub_diagnoses.append(rng.choice(COMMON_COMORBIDITIES))
+
+        yield {
+            'claim_id': f"C{seed:03d}{i:09d}",
+            'patient_id': f"P{rng.randrange(patients):08d}",
+            'age': age,
+            'sex': sex,
+            'admission_date': admission_date,
+            'discharge_date': discharge_date,
+            'los': los,
+            'main_diagnosis': main_dx,
+            'sub_diagnoses': sub_diagnoses,
+            'procedures': procedures,
+        }
+
+
+def generate_claims_frame(count: int, seed: int = 0) -> pd.DataFrame:
+    """합성 청구 DataFrame (group_frame 입력 형식)"""
+    return pd.DataFrame(list(generate_claims(count, seed)), columns=CLAIM_COLUMNS)
+
+
+def upload_row(claim: Dict[str, Any]) -> Dict[str, Any]:
+    """청구를 업로드 파일 행 형식으로 변환 (목록 컬럼은 쉼표 구분)"""
+    return {
+        **claim,
+        'sub_diagnoses': ', '.join(claim['sub_diagnoses']),
+        'procedures': ', '.join(claim['procedures']),
+    }
+
+
+def write_claims_csv(path: str, count: int, seed: int = 0) -> int:
+    """합성 청구를 /upload 형식 CSV로 저장 (행 단위 기록)
+
+    Returns:
+        기록 건수
+    """
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CLAIM_COLUMNS)
+        writer.writeheader()
+        for claim in generate_claims(count, seed):
+            writer.writerow(upload_row(claim))
+            written += 1
+    return written
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("사용법: python benchmarks/claim_generator.py <건수> <출력 CSV> [seed]")
+        sys.exit(1)
+    total = write_claims_csv(sys.argv[2], int(sys.argv[1]), int(sys.argv[3]) if len(sys.argv) > 3 else 0)
+    print(f"{sys.argv[2]}: {total}건")
@@ -17,6 +17,12 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./data/kdrg.db"
+    # 그루핑 이력/작업 DB 연결 풀 (쓰기 1 + 읽기 연결 수, 연결당 페이지 캐시 MB)
+    GROUPING_DB_READERS: int = 4
+    GROUPING_DB_CACHE_MB: int = 16
+    # 그루핑 이력 결과 JSON 압축 수준 (zlib 1~9, 0이면 압축 안 함) / 공유 사전 자동 생성에 필요한 결과 건수
+    HISTORY_COMPRESS_LEVEL: int = 6
+    HISTORY_DICT_MIN_ROWS: int = 1000
     
     # Security
     SECRET_KEY: str = "change-this-in-prod"
@@ -68,6 +74,43 @@ class Settings(BaseSettings):
     MAX_UPLOAD_ROWS: int = 5000
     MAX_RESULT_PREVIEW: int = 100
     MAX_ERROR_PREVIEW: int = 20
+    
+    # Excel 스트리밍 읽기 청크 행 수
+    EXCEL_CHUNK_ROWS: int = 5000
+    
+    # 배치 그루핑 JSON 응답 압축 (Accept-Encoding에 따라 br/gzip, 이 크기 미만은 압축 안 함, 0이면 사용 안 함)
+    RESPONSE_COMPRESS_MIN_BYTES: int = 1024
+    
+    # Pre-Grouper 병렬 처리 (GROUPER_WORKERS=0 이면 CPU 코어 수)
+    GROUPER_WORKERS: int = 0
+    GROUPER_CHUNK_SIZE: int = 5000
+    GROUPER_PARALLEL_MIN_ROWS: int = 20000
+    
+    # Pre-Grouper 결과 캐시 (LRU 항목 수, 0이면 사용 안 함)
+    GROUPER_CACHE_SIZE: int = 10000
+    
+    # KDRG 코드표 바이너리 저장소 (data/kdrg_v47_*.csv에서 자동 빌드, 상대 경로는 backend 디렉토리 기준)
+    RULE_STORE_PATH: str = "./data/kdrg_v47_rules.bin"
+    
+    # 비동기 그루핑 작업 (체크포인트 청크 크기, 동시 실행 작업 수)
+    GROUPING_JOB_CHUNK_SIZE: int = 20000
+    GROUPING_JOB_CONCURRENCY: int = 1
+    
+    # 단건 그루핑 이력 지연 저장 (대기열 최대 건수(0이면 요청마다 바로 저장), 한 번에 저장할 건수, 최대 대기 ms)
+    HISTORY_QUEUE_MAX: int = 10000
+    HISTORY_FLUSH_RECORDS: int = 500
+    HISTORY_FLUSH_MS: int = 200
+    
+    # 그루핑 이력 보관 (보관 기간 일수(0이면 보관 안 함), 실행 주기 시간, Parquet 파일/트랜잭션당 이력 수, 빈 페이지 반납 단위)
+    HISTORY_RETENTION_DAYS: int = 0
+    HISTORY_RETENTION_INTERVAL_HOURS: float = 24.0
+    HISTORY_ARCHIVE_BATCH: int = 100
+    HISTORY_VACUUM_PAGES: int = 2000
+    
+    # Pre-Grouper 규칙 세트 (버전별 JSON 디렉토리, 기본 버전, 활성 버전 확인 주기(초, 0이면 확인 안 함))
+    GROUPER_RULES_DIR: str = "./data/grouper_rules"
+    GROUPER_RULE_SET: str = ""
+    GROUPER_RULES_CHECK_SECONDS: float = 5.0
 
     class Config:
         env_file = ".env"
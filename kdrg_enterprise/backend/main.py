@@ -24,6 +24,11 @@ from api.feedback import router as feedback_router
 from api.comparison import router as comparison_router
 from api.pregrouper import router as pregrouper_router
 from api.optimization import router as optimization_router
+from services.pregrouper_service import pre_grouper
+from services.grouping_jobs import grouping_jobs
+from services.grouping_store import grouping_store
+from services.history_writer import history_writer
+from services.history_retention import history_retention
 
 # 로깅 설정
 logging.basicConfig(
@@ -48,10 +53,21 @@ async def lifespan(app: FastAPI):
     for dir_path in [settings.DATA_DIR, settings.UPLOAD_DIR, settings.EXPORT_DIR, settings.LOG_DIR]:
         os.makedirs(dir_path, exist_ok=True)
     
+    # 그루핑 이력 DB 연결 풀 열기 후 미완료 그루핑 작업 재개
+    await grouping_store.open()
+    await grouping_jobs.start()
+    await history_writer.start()
+    await history_retention.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down...")
+    await history_retention.stop()
+    await grouping_jobs.stop()
+    await history_writer.stop()
+    await grouping_store.close()
+    pre_grouper.shutdown_pool()
 
 
 # FastAPI 앱 생성
@@ -14,6 +14,9 @@ from enum import Enum
 import re
 import logging
 
+from .pregrouper_service import KDRGPreGrouper, pre_grouper
+from .spreadsheet_reader import read_excel, sheet_names
+
 logger = logging.getLogger(__name__)
 
 
@@ -102,17 +105,8 @@ class FeedbackSummary:
 class FeedbackParserService:
     """심평원 환류 데이터 파서 서비스"""
     
-    # 7개 DRG군 코드
-    DRG7_CODES = {
-        'D12': '편도 및 아데노이드 절제술',
-        'D13': '축농증 수술',
-        'G08': '서혜부 및 대퇴부 탈장수술',
-        'H06': '담낭절제술',
-        'I09': '항문수술',
-        'L08': '요로결석 체외충격파쇄석술',
-        'O01': '제왕절개술',
-        'O60': '질식분만',
-    }
+    # 7개 DRG군 코드 (Pre-Grouper 분류표 기준)
+    DRG7_CODES = {code: info['name'] for code, info in KDRGPreGrouper.DRG7_SURGERY_CODES.items()}
     
     # 컬럼 매핑 (심평원 엑셀 → 내부 필드)
     COLUMN_MAPPINGS = {
@@ -242,11 +236,8 @@ class FeedbackParserService:
         
         try:
             if file_type == 'excel':
-                if sheet_name:
-                    df = pd.read_excel(file_path, sheet_name=sheet_name)
-                else:
-                    # 첫 번째 시트 읽기
-                    df = pd.read_excel(file_path)
+                # 시트 이름이 없으면 첫 번째 시트 (행 단위 스트리밍 읽기)
+                df = read_excel(file_path, sheet_name=sheet_name)
             else:
                 # CSV - 인코딩 자동 감지
                 for encoding in ['utf-8', 'cp949', 'euc-kr', 'utf-8-sig']:
@@ -276,10 +267,7 @@ class FeedbackParserService:
         
         try:
             if ext in ['xlsx', 'xls']:
-                if sheet_name:
-                    df = pd.read_excel(io.BytesIO(file_content), sheet_name=sheet_name)
-                else:
-                    df = pd.read_excel(io.BytesIO(file_content))
+                df = read_excel(file_content, file_name, sheet_name)
             else:
                 # CSV
                 for encoding in ['utf-8', 'cp949', 'euc-kr', 'utf-8-sig']:
@@ -616,9 +604,13 @@ class FeedbackParserService:
                 break
         
         if kdrg_col:
-            # 7개 DRG군별 분류
-            for code, name in self.DRG7_CODES.items():
-                count = len(df[df[kdrg_col].str.startswith(code, na=False)])
+            # 7개 DRG군별 분류 (고유 KDRG만 DRG군 판정 후 한 번의 집계)
+            drg7_index = pre_grouper.rules.drg7
+            kdrgs = df[kdrg_col].dropna().astype(str)
+            groups = kdrgs.map({kdrg: drg7_index.classify_kdrg(kdrg) for kdrg in kdrgs.unique()})
+            counts = groups.value_counts()
+            for code, name in drg7_index.names.items():
+                count = int(counts.get(code, 0))
                 if count > 0:
                     summary['drg_distribution'][f"{code} ({name})"] = count
             
@@ -690,15 +682,12 @@ class FeedbackParserService:
 
     def get_excel_sheets(self, file_content: bytes, file_name: str) -> List[str]:
         """엑셀 파일의 시트 목록 조회"""
-        import io
-        
         ext = file_name.lower().split('.')[-1]
         if ext not in ['xlsx', 'xls']:
             return []
         
         try:
-            xl = pd.ExcelFile(io.BytesIO(file_content))
-            return xl.sheet_names
+            return sheet_names(file_content, file_name)
         except Exception as e:
             logger.error(f"시트 목록 조회 오류: {e}")
             return []
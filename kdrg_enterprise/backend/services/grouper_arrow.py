@@ -0,0 +1,234 @@
+"""
+Pre-Grouper Apache Arrow / Parquet 입출력
+- 청구 입력: Parquet, Arrow IPC(file/stream) → 그루핑 입력 DataFrame (pyarrow 기반 ArrowDtype 컬럼)
+- sub_diagnoses / procedures는 list<string> 그대로 전달 (쉼표 구분 문자열 컬럼도 허용)
+  행별 파이썬 리스트를 만들지 않고 parse_frame이 Arrow 목록 배열을 직접 펼침
+- 결과: GrouperResultBatch 컬럼(문자열 풀 ID, 수치 배열)을 dictionary/수치 배열로 감싸 Arrow/Parquet로 출력
+"""
+
+import io
+import os
+from typing import Any, BinaryIO, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from .grouper_batch import RESULT_COLUMNS, STR, STR_LIST, GrouperResultBatch
+
+PARQUET, ARROW = 'parquet', 'arrow'
+
+MEDIA_TYPES = {
+    PARQUET: 'application/vnd.apache.parquet',
+    ARROW: 'application/vnd.apache.arrow.stream',
+}
+
+_EXTENSIONS = {
+    '.parquet': PARQUET,
+    '.pq': PARQUET,
+    '.arrow': ARROW,
+    '.arrows': ARROW,
+    '.feather': ARROW,
+    '.ipc': ARROW,
+}
+
+# 그루핑 입력 컬럼 (_normalize_upload_frame과 같은 순서)
+CODE_LIST = pa.list_(pa.string())
+CLAIM_COLUMNS = (
+    ('patient_id', pa.string()),
+    ('age', pa.int64()),
+    ('sex', pa.string()),
+    ('admission_date', pa.string()),
+    ('discharge_date', pa.string()),
+    ('los', pa.int64()),
+    ('main_diagnosis', pa.string()),
+    ('sub_diagnoses', CODE_LIST),
+    ('procedures', CODE_LIST),
+    ('claim_id', pa.string()),
+)
+
+
+def file_format(filename: str) -> Optional[str]:
+    """파일 확장자로 Arrow 형식 판별 (Parquet/Arrow가 아니면 None)"""
+    return _EXTENSIONS.get(os.path.splitext(filename.lower())[1])
+
+
+def read_table(source: Union[bytes, str, BinaryIO], fmt: str) -> pa.Table:
+    """Parquet / Arrow IPC(file, stream) 읽기"""
+    if isinstance(source, bytes):
+        source = pa.BufferReader(source)
+    if fmt == PARQUET:
+        return pq.read_table(source)
+    return _open_ipc(source).read_all()
+
+
+def iter_batches(source: Union[str, BinaryIO], fmt: str, batch_rows: int) -> Iterator[pa.RecordBatch]:
+    """레코드 배치 단위 읽기 (Parquet은 batch_rows 행씩, Arrow는 파일에 저장된 배치 단위)"""
+    if fmt == PARQUET:
+        yield from pq.ParquetFile(source).iter_batches(batch_size=batch_rows)
+        return
+    reader = _open_ipc(source)
+    if isinstance(reader, ipc.RecordBatchFileReader):
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+    else:
+        yield from reader
+
+
+def iter_claim_frames(source: Union[str, BinaryIO], fmt: str, batch_rows: int) -> Iterator[pd.DataFrame]:
+    """레코드 배치별 그루핑 입력 DataFrame (인덱스는 파일 전체 기준 행 번호)"""
+    start = 0
+    for batch in iter_batches(source, fmt, batch_rows):
+        frame = claims_frame(pa.Table.from_batches([batch]))
+        frame.index = pd.RangeIndex(start, start + len(frame))
+        start += len(frame)
+        yield frame
+
+
+def _open_ipc(source: Any):
+    """Arrow IPC file 형식 우선, 실패하면 stream 형식"""
+    try:
+        return ipc.open_file(source)
+    except pa.ArrowInvalid:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return ipc.open_stream(source)
+
+
+def _code_lists(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    """코드 목록 컬럼을 list<string>으로 정규화 (문자열은 쉼표로 분리, 빈 값/공백 제거)"""
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        lists = pc.split_pattern(column.cast(pa.string()).fill_null(''), ',')
+    else:
+        lists = column.cast(CODE_LIST)
+        values = pc.list_flatten(lists)
+        if lists.null_count == 0 and values.null_count == 0:
+            return lists
+    lists = lists.combine_chunks() if isinstance(lists, pa.ChunkedArray) else lists
+    values = pc.utf8_trim_whitespace(pc.list_flatten(lists))
+    keep = pc.and_(pc.is_valid(values), pc.not_equal(values, '')).fill_null(False)
+    rows = pc.filter(pc.list_parent_indices(lists), keep).to_numpy()
+    offsets = np.zeros(len(lists) + 1, dtype=np.int32)
+    np.cumsum(np.bincount(rows, minlength=len(lists)), out=offsets[1:])
+    return pa.chunked_array([pa.ListArray.from_arrays(pa.array(offsets), pc.filter(values, keep))])
+
+
+def _claim_column(name: str, column: pa.ChunkedArray) -> pa.ChunkedArray:
+    if name in ('sub_diagnoses', 'procedures'):
+        return _code_lists(column)
+    if name in ('age', 'los'):
+        if column.null_count:
+            raise ValueError("빈 값이 있습니다.")
+        return column.cast(pa.int64())
+    if name in ('admission_date', 'discharge_date'):
+        if pa.types.is_date(column.type) or pa.types.is_timestamp(column.type):
+            return pc.strftime(column, format='%Y-%m-%d').fill_null('')
+        return pc.utf8_slice_codeunits(column.cast(pa.string()), 0, 10).fill_null('')
+    column = column.cast(pa.string()).fill_null('')
+    return pc.utf8_upper(column) if name == 'sex' else column
+
+
+def normalize_claims(table: pa.Table) -> pa.Table:
+    """Arrow 테이블을 그루핑 입력 컬럼/타입으로 변환 (없는 필수 컬럼은 그대로 두고 호출 측에서 확인)
+
+    Raises:
+        ValueError: 타입 변환 실패
+    """
+    names, columns = [], []
+    for name, _ in CLAIM_COLUMNS:
+        if name in table.column_names:
+            try:
+                column = _claim_column(name, table.column(name))
+            except (ValueError, pa.ArrowException) as e:
+                raise ValueError(f"{name} 컬럼을 변환할 수 없습니다: {e}") from e
+        elif name == 'claim_id':
+            column = pa.chunked_array([pa.nulls(table.num_rows, pa.string()).fill_null('')])
+        else:
+            continue
+        names.append(name)
+        columns.append(column)
+    return pa.table(columns, names=names)
+
+
+def claims_frame(table: pa.Table) -> pd.DataFrame:
+    """Arrow 테이블 → 그루핑 입력 DataFrame (컬럼 버퍼 공유, 행별 파이썬 객체 미생성)"""
+    return normalize_claims(table).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def is_claims_frame(df: pd.DataFrame) -> bool:
+    """claims_frame으로 만든 (이미 정규화된) 입력인지 여부"""
+    return all(
+        name in df.columns and isinstance(df[name].dtype, pd.ArrowDtype) and df[name].dtype.pyarrow_dtype == CODE_LIST
+        for name in ('sub_diagnoses', 'procedures')
+    )
+
+
+def _dictionary_array(ids: np.ndarray, strings: pa.Array) -> pa.DictionaryArray:
+    """문자열 풀 ID 배열 → 컬럼에 쓰인 값만 담은 dictionary 배열"""
+    used, indices = np.unique(ids, return_inverse=True)
+    return pa.DictionaryArray.from_arrays(
+        pa.array(indices.astype(np.int32, copy=False)), strings.take(pa.array(used)),
+    )
+
+
+def results_table(batch: GrouperResultBatch) -> pa.Table:
+    """배치 결과 → Arrow 테이블 (RESULT_COLUMNS 순서, 문자열은 dictionary 인코딩)"""
+    strings = pa.array(batch.strings, type=pa.string())
+    arrays: List[pa.Array] = []
+    for name, kind in RESULT_COLUMNS:
+        data, offsets = batch.numpy_column(name)
+        if kind == STR:
+            arrays.append(_dictionary_array(data, strings))
+        elif kind == STR_LIST:
+            arrays.append(pa.ListArray.from_arrays(
+                pa.array(offsets.astype(np.int32)), _dictionary_array(data, strings),
+            ))
+        else:
+            arrays.append(pa.array(data))
+    return pa.table(arrays, names=[name for name, _ in RESULT_COLUMNS])
+
+
+def write_table(table: pa.Table, fmt: str) -> bytes:
+    """Arrow 테이블을 Parquet(zstd) 또는 Arrow IPC stream 바이트로 직렬화"""
+    sink = pa.BufferOutputStream()
+    if fmt == PARQUET:
+        pq.write_table(table, sink, compression='zstd')
+    else:
+        with ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class ResultStreamWriter:
+    """배치 결과를 청크 단위로 Parquet/Arrow 스트림에 쓰고 새로 생긴 바이트를 반환 (스트리밍 응답용)"""
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self._sink = io.BytesIO()
+        self._writer = None
+
+    def _take(self) -> bytes:
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return data
+
+    def write(self, batch: GrouperResultBatch) -> bytes:
+        table = results_table(batch)
+        if self._writer is None:
+            if self.fmt == PARQUET:
+                self._writer = pq.ParquetWriter(self._sink, table.schema, compression='zstd')
+            else:
+                self._writer = ipc.new_stream(self._sink, table.schema)
+        self._writer.write_table(table)
+        return self._take()
+
+    def close(self) -> bytes:
+        """스트림 종료 (Parquet footer / Arrow end-of-stream, 결과가 없으면 빈 스키마로 작성)"""
+        if self._writer is None:
+            self.write(GrouperResultBatch())
+        self._writer.close()
+        return self._take()
@@ -0,0 +1,332 @@
+"""
+KDRG Pre-Grouper 배치 결과 저장소
+- 그루핑 결과를 행 객체 대신 타입 지정 컬럼(array)으로 보관
+- 반복되는 문자열(MDC명, 분류 경로, 경고 등)은 문자열 풀에 한 번만 저장
+- 행 단위 뷰, dict/JSON 직렬화 제공
+- JSON은 orjson으로 바로 bytes 직렬화 (행 배열, 컬럼별 배열, dictionary 인코딩 컬럼 레이아웃)
+"""
+
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+import orjson
+
+
+# 결과 컬럼 정의 (GrouperResult 필드 순서와 동일)
+STR, INT, FLOAT, STR_LIST = 'str', 'int', 'float', 'str_list'
+
+RESULT_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('claim_id', STR),
+    ('patient_id', STR),
+    ('mdc', STR),
+    ('mdc_name', STR),
+    ('aadrg', STR),
+    ('kdrg', STR),
+    ('severity', INT),
+    ('relative_weight', FLOAT),
+    ('base_amount', FLOAT),
+    ('estimated_amount', FLOAT),
+    ('los', INT),
+    ('los_lower', INT),
+    ('los_upper', INT),
+    ('los_outlier', STR),
+    ('drg_type', STR),
+    ('grouper_path', STR_LIST),
+    ('warnings', STR_LIST),
+    ('confidence', FLOAT),
+    ('rule_version', STR),
+)
+
+_ARRAY_TYPECODES = {STR: 'I', INT: 'q', FLOAT: 'd'}
+_NUMPY_TYPES = {'I': np.uint32, 'q': np.int64, 'd': np.float64}
+
+# JSON 결과 레이아웃: 행별 객체 배열 / 컬럼명 → 값 배열 / 컬럼 + 반복 문자열 dictionary 인코딩
+ROWS, COLUMNS, COMPACT = 'rows', 'columns', 'compact'
+LAYOUTS = (ROWS, COLUMNS, COMPACT)
+
+_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(value: Any) -> bytes:
+    """JSON bytes 직렬화 (dataclass는 asdict 사본 없이 그대로, NaN/Infinity는 null)"""
+    return orjson.dumps(value, option=_JSON_OPTIONS)
+
+
+class StringPool:
+    """문자열 인터닝 풀 (문자열 → 정수 ID)"""
+
+    __slots__ = ('_ids', '_values')
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._values: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def intern(self, value: str) -> int:
+        """문자열 ID 반환 (처음 보는 문자열은 등록)"""
+        sid = self._ids.get(value)
+        if sid is None:
+            sid = len(self._values)
+            self._ids[value] = sid
+            self._values.append(value)
+        return sid
+
+    def get(self, sid: int) -> str:
+        return self._values[sid]
+
+    def nbytes(self) -> int:
+        """풀 문자열 데이터 크기 (대략)"""
+        return sum(len(v.encode('utf-8')) for v in self._values)
+
+
+class GrouperResultRow:
+    """배치 내 한 행에 대한 읽기 전용 뷰 (GrouperResult와 같은 속성명)"""
+
+    __slots__ = ('_batch', '_index')
+
+    def __init__(self, batch: 'GrouperResultBatch', index: int):
+        self._batch = batch
+        self._index = index
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self._batch.value(self._index, name)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._batch.row_dict(self._index)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, GrouperResultRow):
+            return self.to_dict() == other.to_dict()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"GrouperResultRow({self.to_dict()!r})"
+
+
+class GrouperResultBatch:
+    """그루핑 결과 컬럼 저장소 (struct-of-arrays)
+
+    - 문자열 컬럼: 문자열 풀 ID (uint32)
+    - 정수/실수 컬럼: int64 / float64 배열
+    - 목록 컬럼(grouper_path, warnings): CSR 형식 (offsets + 문자열 ID)
+    """
+
+    __slots__ = ('_pool', '_columns', '_offsets', '_size')
+
+    def __init__(self):
+        self._pool = StringPool()
+        self._columns: Dict[str, array] = {}
+        self._offsets: Dict[str, array] = {}
+        for name, kind in RESULT_COLUMNS:
+            if kind == STR_LIST:
+                self._columns[name] = array('I')
+                self._offsets[name] = array('I', [0])
+            else:
+                self._columns[name] = array(_ARRAY_TYPECODES[kind])
+        self._size = 0
+
+    @classmethod
+    def from_results(cls, results: Iterable[Any]) -> 'GrouperResultBatch':
+        """GrouperResult(또는 같은 속성을 가진 객체) 목록으로 생성"""
+        batch = cls()
+        batch.extend(results)
+        return batch
+
+    @classmethod
+    def from_frame(cls, frame: Any) -> 'GrouperResultBatch':
+        """group_frame 결과 DataFrame으로 생성"""
+        batch = cls()
+        intern = batch._pool.intern
+        columns = batch._columns
+        for name, kind in RESULT_COLUMNS:
+            values = frame[name].tolist()
+            if kind == STR:
+                columns[name].extend([intern(v) for v in values])
+            elif kind == INT:
+                columns[name].extend([int(v) for v in values])
+            elif kind == FLOAT:
+                columns[name].extend([float(v) for v in values])
+            else:
+                batch._extend_lists(name, values)
+        batch._size = len(frame)
+        return batch
+
+    def _extend_lists(self, name: str, lists: Iterable[List[str]]):
+        intern = self._pool.intern
+        data = self._columns[name]
+        offsets = self._offsets[name]
+        end = offsets[-1]
+        for items in lists:
+            data.extend([intern(v) for v in items])
+            end += len(items)
+            offsets.append(end)
+
+    def append(self, result: Any):
+        """결과 1건 추가"""
+        self._append_values(lambda name: getattr(result, name))
+
+    def append_dict(self, row: Mapping[str, Any]):
+        """dict 형태 결과 1건 추가 (asdict(GrouperResult)와 같은 키, rule_version 없는 이전 결과 허용)"""
+        self._append_values(lambda name: row[name] if name != 'rule_version' else row.get(name, ''))
+
+    def _append_values(self, get: Callable[[str], Any]):
+        intern = self._pool.intern
+        columns = self._columns
+        for name, kind in RESULT_COLUMNS:
+            value = get(name)
+            if kind == STR:
+                columns[name].append(intern(value))
+            elif kind == INT:
+                columns[name].append(int(value))
+            elif kind == FLOAT:
+                columns[name].append(float(value))
+            else:
+                self._extend_lists(name, (value,))
+        self._size += 1
+
+    def extend(self, results: Iterable[Any]):
+        """결과 여러 건 추가"""
+        for result in results:
+            self.append(result)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> GrouperResultRow:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        return GrouperResultRow(self, index)
+
+    def __iter__(self) -> Iterator[GrouperResultRow]:
+        for index in range(self._size):
+            yield GrouperResultRow(self, index)
+
+    def value(self, index: int, name: str) -> Any:
+        """한 행의 컬럼 값"""
+        data = self._columns.get(name)
+        if data is None:
+            raise AttributeError(name)
+        offsets = self._offsets.get(name)
+        if offsets is not None:
+            get = self._pool.get
+            return [get(sid) for sid in data[offsets[index]:offsets[index + 1]]]
+        if name in _STR_COLUMNS:
+            return self._pool.get(data[index])
+        return data[index]
+
+    @property
+    def strings(self) -> List[str]:
+        """문자열 풀 값 (ID 순서)"""
+        return self._pool._values
+
+    def raw_column(self, name: str) -> Tuple[array, Optional[array]]:
+        """컬럼 원본 배열 (문자열은 풀 ID, 목록 컬럼은 (풀 ID, offsets), 그 외 offsets는 None)"""
+        return self._columns[name], self._offsets.get(name)
+
+    def numpy_column(self, name: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """raw_column의 numpy 뷰 (복사 없음, 배치에 결과를 더 추가하기 전까지만 유효)"""
+        data, offsets = self.raw_column(name)
+        return _numpy_view(data), (_numpy_view(offsets) if offsets is not None else None)
+
+    def column(self, name: str) -> List[Any]:
+        """컬럼 전체 값 목록 (문자열 ID는 풀 문자열로, 목록 컬럼은 행별 리스트로)"""
+        data = self._columns[name]
+        offsets = self._offsets.get(name)
+        if offsets is None and name not in _STR_COLUMNS:
+            return data.tolist()
+        values = list(map(self._pool._values.__getitem__, data))
+        if offsets is None:
+            return values
+        return [values[offsets[index]:offsets[index + 1]] for index in range(self._size)]
+
+    def row_dict(self, index: int) -> Dict[str, Any]:
+        """한 행을 dict로 변환 (asdict(GrouperResult)와 같은 형태)"""
+        return {name: self.value(index, name) for name, _ in RESULT_COLUMNS}
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        names = [name for name, _ in RESULT_COLUMNS]
+        return [dict(zip(names, row)) for row in self.iter_rows()]
+
+    def to_columns(self) -> Dict[str, List[Any]]:
+        """컬럼명 → 전체 값 목록 (RESULT_COLUMNS 순서)"""
+        return {name: self.column(name) for name, _ in RESULT_COLUMNS}
+
+    def to_compact(self) -> Dict[str, Any]:
+        """컬럼별 값 (반복 문자열은 dictionary 인코딩, RESULT_COLUMNS 순서)
+
+        - 수치 컬럼: 값 배열
+        - 문자열 컬럼: 고유값이 행 수의 절반 이하이면 {"dictionary": [...], "indices": [...]}, 아니면 값 배열
+        - 목록 컬럼: {"dictionary": [...], "offsets": [...], "indices": [...]}
+          (i번째 행 = dictionary[indices[offsets[i]:offsets[i + 1]]])
+        """
+        strings = self._pool._values
+        compact: Dict[str, Any] = {}
+        for name, kind in RESULT_COLUMNS:
+            data, offsets = self.numpy_column(name)
+            if kind in (INT, FLOAT):
+                compact[name] = data
+                continue
+            used, indices = np.unique(data, return_inverse=True)
+            if kind == STR and len(used) * 2 > self._size:
+                compact[name] = self.column(name)
+                continue
+            compact[name] = {'dictionary': [strings[sid] for sid in used.tolist()]}
+            if offsets is not None:
+                compact[name]['offsets'] = offsets
+            compact[name]['indices'] = indices.astype(np.int32).reshape(-1)
+        return compact
+
+    def iter_rows(self) -> Iterator[Tuple[Any, ...]]:
+        """행별 값 튜플 (RESULT_COLUMNS 순서)"""
+        return zip(*(self.column(name) for name, _ in RESULT_COLUMNS))
+
+    def iter_json(self) -> Iterator[bytes]:
+        """행별 JSON bytes (NDJSON 스트리밍용)"""
+        return map(dumps, self.to_dicts())
+
+    def to_json_bytes(self, layout: str = ROWS) -> bytes:
+        """전체 결과를 JSON bytes로 직렬화
+
+        Args:
+            layout: rows(행별 객체 배열), columns(컬럼명 → 값 배열 객체) 또는 compact(to_compact 형식)
+        """
+        if layout == COLUMNS:
+            return dumps(self.to_columns())
+        if layout == COMPACT:
+            return dumps(self.to_compact())
+        return dumps(self.to_dicts())
+
+    def to_json(self, layout: str = ROWS) -> str:
+        """전체 결과를 JSON 문자열로 직렬화 (DB 저장용)"""
+        return self.to_json_bytes(layout).decode('utf-8')
+
+    def nbytes(self) -> int:
+        """컬럼 + 문자열 풀 데이터 크기 (대략)"""
+        size = sum(data.itemsize * len(data) for data in self._columns.values())
+        size += sum(offsets.itemsize * len(offsets) for offsets in self._offsets.values())
+        return size + self._pool.nbytes()
+
+
+_STR_COLUMNS = frozenset(name for name, kind in RESULT_COLUMNS if kind == STR)
+
+
+def _numpy_view(data: array) -> np.ndarray:
+    dtype = _NUMPY_TYPES[data.typecode]
+    return np.frombuffer(data, dtype=dtype) if len(data) else np.empty(0, dtype=dtype)
+
+
+def dumps_with_results(envelope: Dict[str, Any], key: str, batch: GrouperResultBatch,
+                       layout: str = ROWS) -> bytes:
+    """envelope dict를 JSON bytes로 직렬화 (key 항목은 배치 결과로 대체, 키 순서 유지)"""
+    parts = []
+    for name, value in envelope.items():
+        text = batch.to_json_bytes(layout) if name == key else dumps(value)
+        parts.append(dumps(name) + b':' + text)
+    return b'{' + b','.join(parts) + b'}'
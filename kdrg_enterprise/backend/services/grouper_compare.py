@@ -0,0 +1,294 @@
+"""
+규칙/코드북 버전 비교 그루핑
+- 같은 청구 목록을 여러 버전('<규칙 세트>@<코드북 버전>')으로 한 번에 그루핑
+- 입력 파싱/정규화(parse_frame)는 청크당 한 번만 수행하고 버전별 규칙 스냅샷이 공유
+- 청구별 변경 내역(KDRG, 상대가치점수/예상 금액 차이)과 MDC별 합계
+- 첫 번째 버전이 기준 (차이 = 각 버전 - 기준 버전, MDC는 기준 버전 분류)
+
+1년치 청구 파일 비교 (청크 단위로 읽어 메모리 사용량 유지):
+    python -m services.grouper_compare claims.csv 2025.1@V4.6 2025.1@V4.7 --output diff.csv
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from config import settings
+from .grouper_arrow import file_format, iter_claim_frames
+from .grouper_rules import CompiledGrouperRules
+from .grouper_rulesets import RuleSet
+from .pregrouper_service import DetailLevel, KDRGPreGrouper, pre_grouper
+
+# 버전별 비교 컬럼 (결과 컬럼명_버전 번호)
+COMPARED_COLUMNS = ('kdrg', 'relative_weight', 'estimated_amount')
+_GROUPED_COLUMNS = ['mdc', 'mdc_name', *COMPARED_COLUMNS]
+
+
+class VersionComparison:
+    """여러 규칙/코드북 버전 비교 결과 누적
+
+    add_frame으로 청구를 나누어 넣으면 변경 청구와 MDC별 합계를 누적합니다.
+    """
+
+    def __init__(self, versions: List[Union[str, RuleSet]], grouper: KDRGPreGrouper = pre_grouper,
+                 keep_changes: bool = True):
+        """
+        Args:
+            versions: 비교할 버전 목록 (첫 번째가 기준, 2개 이상)
+            keep_changes: 변경 청구 행 보관 여부 (False면 합계만 누적, add_frame 반환값으로 처리)
+
+        Raises:
+            FileNotFoundError: 규칙 세트 파일 없음
+            ValueError: 버전 지정 오류
+        """
+        if len(versions) < 2:
+            raise ValueError("비교할 버전을 2개 이상 지정해야 합니다.")
+        self.grouper = grouper
+        self.rule_sets = [grouper.resolve_rule_set(v) for v in versions]
+        self.rules: List[CompiledGrouperRules] = [grouper.compile_rule_set(rs) for rs in self.rule_sets]
+        self.labels = [str(v) if not isinstance(v, RuleSet) else v.label for v in versions]
+        self.keep_changes = keep_changes
+        self.total = 0
+        self.changed_count = 0
+        self._changes: List[pd.DataFrame] = []
+        self._mdc: Optional[pd.DataFrame] = None
+        self._mdc_names: Dict[str, str] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_workers = 0
+
+    def __enter__(self) -> 'VersionComparison':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """워커 프로세스 풀 종료"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            self._executor_workers = 0
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """비교 버전 정보 (컬럼명의 번호 순서)"""
+        return [
+            {
+                'index': i,
+                'label': label,
+                'rule_set': rule_set.version,
+                'codebook_version': rule_set.codebook_version,
+                'rule_version': rules.version,
+                'base_rate': rules.base_rate,
+            }
+            for i, (label, rule_set, rules) in enumerate(zip(self.labels, self.rule_sets, self.rules))
+        ]
+
+    def add_frame(self, frame: Union[pd.DataFrame, Dict[str, Any]], workers: Optional[int] = None) -> pd.DataFrame:
+        """청구 DataFrame 비교 (group_frame과 같은 입력 형식)
+
+        Args:
+            workers: 워커 프로세스 수 (None이면 설정값, 1이면 현재 프로세스에서 처리)
+
+        Returns:
+            이 프레임에서 변경된 청구 행
+        """
+        df = frame if isinstance(frame, pd.DataFrame) else pd.DataFrame(frame)
+        workers = self.grouper._resolve_workers(workers, len(df))
+        if workers <= 1:
+            # 현재 프로세스에서는 프레임 전체를 한 번에 처리 (코드별 규칙 조회가 청크마다 반복되지 않도록)
+            parts = [_compare_chunk(df, self.grouper, self.rules)] if len(df) else []
+        else:
+            chunk_size = max(settings.GROUPER_CHUNK_SIZE, 1)
+            chunks = [df.iloc[i:i + chunk_size] for i in range(0, len(df), chunk_size)]
+            parts = list(self._get_executor(workers).map(_compare_chunk, chunks))
+
+        changes = [self._accumulate(part) for part in parts]
+        return pd.concat(changes, ignore_index=True) if changes else self._empty_changes()
+
+    def _get_executor(self, workers: int) -> ProcessPoolExecutor:
+        """비교 버전을 모두 미리 컴파일한 워커 풀"""
+        if self._executor is None or self._executor_workers != workers:
+            self.close()
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_compare_worker, initargs=(self.rule_sets,),
+            )
+            self._executor_workers = workers
+        return self._executor
+
+    def _empty_changes(self) -> pd.DataFrame:
+        part, _, kdrg_changed = _add_deltas(_compare_chunk(pd.DataFrame(), self.grouper, self.rules), len(self.rules))
+        part['kdrg_changed'] = kdrg_changed
+        return part
+
+    def _accumulate(self, part: pd.DataFrame) -> pd.DataFrame:
+        """청크 비교 결과를 합계에 더하고 변경 행 반환"""
+        part, changed, kdrg_changed = _add_deltas(part, len(self.rules))
+        part['kdrg_changed'] = kdrg_changed
+        part['changed'] = changed
+        self.total += len(part)
+        self.changed_count += int(changed.sum())
+
+        sums = {'claims': ('claim_id', 'size'), 'kdrg_changed': ('kdrg_changed', 'sum'), 'changed': ('changed', 'sum')}
+        for i in range(len(self.rules)):
+            sums[f'relative_weight_{i}'] = (f'relative_weight_{i}', 'sum')
+            sums[f'estimated_amount_{i}'] = (f'estimated_amount_{i}', 'sum')
+        aggregated = part.groupby('mdc', sort=False).agg(**sums)
+        self._mdc = aggregated if self._mdc is None else self._mdc.add(aggregated, fill_value=0)
+        first = part.loc[~part['mdc'].duplicated(), ['mdc', 'mdc_name']]
+        self._mdc_names.update(zip(first['mdc'], first['mdc_name']))
+
+        changes = part.loc[changed].drop(columns=['changed']).reset_index(drop=True)
+        if self.keep_changes and len(changes):
+            self._changes.append(changes)
+        return changes
+
+    def changes(self, offset: int = 0, limit: Optional[int] = None) -> pd.DataFrame:
+        """변경 청구 비교표 (입력 순서, keep_changes=True일 때)"""
+        frame = pd.concat(self._changes, ignore_index=True) if self._changes else self._empty_changes()
+        end = None if limit is None else offset + limit
+        return frame.iloc[offset:end].reset_index(drop=True)
+
+    def _version_totals(self, row: pd.Series) -> List[Dict[str, Any]]:
+        base_weight = row['relative_weight_0']
+        base_amount = row['estimated_amount_0']
+        totals = []
+        for i, label in enumerate(self.labels):
+            weight = row[f'relative_weight_{i}']
+            amount = row[f'estimated_amount_{i}']
+            totals.append({
+                'version': label,
+                'relative_weight': round(float(weight), 4),
+                'estimated_amount': round(float(amount), 0),
+                'weight_delta': round(float(weight - base_weight), 4),
+                'amount_delta': round(float(amount - base_amount), 0),
+            })
+        return totals
+
+    def mdc_summary(self) -> List[Dict[str, Any]]:
+        """MDC별 합계 (MDC 코드 순)"""
+        if self._mdc is None:
+            return []
+        return [
+            {
+                'mdc': mdc,
+                'mdc_name': self._mdc_names.get(mdc, ''),
+                'claims': int(row['claims']),
+                'kdrg_changed': int(row['kdrg_changed']),
+                'changed': int(row['changed']),
+                'versions': self._version_totals(row),
+            }
+            for mdc, row in self._mdc.sort_index().iterrows()
+        ]
+
+    def totals(self) -> Dict[str, Any]:
+        """전체 합계"""
+        if self._mdc is None:
+            return {'claims': 0, 'kdrg_changed': 0, 'changed': 0, 'versions': []}
+        row = self._mdc.sum()
+        return {
+            'claims': int(row['claims']),
+            'kdrg_changed': int(row['kdrg_changed']),
+            'changed': int(row['changed']),
+            'versions': self._version_totals(row),
+        }
+
+    def labeled(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """버전 번호 컬럼명을 버전 이름으로 변경 (예: kdrg_1 → kdrg[2025.1@V4.7])"""
+        mapping = {}
+        for i, label in enumerate(self.labels):
+            for name in (*COMPARED_COLUMNS, 'weight_delta', 'amount_delta'):
+                mapping[f'{name}_{i}'] = f'{name}[{label}]'
+        return frame.rename(columns=mapping)
+
+
+def _add_deltas(part: pd.DataFrame, count: int):
+    """기준 버전 대비 차이 컬럼 추가 → (DataFrame, 변경 여부, KDRG 변경 여부)"""
+    base_kdrg = part['kdrg_0'].to_numpy()
+    base_weight = part['relative_weight_0'].to_numpy()
+    base_amount = part['estimated_amount_0'].to_numpy()
+    kdrg_changed = np.zeros(len(part), dtype=bool)
+    changed = np.zeros(len(part), dtype=bool)
+    for i in range(1, count):
+        weight_delta = np.round(part[f'relative_weight_{i}'].to_numpy() - base_weight, 4)
+        amount_delta = part[f'estimated_amount_{i}'].to_numpy() - base_amount
+        part[f'weight_delta_{i}'] = weight_delta
+        part[f'amount_delta_{i}'] = amount_delta
+        kdrg_changed |= part[f'kdrg_{i}'].to_numpy() != base_kdrg
+        changed |= (weight_delta != 0) | (amount_delta != 0)
+    return part, changed | kdrg_changed, kdrg_changed
+
+
+# ===== 프로세스 풀 워커 =====
+
+_worker_grouper: Optional[KDRGPreGrouper] = None
+_worker_rules: List[CompiledGrouperRules] = []
+
+
+def _init_compare_worker(rule_sets: List[RuleSet]):
+    """워커 프로세스 초기화 (비교 버전 컴파일 1회)"""
+    global _worker_grouper, _worker_rules
+    _worker_grouper = KDRGPreGrouper(cache_size=0, rule_set=rule_sets[0])
+    _worker_rules = [_worker_grouper.compile_rule_set(rs) for rs in rule_sets]
+
+
+def _compare_chunk(frame: pd.DataFrame, grouper: Optional[KDRGPreGrouper] = None,
+                   rules_list: Optional[List[CompiledGrouperRules]] = None) -> pd.DataFrame:
+    """청크 1개를 파싱 1회 + 버전별 그루핑 (codes-only)"""
+    grouper = grouper or _worker_grouper
+    rules_list = rules_list or _worker_rules
+    parsed = grouper.parse_frame(frame)
+    columns: Dict[str, Any] = {'claim_id': parsed.claim_id, 'patient_id': parsed.patient_id}
+    for i, rules in enumerate(rules_list):
+        result = grouper.group_parsed(parsed, DetailLevel.CODES_ONLY, rules, columns=_GROUPED_COLUMNS)
+        if i == 0:
+            columns['mdc'] = result['mdc'].to_numpy()
+            columns['mdc_name'] = result['mdc_name'].to_numpy()
+        for name in COMPARED_COLUMNS:
+            columns[f'{name}_{i}'] = result[name].to_numpy()
+    return pd.DataFrame(columns)
+
+
+def _read_claims(path: str, chunk_rows: int) -> Iterable[pd.DataFrame]:
+    """청구 CSV/Parquet/Arrow 파일을 청크 단위로 읽기 (CSV 목록 컬럼은 쉼표 구분 문자열)"""
+    fmt = file_format(path)
+    if fmt is not None:
+        yield from iter_claim_frames(path, fmt, chunk_rows)
+        return
+    reader = pd.read_csv(
+        path, encoding='utf-8-sig', chunksize=chunk_rows, keep_default_na=False,
+        dtype={'claim_id': str, 'patient_id': str, 'main_diagnosis': str,
+               'sub_diagnoses': str, 'procedures': str, 'admission_date': str, 'discharge_date': str},
+    )
+    yield from reader
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="규칙/코드북 버전 비교 그루핑")
+    parser.add_argument('claims', help="청구 CSV / Parquet / Arrow 파일 (/upload 형식)")
+    parser.add_argument('versions', nargs='+', help="비교 버전 ('<규칙 세트>@<코드북 버전>', 첫 번째가 기준)")
+    parser.add_argument('--output', help="변경 청구 비교표 CSV 경로")
+    parser.add_argument('--chunk-rows', type=int, default=500_000, help="한 번에 읽을 행 수")
+    parser.add_argument('--workers', type=int, default=0, help="워커 프로세스 수 (0이면 설정값)")
+    args = parser.parse_args()
+
+    with VersionComparison(args.versions, KDRGPreGrouper(cache_size=0), keep_changes=False) as comparison:
+        header = True
+        for frame in _read_claims(args.claims, args.chunk_rows):
+            changes = comparison.add_frame(frame, workers=args.workers or None)
+            if args.output:
+                comparison.labeled(changes).drop(columns=['mdc_name']).to_csv(
+                    args.output, mode='w' if header else 'a', header=header, index=False,
+                )
+                header = False
+            print(f"{comparison.total:,}건 처리 (변경 {comparison.changed_count:,}건)", file=sys.stderr)
+
+        print(json.dumps({
+            'versions': comparison.versions(),
+            'totals': comparison.totals(),
+            'mdc_summary': comparison.mdc_summary(),
+        }, ensure_ascii=False, indent=2))
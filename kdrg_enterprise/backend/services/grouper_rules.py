@@ -0,0 +1,225 @@
+"""
+KDRG Pre-Grouper 규칙 인덱스
+- MDC / CC·MCC / 7개 DRG군 분류표를 조회용 구조로 컴파일
+- 접두어 해시 테이블 기반 O(코드 길이) 조회
+- 원본 분류표의 정의 순서(첫 번째 일치 우선) 보존
+- 7개 DRG군 역색인 (수술 코드 → 후보 DRG군)
+- 컴파일 결과는 규칙 버전/기준수가와 함께 불변 스냅샷으로 교체
+"""
+
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+
+def normalize_code(code: str) -> str:
+    """코드 정규화 (대문자, '.' 제거)"""
+    return code.upper().replace('.', '')
+
+
+class PrefixIndex:
+    """접두어 → 값 조회 인덱스
+
+    (접두어, 값) 목록을 정의 순서대로 받아, 조회 코드의 모든 접두어를
+    해시 테이블에서 찾는다. 여러 접두어가 일치하면 먼저 정의된 항목이 우선한다.
+    """
+
+    __slots__ = ('_table', '_first', '_lengths')
+
+    def __init__(self, entries: Iterable[Tuple[str, Any]]):
+        table: Dict[str, List[Tuple[int, Any]]] = {}
+        for rank, (prefix, value) in enumerate(entries):
+            table.setdefault(normalize_code(prefix), []).append((rank, value))
+
+        self._table: Mapping[str, Tuple[Tuple[int, Any], ...]] = MappingProxyType(
+            {key: tuple(hits) for key, hits in table.items()}
+        )
+        # 접두어별 최우선 항목 (lookup 전용)
+        self._first: Mapping[str, Tuple[int, Any]] = MappingProxyType(
+            {key: hits[0] for key, hits in table.items()}
+        )
+        self._lengths: Tuple[int, ...] = tuple(sorted({len(key) for key in table}))
+
+    def lookup(self, code: str) -> Optional[Any]:
+        """가장 먼저 정의된 일치 항목의 값 (없으면 None)"""
+        first = self._first
+        size = len(code)
+        best = None
+        for length in self._lengths:
+            if length > size:
+                break
+            hit = first.get(code[:length])
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best = hit
+        return best[1] if best is not None else None
+
+    def matches(self, code: str) -> List[Any]:
+        """일치하는 모든 값 (정의 순서, 중복 제거)"""
+        table = self._table
+        size = len(code)
+        hits: List[Tuple[int, Any]] = []
+        for length in self._lengths:
+            if length > size:
+                break
+            hits.extend(table.get(code[:length], ()))
+        if len(hits) > 1:
+            hits.sort(key=lambda hit: hit[0])
+
+        values = []
+        for _, value in hits:
+            if value not in values:
+                values.append(value)
+        return values
+
+    def has_match(self, code: str) -> bool:
+        """일치하는 접두어 존재 여부"""
+        first = self._first
+        size = len(code)
+        for length in self._lengths:
+            if length > size:
+                break
+            if code[:length] in first:
+                return True
+        return False
+
+
+class DRG7Index:
+    """7개 DRG군 역색인
+
+    - 주진단 접두어 → 후보 DRG군 (정의 순서)
+    - 수술 코드(및 앞 4자리) → 해당 DRG군 집합
+    청구 1건의 판정은 후보 DRG군과 수술 코드로 찾은 DRG군 집합의 교집합으로 끝난다.
+    """
+
+    __slots__ = ('codes', 'names', 'dx_index', 'dx_only', 'bits', '_proc_groups', '_proc_prefix_groups')
+
+    PROCEDURE_PREFIX_LENGTH = 4
+
+    def __init__(self, drg7_codes: Dict[str, Dict[str, Any]]):
+        self.codes: Tuple[str, ...] = tuple(drg7_codes)
+        self.names: Mapping[str, str] = MappingProxyType({
+            code: info.get('name', code) for code, info in drg7_codes.items()
+        })
+        self.dx_index = PrefixIndex(
+            (dx, code) for code, info in drg7_codes.items() for dx in info['diagnoses']
+        )
+        # 수술 없이 진단만으로 판정하는 DRG군 (O60 질식분만)
+        self.dx_only: FrozenSet[str] = frozenset(
+            code for code, info in drg7_codes.items() if not info['procedures']
+        )
+        # DRG군별 비트 (컬럼 단위 판정용)
+        self.bits: Mapping[str, int] = MappingProxyType({code: 1 << i for i, code in enumerate(self.codes)})
+
+        proc_groups: Dict[str, Set[str]] = {}
+        prefix_groups: Dict[str, Set[str]] = {}
+        for code, info in drg7_codes.items():
+            for proc in info['procedures']:
+                proc = proc.upper()
+                proc_groups.setdefault(proc, set()).add(code)
+                prefix_groups.setdefault(proc[:self.PROCEDURE_PREFIX_LENGTH], set()).add(code)
+        self._proc_groups: Mapping[str, FrozenSet[str]] = MappingProxyType(
+            {proc: frozenset(groups) for proc, groups in proc_groups.items()}
+        )
+        self._proc_prefix_groups: Mapping[str, FrozenSet[str]] = MappingProxyType(
+            {prefix: frozenset(groups) for prefix, groups in prefix_groups.items()}
+        )
+
+    def candidates(self, main_diagnosis: str) -> List[str]:
+        """주진단이 해당하는 DRG군 (정의 순서)"""
+        return self.dx_index.matches(main_diagnosis.upper())
+
+    def procedure_groups(self, procedures: Iterable[str]) -> Set[str]:
+        """수술 코드가 해당하는 DRG군 집합"""
+        groups: Set[str] = set()
+        for proc in procedures:
+            hit = self._proc_groups.get(proc.upper())
+            if hit:
+                groups.update(hit)
+        return groups
+
+    def procedure_prefix_groups(self, procedures: Iterable[str]) -> Set[str]:
+        """수술 코드 앞 4자리가 해당하는 DRG군 집합"""
+        length = self.PROCEDURE_PREFIX_LENGTH
+        groups: Set[str] = set()
+        for proc in procedures:
+            hit = self._proc_prefix_groups.get(proc.upper()[:length])
+            if hit:
+                groups.update(hit)
+        return groups
+
+    def procedure_mask(self, procedure: str) -> int:
+        """수술 코드가 해당하는 DRG군 비트 합"""
+        mask = 0
+        for code in self._proc_groups.get(procedure.upper(), ()):
+            mask |= self.bits[code]
+        return mask
+
+    def detect(self, main_diagnosis: str, procedures: Iterable[str]) -> Optional[str]:
+        """7개 DRG군 판정 (정의 순서상 첫 번째 일치, 없으면 None)"""
+        candidates = self.candidates(main_diagnosis)
+        if not candidates:
+            return None
+        matched = self.procedure_groups(procedures)
+        for code in candidates:
+            if code in matched or code in self.dx_only:
+                return code
+        return None
+
+    def classify_kdrg(self, kdrg_code: str) -> Optional[str]:
+        """KDRG 코드가 속한 7개 DRG군 (ADRG 앞 3자리 기준)"""
+        code = kdrg_code[:3].upper()
+        return code if code in self.names else None
+
+
+class CompiledGrouperRules:
+    """컴파일된 그루퍼 분류표 (불변, 그루핑 1회는 같은 스냅샷만 사용)"""
+
+    __slots__ = ('mdc_index', 'mcc_index', 'cc_index', 'drg7', 'drg7_codes', 'base_rate', 'weights', 'code_map',
+                 'name', 'version')
+
+    def __init__(self, mdc_index: PrefixIndex, mcc_index: PrefixIndex, cc_index: PrefixIndex,
+                 drg7: DRG7Index, drg7_codes: Optional[Mapping[str, Mapping[str, Any]]] = None,
+                 base_rate: float = 0, weights: Optional[Mapping[str, float]] = None,
+                 code_map: Optional[Mapping[str, str]] = None, name: str = '', version: str = ''):
+        self.mdc_index = mdc_index
+        self.mcc_index = mcc_index
+        self.cc_index = cc_index
+        self.drg7 = drg7
+        self.drg7_codes: Mapping[str, Mapping[str, Any]] = MappingProxyType(dict(drg7_codes or {}))
+        self.base_rate = base_rate
+        # 코드북 버전별 KDRG 상대가치점수 (None이면 공유 코드표 사용)
+        self.weights: Optional[Mapping[str, float]] = MappingProxyType(dict(weights)) if weights is not None else None
+        # 그루퍼 AADRG → V4.7 AADRG (코드표/코드북 조회 키, 매핑이 없는 AADRG는 조회하지 않음)
+        self.code_map: Mapping[str, str] = MappingProxyType(dict(code_map or {}))
+        self.name = name  # 규칙 세트 이름 (builtin 또는 파일 버전)
+        self.version = version  # 내용 기반 규칙 버전 (결과의 rule_version)
+
+
+def compile_rules(mdc_definitions: Dict[str, Tuple[str, List[str]]],
+                  drg7_codes: Dict[str, Dict[str, Any]],
+                  cc_codes: Dict[str, List[str]],
+                  base_rate: float = 0,
+                  weights: Optional[Mapping[str, float]] = None,
+                  code_map: Optional[Mapping[str, str]] = None,
+                  name: str = '',
+                  version: str = '') -> CompiledGrouperRules:
+    """분류표 딕셔너리를 조회 인덱스로 컴파일"""
+    mdc_index = PrefixIndex(
+        (prefix, (mdc_code, mdc_name))
+        for mdc_code, (mdc_name, prefixes) in mdc_definitions.items()
+        for prefix in prefixes
+    )
+    mcc_index = PrefixIndex((code, 'MCC') for code in cc_codes.get('MCC', []))
+    cc_index = PrefixIndex((code, 'CC') for code in cc_codes.get('CC', []))
+
+    return CompiledGrouperRules(
+        mdc_index=mdc_index,
+        mcc_index=mcc_index,
+        cc_index=cc_index,
+        drg7=DRG7Index(drg7_codes),
+        drg7_codes={code: MappingProxyType(dict(info)) for code, info in drg7_codes.items()},
+        base_rate=base_rate,
+        weights=weights,
+        code_map=code_map,
+        name=name,
+        version=version,
+    )
@@ -0,0 +1,227 @@
+"""
+Pre-Grouper 규칙 세트 (버전별 JSON 파일)
+- GROUPER_RULES_DIR/<버전>.json: MDC 정의, 7개 DRG군, CC/MCC 코드, 기준수가
+- GROUPER_RULES_DIR/ACTIVE: 활성 버전 이름 (여러 uvicorn 워커 프로세스가 공유)
+- 내장 규칙(KDRGPreGrouper 클래스 상수)은 'builtin' 버전
+- codebook_version을 지정하면 상대가치점수를 kdrg_codebook의 해당 버전에서 조회 (kdrg_code_map 필요)
+- kdrg_code_map: 그루퍼 AADRG → 실제 V4.7 AADRG (그루퍼 코드는 자체 체계라 같은 코드가 다른 DRG일 수 있음,
+  코드표/코드북의 상대가치점수와 재원일수는 매핑된 AADRG만 조회)
+- 비교용 지정 형식: '<버전>@<코드북 버전>' (예: 'builtin', '2025.1@V4.7')
+
+파일 형식:
+    {
+      "version": "2025.1",
+      "description": "...",
+      "effective_date": "2025-01-01",
+      "base_rate": 87000,
+      "codebook_version": "V4.7",
+      "mdc_definitions": {"A": ["신경계 질환", ["G", "F0"]], ...},
+      "drg7_surgery_codes": {"D12": {"name": "...", "procedures": [...], "diagnoses": [...],
+                                      "base_weight": 0.8, "los_range": [1, 3]}, ...},
+      "cc_codes": {"MCC": [...], "CC": [...]},
+      "kdrg_code_map": {"D121": "D162", ...}
+    }
+
+내장 규칙을 파일로 내보내기 (편집 시작점):
+    python -m services.grouper_rulesets export <버전>
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+
+BUILTIN_VERSION = 'builtin'
+ACTIVE_FILE = 'ACTIVE'
+
+_VERSION_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$')
+_AADRG_PATTERN = re.compile(r'^[A-Z][0-9A-Z]{3}$')
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """그루퍼 규칙 세트 (컴파일 전 원본)"""
+    version: str
+    mdc_definitions: Dict[str, Tuple[str, List[str]]]
+    drg7_surgery_codes: Dict[str, Dict[str, Any]]
+    cc_codes: Dict[str, List[str]]
+    base_rate: float
+    description: str = ''
+    effective_date: Optional[str] = None
+    codebook_version: Optional[str] = None  # 상대가치점수 코드북 버전 (None이면 V4.7 코드표)
+    kdrg_code_map: Dict[str, str] = field(default_factory=dict)  # 그루퍼 AADRG → V4.7 AADRG
+
+    @property
+    def label(self) -> str:
+        """표시 이름 (코드북 버전 포함)"""
+        return f"{self.version}@{self.codebook_version}" if self.codebook_version else self.version
+
+
+def split_spec(spec: str) -> Tuple[str, Optional[str]]:
+    """'<버전>@<코드북 버전>' 지정을 (버전, 코드북 버전)으로 분리 (버전이 비면 활성 규칙 세트)"""
+    version, _, codebook_version = spec.strip().partition('@')
+    return version.strip(), codebook_version.strip() or None
+
+
+def validate_version(version: str) -> str:
+    """버전 이름 검증 (파일명으로 사용)"""
+    if not isinstance(version, str) or not _VERSION_PATTERN.match(version):
+        raise ValueError(f"규칙 세트 버전 이름이 올바르지 않습니다: {version!r}")
+    return version
+
+
+def rule_set_from_dict(data: Dict[str, Any]) -> RuleSet:
+    """JSON 딕셔너리를 규칙 세트로 변환 (형식 오류 시 ValueError)"""
+    try:
+        version = validate_version(data['version'])
+        mdc_definitions = {
+            str(code): (str(name), [str(p) for p in prefixes])
+            for code, (name, prefixes) in data['mdc_definitions'].items()
+        }
+        drg7 = {}
+        for code, info in data['drg7_surgery_codes'].items():
+            lower, upper = info['los_range']
+            drg7[str(code)] = {
+                'name': str(info['name']),
+                'procedures': [str(p) for p in info.get('procedures', [])],
+                'diagnoses': [str(d) for d in info['diagnoses']],
+                'base_weight': float(info['base_weight']),
+                'los_range': (int(lower), int(upper)),
+            }
+        cc_codes = {
+            'MCC': [str(c) for c in data['cc_codes'].get('MCC', [])],
+            'CC': [str(c) for c in data['cc_codes'].get('CC', [])],
+        }
+        kdrg_code_map = {
+            str(aadrg).upper(): str(target).upper() for aadrg, target in (data.get('kdrg_code_map') or {}).items()
+        }
+        for aadrg, target in kdrg_code_map.items():
+            if not (_AADRG_PATTERN.match(aadrg) and _AADRG_PATTERN.match(target)):
+                raise ValueError(f"kdrg_code_map 항목이 올바르지 않습니다: {aadrg!r} → {target!r}")
+        base_rate = data['base_rate']
+        if isinstance(base_rate, bool) or not isinstance(base_rate, (int, float)) or base_rate <= 0:
+            raise ValueError(f"base_rate 값이 올바르지 않습니다: {base_rate!r}")
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"규칙 세트 형식이 올바르지 않습니다: {e}") from e
+
+    return RuleSet(
+        version=version,
+        mdc_definitions=mdc_definitions,
+        drg7_surgery_codes=drg7,
+        cc_codes=cc_codes,
+        base_rate=base_rate,
+        description=str(data.get('description') or ''),
+        effective_date=data.get('effective_date'),
+        codebook_version=data.get('codebook_version') or None,
+        kdrg_code_map=kdrg_code_map,
+    )
+
+
+def rule_set_to_dict(rule_set: RuleSet) -> Dict[str, Any]:
+    """규칙 세트를 JSON 딕셔너리로 변환"""
+    return {
+        'version': rule_set.version,
+        'description': rule_set.description,
+        'effective_date': rule_set.effective_date,
+        'base_rate': rule_set.base_rate,
+        'codebook_version': rule_set.codebook_version,
+        'mdc_definitions': {code: [name, list(prefixes)] for code, (name, prefixes) in rule_set.mdc_definitions.items()},
+        'drg7_surgery_codes': {
+            code: {**info, 'los_range': list(info['los_range'])}
+            for code, info in rule_set.drg7_surgery_codes.items()
+        },
+        'cc_codes': rule_set.cc_codes,
+        'kdrg_code_map': dict(rule_set.kdrg_code_map),
+    }
+
+
+def rule_set_path(version: str, directory: Optional[str] = None) -> str:
+    return os.path.join(directory or settings.GROUPER_RULES_DIR, f"{validate_version(version)}.json")
+
+
+def load_rule_set(version: str, directory: Optional[str] = None) -> RuleSet:
+    """버전 파일 읽기 (파일 없음: FileNotFoundError, 형식 오류: ValueError)"""
+    with open(rule_set_path(version, directory), encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"규칙 세트 JSON을 읽을 수 없습니다: {e}") from e
+    rule_set = rule_set_from_dict(data)
+    if rule_set.version != version:
+        raise ValueError(f"파일 이름과 버전이 다릅니다: {version} != {rule_set.version}")
+    return rule_set
+
+
+def _write_atomic(path: str, text: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def save_rule_set(rule_set: RuleSet, directory: Optional[str] = None) -> str:
+    """규칙 세트를 버전 파일로 저장 (원자적 교체)"""
+    path = rule_set_path(rule_set.version, directory)
+    _write_atomic(path, json.dumps(rule_set_to_dict(rule_set), ensure_ascii=False, indent=2) + '\n')
+    return path
+
+
+def list_rule_sets(directory: Optional[str] = None) -> List[Dict[str, Any]]:
+    """저장된 규칙 세트 목록 (형식 오류 파일은 error 항목으로 표시)"""
+    directory = directory or settings.GROUPER_RULES_DIR
+    if not os.path.isdir(directory):
+        return []
+    items = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.json'):
+            continue
+        version = name[:-5]
+        try:
+            rule_set = load_rule_set(version, directory)
+            items.append({
+                'version': version,
+                'description': rule_set.description,
+                'effective_date': rule_set.effective_date,
+            })
+        except (OSError, ValueError) as e:
+            items.append({'version': version, 'error': str(e)})
+    return items
+
+
+def read_active_version(directory: Optional[str] = None) -> Optional[str]:
+    """ACTIVE 파일의 활성 버전 (없으면 None)"""
+    try:
+        with open(os.path.join(directory or settings.GROUPER_RULES_DIR, ACTIVE_FILE), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def write_active_version(version: str, directory: Optional[str] = None):
+    """활성 버전 기록 (다른 워커 프로세스는 GROUPER_RULES_CHECK_SECONDS 이내에 반영)"""
+    if version != BUILTIN_VERSION:
+        validate_version(version)
+    _write_atomic(os.path.join(directory or settings.GROUPER_RULES_DIR, ACTIVE_FILE), version + '\n')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3 or sys.argv[1] != 'export':
+        print("사용법: python -m services.grouper_rulesets export <버전>")
+        sys.exit(1)
+    from .pregrouper_service import KDRGPreGrouper
+
+    builtin = KDRGPreGrouper.builtin_rule_set()
+    exported = RuleSet(**{**builtin.__dict__, 'version': validate_version(sys.argv[2]), 'description': '내장 규칙에서 내보냄'})
+    print(save_rule_set(exported))
@@ -0,0 +1,265 @@
+"""
+비동기 배치 그루핑 작업
+- 작업 등록 즉시 job_id 반환, 백그라운드 워커가 청크 단위로 그루핑
+- 청크 결과와 진행 상태를 한 트랜잭션으로 저장 (체크포인트)
+- 서버 재시작 시 대기/실행 중 작업을 마지막으로 저장된 청크 다음부터 이어서 처리
+- 취소 요청은 청크 경계에서 반영
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from .grouping_store import GroupingStore, grouping_store
+from .pregrouper_service import DetailLevel, KDRGPreGrouper, pre_grouper
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    """작업 상태"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = (JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value)
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _merge_drg_statistics(stats_list: List[str]) -> Dict[str, Dict[str, Any]]:
+    merged: Dict[str, Dict[str, Any]] = {}
+    for stats_json in stats_list:
+        for drg_type, stat in json.loads(stats_json).items():
+            target = merged.setdefault(drg_type, {'count': 0, 'total_amount': 0})
+            target['count'] += stat['count']
+            target['total_amount'] += stat['total_amount']
+    return merged
+
+
+class GroupingJobManager:
+    """배치 그루핑 작업 관리 (등록 / 백그라운드 처리 / 재개 / 취소)"""
+
+    def __init__(self, store: GroupingStore = grouping_store, grouper: KDRGPreGrouper = pre_grouper):
+        self.store = store
+        self.grouper = grouper
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self):
+        """워커 시작 + 미완료 작업 재개 (이벤트 루프당 1회)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._workers = [
+            loop.create_task(self._worker()) for _ in range(max(settings.GROUPING_JOB_CONCURRENCY, 1))
+        ]
+        pending = await self.store.list_unfinished_jobs()
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        if pending:
+            logger.info(f"미완료 그루핑 작업 {len(pending)}건 재개")
+
+    async def stop(self):
+        """워커 종료 (처리 중이던 청크는 저장되지 않고 다음 시작 시 다시 처리)"""
+        workers, self._workers = self._workers, []
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._loop = None
+        self._queue = None
+
+    async def join(self):
+        """대기열의 작업이 모두 끝날 때까지 대기"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def submit(self, records: List[Dict[str, Any]], refs: List[Dict[str, Any]], source: str,
+                     detail_level: DetailLevel = DetailLevel.FULL, filename: Optional[str] = None,
+                     errors: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """작업 등록 후 대기열에 추가
+
+        Args:
+            records: 그루핑 입력 딕셔너리 목록
+            refs: 입력별 식별 정보 (오류 보고용, records와 같은 순서)
+            source: 작업 유형 (batch/upload)
+            errors: 등록 전 입력 변환 오류 (업로드 파일)
+        """
+        await self.start()
+        job_id = f"job_{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+        chunk_size = max(settings.GROUPING_JOB_CHUNK_SIZE, 1)
+        chunk_inputs = [
+            json.dumps({'records': records[i:i + chunk_size], 'refs': refs[i:i + chunk_size]}, ensure_ascii=False)
+            for i in range(0, len(records), chunk_size)
+        ]
+        job = {
+            'job_id': job_id,
+            'created_at': _now(),
+            'status': JobStatus.QUEUED.value,
+            'source': source,
+            'filename': filename,
+            'detail_level': DetailLevel(detail_level).value,
+            'total': len(records) + len(errors or []),
+        }
+        await self.store.create_job(
+            job, chunk_inputs,
+            errors_json=json.dumps(errors, ensure_ascii=False) if errors else None,
+            error_count=len(errors or []),
+        )
+        self._queue.put_nowait(job_id)
+        return await self.get_status(job_id)
+
+    async def get_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 상태 / 진행률"""
+        job = await self.store.get_job(job_id)
+        if job is None:
+            return None
+        errors, _ = await self.store.get_job_chunk_summaries(job_id, settings.MAX_ERROR_PREVIEW)
+        return {
+            'job_id': job_id,
+            'status': job['status'],
+            'source': job['source'],
+            'filename': job['filename'],
+            'detail_level': job['detail_level'],
+            'created_at': job['created_at'],
+            'updated_at': job['updated_at'],
+            'total': job['total'],
+            'processed': job['processed'],
+            'progress': round(job['processed'] / job['total'] * 100, 1) if job['total'] else 100.0,
+            'chunks_done': job['next_chunk'],
+            'chunk_count': job['chunk_count'],
+            'success_count': job['success_count'],
+            'error_count': job['error_count'],
+            'cancel_requested': bool(job['cancel_requested']),
+            'message': job['message'],
+            'errors': errors or None,
+        }
+
+    async def get_results(self, job_id: str, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """처리된 결과 페이지 (작업 진행 중에도 저장된 청크까지 조회 가능)"""
+        return await self.store.get_job_results(job_id, offset, limit)
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 취소 요청 (대기 중이면 즉시, 실행 중이면 다음 청크 경계에서 취소)"""
+        job = await self.store.get_job(job_id)
+        if job is None:
+            return None
+        if job['status'] not in FINISHED_STATUSES:
+            await self.store.request_job_cancel(job_id)
+            await self.store.update_job_status(
+                job_id, JobStatus.CANCELLED.value, _now(), from_status=[JobStatus.QUEUED.value]
+            )
+        return await self.get_status(job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self.run_job(job_id)
+            except Exception as e:
+                logger.error(f"그루핑 작업 실패 {job_id}: {e}", exc_info=True)
+                await self.store.update_job_status(job_id, JobStatus.FAILED.value, _now(), message=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def run_job(self, job_id: str, max_chunks: Optional[int] = None):
+        """작업 처리 (마지막으로 저장된 청크 다음부터)
+
+        Args:
+            max_chunks: 처리할 최대 청크 수 (None이면 끝까지)
+        """
+        job = await self.store.get_job(job_id)
+        if job is None or job['status'] in FINISHED_STATUSES:
+            return
+        started = await self.store.update_job_status(
+            job_id, JobStatus.RUNNING.value, _now(),
+            from_status=[JobStatus.QUEUED.value, JobStatus.RUNNING.value],
+        )
+        if not started:
+            return
+        detail_level = DetailLevel(job['detail_level'] or DetailLevel.FULL.value)
+
+        handled = 0
+        for chunk_index in range(job['next_chunk'], job['chunk_count']):
+            if max_chunks is not None and handled >= max_chunks:
+                return
+            if (await self.store.get_job(job_id))['cancel_requested']:
+                await self.store.update_job_status(job_id, JobStatus.CANCELLED.value, _now())
+                logger.info(f"그루핑 작업 취소: {job_id} ({chunk_index}/{job['chunk_count']} 청크)")
+                return
+
+            chunk = json.loads(await self.store.get_job_chunk_input(job_id, chunk_index))
+            batch, failed = await asyncio.to_thread(
+                self.grouper.group_records_batch, chunk['records'], None, detail_level
+            )
+            errors = [{**chunk['refs'][idx], 'error': error} for idx, error in failed]
+            stats: Dict[str, Dict[str, Any]] = {}
+            for drg_type, amount in zip(batch.column('drg_type'), batch.column('estimated_amount')):
+                stat = stats.setdefault(drg_type, {'count': 0, 'total_amount': 0})
+                stat['count'] += 1
+                stat['total_amount'] += amount
+
+            await self.store.commit_job_chunk(
+                job_id, chunk_index, batch.to_json(), json.dumps(errors, ensure_ascii=False),
+                json.dumps(stats, ensure_ascii=False), len(chunk['records']), len(batch), len(errors), _now(),
+            )
+            handled += 1
+
+        await self._complete(job_id)
+
+    async def _cancel_running(self, job_id: str, message: str):
+        await self.store.update_job_status(
+            job_id, JobStatus.CANCELLED.value, _now(), from_status=[JobStatus.RUNNING.value]
+        )
+        logger.info(f"그루핑 작업 취소: {job_id} ({message})")
+
+    async def _complete(self, job_id: str):
+        """완료 처리 + 이력에 요약 저장 (개별 결과는 작업 결과 API로 조회)
+
+        마지막 청크 처리 중에 들어온 취소 요청도 반영해 완료 대신 취소로 끝냅니다.
+        """
+        job = await self.store.get_job(job_id)
+        if job['cancel_requested']:
+            await self._cancel_running(job_id, "마지막 청크 처리 후")
+            return
+        errors, stats = await self.store.get_job_chunk_summaries(job_id, settings.MAX_ERROR_PREVIEW)
+        summary = {
+            'history_id': job_id,
+            'created_at': job['created_at'],
+            'type': job['source'],
+            'job': True,
+            'detail_level': job['detail_level'],
+            'filename': job['filename'],
+            'total': job['total'],
+            'success_count': job['success_count'],
+            'error_count': job['error_count'],
+            'drg_statistics': _merge_drg_statistics(stats),
+            'errors': errors,
+        }
+        await self.store.save_history(job_id, job['source'], summary)
+        completed = await self.store.update_job_status(
+            job_id, JobStatus.COMPLETED.value, _now(), from_status=[JobStatus.RUNNING.value],
+            unless_cancel_requested=True,
+        )
+        if not completed:
+            # 이력 저장 중에 취소 요청이 들어옴 (완료 이력은 남기지 않음)
+            await self.store.delete_history(job_id)
+            await self._cancel_running(job_id, "완료 처리 중")
+            return
+        logger.info(f"그루핑 작업 완료: {job_id} ({job['success_count']}/{job['total']})")
+
+
+# 서비스 인스턴스
+grouping_jobs = GroupingJobManager()
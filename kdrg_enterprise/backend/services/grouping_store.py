@@ -1,16 +1,136 @@
+"""
+그루핑 이력 / 비동기 작업 저장소 (SQLite)
+- 이력: 헤더(grouping_history) + 청구별 결과 행(grouping_results) 또는 DRG군 요약(grouping_history_drg)
+- 통계: 이력 저장/삭제와 같은 트랜잭션에서 유형별/DRG군별 누적 집계와 일자별 집계를 갱신
+  (조회 시 이력 전체를 읽지 않음)
+- 헤더/결과 JSON은 HISTORY_COMPRESS_LEVEL로 압축 저장 (payload_codec, 공유 사전은 grouping_payload_dicts)
+- 보관: 기준일 이전 이력을 Parquet(zstd) 파일로 옮긴 뒤 삭제하고 빈 페이지 반납 (incremental vacuum),
+  통계 집계는 보관된 이력도 포함해 유지 (보관 주기 실행은 history_retention)
+
+관리 명령:
+    python -m services.grouping_store rebuild-statistics [--db DB 경로]   # 통계 집계 재계산
+    python -m services.grouping_store train-dictionary [--db DB 경로]     # 최근 결과로 압축 사전 새로 생성
+"""
+
+import argparse
+import asyncio
 import json
 import os
-from typing import Any, Dict, List, Optional
+from datetime import datetime
+from itertools import chain, islice, repeat
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
-import aiosqlite
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from config import settings
+from .grouper_batch import GrouperResultBatch, dumps
+from .payload_codec import PayloadCodec, train_dictionary
+from .sqlite_pool import SQLitePool
+
+# 이력 테이블 스키마 버전 (PRAGMA user_version, 1: 헤더 + 결과 행 분리, 2: 통계 집계 테이블)
+HISTORY_SCHEMA_VERSION = 2
+
+# 통계 집계 종류 (grouping_stats.kind): 이력 유형별 이력 수 / DRG군별 결과 수 + 예상 금액
+STAT_TYPE, STAT_DRG_TYPE = 'type', 'drg_type'
+
+# 압축 사전을 만들 때 쓰는 결과 행 수
+DICTIONARY_SAMPLE_ROWS = 5000
+
+# 이전 grouping_history(history_id, created_at, type, payload_json)에 추가된 헤더 컬럼
+_HISTORY_HEADER_COLUMNS = (
+    ('patient_id', 'TEXT'),
+    ('total', 'INTEGER'),
+    ('success_count', 'INTEGER'),
+    ('error_count', 'INTEGER'),
+    ('results_key', 'TEXT'),
+    ('result_count', 'INTEGER NOT NULL DEFAULT 0'),
+)
+
+# grouping_results 타입 컬럼 (결과 전체는 result_json)
+_RESULT_ROW_COLUMNS = ('claim_id', 'patient_id', 'kdrg', 'mdc', 'drg_type', 'severity', 'estimated_amount')
+
+
+def _result_batch(results: Any) -> GrouperResultBatch:
+    """이력 결과(배치, 결과 객체/dict 또는 그 목록) → GrouperResultBatch"""
+    if isinstance(results, GrouperResultBatch):
+        return results
+    batch = GrouperResultBatch()
+    if results is None:
+        return batch
+    for result in results if isinstance(results, list) else [results]:
+        if isinstance(result, dict):
+            batch.append_dict(result)
+        else:
+            batch.append(result)
+    return batch
+
+
+# 보관 Parquet 스키마 (이력 헤더 / 결과 행, JSON은 압축 해제한 문자열)
+_ARCHIVE_HISTORY_SCHEMA = pa.schema([
+    ('history_id', pa.string()), ('created_at', pa.string()), ('type', pa.string()), ('patient_id', pa.string()),
+    ('total', pa.int64()), ('success_count', pa.int64()), ('error_count', pa.int64()),
+    ('results_key', pa.string()), ('result_count', pa.int64()), ('payload_json', pa.string()),
+])
+_ARCHIVE_RESULT_SCHEMA = pa.schema([
+    ('history_id', pa.string()), ('seq', pa.int64()), ('claim_id', pa.string()), ('patient_id', pa.string()),
+    ('kdrg', pa.string()), ('mdc', pa.string()), ('drg_type', pa.string()), ('severity', pa.int64()),
+    ('estimated_amount', pa.float64()), ('result_json', pa.string()),
+])
+
+
+def _write_parquet(path: str, rows: List[Dict[str, Any]], schema: pa.Schema):
+    """행 목록을 Parquet(zstd)로 저장 (임시 파일에 쓴 뒤 이름 변경, 중간에 실패해도 불완전한 파일이 남지 않음)"""
+    tmp_path = path + '.tmp'
+    pq.write_table(pa.Table.from_pylist(rows, schema=schema), tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+
+
+# 통계 증감 (일자, kind, key, 건수, 금액)
+StatDelta = Tuple[str, str, str, int, float]
+
+# 저장할 이력 (history_id, history_type, payload)
+HistoryItem = Tuple[str, str, Dict[str, Any]]
+
+
+def _stats_day(created_at: Optional[str]) -> str:
+    """일자별 집계 키 (created_at ISO 문자열의 날짜 부분)"""
+    return (created_at or '')[:10]
+
+
+def _statistics(rows: List[Tuple[str, str, int, float]]) -> Dict[str, Any]:
+    """집계 행 (kind, key, count, amount) → 통계 응답 형식"""
+    type_stats: Dict[str, int] = {"single": 0, "batch": 0, "upload": 0}
+    drg_type_counts: Dict[str, int] = {}
+    total_estimated = 0
+    for kind, key, count, amount in rows:
+        if kind == STAT_TYPE:
+            type_stats[key] = type_stats.get(key, 0) + count
+        else:
+            drg_type_counts[key] = drg_type_counts.get(key, 0) + count
+            total_estimated += amount
+    return {
+        "total_groupings": sum(type_stats.values()),
+        "by_type": type_stats,
+        "by_drg_type": drg_type_counts,
+        "total_estimated_amount": total_estimated,
+    }
+
+
+def _result_rows(history_id: str, batch: GrouperResultBatch,
+                 encode: Callable[[bytes], Union[bytes, str]]) -> Iterator[Tuple[Any, ...]]:
+    """grouping_results 삽입 행 (history_id, seq, 타입 컬럼..., result_json), encode는 결과 JSON 저장 형식 변환"""
+    columns = [batch.column(name) for name in _RESULT_ROW_COLUMNS]
+    return zip(repeat(history_id), range(len(batch)), *columns, map(encode, batch.iter_json()))
 
 
 class GroupingStore:
     def __init__(self, db_url: str):
         self.db_path = self._extract_path(db_url)
         self._initialized = False
+        self._pool: Optional[SQLitePool] = None
+        self._codec = PayloadCodec(settings.HISTORY_COMPRESS_LEVEL)
 
     def _extract_path(self, db_url: str) -> str:
         if db_url.startswith("sqlite+aiosqlite:///"):
@@ -19,125 +139,842 @@ class GroupingStore:
             return db_url.replace("sqlite:///", "", 1)
         return db_url
 
+    async def open(self):
+        """연결 풀 열기 + 테이블 생성 (앱 시작 시 호출, 호출하지 않으면 첫 사용 때 열림)"""
+        await self._init()
+
+    async def close(self):
+        """연결 풀 닫기 (앱 종료 시)"""
+        pool, self._pool = self._pool, None
+        self._initialized = False
+        if pool is not None:
+            await pool.close()
+
+    def _ready(self) -> bool:
+        return self._initialized and self._pool is not None and self._pool.bound_to_running_loop()
+
     async def _init(self):
-        if self._initialized:
+        if self._ready():
             return
-        if self.db_path:
-            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
-        async with aiosqlite.connect(self.db_path) as db:
+        # 처음 사용, db_path 변경(_initialized 초기화) 또는 다른 이벤트 루프에서 호출되면 다시 연다
+        await self.close()
+        pool = SQLitePool(self.db_path, settings.GROUPING_DB_READERS, settings.GROUPING_DB_CACHE_MB,
+                          incremental_vacuum=True)
+        await pool.open()
+        # 풀을 열 때마다 압축 수준 설정과 저장된 사전을 다시 읽음
+        self._codec = PayloadCodec(settings.HISTORY_COMPRESS_LEVEL)
+        async with pool.write() as db:
+            await self._create_history_tables(db)
+            await self._load_dictionaries(db)
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS claim_fingerprints (
+                    claim_id TEXT PRIMARY KEY,
+                    fingerprint TEXT NOT NULL,
+                    rule_version TEXT NOT NULL,
+                    result_json TEXT NOT NULL,
+                    history_id TEXT,
+                    updated_at TEXT
+                )
+                """
+            )
             await db.execute(
                 """
-                CREATE TABLE IF NOT EXISTS grouping_history (
-                    history_id TEXT PRIMARY KEY,
+                CREATE TABLE IF NOT EXISTS grouping_jobs (
+                    job_id TEXT PRIMARY KEY,
                     created_at TEXT,
-                    type TEXT,
-                    payload_json TEXT
+                    updated_at TEXT,
+                    status TEXT NOT NULL,
+                    source TEXT,
+                    filename TEXT,
+                    detail_level TEXT,
+                    total INTEGER NOT NULL,
+                    chunk_count INTEGER NOT NULL,
+                    next_chunk INTEGER NOT NULL DEFAULT 0,
+                    processed INTEGER NOT NULL DEFAULT 0,
+                    success_count INTEGER NOT NULL DEFAULT 0,
+                    error_count INTEGER NOT NULL DEFAULT 0,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    message TEXT
+                )
+                """
+            )
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS grouping_job_chunks (
+                    job_id TEXT NOT NULL,
+                    chunk_index INTEGER NOT NULL,
+                    input_json TEXT,
+                    results_json TEXT,
+                    errors_json TEXT,
+                    stats_json TEXT,
+                    result_offset INTEGER,
+                    result_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (job_id, chunk_index)
                 )
                 """
             )
-            await db.commit()
+        if self._ready():
+            # 동시에 시작된 다른 호출이 먼저 열었으면 그 풀을 사용
+            await pool.close()
+            return
+        self._pool = pool
         self._initialized = True
 
+    async def _create_history_tables(self, db):
+        """이력 헤더 / 결과 행 / DRG군 요약 테이블 생성 + 이전 스키마 이력 변환"""
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS grouping_history (
+                history_id TEXT PRIMARY KEY,
+                created_at TEXT,
+                type TEXT,
+                payload_json TEXT
+            )
+            """
+        )
+        cursor = await db.execute("PRAGMA table_info(grouping_history)")
+        existing = {row["name"] for row in await cursor.fetchall()}
+        for name, definition in _HISTORY_HEADER_COLUMNS:
+            if name not in existing:
+                await db.execute(f"ALTER TABLE grouping_history ADD COLUMN {name} {definition}")
+        # 청구별 결과 (기본키 인덱스로 history_id 조회/페이지, seq는 저장 순서)
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS grouping_results (
+                history_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                claim_id TEXT,
+                patient_id TEXT,
+                kdrg TEXT,
+                mdc TEXT,
+                drg_type TEXT,
+                severity INTEGER,
+                estimated_amount REAL,
+                result_json TEXT NOT NULL,
+                PRIMARY KEY (history_id, seq)
+            )
+            """
+        )
+        # 개별 결과 없이 DRG군 요약만 있는 이력 (스트리밍 업로드, 비동기 작업)
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS grouping_history_drg (
+                history_id TEXT NOT NULL,
+                drg_type TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                total_amount REAL NOT NULL,
+                PRIMARY KEY (history_id, drg_type)
+            )
+            """
+        )
+        # 결과 JSON 압축 공유 사전 (저장된 값의 헤더에 dict_id 기록, 사전은 지우지 않음)
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS grouping_payload_dicts (
+                dict_id INTEGER PRIMARY KEY,
+                created_at TEXT,
+                sample_count INTEGER NOT NULL,
+                data BLOB NOT NULL
+            )
+            """
+        )
+        # 보관 파일 기록 (before_day 이전 이력은 Parquet로 옮겨져 통계 재계산 시 일자별 집계를 유지)
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS grouping_archives (
+                archive_id INTEGER PRIMARY KEY,
+                created_at TEXT,
+                before_day TEXT NOT NULL,
+                history_path TEXT NOT NULL,
+                results_path TEXT,
+                history_count INTEGER NOT NULL,
+                result_count INTEGER NOT NULL
+            )
+            """
+        )
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_grouping_history_created_at ON grouping_history (created_at)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_grouping_results_kdrg ON grouping_results (kdrg)")
+        # 통계 집계가 테이블 대신 인덱스만 읽도록 금액 포함
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_grouping_results_drg_type ON grouping_results (drg_type, estimated_amount)"
+        )
+        # 통계 누적 집계 / 일자별 집계 (이력 저장/삭제 시 증감)
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS grouping_stats (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                amount REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+            """
+        )
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS grouping_stats_daily (
+                day TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                amount REAL NOT NULL,
+                PRIMARY KEY (day, kind, key)
+            )
+            """
+        )
+
+        cursor = await db.execute("PRAGMA user_version")
+        version = (await cursor.fetchone())[0]
+        if version < 1:
+            await self._migrate_history(db)
+        if version < 2:
+            await self._rebuild_statistics(db)
+        if version < HISTORY_SCHEMA_VERSION:
+            await db.execute(f"PRAGMA user_version = {HISTORY_SCHEMA_VERSION}")
+
+    async def _migrate_history(self, db):
+        """payload_json에 결과를 통째로 저장하던 이력을 헤더 + 결과 행으로 나눠 다시 저장"""
+        last = ''
+        while True:
+            cursor = await db.execute(
+                "SELECT history_id, type, payload_json FROM grouping_history "
+                "WHERE history_id > ? ORDER BY history_id LIMIT 100",
+                (last,),
+            )
+            rows = await cursor.fetchall()
+            if not rows:
+                return
+            await self._write_histories(
+                db, [(row["history_id"], row["type"], json.loads(row["payload_json"])) for row in rows]
+            )
+            last = rows[-1]["history_id"]
+
+    async def _load_dictionaries(self, db):
+        """아직 등록하지 않은 압축 사전 등록 (다른 프로세스가 만든 사전 포함)"""
+        cursor = await db.execute(
+            "SELECT dict_id, data FROM grouping_payload_dicts WHERE dict_id > ? ORDER BY dict_id",
+            (self._codec.dictionary_id,),
+        )
+        for dict_id, data in await cursor.fetchall():
+            self._codec.add_dictionary(dict_id, data)
+
+    async def _decode(self, db, values: List[Union[bytes, str]]) -> List[Union[bytes, str]]:
+        """저장 값 → JSON (모르는 사전으로 압축된 값이 있으면 사전을 다시 읽은 뒤 해제)"""
+        try:
+            return [self._codec.decompress(value) for value in values]
+        except KeyError:
+            await self._load_dictionaries(db)
+            return [self._codec.decompress(value) for value in values]
+
+    async def _add_dictionary(self, samples: List[bytes]) -> Dict[str, Any]:
+        """결과 JSON 표본으로 압축 사전을 만들어 저장 (commit 후 이후 저장분부터 사용)"""
+        data = train_dictionary(samples)
+        async with self._pool.write() as db:
+            cursor = await db.execute(
+                "INSERT INTO grouping_payload_dicts (created_at, sample_count, data) VALUES (?, ?, ?)",
+                (datetime.now().isoformat(), len(samples), data),
+            )
+            dict_id = cursor.lastrowid
+        self._codec.add_dictionary(dict_id, data)
+        return {"dictionary_id": dict_id, "sample_count": len(samples), "size": len(data)}
+
+    async def _ensure_dictionary(self, items: List[HistoryItem]):
+        """압축 사전이 아직 없으면 저장할 결과가 HISTORY_DICT_MIN_ROWS건 이상일 때 그 결과로 생성"""
+        if not self._codec.level or self._codec.dictionary_id:
+            return
+        batches = [
+            _result_batch(payload[key]) for _, _, payload in items for key in ('results', 'result') if key in payload
+        ]
+        if sum(map(len, batches)) < settings.HISTORY_DICT_MIN_ROWS:
+            return
+        async with self._pool.read() as db:
+            await self._load_dictionaries(db)
+        if self._codec.dictionary_id:  # 다른 프로세스가 먼저 만든 사전 사용
+            return
+        samples = list(islice(chain.from_iterable(batch.iter_json() for batch in batches), DICTIONARY_SAMPLE_ROWS))
+        await self._add_dictionary(samples)
+
+    async def _history_statistics(self, db, history_id: str) -> Optional[List[StatDelta]]:
+        """저장된 이력 1건이 통계에 더한 값, 없는 이력이면 None"""
+        cursor = await db.execute("SELECT created_at, type FROM grouping_history WHERE history_id = ?", (history_id,))
+        row = await cursor.fetchone()
+        if row is None:
+            return None
+        day = _stats_day(row["created_at"])
+        cursor = await db.execute(
+            "SELECT drg_type, COUNT(*), SUM(estimated_amount) FROM grouping_results WHERE history_id = ? GROUP BY drg_type "
+            "UNION ALL "
+            "SELECT drg_type, count, total_amount FROM grouping_history_drg WHERE history_id = ?",
+            (history_id, history_id),
+        )
+        deltas = [(day, STAT_TYPE, row["type"] or "single", 1, 0.0)]
+        deltas.extend(
+            (day, STAT_DRG_TYPE, drg_type, count, amount or 0.0) for drg_type, count, amount in await cursor.fetchall()
+        )
+        return deltas
+
+    async def _apply_statistics(self, db, deltas: List[StatDelta], sign: int = 1):
+        """누적/일자별 집계에 값을 더하거나(sign=1) 뺌(sign=-1)"""
+        daily: Dict[Tuple[str, str, str], List[float]] = {}
+        for day, kind, key, count, amount in deltas:
+            total = daily.setdefault((day, kind, key), [0, 0.0])
+            total[0] += sign * count
+            total[1] += sign * amount
+        totals: Dict[Tuple[str, str], List[float]] = {}
+        for (_, kind, key), (count, amount) in daily.items():
+            total = totals.setdefault((kind, key), [0, 0.0])
+            total[0] += count
+            total[1] += amount
+        await db.executemany(
+            "INSERT INTO grouping_stats (kind, key, count, amount) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (kind, key) DO UPDATE SET count = count + excluded.count, amount = amount + excluded.amount",
+            [(*key, *total) for key, total in totals.items()],
+        )
+        await db.executemany(
+            "INSERT INTO grouping_stats_daily (day, kind, key, count, amount) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (day, kind, key) DO UPDATE SET count = count + excluded.count, amount = amount + excluded.amount",
+            [(*key, *total) for key, total in daily.items()],
+        )
+        if sign < 0:
+            await db.execute("DELETE FROM grouping_stats WHERE count <= 0")
+            await db.executemany(
+                "DELETE FROM grouping_stats_daily WHERE day = ? AND count <= 0",
+                [(day,) for day in {day for day, _, _ in daily}],
+            )
+
+    async def _rebuild_statistics(self, db):
+        """통계 집계 테이블을 이력 헤더 / 결과 행 / DRG군 요약에서 다시 계산
+
+        보관으로 삭제된 날짜(마지막 보관 기준일 이전)의 일자별 집계는 그대로 두고 누적 집계에 포함합니다.
+        """
+        cursor = await db.execute("SELECT COALESCE(MAX(before_day), '') FROM grouping_archives")
+        archived_until = (await cursor.fetchone())[0]
+        await db.execute("DELETE FROM grouping_stats_daily WHERE day >= ?", (archived_until,))
+        await db.execute("DELETE FROM grouping_stats")
+        await db.execute(
+            "INSERT INTO grouping_stats_daily (day, kind, key, count, amount) "
+            f"SELECT substr(COALESCE(created_at, ''), 1, 10), '{STAT_TYPE}', COALESCE(type, 'single'), COUNT(*), 0 "
+            "FROM grouping_history WHERE substr(COALESCE(created_at, ''), 1, 10) >= ? GROUP BY 1, 3",
+            (archived_until,),
+        )
+        await db.execute(
+            "INSERT INTO grouping_stats_daily (day, kind, key, count, amount) "
+            f"SELECT substr(COALESCE(h.created_at, ''), 1, 10), '{STAT_DRG_TYPE}', d.drg_type, "
+            "SUM(d.count), COALESCE(SUM(d.amount), 0) FROM ("
+            "SELECT history_id, drg_type, COUNT(*) AS count, SUM(estimated_amount) AS amount "
+            "FROM grouping_results GROUP BY history_id, drg_type "
+            "UNION ALL "
+            "SELECT history_id, drg_type, count, total_amount FROM grouping_history_drg"
+            ") AS d JOIN grouping_history AS h USING (history_id) "
+            "WHERE substr(COALESCE(h.created_at, ''), 1, 10) >= ? GROUP BY 1, 3",
+            (archived_until,),
+        )
+        await db.execute(
+            "INSERT INTO grouping_stats (kind, key, count, amount) "
+            "SELECT kind, key, SUM(count), SUM(amount) FROM grouping_stats_daily GROUP BY kind, key"
+        )
+
+    async def _write_histories(self, db, items: List[HistoryItem]):
+        """이력 여러 건 저장 (헤더/결과 행/DRG군 요약은 executemany, 통계 집계는 합산해 한 번에 갱신)
+
+        items: (history_id, history_type, payload), 이미 있는 ID는 대체하고 같은 ID가 여러 번이면 마지막 것만 저장
+        """
+        latest = {item[0]: item for item in items}
+        ids = list(latest)
+        existing: List[str] = []
+        # SQLite 바인딩 변수 제한 고려해 나눠서 조회
+        for start in range(0, len(ids), 500):
+            part = ids[start:start + 500]
+            cursor = await db.execute(
+                f"SELECT history_id FROM grouping_history WHERE history_id IN ({','.join('?' * len(part))})", part
+            )
+            existing.extend(row[0] for row in await cursor.fetchall())
+        if existing:
+            previous: List[StatDelta] = []
+            for history_id in existing:
+                previous.extend(await self._history_statistics(db, history_id))
+            await self._apply_statistics(db, previous, -1)
+            await db.executemany("DELETE FROM grouping_results WHERE history_id = ?", [(i,) for i in existing])
+            await db.executemany("DELETE FROM grouping_history_drg WHERE history_id = ?", [(i,) for i in existing])
+
+        headers: List[Tuple[Any, ...]] = []
+        result_rows: List[Iterator[Tuple[Any, ...]]] = []
+        drg_rows: List[Tuple[str, str, int, float]] = []
+        deltas: List[StatDelta] = []
+        for history_id, history_type, payload in latest.values():
+            header = dict(payload)
+            results_key = next((key for key in ('results', 'result') if key in header), None)
+            batch = _result_batch(header.pop(results_key)) if results_key else None
+            day = _stats_day(header.get("created_at"))
+            headers.append((
+                history_id, header.get("created_at"), history_type,
+                header.get("input", {}).get("patient_id", ""), header.get("total", 1),
+                header.get("success_count", 1), header.get("error_count", 0),
+                results_key, len(batch) if batch is not None else 0, self._codec.compress(dumps(header)),
+            ))
+            deltas.append((day, STAT_TYPE, history_type or "single", 1, 0.0))
+            if batch is not None:
+                result_rows.append(_result_rows(history_id, batch, self._codec.compress))
+                deltas.extend(
+                    (day, STAT_DRG_TYPE, drg_type, 1, amount)
+                    for drg_type, amount in zip(batch.column('drg_type'), batch.column('estimated_amount'))
+                )
+            elif isinstance(header.get("drg_statistics"), dict):
+                for drg_type, stat in header["drg_statistics"].items():
+                    drg_rows.append((history_id, drg_type, stat.get("count", 0), stat.get("total_amount", 0)))
+                    deltas.append((day, STAT_DRG_TYPE, drg_type, stat.get("count", 0), stat.get("total_amount", 0)))
+
+        await db.executemany(
+            "INSERT OR REPLACE INTO grouping_history (history_id, created_at, type, patient_id, total, "
+            "success_count, error_count, results_key, result_count, payload_json) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            headers,
+        )
+        if result_rows:
+            await db.executemany(
+                "INSERT INTO grouping_results (history_id, seq, claim_id, patient_id, kdrg, mdc, drg_type, "
+                "severity, estimated_amount, result_json) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                chain.from_iterable(result_rows),
+            )
+        if drg_rows:
+            await db.executemany(
+                "INSERT INTO grouping_history_drg (history_id, drg_type, count, total_amount) VALUES (?, ?, ?, ?)",
+                drg_rows,
+            )
+        await self._apply_statistics(db, deltas)
+
     async def save_history(self, history_id: str, history_type: str, payload: Dict[str, Any]):
+        """이력 저장
+
+        payload의 result(단건) / results(배치, GrouperResultBatch 또는 결과 목록)는 청구별 결과 행으로,
+        나머지 항목은 헤더 JSON으로 저장합니다.
+        """
+        await self.save_histories([(history_id, history_type, payload)])
+
+    async def save_histories(self, items: List[HistoryItem]):
+        """이력 여러 건을 한 트랜잭션으로 저장 (items: (history_id, history_type, payload), 형식은 save_history와 같음)"""
+        if not items:
+            return
+        await self._init()
+        await self._ensure_dictionary(items)
+        async with self._pool.write() as db:
+            await self._write_histories(db, items)
+
+    async def get_claim_fingerprints(self, claim_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """청구 ID별 마지막 입력 지문 / 규칙 버전 / 결과 조회"""
+        await self._init()
+        found: Dict[str, Dict[str, Any]] = {}
+        unique_ids = list(dict.fromkeys(claim_ids))
+        async with self._pool.read() as db:
+            # SQLite 바인딩 변수 제한 고려해 나눠서 조회
+            for start in range(0, len(unique_ids), 500):
+                part = unique_ids[start:start + 500]
+                cursor = await db.execute(
+                    "SELECT claim_id, fingerprint, rule_version, result_json FROM claim_fingerprints "
+                    f"WHERE claim_id IN ({','.join('?' * len(part))})",
+                    part,
+                )
+                for row in await cursor.fetchall():
+                    found[row["claim_id"]] = {
+                        "fingerprint": row["fingerprint"],
+                        "rule_version": row["rule_version"],
+                        "result_json": row["result_json"],
+                    }
+        return found
+
+    async def save_claim_fingerprints(self, rows: List[Tuple[str, str, str, str, str, str]]):
+        """청구 ID별 입력 지문 저장
+
+        rows: (claim_id, fingerprint, rule_version, result_json, history_id, updated_at)
+        """
+        if not rows:
+            return
         await self._init()
-        payload_json = json.dumps(payload, ensure_ascii=False)
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._pool.write() as db:
+            await db.executemany(
+                "INSERT OR REPLACE INTO claim_fingerprints "
+                "(claim_id, fingerprint, rule_version, result_json, history_id, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    async def create_job(self, job: Dict[str, Any], chunk_inputs: List[str],
+                         errors_json: Optional[str] = None, error_count: int = 0):
+        """그루핑 작업 등록 (입력은 청크별 JSON으로 저장)
+
+        errors_json: 등록 전 입력 변환 단계에서 발생한 오류 목록 (청크 -1로 저장, 처리 완료 건으로 집계)
+        """
+        await self._init()
+        async with self._pool.write() as db:
             await db.execute(
-                "INSERT OR REPLACE INTO grouping_history (history_id, created_at, type, payload_json) VALUES (?, ?, ?, ?)",
-                (history_id, payload.get("created_at"), history_type, payload_json),
+                "INSERT INTO grouping_jobs (job_id, created_at, updated_at, status, source, filename, "
+                "detail_level, total, chunk_count, processed, error_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job["job_id"], job["created_at"], job["created_at"], job["status"], job.get("source"),
+                    job.get("filename"), job.get("detail_level"), job["total"], len(chunk_inputs),
+                    error_count, error_count,
+                ),
+            )
+            await db.executemany(
+                "INSERT INTO grouping_job_chunks (job_id, chunk_index, input_json) VALUES (?, ?, ?)",
+                [(job["job_id"], idx, text) for idx, text in enumerate(chunk_inputs)],
             )
-            await db.commit()
+            if errors_json is not None:
+                await db.execute(
+                    "INSERT INTO grouping_job_chunks (job_id, chunk_index, results_json, errors_json, result_offset) "
+                    "VALUES (?, -1, '[]', ?, 0)",
+                    (job["job_id"], errors_json),
+                )
 
-    async def list_history(self, limit: int = 50) -> Dict[str, Any]:
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
         await self._init()
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._pool.read() as db:
+            cursor = await db.execute("SELECT * FROM grouping_jobs WHERE job_id = ?", (job_id,))
+            row = await cursor.fetchone()
+        return dict(row) if row else None
+
+    async def get_job_chunk_input(self, job_id: str, chunk_index: int) -> Optional[str]:
+        await self._init()
+        async with self._pool.read() as db:
             cursor = await db.execute(
-                "SELECT history_id, created_at, type, payload_json FROM grouping_history ORDER BY created_at DESC LIMIT ?",
-                (limit,),
+                "SELECT input_json FROM grouping_job_chunks WHERE job_id = ? AND chunk_index = ?",
+                (job_id, chunk_index),
+            )
+            row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def commit_job_chunk(self, job_id: str, chunk_index: int, results_json: str, errors_json: str,
+                               stats_json: str, processed: int, success_count: int, error_count: int,
+                               updated_at: str) -> bool:
+        """청크 결과 저장 + 작업 진행 상태 갱신 (한 트랜잭션, 체크포인트)
+
+        이미 반영된 청크(next_chunk가 지난 경우)는 무시하고 False를 반환합니다.
+        """
+        await self._init()
+        async with self._pool.write() as db:
+            cursor = await db.execute(
+                "UPDATE grouping_jobs SET next_chunk = next_chunk + 1, processed = processed + ?, "
+                "success_count = success_count + ?, error_count = error_count + ?, updated_at = ? "
+                "WHERE job_id = ? AND next_chunk = ?",
+                (processed, success_count, error_count, updated_at, job_id, chunk_index),
+            )
+            if cursor.rowcount == 0:
+                await db.rollback()
+                return False
+            await db.execute(
+                "UPDATE grouping_job_chunks SET input_json = NULL, results_json = ?, errors_json = ?, "
+                "stats_json = ?, result_count = ?, result_offset = "
+                "(SELECT success_count FROM grouping_jobs WHERE job_id = ?) - ? "
+                "WHERE job_id = ? AND chunk_index = ?",
+                (results_json, errors_json, stats_json, success_count, job_id, success_count, job_id, chunk_index),
+            )
+        return True
+
+    async def update_job_status(self, job_id: str, status: str, updated_at: str,
+                                message: Optional[str] = None, from_status: Optional[List[str]] = None,
+                                unless_cancel_requested: bool = False) -> bool:
+        """작업 상태 변경 (from_status가 주어지면 해당 상태일 때만, unless_cancel_requested면 취소 요청이 없을 때만)"""
+        await self._init()
+        query = "UPDATE grouping_jobs SET status = ?, updated_at = ?, message = COALESCE(?, message) WHERE job_id = ?"
+        params: List[Any] = [status, updated_at, message, job_id]
+        if from_status:
+            query += f" AND status IN ({','.join('?' * len(from_status))})"
+            params.extend(from_status)
+        if unless_cancel_requested:
+            query += " AND cancel_requested = 0"
+        async with self._pool.write() as db:
+            cursor = await db.execute(query, params)
+            if status in ("completed", "cancelled", "failed"):
+                await db.execute(
+                    "UPDATE grouping_job_chunks SET input_json = NULL WHERE job_id = ? AND input_json IS NOT NULL",
+                    (job_id,),
+                )
+            return cursor.rowcount > 0
+
+    async def request_job_cancel(self, job_id: str) -> bool:
+        await self._init()
+        async with self._pool.write() as db:
+            cursor = await db.execute(
+                "UPDATE grouping_jobs SET cancel_requested = 1 WHERE job_id = ?", (job_id,)
+            )
+            return cursor.rowcount > 0
+
+    async def list_unfinished_jobs(self) -> List[str]:
+        """재시작 시 이어서 처리할 작업 (대기/실행 중, 등록 순)"""
+        await self._init()
+        async with self._pool.read() as db:
+            cursor = await db.execute(
+                "SELECT job_id FROM grouping_jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            )
+            return [row[0] for row in await cursor.fetchall()]
+
+    async def get_job_results(self, job_id: str, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """작업 결과 페이지 (성공 결과 기준 offset/limit)"""
+        await self._init()
+        async with self._pool.read() as db:
+            cursor = await db.execute(
+                "SELECT results_json, result_offset FROM grouping_job_chunks "
+                "WHERE job_id = ? AND results_json IS NOT NULL AND result_count > 0 "
+                "AND result_offset < ? AND result_offset + result_count > ? ORDER BY chunk_index",
+                (job_id, offset + limit, offset),
             )
             rows = await cursor.fetchall()
 
-        history_list = []
-        for row in rows:
-            payload = json.loads(row["payload_json"])
-            history_list.append(
-                {
-                    "history_id": row["history_id"],
-                    "created_at": row["created_at"],
-                    "type": row["type"],
-                    "patient_id": payload.get("input", {}).get("patient_id", ""),
-                    "total": payload.get("total", 1),
-                    "success_count": payload.get("success_count", 1),
-                }
+        page: List[Dict[str, Any]] = []
+        for results_json, result_offset in rows:
+            results = json.loads(results_json)
+            start = max(offset - result_offset, 0)
+            page.extend(results[start:start + limit - len(page)])
+        return page
+
+    async def get_job_chunk_summaries(self, job_id: str, error_limit: int) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """처리된 청크의 오류(앞에서부터 error_limit건)와 DRG군 통계 JSON 목록"""
+        await self._init()
+        errors: List[Dict[str, Any]] = []
+        stats: List[str] = []
+        async with self._pool.read() as db:
+            cursor = await db.execute(
+                "SELECT errors_json, stats_json FROM grouping_job_chunks "
+                "WHERE job_id = ? AND results_json IS NOT NULL ORDER BY chunk_index",
+                (job_id,),
             )
+            for errors_json, stats_json in await cursor.fetchall():
+                if errors_json and len(errors) < error_limit:
+                    errors.extend(json.loads(errors_json)[:error_limit - len(errors)])
+                if stats_json:
+                    stats.append(stats_json)
+        return errors, stats
+
+    async def list_history(self, limit: int = 50) -> Dict[str, Any]:
+        await self._init()
+        async with self._pool.read() as db:
+            cursor = await db.execute(
+                "SELECT history_id, created_at, type, patient_id, total, success_count FROM grouping_history "
+                "ORDER BY created_at DESC LIMIT ?",
+                (limit,),
+            )
+            history_list = [dict(row) for row in await cursor.fetchall()]
 
         return {"success": True, "total": len(history_list), "history": history_list}
 
-    async def get_history(self, history_id: str) -> Optional[Dict[str, Any]]:
+    async def get_history(self, history_id: str, offset: int = 0,
+                          limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """이력 상세 (배치 결과는 저장 순서 기준 offset부터 limit건, limit이 None이면 전체)"""
         await self._init()
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._pool.read() as db:
             cursor = await db.execute(
-                "SELECT history_id, created_at, type, payload_json FROM grouping_history WHERE history_id = ?",
+                "SELECT history_id, created_at, type, results_key, result_count, payload_json "
+                "FROM grouping_history WHERE history_id = ?",
                 (history_id,),
             )
             row = await cursor.fetchone()
+            results: List[Dict[str, Any]] = []
+            if row and row["result_count"] > offset and limit != 0:
+                cursor = await db.execute(
+                    "SELECT result_json FROM grouping_results WHERE history_id = ? ORDER BY seq LIMIT ? OFFSET ?",
+                    (history_id, -1 if limit is None else limit, offset),
+                )
+                results = [orjson.loads(text) for text in await self._decode(db, [v for v, in await cursor.fetchall()])]
+            if row:
+                payload_json, = await self._decode(db, [row["payload_json"]])
 
         if not row:
             return None
 
-        payload = json.loads(row["payload_json"])
-        return {
+        history = {
             "history_id": row["history_id"],
             "created_at": row["created_at"],
             "type": row["type"],
-            **payload,
+            **orjson.loads(payload_json),
         }
+        if row["results_key"] == "result":
+            history["result"] = results[0] if results else None
+        elif row["results_key"] == "results":
+            history["result_count"] = row["result_count"]
+            history["results"] = results
+        return history
 
     async def delete_history(self, history_id: str) -> bool:
         await self._init()
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._pool.write() as db:
+            previous = await self._history_statistics(db, history_id)
+            if previous is None:
+                return False
+            await self._apply_statistics(db, previous, -1)
+            await db.execute("DELETE FROM grouping_results WHERE history_id = ?", (history_id,))
+            await db.execute("DELETE FROM grouping_history_drg WHERE history_id = ?", (history_id,))
             cursor = await db.execute("DELETE FROM grouping_history WHERE history_id = ?", (history_id,))
-            await db.commit()
             return cursor.rowcount > 0
 
+    async def archive_history(self, before: str, archive_dir: str, batch_size: int = 100) -> Dict[str, Any]:
+        """created_at이 before(YYYY-MM-DD)보다 이전인 이력을 Parquet 파일로 옮긴 뒤 삭제하고 빈 페이지 반납
+
+        이력 batch_size건마다 헤더 / 결과 파일 1쌍을 쓰고 같은 쓰기 트랜잭션에서 삭제합니다
+        (파일을 다 쓴 뒤 commit하므로 중간에 중단되면 이력이 중복 보관될 수는 있어도 유실되지는 않음).
+        통계 집계는 빼지 않습니다 (보관된 이력도 통계에 포함).
+        """
+        await self._init()
+        os.makedirs(archive_dir, exist_ok=True)
+        batch_size = min(max(batch_size, 1), 500)  # IN 바인딩 변수 제한
+        run = datetime.now().strftime('%Y%m%dT%H%M%S')
+        report: Dict[str, Any] = {"before": before, "histories": 0, "results": 0, "files": []}
+        while True:
+            async with self._pool.write() as db:
+                cursor = await db.execute(
+                    "SELECT history_id, created_at, type, patient_id, total, success_count, error_count, "
+                    "results_key, result_count, payload_json FROM grouping_history "
+                    "WHERE created_at < ? ORDER BY created_at LIMIT ?",
+                    (before, batch_size),
+                )
+                headers = [dict(row) for row in await cursor.fetchall()]
+                if not headers:
+                    break
+                ids = [header["history_id"] for header in headers]
+                placeholders = ','.join('?' * len(ids))
+                cursor = await db.execute(
+                    f"SELECT history_id, seq, {', '.join(_RESULT_ROW_COLUMNS)}, result_json FROM grouping_results "
+                    f"WHERE history_id IN ({placeholders}) ORDER BY history_id, seq",
+                    ids,
+                )
+                results = [dict(row) for row in await cursor.fetchall()]
+                for rows, key in ((headers, "payload_json"), (results, "result_json")):
+                    for row, value in zip(rows, await self._decode(db, [row[key] for row in rows])):
+                        row[key] = value.decode('utf-8') if isinstance(value, bytes) else value
+
+                part = len(report["files"]) + 1
+                history_path = os.path.join(archive_dir, f"history_{run}_{part:05d}.parquet")
+                results_path = os.path.join(archive_dir, f"results_{run}_{part:05d}.parquet") if results else None
+                await asyncio.to_thread(_write_parquet, history_path, headers, _ARCHIVE_HISTORY_SCHEMA)
+                if results_path:
+                    await asyncio.to_thread(_write_parquet, results_path, results, _ARCHIVE_RESULT_SCHEMA)
+
+                for table in ("grouping_results", "grouping_history_drg", "grouping_history"):
+                    await db.execute(f"DELETE FROM {table} WHERE history_id IN ({placeholders})", ids)
+                await db.execute(
+                    "INSERT INTO grouping_archives (created_at, before_day, history_path, results_path, "
+                    "history_count, result_count) VALUES (?, ?, ?, ?, ?, ?)",
+                    (datetime.now().isoformat(), before, history_path, results_path, len(headers), len(results)),
+                )
+            report["histories"] += len(headers)
+            report["results"] += len(results)
+            report["files"].extend(path for path in (history_path, results_path) if path)
+        report.update(await self.vacuum())
+        return report
+
+    async def vacuum(self) -> Dict[str, Any]:
+        """삭제로 생긴 빈 페이지를 파일에서 반납 (HISTORY_VACUUM_PAGES 페이지씩 나눠 쓰기 잠금을 짧게 유지)
+
+        auto_vacuum=INCREMENTAL이 아닌 이전 DB는 처음 한 번 전체 VACUUM으로 변환합니다.
+        """
+        await self._init()
+        converted = False
+        freed = 0
+        while True:
+            async with self._pool.write() as db:
+                cursor = await db.execute("PRAGMA auto_vacuum")
+                if (await cursor.fetchone())[0] != 2:
+                    # executescript: sqlite3 모듈은 PRAGMA incremental_vacuum / VACUUM을 한 단계만 실행하므로 끝까지 실행
+                    await db.executescript("PRAGMA auto_vacuum = INCREMENTAL; VACUUM;")
+                    converted = True
+                    continue
+                cursor = await db.execute("PRAGMA freelist_count")
+                before = (await cursor.fetchone())[0]
+                if before:
+                    await db.executescript(f"PRAGMA incremental_vacuum({max(settings.HISTORY_VACUUM_PAGES, 1)});")
+                    cursor = await db.execute("PRAGMA freelist_count")
+                    after = (await cursor.fetchone())[0]
+                    freed += before - after
+            if not before or after >= before:
+                break
+        if freed or converted:
+            # 반납/변환 내용을 DB 파일에 반영하고 커진 WAL 파일을 비움 (읽는 중인 연결이 있으면 가능한 만큼만)
+            async with self._pool.write() as db:
+                cursor = await db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                await cursor.fetchall()
+        async with self._pool.read() as db:
+            cursor = await db.execute("PRAGMA page_count")
+            page_count = (await cursor.fetchone())[0]
+            cursor = await db.execute("PRAGMA page_size")
+            page_size = (await cursor.fetchone())[0]
+        return {"vacuum_converted": converted, "freed_pages": freed, "db_size_bytes": page_count * page_size}
+
+    async def list_archives(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """보관 파일 기록 (최근 순)"""
+        await self._init()
+        async with self._pool.read() as db:
+            cursor = await db.execute(
+                "SELECT archive_id, created_at, before_day, history_path, results_path, history_count, result_count "
+                "FROM grouping_archives ORDER BY archive_id DESC LIMIT ?",
+                (limit,),
+            )
+            return [dict(row) for row in await cursor.fetchall()]
+
     async def get_statistics(self) -> Dict[str, Any]:
+        """이력 유형별 건수 + DRG군별 결과 건수/예상 금액 (누적 집계 테이블 조회)"""
         await self._init()
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute("SELECT payload_json, type FROM grouping_history")
+        async with self._pool.read() as db:
+            cursor = await db.execute("SELECT kind, key, count, amount FROM grouping_stats")
             rows = await cursor.fetchall()
+        return {"success": True, **_statistics(rows)}
 
-        type_stats: Dict[str, int] = {"single": 0, "batch": 0, "upload": 0}
-        drg_type_counts: Dict[str, int] = {}
-        total_estimated = 0
-        total_groupings = len(rows)
-
-        for row in rows:
-            payload = json.loads(row["payload_json"])
-            hist_type = row["type"] or payload.get("type", "single")
-            type_stats[hist_type] = type_stats.get(hist_type, 0) + 1
-
-            results = payload.get("results")
-            if isinstance(results, list):
-                for r in results:
-                    drg_type = r.get("drg_type", "행위별")
-                    drg_type_counts[drg_type] = drg_type_counts.get(drg_type, 0) + 1
-                    total_estimated += r.get("estimated_amount", 0)
-            elif "result" in payload:
-                r = payload.get("result", {})
-                drg_type = r.get("drg_type", "행위별")
-                drg_type_counts[drg_type] = drg_type_counts.get(drg_type, 0) + 1
-                total_estimated += r.get("estimated_amount", 0)
+    async def get_daily_statistics(self, start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Any]:
+        """일자별 통계 (start/end: YYYY-MM-DD, 양 끝 포함)"""
+        await self._init()
+        async with self._pool.read() as db:
+            cursor = await db.execute(
+                "SELECT day, kind, key, count, amount FROM grouping_stats_daily "
+                "WHERE day >= ? AND day <= ? ORDER BY day",
+                (start or '', end or '9999-12-31'),
+            )
+            rows = await cursor.fetchall()
 
+        by_day: Dict[str, List[Tuple[str, str, int, float]]] = {}
+        for day, kind, key, count, amount in rows:
+            by_day.setdefault(day, []).append((kind, key, count, amount))
         return {
             "success": True,
-            "total_groupings": total_groupings,
-            "by_type": type_stats,
-            "by_drg_type": drg_type_counts,
-            "total_estimated_amount": total_estimated,
+            "days": [{"date": day, **_statistics(day_rows)} for day, day_rows in by_day.items()],
         }
 
+    async def rebuild_statistics(self) -> Dict[str, Any]:
+        """통계 집계를 저장된 이력 전체에서 다시 계산 (관리 명령, 재계산 후 통계 반환)"""
+        await self._init()
+        async with self._pool.write() as db:
+            await self._rebuild_statistics(db)
+        return await self.get_statistics()
+
+    async def train_dictionary(self, sample_rows: int = DICTIONARY_SAMPLE_ROWS) -> Dict[str, Any]:
+        """최근 저장된 결과 sample_rows건으로 압축 사전을 새로 생성 (관리 명령)
+
+        이후 저장분부터 새 사전을 쓰고, 이미 저장된 값은 저장할 때의 사전으로 읽습니다.
+        """
+        await self._init()
+        async with self._pool.read() as db:
+            cursor = await db.execute(
+                "SELECT result_json FROM grouping_results ORDER BY rowid DESC LIMIT ?", (sample_rows,)
+            )
+            samples = await self._decode(db, [v for v, in await cursor.fetchall()])
+        if not samples:
+            raise ValueError("압축 사전을 만들 결과가 없습니다.")
+        return await self._add_dictionary([s.encode('utf-8') if isinstance(s, str) else s for s in samples])
+
 
 grouping_store = GroupingStore(settings.DATABASE_URL)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="그루핑 이력 저장소 관리")
+    parser.add_argument('command', choices=['rebuild-statistics', 'train-dictionary'],
+                        help="rebuild-statistics: 통계 집계 다시 계산, train-dictionary: 결과 압축 사전 새로 생성")
+    parser.add_argument('--db', default=settings.DATABASE_URL, help="DB 경로 또는 URL (기본값 DATABASE_URL)")
+    args = parser.parse_args()
+
+    async def _run():
+        store = GroupingStore(args.db)
+        try:
+            if args.command == 'train-dictionary':
+                return await store.train_dictionary()
+            return await store.rebuild_statistics()
+        finally:
+            await store.close()
+
+    print(json.dumps(asyncio.run(_run()), ensure_ascii=False, indent=2))
@@ -0,0 +1,119 @@
+"""
+그루핑 이력 보관 정책
+- HISTORY_RETENTION_DAYS일이 지난 이력을 EXPORT_DIR/history_archive에 Parquet(zstd) 파일로 옮긴 뒤 DB에서 삭제
+- 삭제 후 빈 페이지를 파일에서 반납 (incremental vacuum)해 이력 DB 크기를 보관 기간만큼으로 유지
+- 백그라운드 작업이 HISTORY_RETENTION_INTERVAL_HOURS마다 실행 (앱 시작 시 한 번 실행)
+- 통계 집계는 보관된 이력도 포함해 유지
+
+수동 실행 (관리 명령):
+    python -m services.history_retention [--days 보관 일수] [--db DB 경로]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, Optional
+
+from config import settings
+from .grouping_store import GroupingStore, grouping_store
+
+logger = logging.getLogger(__name__)
+
+
+def archive_dir() -> str:
+    """보관 Parquet 파일 디렉토리"""
+    return os.path.join(settings.EXPORT_DIR, 'history_archive')
+
+
+def cutoff_day(days: int, today: Optional[date] = None) -> str:
+    """보관 기준일 (YYYY-MM-DD, 이 날짜 이전에 생성된 이력을 보관)"""
+    return ((today or date.today()) - timedelta(days=days)).isoformat()
+
+
+class HistoryRetention:
+    """이력 보관 주기 실행 (이벤트 루프당 작업 1개)"""
+
+    def __init__(self, store: GroupingStore = grouping_store):
+        self.store = store
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last: Optional[Dict[str, Any]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.HISTORY_RETENTION_DAYS > 0
+
+    async def start(self):
+        """보관 작업 시작 (보관 기간이 설정된 경우만)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop or not self.enabled:
+            return
+        self._loop = loop
+        self._task = loop.create_task(self._run())
+
+    async def stop(self):
+        """보관 작업 종료 (진행 중인 파일은 commit 전이면 다음 실행 때 다시 보관)"""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self._loop = None
+
+    async def run_once(self, days: Optional[int] = None) -> Dict[str, Any]:
+        """보관 1회 실행 (days가 없으면 HISTORY_RETENTION_DAYS)"""
+        days = days or settings.HISTORY_RETENTION_DAYS
+        if days <= 0:
+            raise ValueError("보관 기간(일)이 설정되지 않았습니다.")
+        report = await self.store.archive_history(cutoff_day(days), archive_dir(), settings.HISTORY_ARCHIVE_BATCH)
+        self._last = report
+        if report["histories"]:
+            logger.info(
+                f"그루핑 이력 보관: {report['before']} 이전 {report['histories']}건 "
+                f"(결과 {report['results']}건), 반납 {report['freed_pages']}페이지"
+            )
+        return report
+
+    def info(self) -> Dict[str, Any]:
+        """보관 설정과 마지막 실행 결과"""
+        return {
+            'enabled': self.enabled,
+            'retention_days': settings.HISTORY_RETENTION_DAYS,
+            'interval_hours': settings.HISTORY_RETENTION_INTERVAL_HOURS,
+            'archive_dir': archive_dir(),
+            'last_run': self._last,
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 실패해도 다음 주기에 다시 시도 (삭제는 파일 저장 후 commit되므로 이력 유실 없음)
+                logger.error(f"그루핑 이력 보관 오류: {e}")
+            await asyncio.sleep(max(settings.HISTORY_RETENTION_INTERVAL_HOURS, 0.01) * 3600)
+
+
+# 서비스 인스턴스
+history_retention = HistoryRetention()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="그루핑 이력 보관 (Parquet로 옮긴 뒤 삭제 + 빈 페이지 반납)")
+    parser.add_argument('--days', type=int, default=settings.HISTORY_RETENTION_DAYS,
+                        help="보관 기간 일수 (기본값 HISTORY_RETENTION_DAYS)")
+    parser.add_argument('--db', default=settings.DATABASE_URL, help="DB 경로 또는 URL (기본값 DATABASE_URL)")
+    args = parser.parse_args()
+
+    async def _run():
+        store = GroupingStore(args.db)
+        try:
+            return await HistoryRetention(store).run_once(args.days)
+        finally:
+            await store.close()
+
+    print(json.dumps(asyncio.run(_run()), ensure_ascii=False, indent=2))
@@ -0,0 +1,134 @@
+"""
+그루핑 이력 지연 저장 (write-behind)
+- 단건 그루핑 요청은 이력을 대기열에 넣고 바로 응답 (SQLite commit/fsync를 기다리지 않음)
+- 백그라운드 작업이 HISTORY_FLUSH_MS마다 또는 HISTORY_FLUSH_RECORDS건이 모이면 한 트랜잭션으로 저장
+- 대기열은 HISTORY_QUEUE_MAX건으로 제한 (가득 차면 저장될 때까지 요청이 대기), 0이면 요청마다 바로 저장
+- 이력 조회 전 flush()로 그때까지 넣은 이력 저장을 기다림, 앱 종료 시 남은 이력을 모두 저장
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from .grouping_store import GroupingStore, HistoryItem, grouping_store
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryWriter:
+    """이력 지연 저장 대기열 (이벤트 루프당 저장 작업 1개)"""
+
+    def __init__(self, store: GroupingStore = grouping_store):
+        self.store = store
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._urgent: Optional[asyncio.Event] = None
+        self._written: Optional[asyncio.Condition] = None
+        self._flush_waiters = 0
+        self._enqueued = 0
+        self._done = 0
+        self._stats: Dict[str, Any] = {
+            'written': 0, 'failed': 0, 'flushes': 0, 'last_flush_records': 0, 'last_flush_ms': 0.0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return settings.HISTORY_QUEUE_MAX > 0
+
+    async def start(self):
+        """저장 작업 시작 (이벤트 루프당 1회)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop or not self.enabled:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=settings.HISTORY_QUEUE_MAX)
+        self._urgent = asyncio.Event()
+        self._written = asyncio.Condition()
+        self._flush_waiters = 0
+        self._enqueued = 0
+        self._done = 0
+        self._task = loop.create_task(self._run())
+
+    async def stop(self):
+        """대기 중인 이력을 모두 저장한 뒤 종료 (앱 종료 시)"""
+        if self._task is None or self._loop is not asyncio.get_running_loop():
+            return
+        await self.flush()
+        task, self._task = self._task, None
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        self._loop = None
+        self._queue = None
+
+    async def save(self, history_id: str, history_type: str, payload: Dict[str, Any]):
+        """이력 저장 요청 (대기열에 넣고 반환, 비활성화면 바로 저장)"""
+        if not self.enabled:
+            await self.store.save_history(history_id, history_type, payload)
+            return
+        await self.start()
+        await self._queue.put((history_id, history_type, payload))
+        self._enqueued += 1
+        if self._queue.qsize() >= settings.HISTORY_FLUSH_RECORDS:
+            self._urgent.set()
+
+    async def flush(self):
+        """지금까지 넣은 이력이 저장될 때까지 대기 (이후에 들어온 이력은 기다리지 않음)"""
+        if self._task is None or self._loop is not asyncio.get_running_loop() or self._done >= self._enqueued:
+            return
+        target = self._enqueued
+        self._flush_waiters += 1
+        self._urgent.set()
+        try:
+            async with self._written:
+                await self._written.wait_for(lambda: self._done >= target)
+        finally:
+            self._flush_waiters -= 1
+
+    def info(self) -> Dict[str, Any]:
+        """대기열 지표 (대기 건수, 저장/실패 건수, 마지막 저장 건수/시간)"""
+        return {
+            'enabled': self.enabled,
+            'pending': self._queue.qsize() if self._queue is not None else 0,
+            'max_pending': settings.HISTORY_QUEUE_MAX,
+            'flush_records': settings.HISTORY_FLUSH_RECORDS,
+            'flush_ms': settings.HISTORY_FLUSH_MS,
+            **self._stats,
+        }
+
+    async def _run(self):
+        queue = self._queue
+        while True:
+            items: List[HistoryItem] = [await queue.get()]
+            # 첫 이력 이후 HISTORY_FLUSH_MS 동안 모음 (건수가 차거나 flush 요청이 있으면 바로 저장)
+            if queue.qsize() + 1 < settings.HISTORY_FLUSH_RECORDS and not self._flush_waiters:
+                try:
+                    await asyncio.wait_for(self._urgent.wait(), settings.HISTORY_FLUSH_MS / 1000)
+                except asyncio.TimeoutError:
+                    pass
+            self._urgent.clear()
+            while len(items) < settings.HISTORY_FLUSH_RECORDS and not queue.empty():
+                items.append(queue.get_nowait())
+            await self._write(items)
+
+    async def _write(self, items: List[HistoryItem]):
+        start = time.perf_counter()
+        try:
+            await self.store.save_histories(items)
+            self._stats['written'] += len(items)
+        except Exception as e:
+            # 이력 저장 실패는 그루핑 응답에 영향을 주지 않음 (건수만 기록)
+            logger.error(f"그루핑 이력 저장 오류 ({len(items)}건): {e}")
+            self._stats['failed'] += len(items)
+        self._stats['flushes'] += 1
+        self._stats['last_flush_records'] = len(items)
+        self._stats['last_flush_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        async with self._written:
+            self._done += len(items)
+            self._written.notify_all()
+
+
+# 서비스 인스턴스
+history_writer = HistoryWriter()
@@ -2,6 +2,7 @@
 KDRG 코드북 동기화 서비스
 - 심평원 API에서 KDRG 데이터 가져오기
 - SQLite DB에 저장 및 조회
+- 코드북 버전(V4.6, V4.7 ...)별로 보관 (kdrg_code + version 고유)
 """
 
 import sqlite3
@@ -56,11 +57,14 @@ class KDRGCodebookService:
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
+            # 이전 스키마(kdrg_code 단독 고유) 마이그레이션
+            self._migrate_versioned(cursor)
+            
             # KDRG 코드북 테이블
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS kdrg_codebook (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    kdrg_code TEXT NOT NULL UNIQUE,
+                    kdrg_code TEXT NOT NULL,
                     kdrg_name TEXT NOT NULL,
                     aadrg_code TEXT,
                     aadrg_name TEXT,
@@ -72,10 +76,11 @@ class KDRGCodebookService:
                     arithmetic_mean_los REAL DEFAULT 0,
                     low_trim INTEGER DEFAULT 0,
                     high_trim INTEGER DEFAULT 0,
-                    version TEXT DEFAULT 'V4.6',
+                    version TEXT NOT NULL DEFAULT 'V4.6',
                     synced_at TEXT,
                     created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(kdrg_code, version)
                 )
             ''')
             
@@ -96,9 +101,55 @@ class KDRGCodebookService:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_kdrg_code ON kdrg_codebook(kdrg_code)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_aadrg_code ON kdrg_codebook(aadrg_code)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_mdc_code ON kdrg_codebook(mdc_code)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_codebook_version ON kdrg_codebook(version)')
             
             conn.commit()
     
+    def _migrate_versioned(self, cursor: sqlite3.Cursor):
+        """kdrg_code 단독 UNIQUE 테이블을 (kdrg_code, version) UNIQUE로 재구성 (기존 행 유지)"""
+        row = cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'kdrg_codebook'"
+        ).fetchone()
+        if row is None or 'UNIQUE(kdrg_code, version)' in row['sql']:
+            return
+        
+        logger.info("kdrg_codebook 테이블을 버전별 저장 구조로 변환합니다.")
+        columns = (
+            'kdrg_code, kdrg_name, aadrg_code, aadrg_name, mdc_code, mdc_name, cc_level, '
+            'relative_weight, geometric_mean_los, arithmetic_mean_los, low_trim, high_trim, '
+            'synced_at, created_at, updated_at'
+        )
+        cursor.execute('ALTER TABLE kdrg_codebook RENAME TO kdrg_codebook_unversioned')
+        for index in ('idx_kdrg_code', 'idx_aadrg_code', 'idx_mdc_code'):
+            cursor.execute(f'DROP INDEX IF EXISTS {index}')
+        cursor.execute('''
+            CREATE TABLE kdrg_codebook (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kdrg_code TEXT NOT NULL,
+                kdrg_name TEXT NOT NULL,
+                aadrg_code TEXT,
+                aadrg_name TEXT,
+                mdc_code TEXT,
+                mdc_name TEXT,
+                cc_level TEXT,
+                relative_weight REAL DEFAULT 0,
+                geometric_mean_los REAL DEFAULT 0,
+                arithmetic_mean_los REAL DEFAULT 0,
+                low_trim INTEGER DEFAULT 0,
+                high_trim INTEGER DEFAULT 0,
+                version TEXT NOT NULL DEFAULT 'V4.6',
+                synced_at TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(kdrg_code, version)
+            )
+        ''')
+        cursor.execute(
+            f"INSERT INTO kdrg_codebook ({columns}, version) "
+            f"SELECT {columns}, COALESCE(version, 'V4.6') FROM kdrg_codebook_unversioned"
+        )
+        cursor.execute('DROP TABLE kdrg_codebook_unversioned')
+    
     def save_codebook_entries(self, entries: List[Dict]) -> int:
         """코드북 엔트리 저장 (UPSERT)"""
         if not entries:
@@ -119,7 +170,7 @@ class KDRGCodebookService:
                             geometric_mean_los, arithmetic_mean_los,
                             low_trim, high_trim, version, synced_at, updated_at
                         ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ON CONFLICT(kdrg_code) DO UPDATE SET
+                        ON CONFLICT(kdrg_code, version) DO UPDATE SET
                             kdrg_name = excluded.kdrg_name,
                             aadrg_code = excluded.aadrg_code,
                             aadrg_name = excluded.aadrg_name,
@@ -131,7 +182,6 @@ class KDRGCodebookService:
                             arithmetic_mean_los = excluded.arithmetic_mean_los,
                             low_trim = excluded.low_trim,
                             high_trim = excluded.high_trim,
-                            version = excluded.version,
                             synced_at = excluded.synced_at,
                             updated_at = excluded.updated_at
                     ''', (
@@ -182,25 +232,49 @@ class KDRGCodebookService:
             ''')
             last_sync = cursor.fetchone()
             
-            # 코드북 통계
-            cursor.execute('SELECT COUNT(*) as total FROM kdrg_codebook')
+            # 코드북 통계 (버전마다 행이 있으므로 코드 기준, 버전별 건수는 versions)
+            cursor.execute('SELECT COUNT(DISTINCT kdrg_code) as total FROM kdrg_codebook')
             total = cursor.fetchone()['total']
             
             return {
                 'has_codebook': total > 0,
                 'total_codes': total,
+                'versions': self.list_versions(),
                 'last_sync': dict(last_sync) if last_sync else None
             }
     
+    def list_versions(self) -> List[Dict]:
+        """저장된 코드북 버전 목록 (최근 동기화 순)"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT version, COUNT(*) AS total_codes, MAX(synced_at) AS synced_at
+                FROM kdrg_codebook
+                GROUP BY version
+                ORDER BY MAX(updated_at) DESC
+            ''')
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_relative_weights(self, version: str) -> Dict[str, float]:
+        """코드북 버전의 KDRG별 상대가치점수 (0인 코드 제외)"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT kdrg_code, relative_weight FROM kdrg_codebook WHERE version = ? AND relative_weight > 0',
+                (version,),
+            )
+            return {row['kdrg_code']: row['relative_weight'] for row in cursor.fetchall()}
+    
     def get_codebook(
         self,
         page: int = 1,
         per_page: int = 50,
         search: str = None,
         aadrg: str = None,
-        mdc: str = None
+        mdc: str = None,
+        version: str = None
     ) -> Dict:
-        """코드북 조회"""
+        """코드북 조회 (version 미지정 시 모든 버전)"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
@@ -220,13 +294,17 @@ class KDRGCodebookService:
                 query += ' AND mdc_code = ?'
                 params.append(mdc)
             
+            if version:
+                query += ' AND version = ?'
+                params.append(version)
+            
             # 카운트
             count_query = query.replace('SELECT *', 'SELECT COUNT(*) as total')
             cursor.execute(count_query, params)
             total = cursor.fetchone()['total']
             
             # 페이징
-            query += ' ORDER BY kdrg_code LIMIT ? OFFSET ?'
+            query += ' ORDER BY kdrg_code, version LIMIT ? OFFSET ?'
             params.extend([per_page, (page - 1) * per_page])
             
             cursor.execute(query, params)
@@ -239,11 +317,20 @@ class KDRGCodebookService:
                 'codes': codes
             }
     
-    def get_kdrg_info(self, kdrg_code: str) -> Optional[Dict]:
-        """특정 KDRG 코드 정보 조회"""
+    def get_kdrg_info(self, kdrg_code: str, version: str = None) -> Optional[Dict]:
+        """특정 KDRG 코드 정보 조회 (version 미지정 시 가장 최근 동기화된 버전)"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM kdrg_codebook WHERE kdrg_code = ?', (kdrg_code.upper(),))
+            if version:
+                cursor.execute(
+                    'SELECT * FROM kdrg_codebook WHERE kdrg_code = ? AND version = ?',
+                    (kdrg_code.upper(), version),
+                )
+            else:
+                cursor.execute(
+                    'SELECT * FROM kdrg_codebook WHERE kdrg_code = ? ORDER BY updated_at DESC, id DESC LIMIT 1',
+                    (kdrg_code.upper(),),
+                )
             row = cursor.fetchone()
             return dict(row) if row else None
     
@@ -299,9 +386,9 @@ class KDRGCodebookService:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT * FROM kdrg_codebook
-                WHERE aadrg_code LIKE ? AND kdrg_code != ?
+                WHERE aadrg_code LIKE ? AND kdrg_code != ? AND version = ?
                 ORDER BY relative_weight DESC
-            ''', (f'{aadrg_code}%', kdrg_code))
+            ''', (f'{aadrg_code}%', kdrg_code, info.get('version')))
             return [dict(row) for row in cursor.fetchall()]
 
 
@@ -10,6 +10,9 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from .pregrouper_service import pre_grouper
+from .rule_store import get_rule_store, los_bounds
+
 
 class MDCCode(Enum):
     """주진단범주 (Major Diagnostic Category)"""
@@ -73,6 +76,9 @@ class KDRGInfo:
 # 2024년 기준 1점당 수가 (원)
 BASE_RATE_2024 = 87000
 
+# V4.7 특수 중증도 (5-9)는 0-4 중증도 체계에 대응하지 않음
+MAX_SEVERITY = 4
+
 
 # 전체 KDRG 기준정보 (주요 KDRG만 포함, 실제 운영 시 전체 데이터 필요)
 KDRG_REFERENCE_DATA: Dict[str, KDRGInfo] = {
@@ -191,8 +197,62 @@ KDRG_REFERENCE_DATA: Dict[str, KDRGInfo] = {
 
 
 def get_kdrg_info(kdrg_code: str) -> Optional[KDRGInfo]:
-    """KDRG 코드로 정보 조회"""
-    return KDRG_REFERENCE_DATA.get(kdrg_code.upper())
+    """KDRG 코드로 정보 조회 (기준정보에 없으면 V4.7 코드표 조회)"""
+    code = kdrg_code.upper()
+    info = KDRG_REFERENCE_DATA.get(code)
+    if info is None:
+        info = _kdrg_info_from_code_table(code)
+    return info
+
+
+def _kdrg_info_from_code_table(kdrg_code: str) -> Optional[KDRGInfo]:
+    """V4.7 코드표 레코드로 KDRGInfo 구성 (상대가치점수가 있는 코드만)
+    
+    재원일수 기준은 산술평균 재원일수가 있으면 1일 ~ 평균의 2배로 잡습니다.
+    특수 중증도(5-9) 코드는 0-4 중증도로 나타낼 수 없어 제외합니다.
+    """
+    store = get_rule_store()
+    record = store.get(kdrg_code) if store is not None else None
+    if record is None or record.relative_weight <= 0 or record.cc_level > MAX_SEVERITY:
+        return None
+    
+    base_amount = round(record.relative_weight * BASE_RATE_2024, 0)
+    if record.mean_los > 0:
+        los_lower, los_upper = los_bounds(record.mean_los)
+        per_diem = round(base_amount / record.mean_los, 0)
+    else:
+        los_lower, los_upper = 3, 10
+        per_diem = 0.0
+    
+    return KDRGInfo(
+        kdrg_code=record.kdrg_code,
+        aadrg_code=record.aadrg_code,
+        mdc=record.kdrg_code[0],
+        severity=record.cc_level,
+        name=record.name,
+        relative_weight=record.relative_weight,
+        base_amount=base_amount,
+        los_lower=los_lower,
+        los_upper=los_upper,
+        los_outlier_per_diem=per_diem,
+        is_surgical=record.partition == 'S',
+        drg7_code=_drg7_code_for(record.aadrg_code),
+    )
+
+
+def _drg7_code_for(aadrg_code: str) -> Optional[str]:
+    """V4.7 AADRG에 대응하는 7개 DRG군 (활성 규칙 세트의 kdrg_code_map 역방향, 매핑이 없으면 None)
+    
+    그루퍼 코드와 V4.7 코드는 체계가 달라 코드 앞 3자리로는 판정하지 않습니다
+    (예: V4.7 D121은 악관절 수술이지 그루퍼의 편도 D12가 아님).
+    """
+    rules = pre_grouper.rules
+    for grouper_aadrg, target in rules.code_map.items():
+        if target == aadrg_code:
+            drg7_code = rules.drg7.classify_kdrg(grouper_aadrg)
+            if drg7_code is not None:
+                return drg7_code
+    return None
 
 
 def get_kdrg_by_aadrg(aadrg_code: str) -> List[KDRGInfo]:
@@ -23,6 +23,7 @@ from .kdrg_reference_data import (
     KDRG_REFERENCE_DATA,
     BASE_RATE_2024,
 )
+from .rule_store import get_rule_store
 from .pregrouper_service import pre_grouper, PatientInfo, DiagnosisInfo, ProcedureInfo, GrouperInput
 
 logger = logging.getLogger(__name__)
@@ -353,29 +354,12 @@ class GlobalKDRGOptimizationService:
         if current_info.drg7_code:
             return suggestions
         
-        # 7개 DRG군 매핑 확인
-        drg7_mapping = {
-            'D12': {'diagnoses': ['J35', 'J36', 'J03'], 'procedures': ['Q216', 'Q217']},
-            'D13': {'diagnoses': ['J32', 'J33', 'J34'], 'procedures': ['Q213', 'Q214']},
-            'G08': {'diagnoses': ['K40', 'K41'], 'procedures': ['Q289', 'Q290']},
-            'H06': {'diagnoses': ['K80', 'K81', 'K82'], 'procedures': ['Q765', 'Q766']},
-            'I09': {'diagnoses': ['K60', 'K61', 'K62', 'K64'], 'procedures': ['Q297', 'Q298']},
-            'L08': {'diagnoses': ['N20', 'N21', 'N22', 'N23'], 'procedures': ['R391']},
-            'O01': {'diagnoses': ['O82', 'O84'], 'procedures': ['R450', 'R451']},
-            'O60': {'diagnoses': ['O80', 'O81', 'O83'], 'procedures': []},
-        }
-        
-        dx_upper = main_diagnosis.upper()[:3]
-        proc_prefixes = [p.upper()[:4] for p in procedures]
+        # 7개 DRG군 역색인 (주진단 앞 3자리 / 수술 코드 앞 4자리)
+        drg7_index = pre_grouper.rules.drg7
+        proc_groups = drg7_index.procedure_prefix_groups(procedures)
         
-        for drg7, info in drg7_mapping.items():
-            dx_match = any(dx_upper.startswith(d[:3]) for d in info['diagnoses'])
-            proc_match = not info['procedures'] or any(
-                any(p.startswith(pr[:4]) for pr in proc_prefixes)
-                for p in info['procedures']
-            )
-            
-            if dx_match and not proc_match and info['procedures']:
+        for drg7 in drg7_index.candidates(main_diagnosis.upper()[:3]):
+            if drg7 not in drg7_index.dx_only and drg7 not in proc_groups:
                 # 수술 추가하면 7개 DRG군 가능
                 drg7_kdrg = drg7 + "10"  # 기본 중증도
                 drg7_info = get_kdrg_info(drg7_kdrg)
@@ -545,11 +529,16 @@ class GlobalKDRGOptimizationService:
     
     def get_optimization_summary(self) -> Dict[str, Any]:
         """최적화 서비스 요약 정보"""
+        store = get_rule_store()
         return {
             'service_name': 'Global KDRG Optimization Service',
             'version': '1.0.0',
             'supported_mdc': [m.code for m in MDCCode],
             'total_kdrg_codes': len(KDRG_REFERENCE_DATA),
+            'code_table': {
+                'version': store.table_version,
+                'total_codes': len(store),
+            } if store is not None else None,
             'optimization_types': [t.value for t in OptimizationType],
             'risk_levels': [r.value for r in RiskLevel],
             'base_rate_2024': BASE_RATE_2024,
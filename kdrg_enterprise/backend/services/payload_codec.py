@@ -0,0 +1,79 @@
+"""
+그루핑 결과 JSON 압축 저장
+- 결과 행(수백 바이트)은 행마다 따로 압축해 조회할 때 필요한 행만 해제
+- 짧은 행은 일반 압축 효과가 작아 저장된 결과 표본으로 만든 공유 사전(zlib zdict, 최대 32KB) 사용
+  (키 이름, MDC명, DRG군, 분류 경로 문구가 사전에 있어 행마다 반복 저장하지 않음)
+- 압축 값: b'Z' + 사전 ID(uint16, 0이면 사전 없음) + raw deflate (BLOB)
+- 압축하지 않은 TEXT 값(이전 저장분, 압축 수준 0)은 그대로 읽음
+"""
+
+import struct
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Union
+
+import orjson
+
+MAGIC = b'Z'
+MAX_DICTIONARY_BYTES = 32 * 1024
+
+_HEADER = struct.Struct('>cH')
+_WBITS = -15  # raw deflate (zlib 헤더/체크섬 6바이트 생략)
+
+
+def train_dictionary(samples: List[bytes], size: int = MAX_DICTIONARY_BYTES) -> bytes:
+    """결과 JSON 표본으로 공유 사전 생성
+
+    KDRG별 대표 행을 1개씩 모으고, 자주 나온 KDRG의 행을 사전 끝(압축 시 가까운 거리)에 둔 뒤 size 바이트로 자름
+    """
+    counts: Counter = Counter()
+    first: Dict[Any, bytes] = {}
+    for sample in samples:
+        key = orjson.loads(sample).get('kdrg')
+        counts[key] += 1
+        first.setdefault(key, sample)
+    return b''.join(first[key] for key in sorted(first, key=counts.__getitem__))[-size:]
+
+
+class PayloadCodec:
+    """결과 JSON 압축/해제 (새로 저장하는 값은 가장 최근 사전 사용)"""
+
+    def __init__(self, level: int = 6):
+        self.level = level
+        self.dictionary_id = 0
+        self._compressors: Dict[int, Any] = {}
+        self._decompressors: Dict[int, Any] = {0: zlib.decompressobj(_WBITS)}
+        if level:
+            self._compressors[0] = zlib.compressobj(level, zlib.DEFLATED, _WBITS)
+
+    def has_dictionary(self, dict_id: int) -> bool:
+        return dict_id in self._decompressors
+
+    def add_dictionary(self, dict_id: int, data: bytes):
+        """사전 등록 (ID가 가장 크면 이후 압축에 사용)"""
+        self._decompressors[dict_id] = zlib.decompressobj(_WBITS, zdict=data)
+        if self.level:
+            self._compressors[dict_id] = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS, zdict=data)
+        self.dictionary_id = max(self.dictionary_id, dict_id)
+
+    def compress(self, data: bytes) -> Union[bytes, str]:
+        """JSON bytes 압축 (압축 수준 0이면 TEXT로 저장하도록 str 반환)"""
+        if not self.level:
+            return data.decode('utf-8')
+        # 사전을 읽어 둔 압축기를 복사해 사용 (행마다 사전을 다시 읽지 않음)
+        compressor = self._compressors[self.dictionary_id].copy()
+        return _HEADER.pack(MAGIC, self.dictionary_id) + compressor.compress(data) + compressor.flush()
+
+    def decompress(self, value: Union[bytes, str]) -> Union[bytes, str]:
+        """저장 값 → JSON (압축하지 않은 TEXT는 그대로)
+
+        Raises:
+            KeyError: 등록되지 않은 사전 ID (다른 프로세스가 만든 사전이면 불러온 뒤 다시 호출)
+        """
+        if not isinstance(value, bytes):
+            return value
+        magic, dict_id = _HEADER.unpack_from(value)
+        if magic != MAGIC:
+            raise ValueError("압축 형식이 아닙니다.")
+        decompressor = self._decompressors[dict_id].copy()
+        return decompressor.decompress(value[_HEADER.size:]) + decompressor.flush()
@@ -8,13 +8,35 @@ KDRG Pre-Grouper 서비스
       공개된 KDRG 분류 기준을 기반으로 구현
 """
 
+import os
 import re
+import json
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from datetime import datetime, date
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Any, Sequence, Tuple, Union
+from dataclasses import dataclass, field, fields, asdict, replace
 from enum import Enum
 import logging
 
+import numpy as np
+import pandas as pd
+
+from config import settings
+from .grouper_rules import CompiledGrouperRules, compile_rules, normalize_code
+from .grouper_batch import GrouperResultBatch
+from .grouper_rulesets import (
+    BUILTIN_VERSION, RuleSet, list_rule_sets, load_rule_set, read_active_version, rule_set_path,
+    split_spec, write_active_version,
+)
+from .kdrg_codebook_service import codebook_service
+from .rule_store import KDRGRuleStore, get_rule_store, los_bounds
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,7 +56,24 @@ class PatientType(Enum):
     DAY_SURGERY = "day_surgery"  # 당일 수술
 
 
-@dataclass
+class DetailLevel(str, Enum):
+    """그루핑 결과 상세 수준"""
+    FULL = "full"  # 분류 경로/경고를 문장으로 생성
+    CODES_ONLY = "codes-only"  # 경고는 WarningCode, 분류 경로는 생략 (expand_detail로 복원)
+
+
+class WarningCode(str, Enum):
+    """경고 코드 (codes-only 결과의 warnings 항목, 인자가 있으면 'W04:130' 형태)"""
+    MISSING_MAIN_DX = "W01"  # 주진단 없음
+    DATE_ORDER = "W02"  # 퇴원일 < 입원일
+    DATE_FORMAT = "W03"  # 날짜 형식 오류
+    AGE_OUTLIER = "W04"  # 나이 이상치 (인자: 나이)
+    NEGATIVE_LOS = "W05"  # 재원일수 음수
+    LONG_STAY = "W06"  # 장기 재원 (인자: 재원일수)
+    LOS_OUTLIER = "W07"  # 재원일수 이상치 (결과의 los/los_lower/los_upper로 복원)
+
+
+@dataclass(slots=True)
 class PatientInfo:
     """환자 정보"""
     patient_id: str
@@ -47,7 +86,7 @@ class PatientInfo:
     discharge_status: str = "alive"  # alive/dead/transfer
 
 
-@dataclass
+@dataclass(slots=True)
 class DiagnosisInfo:
     """진단 정보"""
     main_diagnosis: str  # 주진단 (ICD-10)
@@ -59,7 +98,7 @@ class DiagnosisInfo:
         return [self.main_diagnosis] + self.sub_diagnoses
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcedureInfo:
     """수술/처치 정보"""
     procedures: List[str] = field(default_factory=list)  # 수술/처치 코드
@@ -67,7 +106,7 @@ class ProcedureInfo:
     or_procedures: List[str] = field(default_factory=list)  # 수술실 수술
 
 
-@dataclass
+@dataclass(slots=True)
 class GrouperInput:
     """Pre-Grouper 입력"""
     patient: PatientInfo
@@ -76,7 +115,25 @@ class GrouperInput:
     claim_id: Optional[str] = None
 
 
-@dataclass
+# 그루핑 입력 행 튜플 (필드 순서는 CLAIM_FIELDS) - 입력 dataclass 없이 그루핑 커널에 직접 전달
+CLAIM_FIELDS = (
+    'patient_id', 'age', 'sex', 'admission_date', 'discharge_date', 'los',
+    'main_diagnosis', 'sub_diagnoses', 'procedures', 'claim_id',
+)
+ClaimRow = Tuple[str, int, str, str, str, int, str, Sequence[str], Sequence[str], Optional[str]]
+
+
+def _input_row(input_data: GrouperInput) -> ClaimRow:
+    """GrouperInput → 입력 행 튜플"""
+    patient = input_data.patient
+    return (
+        patient.patient_id, patient.age, patient.sex, patient.admission_date, patient.discharge_date,
+        patient.los, input_data.diagnosis.main_diagnosis, input_data.diagnosis.sub_diagnoses,
+        input_data.procedure.procedures, input_data.claim_id,
+    )
+
+
+@dataclass(slots=True)
 class GrouperResult:
     """Pre-Grouper 결과"""
     claim_id: str
@@ -105,6 +162,120 @@ class GrouperResult:
     grouper_path: List[str]  # 분류 경로
     warnings: List[str]  # 경고 메시지
     confidence: float  # 신뢰도 (0-100)
+    rule_version: str = ''  # 적용된 규칙 버전
+
+
+@dataclass(slots=True)
+class ParsedFrame:
+    """컬럼 단위 그루핑 입력 (파싱/정규화 결과, 규칙 버전과 무관)"""
+    n: int
+    claim_id: np.ndarray
+    patient_id: np.ndarray
+    main_dx: np.ndarray
+    age: np.ndarray
+    los: np.ndarray
+    has_procs: np.ndarray
+    dx_codes: np.ndarray  # 주진단 factorize
+    dx_uniques: np.ndarray
+    proc_rows: np.ndarray  # 수술 코드 (행 번호, factorize)
+    proc_codes: np.ndarray
+    proc_uniques: np.ndarray
+    all_rows: np.ndarray  # 주진단 + 부진단 (행 번호, factorize)
+    all_dx_codes: np.ndarray
+    all_dx_uniques: np.ndarray
+    date_status: np.ndarray  # date_messages 인덱스
+    date_messages: List[Optional[str]]
+
+
+@lru_cache(maxsize=8192)
+def _date_warning(admission_date: str, discharge_date: str) -> Optional[str]:
+    """입원일/퇴원일 검증 (경고 메시지 또는 None)"""
+    try:
+        adm = datetime.strptime(admission_date, '%Y-%m-%d')
+        dis = datetime.strptime(discharge_date, '%Y-%m-%d')
+        if dis < adm:
+            return "퇴원일이 입원일보다 이전입니다."
+    except:
+        return "날짜 형식 오류 (YYYY-MM-DD)"
+    return None
+
+
+_DATE_WARNING_CODES = {
+    "퇴원일이 입원일보다 이전입니다.": WarningCode.DATE_ORDER.value,
+    "날짜 형식 오류 (YYYY-MM-DD)": WarningCode.DATE_FORMAT.value,
+}
+
+_WARNING_MESSAGES = {
+    WarningCode.MISSING_MAIN_DX.value: "주진단 코드가 없습니다.",
+    WarningCode.DATE_ORDER.value: "퇴원일이 입원일보다 이전입니다.",
+    WarningCode.DATE_FORMAT.value: "날짜 형식 오류 (YYYY-MM-DD)",
+    WarningCode.AGE_OUTLIER.value: "나이 이상치: {0}",
+    WarningCode.NEGATIVE_LOS.value: "재원일수가 음수입니다.",
+    WarningCode.LONG_STAY.value: "장기 재원: {0}일",
+}
+
+
+def _to_code_list(value: Any) -> List[Any]:
+    """리스트 또는 쉼표 구분 문자열 셀을 코드 리스트로 변환"""
+    if type(value) is list:
+        return value
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(',') if v.strip()]
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return list(value)
+    return []
+
+
+def _explode_lists(lists: List[List[Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """행별 리스트를 (행 번호, 값) 배열 쌍으로 펼침"""
+    lengths = np.fromiter(map(len, lists), dtype=np.int64, count=len(lists))
+    rows = np.repeat(np.arange(len(lists)), lengths)
+    values = np.fromiter(itertools.chain.from_iterable(lists), dtype=object, count=int(lengths.sum()))
+    return rows, values
+
+
+def _explode_code_column(df: pd.DataFrame, name: str) -> Tuple[np.ndarray, np.ndarray]:
+    """코드 목록 컬럼을 (행 번호, 코드) 배열 쌍으로 펼침
+    
+    Arrow list 컬럼(grouper_arrow.claims_frame)은 행별 리스트를 만들지 않고 목록 배열을 직접 펼칩니다.
+    """
+    if name not in df.columns:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=object)
+    values = df[name]
+    if isinstance(values.dtype, pd.ArrowDtype) and values.dtype.type is list:
+        import pyarrow.compute as pc
+        
+        lists = values.array.__arrow_array__()
+        codes = pc.list_flatten(lists)
+        rows = pc.list_parent_indices(lists)
+        if codes.null_count:
+            valid = pc.is_valid(codes)
+            codes, rows = pc.filter(codes, valid), pc.filter(rows, valid)
+        return rows.to_numpy().astype(np.int64, copy=False), codes.to_numpy().astype(object, copy=False)
+    return _explode_lists([_to_code_list(v) for v in values.to_numpy(dtype=object)])
+
+
+def _map_unique(values: np.ndarray, func, dtype=object) -> np.ndarray:
+    """고유값에만 func를 적용한 뒤 전체 배열로 펼침"""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    return _map_factorized(codes, uniques, func, dtype)
+
+
+def _map_factorized(codes: np.ndarray, uniques: np.ndarray, func, dtype=object) -> np.ndarray:
+    """factorize 결과(codes, uniques)에 func를 적용한 뒤 전체 배열로 펼침"""
+    mapped = np.array([func(u) for u in uniques], dtype=dtype)
+    return mapped[codes] if len(mapped) else np.empty(len(codes), dtype=dtype)
+
+
+def _row_groups(*keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """키 컬럼 조합별 그룹 번호와 그룹별 대표 행 번호"""
+    groups = np.zeros(len(keys[0]), dtype=np.int64)
+    for key in keys:
+        codes, uniques = pd.factorize(key, use_na_sentinel=False)
+        groups, _ = pd.factorize(groups * max(len(uniques), 1) + codes)
+    first = np.empty(int(groups.max()) + 1 if len(groups) else 0, dtype=np.int64)
+    first[groups[::-1]] = np.arange(len(groups))[::-1]
+    return groups, first
 
 
 class KDRGPreGrouper:
@@ -215,118 +386,441 @@ class KDRGPreGrouper:
     # 기준 수가 (2024년 기준, 원)
     BASE_RATE_2024 = 87000  # 1점당 수가
     
-    def __init__(self):
-        self.grouper_version = "PreGrouper-1.0"
+    # 그루퍼 AADRG → V4.7 AADRG (코드표/코드북 상대가치점수·재원일수 조회 키)
+    # 그루퍼 코드는 자체 체계라 같은 코드가 V4.7에서는 다른 DRG일 수 있고 (예: 편도 D121 ↔ V4.7 D121 악관절 수술),
+    # 7개 DRG군도 V4.7에서는 여러 AADRG로 나뉘어 (예: 편도 D161/D162) 내장 규칙은 매핑 없이 기준 가중치 사용
+    KDRG_CODE_MAP: Dict[str, str] = {}
     
-    def determine_mdc(self, main_diagnosis: str) -> Tuple[str, str]:
-        """주진단으로 MDC 결정"""
-        dx = main_diagnosis.upper().replace('.', '')
+    def __init__(self, cache_size: Optional[int] = None,
+                 rule_set: Optional[Union[str, RuleSet]] = None):
+        """
+        Args:
+            cache_size: 결과 캐시 크기 (None이면 설정값)
+            rule_set: 고정할 규칙 세트 (버전 이름 또는 RuleSet, None이면 ACTIVE 파일을 따라 자동 교체)
+        """
+        self.grouper_version = "PreGrouper-1.0"
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_workers = 0
+        self._executor_rule_version = ''
+        self._executor_lock = threading.Lock()
+        
+        # 결과 캐시 (LRU, 0이면 사용 안 함)
+        self.cache_size = settings.GROUPER_CACHE_SIZE if cache_size is None else cache_size
+        self._cache: "OrderedDict[Tuple, Tuple]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._cache_evictions = 0
         
-        for mdc_code, (mdc_name, prefixes) in self.MDC_DEFINITIONS.items():
-            for prefix in prefixes:
-                if dx.startswith(prefix.replace('.', '')):
-                    return (mdc_code, mdc_name)
+        # V4.7 코드표 (memmap, 상대가치점수가 있는 코드는 하드코딩 기준보다 우선)
+        self.rule_store: Optional[KDRGRuleStore] = get_rule_store()
         
-        return ('W', '기타')
+        # 규칙 세트: 컴파일된 스냅샷(rules)을 통째로 교체, 직전 스냅샷은 비교용으로 보관
+        self._pinned_rule_set = rule_set
+        self.rule_set: Optional[RuleSet] = None
+        self.rules: Optional[CompiledGrouperRules] = None
+        self.previous_rule_set: Optional[RuleSet] = None
+        self.previous_rules: Optional[CompiledGrouperRules] = None
+        self._rules_lock = threading.RLock()
+        self._rules_stamp: Optional[Tuple] = None
+        self._rules_checked = time.monotonic()
+        self.reload_rules()
     
-    def check_drg7(self, diagnosis: DiagnosisInfo, procedure: ProcedureInfo) -> Optional[str]:
-        """7개 DRG군 해당 여부 확인"""
-        main_dx = diagnosis.main_diagnosis.upper()
+    @classmethod
+    def builtin_rule_set(cls) -> RuleSet:
+        """클래스 상수로 정의된 내장 규칙 세트"""
+        return RuleSet(
+            version=BUILTIN_VERSION,
+            mdc_definitions=cls.MDC_DEFINITIONS,
+            drg7_surgery_codes=cls.DRG7_SURGERY_CODES,
+            cc_codes=cls.CC_CODES,
+            base_rate=cls.BASE_RATE_2024,
+            description='내장 규칙',
+            kdrg_code_map=cls.KDRG_CODE_MAP,
+        )
+    
+    def _rules_signature(self) -> Tuple:
+        """내장 분류표/기준수가 변경 감지용 서명"""
+        return (
+            id(self.MDC_DEFINITIONS),
+            id(self.DRG7_SURGERY_CODES),
+            id(self.CC_CODES),
+            id(self.KDRG_CODE_MAP),
+            self.BASE_RATE_2024,
+        )
+    
+    def _load_rule_set(self, rule_set: Union[str, RuleSet]) -> RuleSet:
+        """버전 이름을 규칙 세트로 변환 (파일 없음: FileNotFoundError, 형식 오류: ValueError)"""
+        if isinstance(rule_set, RuleSet):
+            return rule_set
+        if rule_set == BUILTIN_VERSION:
+            return self.builtin_rule_set()
+        return load_rule_set(rule_set)
+    
+    def _active_stamp(self) -> Tuple[str, Optional[int]]:
+        """공유 활성 버전 (ACTIVE 파일 > 설정값 > 내장 규칙)과 규칙 세트 파일 수정 시각"""
+        version = read_active_version() or settings.GROUPER_RULE_SET or BUILTIN_VERSION
+        if version == BUILTIN_VERSION:
+            return (version, None)
+        try:
+            return (version, os.stat(rule_set_path(version)).st_mtime_ns)
+        except (OSError, ValueError):
+            return (version, None)
+    
+    def reload_rules(self):
+        """현재 규칙 세트를 다시 읽어 재컴파일하고 결과 캐시 무효화
         
-        for drg_code, drg_info in self.DRG7_SURGERY_CODES.items():
-            # 진단 확인
-            dx_match = any(
-                main_dx.startswith(dx.replace('.', '')) 
-                for dx in drg_info['diagnoses']
-            )
+        내장 분류표를 교체하거나 기준수가를 바꾸면 다음 그루핑 시 자동으로 호출됩니다.
+        분류표 딕셔너리를 제자리에서 수정했거나 코드표(rule_store)를 바꾼 경우에는 직접 호출해야 합니다.
+        """
+        with self._rules_lock:
+            if self._pinned_rule_set is not None:
+                self._install(self._load_rule_set(self._pinned_rule_set))
+                return
             
-            # 수술 확인 (O60 질식분만은 수술 없음)
-            if drg_info['procedures']:
-                proc_match = any(
-                    proc.upper() in [p.upper() for p in procedure.procedures]
-                    for proc in drg_info['procedures']
+            stamp = self._active_stamp()
+            version = self.rule_set.version if self.rule_set is not None else stamp[0]
+            try:
+                rule_set = self._load_rule_set(version)
+            except (OSError, ValueError) as e:
+                if self.rules is not None:
+                    raise
+                logger.error(f"규칙 세트 {version} 로드 실패, 내장 규칙 사용: {e}")
+                rule_set = self.builtin_rule_set()
+            self._install(rule_set)
+            # 다른 워커가 다른 버전을 활성화했으면 stamp를 갱신하지 않아 다음 확인 때 전환
+            if version == stamp[0]:
+                self._rules_stamp = stamp
+    
+    def resolve_rule_set(self, spec: Union[str, RuleSet]) -> RuleSet:
+        """비교용 지정('<버전>@<코드북 버전>', 버전이 비면 활성 규칙 세트)을 규칙 세트로 변환"""
+        if isinstance(spec, RuleSet):
+            return spec
+        version, codebook_version = split_spec(spec)
+        rule_set = self._load_rule_set(version) if version else self.rule_set
+        if codebook_version:
+            rule_set = replace(rule_set, codebook_version=codebook_version)
+        return rule_set
+    
+    def compile_rule_set(self, spec: Union[str, RuleSet]) -> CompiledGrouperRules:
+        """규칙 세트 컴파일 (활성 규칙은 그대로, group/group_frame의 rules 인자로 사용)
+        
+        Raises:
+            FileNotFoundError: 규칙 세트 파일 없음
+            ValueError: 형식 오류, 상대가치점수가 없는 코드북 버전 또는 kdrg_code_map 없이 코드북 버전 지정
+        """
+        rule_set = self.resolve_rule_set(spec)
+        weights = None
+        if rule_set.codebook_version:
+            # 코드북은 실제 KDRG 코드 기준이라 그루퍼 코드를 V4.7 코드로 매핑한 규칙 세트에만 의미가 있음
+            if not rule_set.kdrg_code_map:
+                raise ValueError(
+                    f"규칙 세트 {rule_set.version}에 kdrg_code_map이 없어 코드북 버전 "
+                    f"{rule_set.codebook_version}의 상대가치점수를 적용할 수 없습니다."
                 )
-            else:
-                # 질식분만: 진단만으로 판단
-                proc_match = dx_match
-            
-            if dx_match and proc_match:
-                return drg_code
+            weights = codebook_service.get_relative_weights(rule_set.codebook_version)
+            if not weights:
+                raise ValueError(f"코드북 버전 {rule_set.codebook_version}에 상대가치점수가 없습니다.")
+        return compile_rules(
+            rule_set.mdc_definitions, rule_set.drg7_surgery_codes, rule_set.cc_codes,
+            base_rate=rule_set.base_rate, weights=weights, code_map=rule_set.kdrg_code_map, name=rule_set.version,
+            version=self._compute_rule_version(rule_set, weights),
+        )
+    
+    def _install(self, rule_set: RuleSet):
+        """규칙 세트 컴파일 후 스냅샷 교체 (진행 중인 그루핑은 기존 스냅샷으로 끝까지 처리)"""
+        compiled = self.compile_rule_set(rule_set)
+        version = compiled.version
+        with self._rules_lock:
+            if self.rules is not None and self.rules.version != version:
+                self.previous_rule_set, self.previous_rules = self.rule_set, self.rules
+            self._table_weights: Dict[str, Optional[float]] = {}
+            self._table_los: Dict[str, Optional[Tuple[int, int]]] = {}
+            self.rule_set, self.rules = rule_set, compiled
+            self.rule_version = version
+            self._rules_sig = self._rules_signature()
+        self.clear_cache()
+    
+    def _compute_rule_version(self, rule_set: RuleSet,
+                              weights: Optional[Dict[str, float]] = None) -> str:
+        """분류표 내용 기반 규칙 버전 (프로세스 재시작 후에도 동일)"""
+        content = [
+            rule_set.mdc_definitions,
+            rule_set.drg7_surgery_codes,
+            rule_set.cc_codes,
+            rule_set.base_rate,
+            [self.rule_store.table_version, self.rule_store.content_digest] if self.rule_store is not None else None,
+        ]
+        if rule_set.kdrg_code_map:
+            content.append(sorted(rule_set.kdrg_code_map.items()))
+        prefix = self.grouper_version if rule_set.version == BUILTIN_VERSION else rule_set.version
+        if rule_set.codebook_version:
+            content.append([rule_set.codebook_version, sorted((weights or {}).items())])
+            prefix = f"{prefix}@{rule_set.codebook_version}"
+        digest = hashlib.sha256(
+            json.dumps(content, ensure_ascii=False, default=list).encode('utf-8')
+        ).hexdigest()[:12]
+        return f"{prefix}:{digest}"
+    
+    def activate_rule_set(self, version: str) -> Dict[str, Any]:
+        """규칙 세트 활성화
+        
+        컴파일이 끝난 뒤 스냅샷을 교체하므로 처리 중인 요청은 중단되지 않습니다.
+        ACTIVE 파일에 기록해 다른 워커 프로세스도 GROUPER_RULES_CHECK_SECONDS 이내에 전환합니다.
+        
+        Raises:
+            FileNotFoundError: 규칙 세트 파일 없음
+            ValueError: 형식 오류 또는 규칙 세트가 고정된 그루퍼
+        """
+        if self._pinned_rule_set is not None:
+            raise ValueError("규칙 세트가 고정된 그루퍼입니다.")
+        rule_set = self._load_rule_set(version)
+        with self._rules_lock:
+            self._install(rule_set)
+            write_active_version(rule_set.version)
+            self._rules_stamp = self._active_stamp()
+        logger.info(f"규칙 세트 활성화: {rule_set.version} ({self.rule_version})")
+        return self.rule_set_info()
+    
+    def rollback_rules(self) -> Dict[str, Any]:
+        """직전 규칙 세트로 되돌리기 (현재 규칙 세트는 previous로 보관)"""
+        with self._rules_lock:
+            if self.previous_rule_set is None:
+                raise ValueError("이전 규칙 세트가 없습니다.")
+            if self._pinned_rule_set is not None:
+                raise ValueError("규칙 세트가 고정된 그루퍼입니다.")
+            rule_set = self.previous_rule_set
+            self._install(rule_set)
+            write_active_version(rule_set.version)
+            self._rules_stamp = self._active_stamp()
+        logger.info(f"규칙 세트 되돌림: {rule_set.version} ({self.rule_version})")
+        return self.rule_set_info()
+    
+    def rule_set_info(self) -> Dict[str, Any]:
+        """활성/직전 규칙 세트 정보와 사용 가능한 버전 목록"""
+        def describe(rule_set: Optional[RuleSet], rules: Optional[CompiledGrouperRules]) -> Optional[Dict[str, Any]]:
+            if rule_set is None or rules is None:
+                return None
+            return {
+                'name': rule_set.version,
+                'codebook_version': rule_set.codebook_version,
+                'rule_version': rules.version,
+                'description': rule_set.description,
+                'effective_date': rule_set.effective_date,
+                'base_rate': rule_set.base_rate,
+                'mdc_count': len(rule_set.mdc_definitions),
+                'drg7_count': len(rule_set.drg7_surgery_codes),
+            }
+        
+        with self._rules_lock:
+            active = describe(self.rule_set, self.rules)
+            previous = describe(self.previous_rule_set, self.previous_rules)
+        return {
+            'active': active,
+            'previous': previous,
+            'pinned': self._pinned_rule_set is not None,
+            'available': [{'version': BUILTIN_VERSION, 'description': '내장 규칙'}] + list_rule_sets(),
+            'codebook_versions': codebook_service.list_versions(),
+        }
+    
+    def input_fingerprint(self, input_data: GrouperInput) -> str:
+        """분류에 영향을 주는 입력값의 내용 지문 (식별자 제외)"""
+        return self.row_fingerprint(_input_row(input_data))
+    
+    def row_fingerprint(self, row: ClaimRow) -> str:
+        """입력 행 튜플의 내용 지문 (input_fingerprint와 같은 값)"""
+        _, age, sex, admission_date, discharge_date, los, main_dx, sub_dx, procedures, _ = row
+        content = json.dumps([
+            age,
+            sex.upper(),
+            admission_date,
+            discharge_date,
+            los,
+            main_dx.upper(),
+            sorted(dx.upper() for dx in sub_dx),
+            sorted(p.upper() for p in procedures),
+        ], ensure_ascii=False)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+    
+    def _ensure_rules(self):
+        """규칙 변경 반영 (내장 분류표 교체, 다른 프로세스의 활성 버전 전환)"""
+        if (self.rules.name == BUILTIN_VERSION and not isinstance(self._pinned_rule_set, RuleSet)
+                and self._rules_sig != self._rules_signature()):
+            self.reload_rules()
         
-        return None
+        interval = settings.GROUPER_RULES_CHECK_SECONDS
+        if self._pinned_rule_set is None and interval > 0:
+            now = time.monotonic()
+            if now - self._rules_checked >= interval:
+                self._rules_checked = now
+                self._sync_active_rule_set()
+    
+    def _sync_active_rule_set(self):
+        """ACTIVE 파일 또는 활성 규칙 세트 파일이 바뀌었으면 교체 (실패 시 기존 규칙 유지)"""
+        stamp = self._active_stamp()
+        if stamp == self._rules_stamp:
+            return
+        with self._rules_lock:
+            if stamp == self._rules_stamp:
+                return
+            try:
+                self._install(self._load_rule_set(stamp[0]))
+                logger.info(f"규칙 세트 전환: {stamp[0]} ({self.rule_version})")
+            except (OSError, ValueError) as e:
+                logger.error(f"규칙 세트 {stamp[0]} 적용 실패, 기존 규칙 유지: {e}")
+            self._rules_stamp = stamp
+    
+    def _current_rules(self) -> CompiledGrouperRules:
+        """변경 확인 후 현재 규칙 스냅샷"""
+        self._ensure_rules()
+        return self.rules
+    
+    def determine_mdc(self, main_diagnosis: str,
+                      rules: Optional[CompiledGrouperRules] = None) -> Tuple[str, str]:
+        """주진단으로 MDC 결정"""
+        mdc = (rules or self.rules).mdc_index.lookup(normalize_code(main_diagnosis))
+        return mdc if mdc else ('W', '기타')
+    
+    def check_drg7(self, diagnosis: DiagnosisInfo, procedure: ProcedureInfo,
+                   rules: Optional[CompiledGrouperRules] = None) -> Optional[str]:
+        """7개 DRG군 해당 여부 확인"""
+        return (rules or self.rules).drg7.detect(diagnosis.main_diagnosis, procedure.procedures)
     
-    def calculate_severity(self, diagnosis: DiagnosisInfo, patient: PatientInfo) -> int:
+    def calculate_severity(self, diagnosis: DiagnosisInfo, patient: PatientInfo,
+                           rules: Optional[CompiledGrouperRules] = None) -> int:
         """중증도 계산"""
+        return self._severity(diagnosis.main_diagnosis, diagnosis.sub_diagnoses, patient.age, patient.los, rules)
+    
+    def _severity(self, main_diagnosis: str, sub_diagnoses: Sequence[str], age: int, los: int,
+                  rules: Optional[CompiledGrouperRules] = None) -> int:
+        """중증도 계산 (진단 코드/나이/재원일수 값으로 직접)"""
+        rules = rules or self.rules
         severity = 0
         
-        all_dx = diagnosis.all_diagnoses()
+        all_dx = [normalize_code(dx) for dx in (main_diagnosis, *sub_diagnoses)]
         
         # MCC 체크
-        for dx in all_dx:
-            dx_clean = dx.upper().replace('.', '')
-            for mcc in self.CC_CODES['MCC']:
-                if dx_clean.startswith(mcc.replace('.', '')):
-                    severity = max(severity, 3)
-                    break
-        
+        if any(rules.mcc_index.has_match(dx) for dx in all_dx):
+            severity = 3
         # CC 체크
-        if severity < 3:
-            for dx in all_dx:
-                dx_clean = dx.upper().replace('.', '')
-                for cc in self.CC_CODES['CC']:
-                    if dx_clean.startswith(cc.replace('.', '')):
-                        severity = max(severity, 2)
-                        break
+        elif any(rules.cc_index.has_match(dx) for dx in all_dx):
+            severity = 2
         
+        return self._adjust_severity(severity, age, los)
+    
+    def _cc_level(self, dx: str, rules: Optional[CompiledGrouperRules] = None) -> int:
+        """진단 1건의 CC 수준 (MCC=3, CC=2, 없음=0)"""
+        rules = rules or self.rules
+        dx_clean = normalize_code(dx)
+        if rules.mcc_index.has_match(dx_clean):
+            return 3
+        if rules.cc_index.has_match(dx_clean):
+            return 2
+        return 0
+    
+    def _adjust_severity(self, severity: int, age: int, los: int) -> int:
+        """나이/재원일수 중증도 보정"""
         # 나이 보정
-        if patient.age >= 70:
+        if age >= 70:
             severity = min(severity + 1, 4)
-        elif patient.age < 1:
+        elif age < 1:
             severity = min(severity + 1, 4)
         
         # 재원일수 보정
-        if patient.los > 14:
+        if los > 14:
             severity = min(severity + 1, 4)
         
         return severity
     
+    # 중증도 보정 계수
+    SEVERITY_MULTIPLIER = {
+        0: 0.9,
+        1: 1.0,
+        2: 1.1,
+        3: 1.25,
+        4: 1.5,
+    }
+    
     def calculate_relative_weight(self, aadrg: str, severity: int, 
-                                   patient: PatientInfo) -> float:
+                                   patient: PatientInfo,
+                                   rules: Optional[CompiledGrouperRules] = None) -> float:
         """상대가치점수 계산"""
+        return self._weight_for(aadrg, severity, patient.los, rules)
+    
+    def _weight_for(self, aadrg: str, severity: int, los: int,
+                    rules: Optional[CompiledGrouperRules] = None) -> float:
+        """상대가치점수 (V4.7 코드로 매핑되면 코드표 값 우선, 없으면 기준 가중치 보정)"""
+        code = self.table_code(aadrg, severity, rules)
+        table_weight = self._table_weight(code, rules) if code else None
+        if table_weight is not None:
+            return round(table_weight, 4)
+        
         # 7개 DRG군 기준 가중치
         drg_code = aadrg[:3] if len(aadrg) >= 3 else aadrg
+        info = (rules or self.rules).drg7_codes.get(drg_code)
+        base_weight = info['base_weight'] if info else 1.0
         
-        if drg_code in self.DRG7_SURGERY_CODES:
-            base_weight = self.DRG7_SURGERY_CODES[drg_code]['base_weight']
-        else:
-            base_weight = 1.0
-        
+        return self._adjust_weight(base_weight, severity, los)
+    
+    def table_code(self, aadrg: str, severity: int,
+                   rules: Optional[CompiledGrouperRules] = None) -> Optional[str]:
+        """상대가치점수/재원일수를 조회할 V4.7 KDRG 코드 (규칙 세트의 kdrg_code_map에 없는 AADRG면 None)"""
+        target = (rules or self.rules).code_map.get(aadrg[:4])
+        return self.generate_kdrg(target, severity) if target else None
+    
+    def _table_weight(self, kdrg: str, rules: Optional[CompiledGrouperRules] = None) -> Optional[float]:
+        """V4.7 KDRG 상대가치점수 (규칙 세트의 코드북 버전 우선, 아니면 공유 코드표 조회 결과 메모)"""
+        weights = (rules or self.rules).weights
+        if weights is not None:
+            return weights.get(kdrg)
+        try:
+            return self._table_weights[kdrg]
+        except KeyError:
+            pass
+        weight = self.rule_store.relative_weight(kdrg) if self.rule_store is not None else None
+        self._table_weights[kdrg] = weight
+        return weight
+    
+    def _los_range(self, aadrg: str, rules: Optional[CompiledGrouperRules] = None,
+                   severity: Optional[int] = None) -> Tuple[int, int]:
+        """재원일수 기준 (하한, 상한): V4.7 코드로 매핑되면 코드표 평균 재원일수 우선, 없으면 7개 DRG군 기준값"""
+        code = self.table_code(aadrg, severity, rules) if severity is not None else None
+        table_range = self._table_los_range(code) if code else None
+        if table_range is not None:
+            return table_range
+        drg_code = aadrg[:3] if len(aadrg) >= 3 else aadrg
+        info = (rules or self.rules).drg7_codes.get(drg_code)
+        return info['los_range'] if info else (3, 10)
+    
+    def _table_los_range(self, kdrg: str) -> Optional[Tuple[int, int]]:
+        """V4.7 KDRG 평균 재원일수 기준 재원일수 범위 (조회 결과 메모)"""
+        try:
+            return self._table_los[kdrg]
+        except KeyError:
+            pass
+        mean_los = self.rule_store.mean_los(kdrg) if self.rule_store is not None else None
+        bounds = los_bounds(mean_los) if mean_los else None
+        self._table_los[kdrg] = bounds
+        return bounds
+    
+    def _adjust_weight(self, base_weight: float, severity: int, los: int) -> float:
+        """기준 가중치에 중증도/재원일수 보정 적용"""
         # 중증도 보정
-        severity_multiplier = {
-            0: 0.9,
-            1: 1.0,
-            2: 1.1,
-            3: 1.25,
-            4: 1.5,
-        }
-        weight = base_weight * severity_multiplier.get(severity, 1.0)
+        weight = base_weight * self.SEVERITY_MULTIPLIER.get(severity, 1.0)
         
         # 재원일수 보정
-        if patient.los > 7:
+        if los > 7:
             weight *= 1.1
-        elif patient.los < 2:
+        elif los < 2:
             weight *= 0.95
         
         return round(weight, 4)
     
-    def determine_los_outlier(self, los: int, aadrg: str) -> Tuple[int, int, str]:
-        """재원일수 이상치 판정"""
-        drg_code = aadrg[:3] if len(aadrg) >= 3 else aadrg
-        
-        if drg_code in self.DRG7_SURGERY_CODES:
-            los_lower, los_upper = self.DRG7_SURGERY_CODES[drg_code]['los_range']
-        else:
-            los_lower, los_upper = 3, 10
+    def determine_los_outlier(self, los: int, aadrg: str,
+                              rules: Optional[CompiledGrouperRules] = None,
+                              severity: Optional[int] = None) -> Tuple[int, int, str]:
+        """재원일수 이상치 판정 (severity가 주어지고 V4.7 코드로 매핑되면 코드표 평균 재원일수 기준 우선)"""
+        los_lower, los_upper = self._los_range(aadrg, rules, severity)
         
         if los < los_lower:
             outlier = 'short'
@@ -340,11 +834,14 @@ class KDRGPreGrouper:
     def generate_aadrg(self, mdc: str, drg7_code: Optional[str], 
                         procedure: ProcedureInfo) -> str:
         """AADRG 생성"""
+        return self._aadrg_for(mdc, drg7_code, bool(procedure.procedures))
+    
+    def _aadrg_for(self, mdc: str, drg7_code: Optional[str], has_procedures: bool) -> str:
         if drg7_code:
             return drg7_code + '1'
         
         # 수술 여부에 따라 분류
-        if procedure.procedures:
+        if has_procedures:
             return f"{mdc}01A"  # 수술 있음
         else:
             return f"{mdc}60A"  # 수술 없음 (내과)
@@ -355,85 +852,265 @@ class KDRGPreGrouper:
     
     def validate_input(self, input_data: GrouperInput) -> List[str]:
         """입력 데이터 검증"""
+        patient = input_data.patient
+        return self._input_warnings(
+            input_data.diagnosis.main_diagnosis, patient.admission_date, patient.discharge_date,
+            patient.age, patient.los,
+        )
+    
+    def validate_input_codes(self, input_data: GrouperInput) -> List[str]:
+        """입력 데이터 검증 (codes-only: 경고 문장 대신 WarningCode)"""
+        patient = input_data.patient
+        return self._input_warning_codes(
+            input_data.diagnosis.main_diagnosis, patient.admission_date, patient.discharge_date,
+            patient.age, patient.los,
+        )
+    
+    def _input_warnings(self, main_diagnosis: str, admission_date: str, discharge_date: str,
+                        age: int, los: int) -> List[str]:
         warnings = []
         
         # 주진단 필수
-        if not input_data.diagnosis.main_diagnosis:
+        if not main_diagnosis:
             warnings.append("주진단 코드가 없습니다.")
         
         # 날짜 검증
-        try:
-            adm = datetime.strptime(input_data.patient.admission_date, '%Y-%m-%d')
-            dis = datetime.strptime(input_data.patient.discharge_date, '%Y-%m-%d')
-            if dis < adm:
-                warnings.append("퇴원일이 입원일보다 이전입니다.")
-        except:
-            warnings.append("날짜 형식 오류 (YYYY-MM-DD)")
+        date_warning = self._check_dates(admission_date, discharge_date)
+        if date_warning:
+            warnings.append(date_warning)
         
         # 나이 검증
-        if input_data.patient.age < 0 or input_data.patient.age > 120:
-            warnings.append(f"나이 이상치: {input_data.patient.age}")
+        if age < 0 or age > 120:
+            warnings.append(f"나이 이상치: {age}")
         
         # 재원일수 검증
-        if input_data.patient.los < 0:
+        if los < 0:
             warnings.append("재원일수가 음수입니다.")
-        elif input_data.patient.los > 365:
-            warnings.append(f"장기 재원: {input_data.patient.los}일")
+        elif los > 365:
+            warnings.append(f"장기 재원: {los}일")
         
         return warnings
     
-    def group(self, input_data: GrouperInput) -> GrouperResult:
-        """KDRG 그루핑 실행"""
-        warnings = self.validate_input(input_data)
-        grouper_path = []
+    def _input_warning_codes(self, main_diagnosis: str, admission_date: str, discharge_date: str,
+                             age: int, los: int) -> List[str]:
+        codes = []
         
-        patient = input_data.patient
-        diagnosis = input_data.diagnosis
-        procedure = input_data.procedure
+        if not main_diagnosis:
+            codes.append(WarningCode.MISSING_MAIN_DX.value)
+        
+        date_warning = self._check_dates(admission_date, discharge_date)
+        if date_warning:
+            codes.append(_DATE_WARNING_CODES[date_warning])
+        
+        if age < 0 or age > 120:
+            codes.append(f"{WarningCode.AGE_OUTLIER.value}:{age}")
+        
+        if los < 0:
+            codes.append(WarningCode.NEGATIVE_LOS.value)
+        elif los > 365:
+            codes.append(f"{WarningCode.LONG_STAY.value}:{los}")
+        
+        return codes
+    
+    def expand_detail(self, result: Union[GrouperResult, Dict[str, Any]]) -> Dict[str, List[str]]:
+        """codes-only 결과의 분류 경로/경고를 full 결과와 같은 문장으로 복원
+        
+        분류 경로는 결과 필드(mdc, drg_type, severity, aadrg, kdrg)로 다시 만들고,
+        경고 코드는 메시지로 바꿉니다. 이미 문장인 항목(full 결과)은 그대로 둡니다.
+        """
+        get = result.get if isinstance(result, dict) else lambda name: getattr(result, name)
+        
+        grouper_path = list(get('grouper_path') or [])
+        if not grouper_path:
+            aadrg = get('aadrg')
+            drg_type = get('drg_type')
+            grouper_path = [
+                f"MDC: {get('mdc')} ({get('mdc_name')})",
+                f"7개 DRG군: {aadrg[:3]} ({drg_type})" if drg_type != '행위별' else "7개 DRG군 해당 없음 (행위별)",
+                f"중증도: {get('severity')}",
+                f"AADRG: {aadrg}",
+                f"KDRG: {get('kdrg')}",
+            ]
+        
+        warnings = []
+        for item in get('warnings') or []:
+            code, _, arg = item.partition(':')
+            if code == WarningCode.LOS_OUTLIER.value:
+                warnings.append(
+                    f"재원일수 이상치: {get('los_outlier')} "
+                    f"({get('los')}일, 기준: {get('los_lower')}-{get('los_upper')}일)"
+                )
+            elif code in _WARNING_MESSAGES:
+                warnings.append(_WARNING_MESSAGES[code].format(arg))
+            else:
+                warnings.append(item)
+        
+        return {'grouper_path': grouper_path, 'warnings': warnings}
+    
+    def _check_dates(self, admission_date: str, discharge_date: str) -> Optional[str]:
+        """입원일/퇴원일 검증 (경고 메시지 또는 None)"""
+        return _date_warning(admission_date, discharge_date)
+    
+    def _cache_key(self, row: ClaimRow) -> Tuple:
+        """캐시 키 (식별자 제외, 분류 결과에 영향을 주는 값만 정규화)"""
+        _, age, _, admission_date, discharge_date, los, main_dx, sub_dx, procedures, _ = row
+        if age < 0 or age > 120:
+            age_band = age  # 경고 메시지에 나이 포함
+        elif age < 1:
+            age_band = '<1'
+        elif age >= 70:
+            age_band = '70+'
+        else:
+            age_band = '1-69'
+        
+        return (
+            main_dx.upper(),
+            frozenset(dx.upper() for dx in sub_dx),
+            frozenset(p.upper() for p in procedures),
+            age_band,
+            los,
+            self._check_dates(admission_date, discharge_date),
+        )
+    
+    def cache_info(self) -> Dict[str, Any]:
+        """결과 캐시 통계"""
+        with self._cache_lock:
+            lookups = self._cache_hits + self._cache_misses
+            return {
+                'enabled': self.cache_size > 0,
+                'max_size': self.cache_size,
+                'size': len(self._cache),
+                'hits': self._cache_hits,
+                'misses': self._cache_misses,
+                'evictions': self._cache_evictions,
+                'hit_rate': round(self._cache_hits / lookups * 100, 2) if lookups else 0.0,
+            }
+    
+    def clear_cache(self):
+        """결과 캐시 비우기 (통계 유지)"""
+        with self._cache_lock:
+            self._cache.clear()
+    
+    def group(self, input_data: GrouperInput,
+              detail_level: DetailLevel = DetailLevel.FULL,
+              rules: Optional[CompiledGrouperRules] = None) -> GrouperResult:
+        """KDRG 그루핑 실행 (캐시 사용 시 동일 임상 프로파일 결과 재사용)
+        
+        Args:
+            input_data: 그루핑 입력
+            detail_level: full이면 분류 경로/경고 문장 생성, codes-only면 경고 코드만 기록
+            rules: 사용할 규칙 스냅샷 (None이면 활성 규칙, 비교 시 previous_rules 등)
+        """
+        return self.group_row(_input_row(input_data), detail_level, rules)
+    
+    def group_row(self, row: ClaimRow,
+                  detail_level: DetailLevel = DetailLevel.FULL,
+                  rules: Optional[CompiledGrouperRules] = None) -> GrouperResult:
+        """입력 행 튜플 그루핑 (PatientInfo 등 입력 객체 미생성, group과 같은 결과)
+        
+        Args:
+            row: CLAIM_FIELDS 순서의 값 (타입 변환/정규화는 호출 측에서 완료 - row_from_dict 참고)
+        """
+        rules = rules or self._current_rules()
+        detail_level = DetailLevel(detail_level)
+        if self.cache_size <= 0:
+            return self._group_row(row, detail_level, rules)
+        
+        key = (*self._cache_key(row), detail_level, rules.version)
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                self._cache_hits += 1
+            else:
+                self._cache_misses += 1
+        
+        if entry is not None:
+            # 식별자만 교체한 새 결과 (목록 필드는 복사)
+            return GrouperResult(
+                row[9] or '', row[0],
+                *entry[:13], list(entry[13]), list(entry[14]), entry[15], entry[16],
+            )
+        
+        result = self._group_row(row, detail_level, rules)
+        entry = (
+            result.mdc, result.mdc_name, result.aadrg, result.kdrg, result.severity,
+            result.relative_weight, result.base_amount, result.estimated_amount,
+            result.los, result.los_lower, result.los_upper, result.los_outlier, result.drg_type,
+            tuple(result.grouper_path), tuple(result.warnings), result.confidence, result.rule_version,
+        )
+        with self._cache_lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self._cache_evictions += 1
+        return result
+    
+    def _group(self, input_data: GrouperInput,
+               detail_level: DetailLevel = DetailLevel.FULL,
+               rules: Optional[CompiledGrouperRules] = None) -> GrouperResult:
+        """KDRG 그루핑 실행 (캐시 미사용)"""
+        return self._group_row(_input_row(input_data), detail_level, rules)
+    
+    def _group_row(self, row: ClaimRow,
+                   detail_level: DetailLevel = DetailLevel.FULL,
+                   rules: Optional[CompiledGrouperRules] = None) -> GrouperResult:
+        """KDRG 그루핑 커널 (캐시 미사용, 행 튜플 값으로 직접 계산)"""
+        rules = rules or self.rules
+        full = detail_level is DetailLevel.FULL
+        patient_id, age, _, admission_date, discharge_date, los, main_dx, sub_dx, procedures, claim_id = row
+        check = self._input_warnings if full else self._input_warning_codes
+        warnings = check(main_dx, admission_date, discharge_date, age, los)
+        grouper_path = []
         
         # 1. MDC 결정
-        mdc, mdc_name = self.determine_mdc(diagnosis.main_diagnosis)
-        grouper_path.append(f"MDC: {mdc} ({mdc_name})")
+        mdc, mdc_name = self.determine_mdc(main_dx, rules)
+        if full:
+            grouper_path.append(f"MDC: {mdc} ({mdc_name})")
         
         # 2. 7개 DRG군 확인
-        drg7_code = self.check_drg7(diagnosis, procedure)
-        if drg7_code:
-            drg_type = self.DRG7_SURGERY_CODES[drg7_code]['name']
-            grouper_path.append(f"7개 DRG군: {drg7_code} ({drg_type})")
-        else:
-            drg_type = '행위별'
-            grouper_path.append("7개 DRG군 해당 없음 (행위별)")
+        drg7_code = rules.drg7.detect(main_dx, procedures)
+        drg_type = rules.drg7_codes[drg7_code]['name'] if drg7_code else '행위별'
         
         # 3. 중증도 계산
-        severity = self.calculate_severity(diagnosis, patient)
-        grouper_path.append(f"중증도: {severity}")
+        severity = self._severity(main_dx, sub_dx, age, los, rules)
         
         # 4. AADRG 생성
-        aadrg = self.generate_aadrg(mdc, drg7_code, procedure)
-        grouper_path.append(f"AADRG: {aadrg}")
+        aadrg = self._aadrg_for(mdc, drg7_code, bool(procedures))
         
         # 5. KDRG 생성
         kdrg = self.generate_kdrg(aadrg, severity)
-        grouper_path.append(f"KDRG: {kdrg}")
+        
+        if full:
+            grouper_path.append(
+                f"7개 DRG군: {drg7_code} ({drg_type})" if drg7_code else "7개 DRG군 해당 없음 (행위별)"
+            )
+            grouper_path.append(f"중증도: {severity}")
+            grouper_path.append(f"AADRG: {aadrg}")
+            grouper_path.append(f"KDRG: {kdrg}")
         
         # 6. 상대가치점수
-        relative_weight = self.calculate_relative_weight(aadrg, severity, patient)
+        relative_weight = self._weight_for(aadrg, severity, los, rules)
         
         # 7. 재원일수 이상치
-        los_lower, los_upper, los_outlier = self.determine_los_outlier(patient.los, aadrg)
+        los_lower, los_upper, los_outlier = self.determine_los_outlier(los, aadrg, rules, severity)
         if los_outlier != 'normal':
-            warnings.append(f"재원일수 이상치: {los_outlier} ({patient.los}일, 기준: {los_lower}-{los_upper}일)")
+            warnings.append(
+                f"재원일수 이상치: {los_outlier} ({los}일, 기준: {los_lower}-{los_upper}일)"
+                if full else WarningCode.LOS_OUTLIER.value
+            )
         
         # 8. 예상 금액
-        base_amount = relative_weight * self.BASE_RATE_2024
+        base_amount = relative_weight * rules.base_rate
         
         # 재원일수 보정
         if los_outlier == 'short':
             estimated_amount = base_amount * 0.9
         elif los_outlier == 'long':
             # 장기 재원 일당 추가
-            extra_days = patient.los - los_upper
-            estimated_amount = base_amount + (extra_days * self.BASE_RATE_2024 * 0.3)
+            extra_days = los - los_upper
+            estimated_amount = base_amount + (extra_days * rules.base_rate * 0.3)
         else:
             estimated_amount = base_amount
         
@@ -443,13 +1120,13 @@ class KDRGPreGrouper:
             confidence -= 20  # 7개 DRG군 아님
         if len(warnings) > 0:
             confidence -= len(warnings) * 5
-        if not procedure.procedures:
+        if not procedures:
             confidence -= 10  # 수술 정보 없음
         confidence = max(30, confidence)
         
         return GrouperResult(
-            claim_id=input_data.claim_id or '',
-            patient_id=patient.patient_id,
+            claim_id=claim_id or '',
+            patient_id=patient_id,
             mdc=mdc,
             mdc_name=mdc_name,
             aadrg=aadrg,
@@ -458,7 +1135,7 @@ class KDRGPreGrouper:
             relative_weight=relative_weight,
             base_amount=base_amount,
             estimated_amount=round(estimated_amount, 0),
-            los=patient.los,
+            los=los,
             los_lower=los_lower,
             los_upper=los_upper,
             los_outlier=los_outlier,
@@ -466,45 +1143,477 @@ class KDRGPreGrouper:
             grouper_path=grouper_path,
             warnings=warnings,
             confidence=confidence,
+            rule_version=rules.version,
         )
     
-    def group_batch(self, inputs: List[GrouperInput]) -> List[GrouperResult]:
-        """배치 그루핑"""
-        return [self.group(inp) for inp in inputs]
+    def group_batch(self, inputs: List[GrouperInput],
+                    workers: Optional[int] = None,
+                    detail_level: DetailLevel = DetailLevel.FULL) -> List[GrouperResult]:
+        """배치 그루핑
+        
+        대량 배치는 청크로 나누어 프로세스 풀에서 병렬 처리하고 입력 순서대로 병합합니다.
+        
+        Args:
+            inputs: 그루핑 입력 목록
+            workers: 워커 프로세스 수 (None이면 설정값, 1이면 현재 프로세스에서 처리)
+            detail_level: 결과 상세 수준 (codes-only는 경로/경고 문장 생성 생략)
+        """
+        return self._run_chunked(_group_input_chunk, inputs, workers, detail_level=DetailLevel(detail_level))
+    
+    def group_records(self, records: List[Dict[str, Any]],
+                      workers: Optional[int] = None,
+                      detail_level: DetailLevel = DetailLevel.FULL) -> List[Tuple[Optional[GrouperResult], Optional[str]]]:
+        """딕셔너리 목록 배치 그루핑 (행별 오류 수집)
+        
+        Returns:
+            입력 순서대로 (결과, None) 또는 (None, 오류 메시지) 목록
+        """
+        return self._run_chunked(_group_record_chunk, records, workers, detail_level=DetailLevel(detail_level))
+    
+    def _resolve_workers(self, workers: Optional[int], size: int) -> int:
+        """실제 사용할 워커 수 결정"""
+        if workers is None:
+            if size < settings.GROUPER_PARALLEL_MIN_ROWS:
+                return 1
+            workers = settings.GROUPER_WORKERS or os.cpu_count() or 1
+        chunks = -(-size // max(settings.GROUPER_CHUNK_SIZE, 1))
+        return max(1, min(workers, chunks))
+    
+    def _get_executor(self, workers: int) -> ProcessPoolExecutor:
+        """워커 프로세스 풀 반환 (현재 규칙 세트를 미리 컴파일한 워커)
+        
+        규칙 세트가 바뀌면 새 풀을 만들고, 기존 풀은 제출된 청크를 마저 처리한 뒤 종료됩니다.
+        """
+        with self._executor_lock:
+            rule_set, rules = self.rule_set, self.rules
+            if (self._executor is None or self._executor_workers != workers
+                    or self._executor_rule_version != rules.version):
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init_worker, initargs=(rule_set,),
+                )
+                self._executor_workers = workers
+                self._executor_rule_version = rules.version
+            return self._executor
+    
+    def group_records_batch(self, records: List[Dict[str, Any]],
+                            workers: Optional[int] = None,
+                            detail_level: DetailLevel = DetailLevel.FULL) -> Tuple[GrouperResultBatch, List[Tuple[int, str]]]:
+        """딕셔너리 목록 배치 그루핑 (컬럼 저장소로 결과 수집)
+        
+        청크 단위로 결과를 GrouperResultBatch에 옮겨 담아 결과 객체를 오래 유지하지 않습니다.
+        
+        Returns:
+            (성공 결과 배치, [(입력 인덱스, 오류 메시지), ...])
+        """
+        return self._collect_batch(_group_record_chunk, records, workers, detail_level)
+    
+    def group_rows_batch(self, rows: List[ClaimRow],
+                         workers: Optional[int] = None,
+                         detail_level: DetailLevel = DetailLevel.FULL) -> Tuple[GrouperResultBatch, List[Tuple[int, str]]]:
+        """입력 행 튜플 목록 배치 그루핑 (group_records_batch와 같은 반환, 입력 dict/객체 미생성)
+        
+        Args:
+            rows: CLAIM_FIELDS 순서의 값 튜플 (Pydantic 요청 필드 등 이미 검증된 값)
+        """
+        return self._collect_batch(_group_row_chunk, rows, workers, detail_level)
+    
+    def _collect_batch(self, func, items: List[Any], workers: Optional[int],
+                       detail_level: DetailLevel) -> Tuple[GrouperResultBatch, List[Tuple[int, str]]]:
+        """청크 결과 (결과, 오류) 목록을 배치와 (입력 인덱스, 오류) 목록으로 수집"""
+        batch = GrouperResultBatch()
+        errors: List[Tuple[int, str]] = []
+        index = 0
+        parts = self._iter_chunked(func, items, workers, detail_level=DetailLevel(detail_level))
+        for part in parts:
+            for result, error in part:
+                if error is None:
+                    batch.append(result)
+                else:
+                    errors.append((index, error))
+                index += 1
+        return batch, errors
     
-    def group_from_dict(self, data: Dict[str, Any]) -> GrouperResult:
+    def _iter_chunked(self, func, items: List[Any], workers: Optional[int], **kwargs):
+        """청크 단위 실행 결과를 입력 순서대로 반환 (kwargs는 청크 함수에 전달)"""
+        workers = self._resolve_workers(workers, len(items))
+        chunk_size = max(settings.GROUPER_CHUNK_SIZE, 1)
+        if workers <= 1:
+            # 배치 전체를 같은 규칙 스냅샷으로 처리
+            rules = self._current_rules()
+            for start in range(0, len(items), chunk_size):
+                yield func(items[start:start + chunk_size], self, rules=rules, **kwargs)
+            return
+        
+        self._ensure_rules()
+        
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        yield from self._get_executor(workers).map(partial(func, **kwargs), chunks)
+    
+    def _run_chunked(self, func, items: List[Any], workers: Optional[int], **kwargs) -> List[Any]:
+        """청크 단위 실행 후 입력 순서대로 병합"""
+        results: List[Any] = []
+        for part in self._iter_chunked(func, items, workers, **kwargs):
+            results.extend(part)
+        return results
+    
+    def shutdown_pool(self):
+        """워커 프로세스 풀 종료"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+                self._executor_workers = 0
+                self._executor_rule_version = ''
+    
+    def group_from_dict(self, data: Dict[str, Any],
+                        detail_level: DetailLevel = DetailLevel.FULL,
+                        rules: Optional[CompiledGrouperRules] = None) -> GrouperResult:
         """딕셔너리에서 그루핑"""
-        patient = PatientInfo(
-            patient_id=str(data.get('patient_id', '')),
-            age=int(data.get('age', 0)),
-            sex=str(data.get('sex', 'M')),
-            admission_date=str(data.get('admission_date', '')),
-            discharge_date=str(data.get('discharge_date', '')),
-            los=int(data.get('los', 0)),
-        )
+        return self.group_row(self.row_from_dict(data), detail_level, rules)
+    
+    def fingerprint_records(self, records: List[Dict[str, Any]]) -> List[Tuple[Optional[str], Optional[str]]]:
+        """딕셔너리 목록의 입력 지문 (행별 오류 수집)
         
-        diagnosis = DiagnosisInfo(
-            main_diagnosis=str(data.get('main_diagnosis', '')),
-            sub_diagnoses=data.get('sub_diagnoses', []) if isinstance(data.get('sub_diagnoses'), list) else [],
+        Returns:
+            입력 순서대로 (지문, None) 또는 (None, 오류 메시지) 목록
+        """
+        fingerprints = []
+        for record in records:
+            try:
+                fingerprints.append((self.row_fingerprint(self.row_from_dict(record)), None))
+            except Exception as e:
+                fingerprints.append((None, str(e)))
+        return fingerprints
+    
+    def input_from_dict(self, data: Dict[str, Any]) -> GrouperInput:
+        """딕셔너리를 그루퍼 입력으로 변환"""
+        patient_id, age, sex, admission_date, discharge_date, los, main_dx, sub_dx, procedures, claim_id = (
+            self.row_from_dict(data)
         )
-        
+        return GrouperInput(
+            patient=PatientInfo(
+                patient_id=patient_id,
+                age=age,
+                sex=sex,
+                admission_date=admission_date,
+                discharge_date=discharge_date,
+                los=los,
+            ),
+            diagnosis=DiagnosisInfo(main_diagnosis=main_dx, sub_diagnoses=sub_dx),
+            procedure=ProcedureInfo(
+                procedures=procedures,
+                main_procedure=procedures[0] if procedures else None,
+            ),
+            claim_id=claim_id,
+        )
+    
+    def row_from_dict(self, data: Dict[str, Any]) -> ClaimRow:
+        """딕셔너리를 입력 행 튜플로 변환 (input_from_dict와 같은 타입 변환/정규화)"""
+        sub_diagnoses = data.get('sub_diagnoses', [])
         procedures = data.get('procedures', [])
         if isinstance(procedures, str):
             procedures = [p.strip() for p in procedures.split(',') if p.strip()]
+        return (
+            str(data.get('patient_id', '')),
+            int(data.get('age', 0)),
+            str(data.get('sex', 'M')),
+            str(data.get('admission_date', '')),
+            str(data.get('discharge_date', '')),
+            int(data.get('los', 0)),
+            str(data.get('main_diagnosis', '')),
+            sub_diagnoses if isinstance(sub_diagnoses, list) else [],
+            procedures,
+            str(data.get('claim_id', '')),
+        )
+    
+    def group_frame(self, frame: Union[pd.DataFrame, Dict[str, Any]],
+                    workers: Optional[int] = None,
+                    detail_level: DetailLevel = DetailLevel.FULL,
+                    rules: Optional[CompiledGrouperRules] = None) -> pd.DataFrame:
+        """컬럼 단위 배치 그루핑
         
-        procedure = ProcedureInfo(
-            procedures=procedures,
-            main_procedure=procedures[0] if procedures else None,
+        group_from_dict와 동일한 규칙을 행 반복 대신 컬럼 연산으로 수행합니다.
+        코드 문자열 판정은 고유값에 대해서만 실행한 뒤 전체 행으로 펼칩니다.
+        sub_diagnoses / procedures 컬럼은 리스트 또는 쉼표 구분 문자열을 받습니다.
+        
+        Args:
+            frame: pandas DataFrame 또는 {컬럼명: 배열} 딕셔너리
+            workers: 워커 프로세스 수 (None이면 설정값, 1이면 현재 프로세스에서 처리)
+            detail_level: 결과 상세 수준 (codes-only는 경로/경고 문장 생성 생략)
+            rules: 사용할 규칙 스냅샷 (None이면 활성 규칙, 활성 규칙이 아니면 현재 프로세스에서 처리)
+        
+        Returns:
+            GrouperResult 필드 순서의 결과 DataFrame (입력 행 순서 유지)
+        """
+        active = self._current_rules()
+        rules = rules or active
+        detail_level = DetailLevel(detail_level)
+        df = frame if isinstance(frame, pd.DataFrame) else pd.DataFrame(frame)
+        workers = self._resolve_workers(workers, len(df)) if rules is active else 1
+        if workers <= 1:
+            return self._group_frame(df, detail_level, rules)
+        
+        chunk_size = max(settings.GROUPER_CHUNK_SIZE, 1)
+        chunks = [df.iloc[i:i + chunk_size] for i in range(0, len(df), chunk_size)]
+        parts = list(self._get_executor(workers).map(partial(_group_frame_chunk, detail_level=detail_level), chunks))
+        return pd.concat(parts, ignore_index=True)
+    
+    def _group_frame(self, df: pd.DataFrame,
+                     detail_level: DetailLevel = DetailLevel.FULL,
+                     rules: Optional[CompiledGrouperRules] = None) -> pd.DataFrame:
+        """컬럼 단위 그루핑 (현재 프로세스)"""
+        return self.group_parsed(self.parse_frame(df), detail_level, rules)
+    
+    def parse_frame(self, df: pd.DataFrame) -> "ParsedFrame":
+        """입력 DataFrame 파싱/정규화 (규칙과 무관한 단계, 여러 규칙 버전에서 공유)"""
+        n = len(df)
+        
+        def column(name: str, default: Any) -> np.ndarray:
+            if name in df.columns:
+                return df[name].to_numpy(dtype=object)
+            return np.full(n, default, dtype=object)
+        
+        def str_column(name: str) -> np.ndarray:
+            if name in df.columns:
+                values = df[name]
+                if pd.api.types.is_string_dtype(values) and not values.isna().any():
+                    return values.to_numpy(dtype=object)
+            return np.array([str(v) for v in column(name, '')], dtype=object)
+        
+        admission_date = str_column('admission_date')
+        discharge_date = str_column('discharge_date')
+        main_dx = str_column('main_diagnosis')
+        
+        dx_codes, dx_uniques = pd.factorize(main_dx, use_na_sentinel=False)
+        proc_rows, proc_values = _explode_code_column(df, 'procedures')
+        proc_codes, proc_uniques = pd.factorize(proc_values, use_na_sentinel=False)
+        sub_rows, sub_values = _explode_code_column(df, 'sub_diagnoses')
+        all_dx_codes, all_dx_uniques = pd.factorize(np.concatenate([main_dx, sub_values]), use_na_sentinel=False)
+        
+        # 날짜 검증 (입원일/퇴원일 조합별 한 번씩)
+        adm_codes, adm_uniques = pd.factorize(admission_date, use_na_sentinel=False)
+        dis_codes, dis_uniques = pd.factorize(discharge_date, use_na_sentinel=False)
+        stride = max(len(dis_uniques), 1)
+        pair_codes, pair_uniques = pd.factorize(adm_codes * stride + dis_codes)
+        date_warnings = [
+            self._check_dates(adm_uniques[p // stride], dis_uniques[p % stride]) for p in pair_uniques
+        ]
+        date_messages = [None] + sorted({w for w in date_warnings if w is not None})
+        date_status = np.array(
+            [date_messages.index(w) for w in date_warnings] or [0], dtype=np.int64
+        )[pair_codes]
+        
+        return ParsedFrame(
+            n=n,
+            claim_id=str_column('claim_id'),
+            patient_id=str_column('patient_id'),
+            main_dx=main_dx,
+            age=column('age', 0).astype(np.int64),
+            los=column('los', 0).astype(np.int64),
+            has_procs=np.bincount(proc_rows, minlength=n) > 0,
+            dx_codes=dx_codes,
+            dx_uniques=dx_uniques,
+            proc_rows=proc_rows,
+            proc_codes=proc_codes,
+            proc_uniques=proc_uniques,
+            all_rows=np.concatenate([np.arange(n), sub_rows]),
+            all_dx_codes=all_dx_codes,
+            all_dx_uniques=all_dx_uniques,
+            date_status=date_status,
+            date_messages=date_messages,
+        )
+    
+    def group_parsed(self, parsed: "ParsedFrame",
+                     detail_level: DetailLevel = DetailLevel.FULL,
+                     rules: Optional[CompiledGrouperRules] = None,
+                     columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """파싱된 입력을 규칙 스냅샷 하나로 컬럼 단위 그루핑
+        
+        Args:
+            columns: 필요한 결과 컬럼 (None이면 전체, 경고/신뢰도/분류 경로는 요청 시에만 생성)
+        """
+        rules = rules or self.rules
+        names = [f.name for f in fields(GrouperResult)] if columns is None else list(columns)
+        full = detail_level is DetailLevel.FULL and 'grouper_path' in names
+        n = parsed.n
+        age, los, has_procs = parsed.age, parsed.los, parsed.has_procs
+        dx_codes, dx_uniques = parsed.dx_codes, parsed.dx_uniques
+        
+        # 1. MDC 결정 (주진단 고유값 단위)
+        mdc_of = [self.determine_mdc(dx, rules) for dx in dx_uniques]
+        mdc = np.array([m[0] for m in mdc_of] or [''], dtype=object)[dx_codes]
+        mdc_name = np.array([m[1] for m in mdc_of] or [''], dtype=object)[dx_codes]
+        if full:
+            mdc_path = np.array([f"MDC: {m[0]} ({m[1]})" for m in mdc_of] or [''], dtype=object)[dx_codes]
+        
+        # 2. 7개 DRG군 확인 (정의 순서대로 첫 번째 일치)
+        drg7_index = rules.drg7
+        
+        # 행별 수술 코드 → DRG군 비트 합 (역색인)
+        proc_mask = np.zeros(n, dtype=np.int64)
+        np.bitwise_or.at(
+            proc_mask, parsed.proc_rows,
+            _map_factorized(parsed.proc_codes, parsed.proc_uniques, drg7_index.procedure_mask, dtype=np.int64),
+        )
+        dx_candidates = [set(drg7_index.candidates(dx)) for dx in dx_uniques]
+        
+        drg7 = np.full(n, '', dtype=object)
+        assigned = np.zeros(n, dtype=bool)
+        for drg_code in drg7_index.codes:
+            dx_match = np.array([drg_code in c for c in dx_candidates] or [False])[dx_codes]
+            if drg_code in drg7_index.dx_only:
+                hit = dx_match & ~assigned
+            else:
+                hit = dx_match & ((proc_mask & drg7_index.bits[drg_code]) != 0) & ~assigned
+            drg7[hit] = drg_code
+            assigned |= hit
+        
+        drg_names = drg7_index.names
+        drg_type = _map_unique(drg7, lambda code: drg_names[code] if code else '행위별')
+        if full:
+            drg_path = _map_unique(
+                drg7,
+                lambda code: f"7개 DRG군: {code} ({drg_names[code]})" if code else "7개 DRG군 해당 없음 (행위별)",
+            )
+        
+        # 3. 중증도 계산 (주진단 + 부진단 중 최고 CC 수준)
+        severity = np.zeros(n, dtype=np.int64)
+        np.maximum.at(
+            severity, parsed.all_rows,
+            _map_factorized(parsed.all_dx_codes, parsed.all_dx_uniques, partial(self._cc_level, rules=rules),
+                            dtype=np.int64),
         )
+        severity = np.where((age >= 70) | (age < 1), np.minimum(severity + 1, 4), severity)
+        severity = np.where(los > 14, np.minimum(severity + 1, 4), severity)
+        
+        # 4-5. AADRG / KDRG 생성
+        aadrg = np.where(assigned, drg7 + '1', mdc + np.where(has_procs, '01A', '60A').astype(object))
+        kdrg = _map_unique(aadrg, lambda a: a[:4]) + np.minimum(severity, 4).astype(str).astype(object)
+        
+        # 6-7. 재원일수 기준 ((AADRG, 중증도) 고유값 단위, 코드표 평균 재원일수 우선) / 상대가치점수
+        aadrg_codes, aadrg_uniques = pd.factorize(aadrg, use_na_sentinel=False)
+        los_codes, los_uniques = pd.factorize(aadrg_codes * 5 + np.minimum(severity, 4))
+        params = np.array([
+            self._los_range(aadrg_uniques[c // 5], rules, int(c % 5))
+            for c in los_uniques
+        ] or [(3, 10)], dtype=np.int64)
+        los_lower = params[:, 0][los_codes]
+        los_upper = params[:, 1][los_codes]
         
-        input_data = GrouperInput(
-            patient=patient,
-            diagnosis=diagnosis,
-            procedure=procedure,
-            claim_id=str(data.get('claim_id', '')),
+        # 가중치는 (AADRG, 중증도, 재원일수 구간) 조합별로 스칼라 계산 (반올림 결과 동일 보장)
+        los_bucket = np.where(los > 7, 2, np.where(los < 2, 0, 1))
+        combo = (aadrg_codes * 5 + severity) * 3 + los_bucket
+        combo_codes, combo_uniques = pd.factorize(combo)
+        bucket_los = (1, 2, 8)
+        relative_weight = np.array([
+            self._weight_for(aadrg_uniques[c // 15], int(c // 3 % 5), bucket_los[c % 3], rules)
+            for c in combo_uniques
+        ] or [0.0], dtype=np.float64)[combo_codes]
+        
+        short = los < los_lower
+        long = los > los_upper
+        los_outlier = np.where(short, 'short', np.where(long, 'long', 'normal')).astype(object)
+        
+        # 8. 예상 금액
+        base_amount = relative_weight * rules.base_rate
+        estimated_amount = np.where(
+            short,
+            base_amount * 0.9,
+            np.where(long, base_amount + ((los - los_upper) * rules.base_rate * 0.3), base_amount),
         )
+        estimated_amount = np.round(estimated_amount, 0)
         
-        return self.group(input_data)
+        data = {
+            'claim_id': parsed.claim_id,
+            'patient_id': parsed.patient_id,
+            'mdc': mdc,
+            'mdc_name': mdc_name,
+            'aadrg': aadrg,
+            'kdrg': kdrg,
+            'severity': severity,
+            'relative_weight': relative_weight,
+            'base_amount': base_amount,
+            'estimated_amount': estimated_amount,
+            'los': los,
+            'los_lower': los_lower,
+            'los_upper': los_upper,
+            'los_outlier': los_outlier,
+            'drg_type': drg_type,
+            'rule_version': np.full(n, rules.version, dtype=object),
+        }
+        if 'warnings' in names or 'confidence' in names:
+            data.update(self._frame_warnings(
+                parsed, detail_level is DetailLevel.FULL, assigned, aadrg_codes, los_outlier, los_lower, los_upper,
+            ))
+        
+        # 분류 경로 (주진단, DRG군, 수술 여부, 중증도 조합별, codes-only는 생략)
+        if full:
+            path_groups, path_rows = _row_groups(dx_codes, drg7, has_procs, severity)
+            path_lists = [
+                [mdc_path[i], drg_path[i], f"중증도: {severity[i]}", f"AADRG: {aadrg[i]}", f"KDRG: {kdrg[i]}"]
+                for i in path_rows
+            ]
+            data['grouper_path'] = [list(path_lists[g]) for g in path_groups]
+        elif 'grouper_path' in names:
+            data['grouper_path'] = [[] for _ in range(n)]
+        
+        return pd.DataFrame({name: data[name] for name in names}, columns=names)
+    
+    def _frame_warnings(self, parsed: "ParsedFrame", full: bool, assigned: np.ndarray, aadrg_codes: np.ndarray,
+                        los_outlier: np.ndarray, los_lower: np.ndarray, los_upper: np.ndarray) -> Dict[str, Any]:
+        """컬럼 단위 경고 목록 / 신뢰도"""
+        main_dx, age, los, has_procs = parsed.main_dx, parsed.age, parsed.los, parsed.has_procs
+        short = los < los_lower
+        long = los > los_upper
+        
+        # 입력 검증 / 이상치 경고 (메시지를 결정하는 키 조합별로 한 번씩 생성)
+        date_status = parsed.date_status
+        date_messages = parsed.date_messages
+        if not full:
+            date_messages = [None] + [_DATE_WARNING_CODES[w] for w in date_messages[1:]]
+        
+        age_warn = (age < 0) | (age > 120)
+        outlier = short | long
+        warn_groups, warn_rows = _row_groups(
+            main_dx == '',
+            date_status,
+            np.where(age_warn, age, 0),
+            age_warn,
+            np.where(los < 0, -1, np.where(los > 365, los, 0)),
+            np.where(outlier, los, 0),
+            np.where(outlier, aadrg_codes + 1, 0),
+        )
+        warning_lists = []
+        for i in warn_rows:
+            row_warnings = []
+            if main_dx[i] == '':
+                row_warnings.append("주진단 코드가 없습니다." if full else WarningCode.MISSING_MAIN_DX.value)
+            if date_messages[date_status[i]] is not None:
+                row_warnings.append(date_messages[date_status[i]])
+            if age_warn[i]:
+                row_warnings.append(f"나이 이상치: {age[i]}" if full else f"{WarningCode.AGE_OUTLIER.value}:{age[i]}")
+            if los[i] < 0:
+                row_warnings.append("재원일수가 음수입니다." if full else WarningCode.NEGATIVE_LOS.value)
+            elif los[i] > 365:
+                row_warnings.append(f"장기 재원: {los[i]}일" if full else f"{WarningCode.LONG_STAY.value}:{los[i]}")
+            if outlier[i]:
+                row_warnings.append(
+                    f"재원일수 이상치: {los_outlier[i]} ({los[i]}일, 기준: {los_lower[i]}-{los_upper[i]}일)"
+                    if full else WarningCode.LOS_OUTLIER.value
+                )
+            warning_lists.append(row_warnings)
+        warning_count = np.array([len(w) for w in warning_lists] or [0], dtype=np.int64)[warn_groups]
+        
+        # 9. 신뢰도
+        confidence = 100.0 - np.where(assigned, 0, 20) - warning_count * 5 - np.where(has_procs, 0, 10)
+        confidence = np.maximum(30, confidence).astype(np.float64)
+        
+        return {
+            'warnings': [list(warning_lists[g]) for g in warn_groups],
+            'confidence': confidence,
+        }
     
     def estimate_optimization(self, result: GrouperResult, 
                                original_kdrg: str = None) -> Dict[str, Any]:
@@ -556,5 +1665,62 @@ class KDRGPreGrouper:
         }
 
 
+# ===== 프로세스 풀 워커 =====
+
+_worker_grouper: Optional[KDRGPreGrouper] = None
+
+
+def _init_worker(rule_set: Optional[RuleSet] = None):
+    """워커 프로세스 초기화 (부모 프로세스와 같은 규칙 세트로 고정, 컴파일 1회)"""
+    global _worker_grouper
+    _worker_grouper = KDRGPreGrouper(rule_set=rule_set)
+
+
+def _group_input_chunk(inputs: List[GrouperInput],
+                       grouper: Optional[KDRGPreGrouper] = None,
+                       detail_level: DetailLevel = DetailLevel.FULL,
+                       rules: Optional[CompiledGrouperRules] = None) -> List[GrouperResult]:
+    """GrouperInput 청크 그루핑"""
+    grouper = grouper or _worker_grouper
+    return [grouper.group(inp, detail_level, rules) for inp in inputs]
+
+
+def _group_frame_chunk(frame: pd.DataFrame,
+                       detail_level: DetailLevel = DetailLevel.FULL) -> pd.DataFrame:
+    """DataFrame 청크 그루핑"""
+    return _worker_grouper._group_frame(frame, detail_level)
+
+
+def _group_row_chunk(rows: List[ClaimRow],
+                     grouper: Optional[KDRGPreGrouper] = None,
+                     detail_level: DetailLevel = DetailLevel.FULL,
+                     rules: Optional[CompiledGrouperRules] = None) -> List[Tuple[Optional[GrouperResult], Optional[str]]]:
+    """입력 행 튜플 청크 그루핑 (행별 오류 수집)"""
+    grouper = grouper or _worker_grouper
+    group_row = grouper.group_row
+    results = []
+    for row in rows:
+        try:
+            results.append((group_row(row, detail_level, rules), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+
+def _group_record_chunk(records: List[Dict[str, Any]],
+                        grouper: Optional[KDRGPreGrouper] = None,
+                        detail_level: DetailLevel = DetailLevel.FULL,
+                        rules: Optional[CompiledGrouperRules] = None) -> List[Tuple[Optional[GrouperResult], Optional[str]]]:
+    """딕셔너리 청크 그루핑 (행별 오류 수집)"""
+    grouper = grouper or _worker_grouper
+    results = []
+    for record in records:
+        try:
+            results.append((grouper.group_from_dict(record, detail_level, rules), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+
 # 서비스 인스턴스
 pre_grouper = KDRGPreGrouper()
@@ -0,0 +1,282 @@
+"""
+KDRG 코드표 바이너리 저장소
+- data/kdrg_v47_codes.csv, kdrg_v47_extracted.csv를 고정폭 레코드 바이너리 파일로 컴파일
+- KDRG 코드 정렬 + 이진 탐색 조회, 파일은 읽기 전용 memmap으로 열어 파싱 비용 없음
+- 여러 워커 프로세스가 OS 페이지 캐시를 공유
+
+파일 구조:
+    [헤더 96B] magic(8) | 포맷 버전(u4) | 레코드 수(u4) | 이름 영역 크기(u4) | 코드표 버전(16)
+               | 내용 SHA-256(32, 레코드 + 이름 영역) | 예약
+    [레코드]   RECORD_DTYPE × 레코드 수 (kdrg_code 오름차순)
+    [이름 영역] UTF-8 문자열 (레코드의 offset/length로 참조)
+
+빌드:
+    python -m services.rule_store [출력 경로]
+"""
+
+import csv
+import hashlib
+import math
+import logging
+import os
+import struct
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'KDRGRS\x00\x00'
+FORMAT_VERSION = 2
+HEADER_SIZE = 96
+_HEADER = struct.Struct('<8sIII16s32s')
+
+RECORD_DTYPE = np.dtype([
+    ('kdrg_code', 'S5'),
+    ('aadrg_code', 'S4'),
+    ('partition', 'S1'),  # S: 외과계, M: 내과계
+    ('cc_level', 'u1'),
+    ('relative_weight', '<f8'),
+    ('mean_los', '<f8'),  # 산술평균 재원일수
+    ('name_offset', '<u4'),
+    ('name_length', '<u4'),
+    ('aadrg_name_offset', '<u4'),
+    ('aadrg_name_length', '<u4'),
+])
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = BACKEND_DIR / 'data'
+SOURCE_CODES = DATA_DIR / 'kdrg_v47_codes.csv'
+SOURCE_EXTRACTED = DATA_DIR / 'kdrg_v47_extracted.csv'
+TABLE_VERSION = 'V4.7'
+
+
+def resolve_store_path(path: str) -> str:
+    """저장소 경로 (상대 경로는 실행 디렉토리가 아닌 backend 디렉토리 기준, 워커가 같은 파일을 매핑)"""
+    return str(Path(path) if os.path.isabs(path) else (BACKEND_DIR / path).resolve())
+
+
+def los_bounds(mean_los: float) -> Tuple[int, int]:
+    """산술평균 재원일수 → 재원일수 기준 (하한, 상한), 상한은 평균의 2배"""
+    return 1, max(1, math.ceil(mean_los * 2))
+
+
+class KDRGCodeRecord(NamedTuple):
+    """코드표 레코드"""
+    kdrg_code: str
+    aadrg_code: str
+    name: str
+    aadrg_name: str
+    partition: str
+    cc_level: int
+    relative_weight: float
+    mean_los: float
+
+
+def _to_float(value: Optional[str]) -> float:
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def build_rule_store(output_path: str,
+                     codes_csv: Path = SOURCE_CODES,
+                     extracted_csv: Path = SOURCE_EXTRACTED,
+                     table_version: str = TABLE_VERSION) -> int:
+    """CSV 코드표를 바이너리 저장소로 컴파일
+
+    extracted(상세) 행이 codes(목록) 행보다 우선합니다.
+    결과 파일은 임시 파일에 기록한 뒤 원자적으로 교체합니다.
+
+    Returns:
+        레코드 수
+    """
+    rows: Dict[str, Dict[str, str]] = {}
+    with open(codes_csv, encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            code = (row.get('kdrg_code') or '').strip().upper()
+            if code:
+                rows[code] = {'aadrg_code': row.get('aadrg_code') or '', 'kdrg_name': row.get('kdrg_name') or ''}
+    with open(extracted_csv, encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            code = (row.get('kdrg_code') or '').strip().upper()
+            if code:
+                rows[code] = row
+
+    codes = sorted(rows)
+    records = np.zeros(len(codes), dtype=RECORD_DTYPE)
+    names = bytearray()
+    name_ids: Dict[str, tuple] = {}
+
+    def add_name(text: str) -> tuple:
+        ref = name_ids.get(text)
+        if ref is None:
+            encoded = text.encode('utf-8')
+            ref = (len(names), len(encoded))
+            names.extend(encoded)
+            name_ids[text] = ref
+        return ref
+
+    for i, code in enumerate(codes):
+        row = rows[code]
+        rec = records[i]
+        rec['kdrg_code'] = code.encode('ascii')
+        rec['aadrg_code'] = (row.get('aadrg_code') or code[:4]).strip().upper().encode('ascii')
+        rec['partition'] = (row.get('partition') or '').strip().upper()[:1].encode('ascii')
+        rec['cc_level'] = int(_to_float(row.get('cc_level')))
+        rec['relative_weight'] = _to_float(row.get('relative_weight'))
+        rec['mean_los'] = _to_float(row.get('arithmetic_mean_los'))
+        rec['name_offset'], rec['name_length'] = add_name((row.get('kdrg_name') or '').strip())
+        rec['aadrg_name_offset'], rec['aadrg_name_length'] = add_name((row.get('aadrg_name') or '').strip())
+
+    digest = hashlib.sha256(records.tobytes())
+    digest.update(names)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(records), len(names), table_version.encode('utf-8')[:16],
+                          digest.digest())
+    directory = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header.ljust(HEADER_SIZE, b'\x00'))
+            f.write(records.tobytes())
+            f.write(bytes(names))
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return len(records)
+
+
+class KDRGRuleStore:
+    """memmap 기반 KDRG 코드표 조회 (읽기 전용)
+
+    table_version은 코드표 이름(예: V4.7)이고, 내용 변경(상대가치점수, 재원일수 등)은 content_digest로 구분합니다.
+    """
+
+    __slots__ = ('path', 'table_version', 'content_digest', '_records', '_codes', '_names')
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"코드표 파일이 손상되었습니다: {path}")
+        magic, version, count, names_size, table_version, digest = _HEADER.unpack_from(header)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 코드표 파일 형식입니다: {path}")
+
+        self.path = path
+        self.table_version = table_version.rstrip(b'\x00').decode('utf-8')
+        self.content_digest = digest.hex()
+        self._records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+        self._codes = self._records['kdrg_code']
+        self._names = np.memmap(
+            path, dtype=np.uint8, mode='r',
+            offset=HEADER_SIZE + count * RECORD_DTYPE.itemsize, shape=(names_size,),
+        ) if names_size else np.zeros(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _index(self, kdrg_code: str) -> int:
+        """KDRG 코드의 레코드 위치 (없으면 -1)"""
+        try:
+            key = kdrg_code.upper().encode('ascii')
+        except UnicodeEncodeError:
+            return -1
+        pos = int(np.searchsorted(self._codes, key))
+        if pos < len(self._codes) and self._codes[pos] == key:
+            return pos
+        return -1
+
+    def _name(self, offset: int, length: int) -> str:
+        return bytes(self._names[offset:offset + length]).decode('utf-8')
+
+    def __contains__(self, kdrg_code: str) -> bool:
+        return self._index(kdrg_code) >= 0
+
+    def get(self, kdrg_code: str) -> Optional[KDRGCodeRecord]:
+        """KDRG 코드 레코드 조회"""
+        pos = self._index(kdrg_code)
+        if pos < 0:
+            return None
+        rec = self._records[pos]
+        return KDRGCodeRecord(
+            kdrg_code=rec['kdrg_code'].decode('ascii'),
+            aadrg_code=rec['aadrg_code'].decode('ascii'),
+            name=self._name(int(rec['name_offset']), int(rec['name_length'])),
+            aadrg_name=self._name(int(rec['aadrg_name_offset']), int(rec['aadrg_name_length'])),
+            partition=rec['partition'].decode('ascii'),
+            cc_level=int(rec['cc_level']),
+            relative_weight=float(rec['relative_weight']),
+            mean_los=float(rec['mean_los']),
+        )
+
+    def relative_weight(self, kdrg_code: str) -> Optional[float]:
+        """상대가치점수 (코드표에 값이 없거나 0이면 None)"""
+        pos = self._index(kdrg_code)
+        if pos < 0:
+            return None
+        weight = float(self._records[pos]['relative_weight'])
+        return weight if weight > 0 else None
+
+    def mean_los(self, kdrg_code: str) -> Optional[float]:
+        """산술평균 재원일수 (코드표에 값이 없거나 0이면 None)"""
+        pos = self._index(kdrg_code)
+        if pos < 0:
+            return None
+        value = float(self._records[pos]['mean_los'])
+        return value if value > 0 else None
+
+
+def _is_stale(path: str) -> bool:
+    """빌드 파일이 없거나, 이전 포맷이거나, 원본 CSV보다 오래되었는지"""
+    if not os.path.exists(path):
+        return True
+    with open(path, 'rb') as f:
+        header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size or _HEADER.unpack_from(header)[:2] != (MAGIC, FORMAT_VERSION):
+        return True
+    built = os.path.getmtime(path)
+    return any(src.exists() and src.stat().st_mtime > built for src in (SOURCE_CODES, SOURCE_EXTRACTED))
+
+
+_store: Optional[KDRGRuleStore] = None
+_store_lock = threading.Lock()
+
+
+def get_rule_store() -> Optional[KDRGRuleStore]:
+    """공유 코드표 저장소 (필요 시 빌드 후 memmap으로 열기)
+
+    원본 CSV가 없거나 빌드/열기에 실패하면 None을 반환하고 하드코딩된 기준값을 사용합니다.
+    """
+    global _store
+    if _store is not None:
+        return _store
+    with _store_lock:
+        if _store is None:
+            path = resolve_store_path(settings.RULE_STORE_PATH)
+            try:
+                if _is_stale(path):
+                    if not (SOURCE_CODES.exists() and SOURCE_EXTRACTED.exists()):
+                        return None
+                    build_rule_store(path)
+                _store = KDRGRuleStore(path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"KDRG 코드표 저장소를 열 수 없습니다: {e}")
+                return None
+    return _store
+
+
+if __name__ == '__main__':
+    target = sys.argv[1] if len(sys.argv) > 1 else resolve_store_path(settings.RULE_STORE_PATH)
+    count = build_rule_store(target)
+    print(f"{target}: {count}건 ({TABLE_VERSION})")
@@ -0,0 +1,150 @@
+"""
+스프레드시트(Excel) 스트리밍 읽기
+- openpyxl read-only 행 반복으로 읽어 청크 DataFrame(EXCEL_CHUNK_ROWS행)으로 전달
+- 시트 전체를 메모리에 올리지 않으며 첫 청크는 시트를 끝까지 읽기 전에 전달
+- 첫 행은 헤더, 중간의 빈 행은 유지하고 끝의 빈 행은 제외 (행 번호는 pd.read_excel과 동일)
+- 정수 값인 실수(40.0)는 정수로 변환 (pd.read_excel과 동일)
+- .xls(BIFF)는 openpyxl이 지원하지 않아 pd.read_excel로 읽은 뒤 청크로 나눔
+"""
+
+import io
+from typing import Any, BinaryIO, Iterator, List, Optional, Sequence, Union
+
+import openpyxl
+import pandas as pd
+
+from config import settings
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+
+Source = Union[str, bytes, BinaryIO]
+
+
+def is_excel(filename: str) -> bool:
+    return filename.lower().endswith(EXCEL_EXTENSIONS)
+
+
+def _open(source: Source) -> Union[str, BinaryIO]:
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _is_xls(source: Source, filename: Optional[str]) -> bool:
+    name = filename or (source if isinstance(source, str) else '')
+    return name.lower().endswith('.xls')
+
+
+def _header(values: Sequence[Any]) -> List[str]:
+    """헤더 행 → 컬럼명 (빈 칸은 'Unnamed: i', 중복은 '이름.1' 형식)"""
+    names: List[str] = []
+    seen = {}
+    for i, value in enumerate(values):
+        name = f"Unnamed: {i}" if value is None or value == '' else str(value)
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        names.append(f"{name}.{count}" if count else name)
+    return names
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _frame(rows: List[List[Any]], header: List[str], start: int) -> pd.DataFrame:
+    frame = pd.DataFrame(rows, columns=header).infer_objects()
+    frame.index = pd.RangeIndex(start, start + len(rows))
+    return frame
+
+
+def iter_excel(source: Source, filename: Optional[str] = None, sheet_name: Optional[str] = None,
+               chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """Excel 시트를 청크 DataFrame으로 읽기 (인덱스는 시트 전체 기준 데이터 행 번호)
+
+    Args:
+        source: 파일 경로, 바이트 또는 seek 가능한 파일 객체
+        filename: 형식 판별용 파일명 (source가 경로가 아닐 때)
+        sheet_name: 시트 이름 (None이면 첫 번째 시트)
+        chunk_rows: 청크 행 수 (None이면 EXCEL_CHUNK_ROWS)
+
+    Raises:
+        KeyError: 시트 없음
+    """
+    chunk_rows = max(chunk_rows or settings.EXCEL_CHUNK_ROWS, 1)
+    if _is_xls(source, filename):
+        frame = pd.read_excel(_open(source), sheet_name=sheet_name or 0)
+        for start in range(0, max(len(frame), 1), chunk_rows):
+            yield frame.iloc[start:start + chunk_rows]
+        return
+
+    workbook = openpyxl.load_workbook(_open(source), read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        # 저장된 시트 크기 정보가 틀린 파일이 있어 실제 행 끝까지 읽음
+        sheet.reset_dimensions()
+        rows = sheet.iter_rows(values_only=True)
+
+        header = None
+        for values in rows:
+            if any(v is not None for v in values):
+                header = _header(values)
+                break
+        if header is None:
+            return
+
+        width = len(header)
+        chunk: List[List[Any]] = []
+        blank = 0
+        start = 0
+        for values in rows:
+            if all(v is None for v in values):
+                blank += 1
+                continue
+            # 빈 행은 뒤에 데이터 행이 있을 때만 포함
+            chunk.extend([None] * width for _ in range(blank))
+            blank = 0
+            row = [_cell(v) for v in values[:width]]
+            row.extend([None] * (width - len(row)))
+            chunk.append(row)
+            while len(chunk) >= chunk_rows:
+                yield _frame(chunk[:chunk_rows], header, start)
+                start += chunk_rows
+                chunk = chunk[chunk_rows:]
+        if chunk or start == 0:
+            yield _frame(chunk, header, start)
+    finally:
+        workbook.close()
+
+
+def read_excel(source: Source, filename: Optional[str] = None, sheet_name: Optional[str] = None,
+               max_rows: Optional[int] = None) -> pd.DataFrame:
+    """Excel 시트 전체를 DataFrame으로 읽기 (iter_excel 청크 연결)
+
+    Args:
+        max_rows: 이 행 수를 넘으면 더 읽지 않음 (반환 행 수로 초과 여부 확인)
+    """
+    chunks = []
+    total = 0
+    reader = iter_excel(source, filename, sheet_name)
+    try:
+        for chunk in reader:
+            chunks.append(chunk)
+            total += len(chunk)
+            if max_rows is not None and total > max_rows:
+                break
+    finally:
+        reader.close()
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+
+
+def sheet_names(source: Source, filename: Optional[str] = None) -> List[str]:
+    """시트 이름 목록 (셀 데이터는 읽지 않음)"""
+    if _is_xls(source, filename):
+        return pd.ExcelFile(_open(source)).sheet_names
+    workbook = openpyxl.load_workbook(_open(source), read_only=True, keep_links=False)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
@@ -0,0 +1,133 @@
+"""
+SQLite(aiosqlite) 연결 풀
+- 쓰기 연결 1개 + 읽기 연결 N개를 앱 수명 동안 유지 (요청마다 연결/스레드 생성 안 함)
+- WAL 모드: 쓰기 중에도 읽기 연결은 막히지 않음, 쓰기는 잠금으로 직렬화
+- 연결별 문장 캐시(cached_statements)로 같은 SQL은 다시 컴파일하지 않음
+- 연결은 연 이벤트 루프에서만 사용 (다른 루프에서 호출되면 호출 측에서 다시 열기)
+- incremental_vacuum: 새 DB를 auto_vacuum=INCREMENTAL로 생성 (삭제로 생긴 빈 페이지를 나눠서 파일에서 반납 가능)
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Set
+
+import aiosqlite
+
+
+class SQLitePool:
+    """aiosqlite 연결 풀 (쓰기 1 + 읽기 readers개)"""
+
+    def __init__(self, db_path: str, readers: int = 4, cache_mb: int = 16,
+                 busy_timeout_ms: int = 5000, cached_statements: int = 256, incremental_vacuum: bool = False):
+        self.db_path = db_path
+        self.readers = max(readers, 1)
+        self.cache_mb = cache_mb
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self.incremental_vacuum = incremental_vacuum
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._connections: List[aiosqlite.Connection] = []
+        self._stale: Set[aiosqlite.Connection] = set()
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+
+    def bound_to_running_loop(self) -> bool:
+        """현재 실행 중인 이벤트 루프에서 연 풀인지 여부"""
+        try:
+            return self._loop is asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+
+    async def _connect(self) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(self.db_path, cached_statements=self.cached_statements)
+        self._connections.append(conn)
+        conn.row_factory = aiosqlite.Row
+        await conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        await conn.execute("PRAGMA synchronous = NORMAL")
+        await conn.execute(f"PRAGMA cache_size = {-int(self.cache_mb) * 1024}")
+        await conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    async def open(self):
+        """연결 열기 (이미 열려 있으면 무시)"""
+        if self.is_open:
+            return
+        if self.db_path and self.db_path != ':memory:':
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        try:
+            self._writer = await self._connect()
+            if self.incremental_vacuum:
+                # auto_vacuum은 테이블이 없는 새 DB에서 journal_mode 설정 전에만 바로 반영됨 (기존 DB는 VACUUM으로 변환)
+                await self._writer.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            # journal_mode는 DB 파일에 기록되므로 쓰기 연결에서 한 번만 설정
+            async with self._writer.execute("PRAGMA journal_mode = WAL") as cursor:
+                await cursor.fetchone()
+            self._idle = asyncio.Queue()
+            for _ in range(self.readers):
+                self._idle.put_nowait(await self._connect())
+        except BaseException:
+            await self.close()
+            raise
+        self._write_lock = asyncio.Lock()
+        self._loop = asyncio.get_running_loop()
+
+    async def close(self):
+        """모든 연결 닫기 (WAL 체크포인트는 마지막 연결이 닫힐 때 SQLite가 수행)"""
+        connections, self._connections = self._connections, []
+        self._stale = set()
+        self._writer = None
+        self._idle = None
+        self._write_lock = None
+        self._loop = None
+        for conn in connections:
+            try:
+                await conn.close()
+            except Exception:
+                pass
+
+    async def _reopen(self, conn: aiosqlite.Connection) -> aiosqlite.Connection:
+        self._stale.discard(conn)
+        if conn in self._connections:
+            self._connections.remove(conn)
+        try:
+            await conn.close()
+        except Exception:
+            pass
+        return await self._connect()
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[aiosqlite.Connection]:
+        """읽기 연결 대여 (모두 사용 중이면 반납될 때까지 대기)
+
+        조회 결과는 끝까지 읽어야 함 (읽다 만 커서가 남으면 그 연결은 이전 스냅샷을 계속 봄)
+        예외/취소로 끝난 연결은 끝나지 않은 문장이 남았을 수 있어 다음 대여 때 새로 엶
+        """
+        idle = self._idle
+        conn = await idle.get()
+        try:
+            if conn in self._stale:
+                conn = await self._reopen(conn)
+            yield conn
+        except BaseException:
+            self._stale.add(conn)
+            raise
+        finally:
+            idle.put_nowait(conn)
+
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[aiosqlite.Connection]:
+        """쓰기 연결 (쓰기 잠금 보유, 정상 종료 시 commit, 예외 시 rollback)"""
+        async with self._write_lock:
+            conn = self._writer
+            try:
+                yield conn
+            except BaseException:
+                await conn.rollback()
+                raise
+            await conn.commit()
@@ -0,0 +1,25 @@
+from benchmarks.claim_generator import generate_claims, generate_claims_frame
+from services.pregrouper_service import KDRGPreGrouper
+
+
+def test_generator_is_deterministic_per_seed():
+    first = list(generate_claims(500, seed=7))
+
+    assert first == list(generate_claims(500, seed=7))
+    assert first != list(generate_claims(500, seed=8))
+    assert generate_claims_frame(500, seed=7).to_dict('records') == first
+
+
+def test_generator_covers_every_mdc_and_groups_cleanly():
+    grouper = KDRGPreGrouper()
+    claims = list(generate_claims(5000, seed=1))
+
+    for mdc, (_, prefixes) in KDRGPreGrouper.MDC_DEFINITIONS.items():
+        if prefixes:
+            assert any(
+                c['main_diagnosis'].replace('.', '').startswith(p.replace('.', '')) for c in claims for p in prefixes
+            ), mdc
+
+    batch, errors = grouper.group_records_batch(claims, workers=1)
+    assert errors == []
+    assert len(set(batch.column('drg_type'))) == len(KDRGPreGrouper.DRG7_SURGERY_CODES) + 1
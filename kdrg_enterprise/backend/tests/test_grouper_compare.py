@@ -0,0 +1,112 @@
+import sqlite3
+from dataclasses import replace
+
+import pandas as pd
+import pytest
+
+from services import pregrouper_service
+from services.grouper_compare import VersionComparison
+from services.grouper_rulesets import save_rule_set
+from services.kdrg_codebook_service import KDRGCodebookService
+from services.pregrouper_service import KDRGPreGrouper
+
+CLAIMS = pd.DataFrame([
+    {
+        "patient_id": "P1", "age": 40, "sex": "M", "admission_date": "2024-01-01",
+        "discharge_date": "2024-01-03", "los": 2, "main_diagnosis": "J35.0",
+        "sub_diagnoses": [], "procedures": ["Q2161"], "claim_id": "C1",
+    },
+    {
+        "patient_id": "P2", "age": 75, "sex": "F", "admission_date": "2024-01-01",
+        "discharge_date": "2024-01-05", "los": 4, "main_diagnosis": "K80.2",
+        "sub_diagnoses": ["I10", "E11"], "procedures": ["Q7651"], "claim_id": "C2",
+    },
+])
+
+
+@pytest.fixture
+def codebook(tmp_path, monkeypatch):
+    service = KDRGCodebookService(str(tmp_path / "kdrg.db"))
+    monkeypatch.setattr(pregrouper_service, "codebook_service", service)
+    return service
+
+
+def test_compare_reports_changed_claims_and_mdc_totals(tmp_path, monkeypatch, codebook):
+    from config import settings
+
+    monkeypatch.setattr(settings, "GROUPER_RULES_DIR", str(tmp_path))
+    builtin = KDRGPreGrouper.builtin_rule_set()
+    save_rule_set(replace(builtin, version="2025.1", base_rate=builtin.base_rate + 1000))
+    save_rule_set(replace(builtin, version="mapped", kdrg_code_map={"D121": "D162"}))
+    codebook.save_codebook_entries([
+        {"kdrg_code": "D1620", "kdrg_name": "단순 편도 및 아데노이드 수술", "aadrg_code": "D162",
+         "relative_weight": 0.9, "version": "V4.7"},
+    ])
+
+    with VersionComparison(["builtin", "2025.1", "mapped@V4.7"], KDRGPreGrouper(cache_size=0)) as comparison:
+        comparison.add_frame(CLAIMS, workers=1)
+        changes = comparison.changes()
+        totals = comparison.totals()
+
+    assert comparison.changed_count == 2
+    assert list(changes["kdrg_changed"]) == [False, False]
+    assert list(changes["amount_delta_1"]) == list(changes["relative_weight_0"] * 1000)
+    # 편도(D121 → V4.7 D162)만 코드북 상대가치점수로 바뀜
+    assert list(changes["weight_delta_2"]) == [round(0.9 - changes["relative_weight_0"][0], 4), 0.0]
+    assert totals["claims"] == 2
+    assert [v["version"] for v in totals["versions"]] == ["builtin", "2025.1", "mapped@V4.7"]
+    assert {row["mdc"]: row["claims"] for row in comparison.mdc_summary()} == {"C": 1, "F": 1}
+    assert "kdrg[2025.1]" in comparison.labeled(changes).columns
+
+
+def test_compare_rejects_unknown_versions(tmp_path, monkeypatch, codebook):
+    from config import settings
+
+    monkeypatch.setattr(settings, "GROUPER_RULES_DIR", str(tmp_path))
+    save_rule_set(replace(KDRGPreGrouper.builtin_rule_set(), version="mapped", kdrg_code_map={"D121": "D162"}))
+    with pytest.raises(ValueError):
+        VersionComparison(["builtin"])
+    with pytest.raises(ValueError, match="V9.9"):
+        VersionComparison(["builtin", "mapped@V9.9"])
+    with pytest.raises(FileNotFoundError):
+        VersionComparison(["builtin", "missing"])
+
+
+def test_compare_rejects_codebook_weights_without_code_map(tmp_path, monkeypatch, codebook):
+    from config import settings
+
+    monkeypatch.setattr(settings, "GROUPER_RULES_DIR", str(tmp_path))
+    codebook.save_codebook_entries([
+        {"kdrg_code": "D1210", "kdrg_name": "악관절 수술", "aadrg_code": "D121", "relative_weight": 0.9,
+         "version": "V4.7"},
+    ])
+    # 내장 규칙의 D1210(편도)은 V4.7 D1210(악관절 수술)과 다른 DRG
+    with pytest.raises(ValueError, match="kdrg_code_map"):
+        VersionComparison(["builtin", "builtin@V4.7"])
+
+
+def test_codebook_migrates_to_per_version_rows(tmp_path):
+    db_path = tmp_path / "kdrg.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE kdrg_codebook (id INTEGER PRIMARY KEY AUTOINCREMENT, kdrg_code TEXT NOT NULL UNIQUE, "
+            "kdrg_name TEXT NOT NULL, aadrg_code TEXT, aadrg_name TEXT, mdc_code TEXT, mdc_name TEXT, "
+            "cc_level TEXT, relative_weight REAL DEFAULT 0, geometric_mean_los REAL DEFAULT 0, "
+            "arithmetic_mean_los REAL DEFAULT 0, low_trim INTEGER DEFAULT 0, high_trim INTEGER DEFAULT 0, "
+            "version TEXT DEFAULT 'V4.6', synced_at TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP, "
+            "updated_at TEXT DEFAULT CURRENT_TIMESTAMP)"
+        )
+        conn.execute("INSERT INTO kdrg_codebook (kdrg_code, kdrg_name, relative_weight) VALUES ('D1210', 'x', 0.8)")
+
+    service = KDRGCodebookService(str(db_path))
+    service.save_codebook_entries([
+        {"kdrg_code": "D1210", "kdrg_name": "x", "aadrg_code": "D121", "relative_weight": 0.9, "version": "V4.7"},
+    ])
+
+    assert service.get_relative_weights("V4.6") == {"D1210": 0.8}
+    assert service.get_relative_weights("V4.7") == {"D1210": 0.9}
+    assert sorted(v["version"] for v in service.list_versions()) == ["V4.6", "V4.7"]
+
+    status = service.get_sync_status()
+    assert status["total_codes"] == 1
+    assert sorted((v["version"], v["total_codes"]) for v in status["versions"]) == [("V4.6", 1), ("V4.7", 1)]
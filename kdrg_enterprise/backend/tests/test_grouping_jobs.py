@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.claim_generator import generate_claims
+from services.grouping_jobs import GroupingJobManager, JobStatus
+from services.grouping_store import GroupingStore
+from services.pregrouper_service import pre_grouper
+
+
+@pytest.fixture
+def job_store(tmp_path, monkeypatch):
+    from config import settings
+
+    monkeypatch.setattr(settings, "GROUPING_JOB_CHUNK_SIZE", 40)
+    store = GroupingStore(str(tmp_path / "jobs.db"))
+    yield store
+    asyncio.run(store.close())
+
+
+def _claims(count):
+    claims = list(generate_claims(count, seed=4))
+    claims[5] = dict(claims[5], age="unknown")
+    return claims, [{"index": i, "patient_id": c["patient_id"]} for i, c in enumerate(claims)]
+
+
+def test_job_resumes_from_last_checkpoint(job_store):
+    claims, refs = _claims(100)
+    expected, failed = pre_grouper.group_records_batch(claims, workers=1)
+
+    async def scenario():
+        first = GroupingJobManager(job_store)
+        status = await first.submit(claims, refs, "batch")
+        await first.stop()  # 서버 종료 (대기열 유실)
+        await first.run_job(status["job_id"], max_chunks=1)  # 첫 청크만 저장된 상태
+
+        partial = await first.get_status(status["job_id"])
+        assert (partial["status"], partial["processed"], partial["chunks_done"]) == ("running", 40, 1)
+
+        restarted = GroupingJobManager(job_store)
+        await restarted.start()  # 재시작 시 미완료 작업 자동 재개
+        await restarted.join()
+        done = await restarted.get_status(status["job_id"])
+        page = await restarted.get_results(status["job_id"], 30, 50)
+        everything = await restarted.get_results(status["job_id"], 0, 1000)
+        await restarted.stop()
+        return done, page, everything
+
+    done, page, everything = asyncio.run(scenario())
+
+    assert done["status"] == JobStatus.COMPLETED.value
+    assert (done["processed"], done["success_count"], done["error_count"]) == (100, 99, 1)
+    assert done["errors"][0]["index"] == failed[0][0] == 5
+    assert everything == json.loads(expected.to_json())
+    assert page == everything[30:80]
+
+
+def test_job_cancel_stops_at_chunk_boundary(job_store):
+    claims, refs = _claims(100)
+
+    async def scenario():
+        manager = GroupingJobManager(job_store)
+        status = await manager.submit(claims, refs, "batch")
+        await manager.stop()
+        await manager.run_job(status["job_id"], max_chunks=1)
+        await manager.cancel(status["job_id"])
+        await manager.run_job(status["job_id"])
+        return await manager.get_status(status["job_id"]), await manager.get_results(status["job_id"], 0, 1000)
+
+    cancelled, results = asyncio.run(scenario())
+
+    assert cancelled["status"] == JobStatus.CANCELLED.value
+    assert cancelled["chunks_done"] == 1
+    assert len(results) == cancelled["success_count"] == 39
+
+
+def test_cancel_during_last_chunk_is_not_reported_as_completed(job_store, monkeypatch):
+    claims, refs = _claims(100)
+    commit_job_chunk = job_store.commit_job_chunk
+
+    async def commit_then_cancel(job_id, chunk_index, *args):
+        committed = await commit_job_chunk(job_id, chunk_index, *args)
+        if chunk_index == 2:  # 마지막 청크 처리 중 취소 요청
+            await job_store.request_job_cancel(job_id)
+        return committed
+
+    monkeypatch.setattr(job_store, "commit_job_chunk", commit_then_cancel)
+
+    async def scenario():
+        manager = GroupingJobManager(job_store)
+        status = await manager.submit(claims, refs, "batch")
+        await manager.stop()
+        await manager.run_job(status["job_id"])
+        return await manager.get_status(status["job_id"]), await job_store.get_history(status["job_id"])
+
+    cancelled, history = asyncio.run(scenario())
+
+    assert cancelled["status"] == JobStatus.CANCELLED.value
+    assert cancelled["chunks_done"] == 3 and cancelled["cancel_requested"]
+    assert history is None
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+from benchmarks.claim_generator import generate_claims
+from config import settings
+from services.grouping_store import HISTORY_SCHEMA_VERSION, GroupingStore
+from services.payload_codec import PayloadCodec
+from services.pregrouper_service import pre_grouper
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = GroupingStore(str(tmp_path / "history.db"))
+    yield store
+    asyncio.run(store.close())
+
+
+def _batch_payload(history_id, results):
+    return {
+        "history_id": history_id,
+        "created_at": "2024-01-01T00:00:00",
+        "type": "batch",
+        "total": len(results),
+        "success_count": len(results),
+        "error_count": 0,
+        "results": results,
+        "errors": [],
+    }
+
+
+def test_history_results_are_paged_and_statistics_follow_saves(store):
+    batch, _ = pre_grouper.group_records_batch(list(generate_claims(30, seed=2)), workers=1)
+    single = pre_grouper.group_from_dict(next(iter(generate_claims(1, seed=3))))
+    expected = json.loads(batch.to_json())
+
+    async def scenario():
+        await store.save_history("batch_1", "batch", _batch_payload("batch_1", batch))
+        for _ in range(2):  # 같은 ID로 다시 저장하면 통계는 한 번만 반영
+            await store.save_history("grp_1", "single", {
+                "created_at": "2024-01-02T00:00:00", "input": {"patient_id": "P1"}, "result": single,
+            })
+        await store.save_history("upload_1", "upload", {
+            "created_at": "2024-01-03T00:00:00", "streamed": True, "total": 5, "success_count": 5,
+            "drg_statistics": {"포괄수가": {"count": 5, "total_amount": 1000.0}},
+        })
+        page = await store.get_history("batch_1", offset=10, limit=5)
+        whole = await store.get_history("batch_1")
+        one = await store.get_history("grp_1")
+        listed = await store.list_history()
+        stats = await store.get_statistics()
+        daily = await store.get_daily_statistics("2024-01-02")
+        deleted = await store.delete_history("batch_1")
+        after = await store.get_statistics()
+        rebuilt = await store.rebuild_statistics()
+        return page, whole, one, listed, stats, daily, deleted, after, rebuilt
+
+    page, whole, one, listed, stats, daily, deleted, after, rebuilt = asyncio.run(scenario())
+
+    assert page["result_count"] == 30 and page["results"] == expected[10:15]
+    assert whole["results"] == expected and whole["errors"] == []
+    assert one["result"]["kdrg"] == single.kdrg and one["input"] == {"patient_id": "P1"}
+    assert [h["history_id"] for h in listed["history"]] == ["upload_1", "grp_1", "batch_1"]
+    assert listed["history"][1]["patient_id"] == "P1"
+
+    counts = {}
+    for r in expected + [one["result"]]:
+        counts[r["drg_type"]] = counts.get(r["drg_type"], 0) + 1
+    counts["포괄수가"] = counts.get("포괄수가", 0) + 5
+    assert stats["by_type"] == {"single": 1, "batch": 1, "upload": 1}
+    assert stats["by_drg_type"] == counts
+    assert stats["total_estimated_amount"] == pytest.approx(
+        sum(r["estimated_amount"] for r in expected) + single.estimated_amount + 1000.0
+    )
+    assert [day["date"] for day in daily["days"]] == ["2024-01-02", "2024-01-03"]
+    assert daily["days"][0]["by_drg_type"] == {single.drg_type: 1}
+    assert deleted and after["total_groupings"] == 2
+    assert rebuilt["by_type"] == after["by_type"] and rebuilt["by_drg_type"] == after["by_drg_type"]
+    assert rebuilt["total_estimated_amount"] == pytest.approx(after["total_estimated_amount"])
+
+
+def test_legacy_payload_history_is_migrated(store):
+    batch, _ = pre_grouper.group_records_batch(list(generate_claims(3, seed=5)), workers=1)
+    results = json.loads(batch.to_json())
+    with sqlite3.connect(store.db_path) as conn:
+        conn.execute(
+            "CREATE TABLE grouping_history (history_id TEXT PRIMARY KEY, created_at TEXT, type TEXT, payload_json TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO grouping_history VALUES (?, ?, ?, ?)",
+            ("batch_old", "2023-12-31T00:00:00", "batch",
+             json.dumps(_batch_payload("batch_old", results), ensure_ascii=False)),
+        )
+
+    async def scenario():
+        return await store.get_history("batch_old", limit=2), await store.get_statistics()
+
+    history, stats = asyncio.run(scenario())
+
+    assert history["result_count"] == 3 and history["results"] == results[:2]
+    assert sum(stats["by_drg_type"].values()) == 3
+    with sqlite3.connect(store.db_path) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == HISTORY_SCHEMA_VERSION
+        header = json.loads(PayloadCodec().decompress(conn.execute("SELECT payload_json FROM grouping_history").fetchone()[0]))
+    assert "results" not in header
+
+
+def test_results_are_compressed_with_a_shared_dictionary(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_DICT_MIN_ROWS", 20)
+    batch, _ = pre_grouper.group_records_batch(list(generate_claims(40, seed=7)), workers=1)
+    expected = json.loads(batch.to_json())
+
+    async def scenario():
+        await store.save_history("small", "batch", _batch_payload("small", expected[:5]))  # 사전 없이 압축
+        await store.save_history("large", "batch", _batch_payload("large", batch))  # 사전 생성 후 압축
+        trained = await store.train_dictionary()
+        await store.save_history("after", "batch", _batch_payload("after", batch))
+        await store.close()
+        # 다른 프로세스처럼 사전을 모르는 저장소에서 읽기
+        other = GroupingStore(store.db_path)
+        try:
+            return trained, [await other.get_history(i) for i in ("small", "large", "after")]
+        finally:
+            await other.close()
+
+    trained, histories = asyncio.run(scenario())
+
+    assert trained["dictionary_id"] == 2
+    assert [h["results"] for h in histories] == [expected[:5], expected, expected]
+    with sqlite3.connect(store.db_path) as conn:
+        rows = conn.execute("SELECT history_id, result_json FROM grouping_results WHERE seq = 0").fetchall()
+    assert {history_id: value[1:3] for history_id, value in rows} == {
+        "small": b"\x00\x00", "large": b"\x00\x01", "after": b"\x00\x02",
+    }
+    raw = sum(len(json.dumps(r, ensure_ascii=False).encode()) for r in expected)
+    with sqlite3.connect(store.db_path) as conn:
+        stored = conn.execute("SELECT SUM(LENGTH(result_json)) FROM grouping_results WHERE history_id = 'large'")
+        assert stored.fetchone()[0] < raw / 4
+
+
+def test_old_histories_are_archived_to_parquet_and_space_is_reclaimed(store, tmp_path):
+    import pyarrow.parquet as pq
+
+    batch, _ = pre_grouper.group_records_batch(list(generate_claims(300, seed=9)), workers=1)
+    expected = json.loads(batch.to_json())
+
+    async def scenario():
+        for day in range(1, 6):
+            history_id = f"batch_{day}"
+            payload = {**_batch_payload(history_id, batch), "created_at": f"2024-01-0{day}T09:00:00"}
+            await store.save_history(history_id, "batch", payload)
+        before = await store.get_statistics()
+        report = await store.archive_history("2024-01-04", str(tmp_path / "archive"), batch_size=2)
+        histories = [await store.get_history(f"batch_{day}", limit=1) for day in (1, 4)]
+        listed = await store.list_history()
+        rebuilt = await store.rebuild_statistics()
+        archives = await store.list_archives()
+        daily = await store.get_daily_statistics()
+        return before, report, histories, listed, rebuilt, archives, daily
+
+    before, report, (archived, kept), listed, rebuilt, archives, daily = asyncio.run(scenario())
+
+    assert report["histories"] == 3 and report["results"] == 900 and len(report["files"]) == 4
+    assert report["freed_pages"] > 0
+    assert archived is None and kept["results"] == expected[:1]
+    assert [h["history_id"] for h in listed["history"]] == ["batch_5", "batch_4"]
+    # 보관된 이력도 통계에 남고, 재계산해도 보관된 날짜의 집계는 유지
+    assert rebuilt["by_drg_type"] == before["by_drg_type"] and rebuilt["by_type"] == before["by_type"]
+    assert [day["date"] for day in daily["days"]][:3] == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert [a["history_count"] for a in archives] == [1, 2]
+
+    headers = pq.read_table([f for f in report["files"] if "history_" in f][0]).to_pylist()
+    results = pq.read_table([f for f in report["files"] if "results_" in f][0]).to_pylist()
+    assert [h["history_id"] for h in headers] == ["batch_1", "batch_2"]
+    assert json.loads(headers[0]["payload_json"])["total"] == 300
+    assert [json.loads(r["result_json"]) for r in results[:300]] == expected
+    with sqlite3.connect(store.db_path) as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+
+def test_reader_left_by_an_aborted_query_is_reopened(tmp_path):
+    from services.sqlite_pool import SQLitePool
+
+    async def scenario():
+        pool = SQLitePool(str(tmp_path / "pool.db"), readers=1)
+        await pool.open()
+        async with pool.write() as db:
+            await db.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v INTEGER)")
+            await db.executemany("INSERT INTO t VALUES (?, 0)", [(i,) for i in range(3)])
+        cursor = None
+        with pytest.raises(asyncio.CancelledError):
+            async with pool.read() as db:
+                # 취소된 조회처럼 끝나지 않은 문장을 남김 (이 연결은 지금 스냅샷에 고정됨)
+                cursor = await db.execute("SELECT v FROM t")
+                await cursor.fetchone()
+                raise asyncio.CancelledError()
+        async with pool.write() as db:
+            await db.execute("UPDATE t SET v = 1")
+        async with pool.read() as db:
+            rows = await (await db.execute("SELECT v FROM t")).fetchall()
+        await pool.close()
+        del cursor
+        return [v for v, in rows]
+
+    assert asyncio.run(scenario()) == [1, 1, 1]
@@ -0,0 +1,398 @@
+import itertools
+import json
+import random
+import string
+from dataclasses import asdict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.grouper_batch import COLUMNS, COMPACT, GrouperResultBatch, dumps
+from services.pregrouper_service import (
+    DetailLevel,
+    KDRGPreGrouper,
+    PatientInfo,
+    DiagnosisInfo,
+    ProcedureInfo,
+)
+
+
+def _legacy_mdc(main_diagnosis):
+    dx = main_diagnosis.upper().replace('.', '')
+    for mdc_code, (mdc_name, prefixes) in KDRGPreGrouper.MDC_DEFINITIONS.items():
+        for prefix in prefixes:
+            if dx.startswith(prefix.replace('.', '')):
+                return (mdc_code, mdc_name)
+    return ('W', '기타')
+
+
+def _legacy_drg7(main_diagnosis, procedures):
+    main_dx = main_diagnosis.upper()
+    for drg_code, drg_info in KDRGPreGrouper.DRG7_SURGERY_CODES.items():
+        dx_match = any(main_dx.startswith(dx.replace('.', '')) for dx in drg_info['diagnoses'])
+        if drg_info['procedures']:
+            proc_match = any(
+                proc.upper() in [p.upper() for p in procedures]
+                for proc in drg_info['procedures']
+            )
+        else:
+            proc_match = dx_match
+        if dx_match and proc_match:
+            return drg_code
+    return None
+
+
+def _legacy_cc_level(diagnoses):
+    for dx in diagnoses:
+        dx_clean = dx.upper().replace('.', '')
+        if any(dx_clean.startswith(c.replace('.', '')) for c in KDRGPreGrouper.CC_CODES['MCC']):
+            return 3
+    for dx in diagnoses:
+        dx_clean = dx.upper().replace('.', '')
+        if any(dx_clean.startswith(c.replace('.', '')) for c in KDRGPreGrouper.CC_CODES['CC']):
+            return 2
+    return 0
+
+
+def _diagnosis_codes():
+    codes = [''.join(p) for p in itertools.product(string.ascii_uppercase, string.digits, string.digits)]
+    codes += ['E10.1', 'e11.1', 'K70.4', 'J35.1', 'j3.5', 'N40', 'T07', 'C50.9', 'X', '']
+    return codes
+
+
+@pytest.fixture
+def grouper():
+    return KDRGPreGrouper()
+
+
+def test_determine_mdc_matches_legacy_first_match(grouper):
+    for code in _diagnosis_codes():
+        assert grouper.determine_mdc(code) == _legacy_mdc(code), code
+
+
+def test_check_drg7_matches_legacy(grouper):
+    rng = random.Random(7)
+    all_procs = [p for info in KDRGPreGrouper.DRG7_SURGERY_CODES.values() for p in info['procedures']]
+    all_procs += ['q2161', 'Z9999', 'N0001']
+    all_dx = [dx for info in KDRGPreGrouper.DRG7_SURGERY_CODES.values() for dx in info['diagnoses']]
+    for _ in range(3000):
+        main_dx = rng.choice(all_dx) + rng.choice(['', '0', '.1', '9'])
+        procedures = rng.sample(all_procs, rng.randint(0, 3))
+        result = grouper.check_drg7(DiagnosisInfo(main_diagnosis=main_dx), ProcedureInfo(procedures=procedures))
+        assert result == _legacy_drg7(main_dx, procedures), (main_dx, procedures)
+
+
+def test_calculate_severity_matches_legacy(grouper):
+    rng = random.Random(11)
+    pool = _diagnosis_codes()
+    for _ in range(3000):
+        diagnoses = rng.sample(pool, rng.randint(1, 4))
+        age = rng.choice([0, 35, 75])
+        los = rng.choice([1, 5, 20])
+        patient = PatientInfo('P', age, 'M', '2024-01-01', '2024-01-02', los)
+        severity = grouper.calculate_severity(
+            DiagnosisInfo(main_diagnosis=diagnoses[0], sub_diagnoses=diagnoses[1:]), patient
+        )
+        expected = _legacy_cc_level(diagnoses)
+        if age >= 70 or age < 1:
+            expected = min(expected + 1, 4)
+        if los > 14:
+            expected = min(expected + 1, 4)
+        assert severity == expected, diagnoses
+
+
+def _random_records(count, seed=3):
+    rng = random.Random(seed)
+    drg7 = KDRGPreGrouper.DRG7_SURGERY_CODES
+    dx_pool = [dx for info in drg7.values() for dx in info['diagnoses']]
+    dx_pool += ['I21.0', 'J96', 'E11.9', 'P07', 'K70.4', 'C50.1', 'F10', 'T07', 'Z00', '']
+    proc_pool = [p for info in drg7.values() for p in info['procedures']] + ['N0001', 'm1234']
+    records = []
+    for i in range(count):
+        records.append({
+            'patient_id': f"P{i:05d}",
+            'claim_id': f"C{i:05d}" if i % 7 else '',
+            'age': rng.choice([0, 5, 45, 70, 88, 130]),
+            'sex': rng.choice(['M', 'F']),
+            'admission_date': rng.choice(['2024-03-01', '2024-03-10', '2024/03/01']),
+            'discharge_date': rng.choice(['2024-03-05', '2024-02-28', '2024-04-30']),
+            'los': rng.choice([0, 1, 3, 6, 9, 16, 400]),
+            'main_diagnosis': rng.choice(dx_pool) + rng.choice(['', '1', '.9']),
+            'sub_diagnoses': rng.sample(dx_pool, rng.randint(0, 3)),
+            'procedures': rng.sample(proc_pool, rng.randint(0, 2)),
+        })
+    return records
+
+
+def test_group_frame_matches_row_grouping(grouper):
+    records = _random_records(2000)
+    expected = [asdict(grouper.group_from_dict(r)) for r in records]
+    frame = grouper.group_frame(pd.DataFrame(records))
+
+    assert list(frame.columns) == list(expected[0].keys())
+    assert frame.to_dict('records') == expected
+
+
+def test_group_frame_accepts_column_arrays_and_joined_codes(grouper):
+    frame = grouper.group_frame({
+        'patient_id': np.array(['P1', 'P2']),
+        'age': np.array([40, 75]),
+        'sex': np.array(['M', 'F']),
+        'admission_date': np.array(['2024-01-01', '2024-01-01']),
+        'discharge_date': np.array(['2024-01-03', '2024-01-05']),
+        'los': np.array([2, 4]),
+        'main_diagnosis': np.array(['J35.0', 'K80.2']),
+        'sub_diagnoses': np.array(['', 'I10, E11'], dtype=object),
+        'procedures': np.array(['Q2161', 'Q7651'], dtype=object),
+    })
+
+    assert frame['kdrg'].tolist() == ['D1210', 'H0613']
+    assert frame['claim_id'].tolist() == ['', '']
+
+
+def test_group_records_process_pool_preserves_order(grouper, monkeypatch):
+    from config import settings
+
+    monkeypatch.setattr(settings, "GROUPER_CHUNK_SIZE", 50)
+    records = _random_records(300)
+    expected = [grouper.group_from_dict(r) for r in records]
+    try:
+        pooled = grouper.group_records(records, workers=2)
+        frame = grouper.group_frame(pd.DataFrame(records), workers=2)
+    finally:
+        grouper.shutdown_pool()
+
+    assert [result for result, _ in pooled] == expected
+    assert frame.to_dict('records') == [asdict(r) for r in expected]
+
+
+def test_result_cache_reuses_profiles_and_restamps_identifiers():
+    cached = KDRGPreGrouper(cache_size=50)
+    uncached = KDRGPreGrouper(cache_size=0)
+    records = _random_records(40)
+    repeated = [dict(r, patient_id=r['patient_id'] + 'R', claim_id='X') for r in records]
+
+    for record in records + repeated + _random_records(100, seed=5):
+        assert cached.group_from_dict(record) == uncached.group_from_dict(record)
+
+    info = cached.cache_info()
+    assert info['hits'] >= 40
+    assert info['evictions'] > 0
+    assert info['size'] == 50
+
+
+def test_result_cache_invalidated_on_base_rate_change(monkeypatch):
+    grouper = KDRGPreGrouper(cache_size=10)
+    record = _random_records(1)[0]
+    before = grouper.group_from_dict(record)
+
+    monkeypatch.setattr(KDRGPreGrouper, 'BASE_RATE_2024', 90000)
+    after = grouper.group_from_dict(record)
+
+    assert after.base_amount == after.relative_weight * 90000
+    assert after.base_amount != before.base_amount
+    assert grouper.cache_info()['hits'] == 0
+
+
+def test_result_batch_round_trips_results(grouper):
+    records = _random_records(500)
+    expected = [asdict(grouper.group_from_dict(r)) for r in records]
+    batch, errors = grouper.group_records_batch(records)
+
+    assert errors == []
+    assert batch.to_dicts() == expected
+    assert json.loads(batch.to_json()) == expected
+    assert GrouperResultBatch.from_frame(grouper.group_frame(pd.DataFrame(records))).to_dicts() == expected
+
+    columns = json.loads(batch.to_json_bytes(COLUMNS))
+    assert columns['kdrg'] == [r['kdrg'] for r in expected]
+    assert columns['warnings'] == [r['warnings'] for r in expected]
+    assert json.loads(dumps(grouper.group_from_dict(records[0]))) == expected[0]
+
+    compact = json.loads(batch.to_json_bytes(COMPACT))
+    assert isinstance(compact['claim_id'], list) and compact['los'] == [r['los'] for r in expected]
+    drg_type = compact['drg_type']
+    assert [drg_type['dictionary'][i] for i in drg_type['indices']] == [r['drg_type'] for r in expected]
+    path = compact['grouper_path']
+    offsets, indices = path['offsets'], path['indices']
+    assert [
+        [path['dictionary'][i] for i in indices[offsets[row]:offsets[row + 1]]] for row in range(len(expected))
+    ] == [r['grouper_path'] for r in expected]
+
+    row = batch[-1]
+    assert row.kdrg == expected[-1]['kdrg']
+    assert row.warnings == expected[-1]['warnings']
+    assert not hasattr(grouper.group_from_dict(records[0]), '__dict__')
+
+
+def test_result_batch_collects_errors_by_index(grouper):
+    records = _random_records(3)
+    records[1] = dict(records[1], age='unknown')
+    batch, errors = grouper.group_records_batch(records)
+
+    assert len(batch) == 2
+    assert [idx for idx, _ in errors] == [1]
+
+
+def test_group_row_matches_input_objects(grouper):
+    records = _random_records(300, seed=5)
+    rows = [grouper.row_from_dict(r) for r in records]
+
+    for level in DetailLevel:
+        expected = [asdict(grouper.group(grouper.input_from_dict(r), level)) for r in records]
+        assert [asdict(grouper.group_row(row, level)) for row in rows] == expected
+        batch, errors = grouper.group_rows_batch(rows, detail_level=level)
+        assert errors == [] and batch.to_dicts() == expected
+    assert grouper.row_fingerprint(rows[0]) == grouper.input_fingerprint(grouper.input_from_dict(records[0]))
+
+
+def test_drg7_index_resolves_procedures_by_code_and_prefix(grouper):
+    index = grouper.rules.drg7
+
+    assert index.procedure_groups(['q2161', 'Z0000']) == {'D12'}
+    assert index.procedure_prefix_groups(['Q2169', 'R3919']) == {'D12', 'L08'}
+    assert index.detect('O80.0', []) == 'O60'
+    assert index.detect('K80.2', ['Q2161']) is None
+    assert index.classify_kdrg('H0613') == 'H06'
+
+
+def test_feedback_summary_counts_drg7_groups():
+    from services.feedback_parser_service import FeedbackDataType, FeedbackParserService
+
+    frame = pd.DataFrame({'kdrg': ['D1210', 'D1211', 'H0613', 'h0612', 'F60A1', None]})
+    summary = FeedbackParserService().generate_summary(frame, FeedbackDataType.KDRG_GROUPER, 'x.csv')
+
+    assert summary['drg_distribution'] == {
+        'D12 (편도 및 아데노이드 절제술)': 2,
+        'H06 (담낭절제술)': 2,
+        '기타 (행위별)': 2,
+    }
+
+
+def test_drg7_conversion_uses_prefix_index():
+    from services.kdrg_reference_data import get_kdrg_info
+    from services.optimization_service import global_optimization_service
+
+    current = get_kdrg_info('I0910')
+    current = type(current)(**{**asdict(current), 'drg7_code': None})
+    analyze = global_optimization_service._analyze_drg7_conversion
+
+    assert [s.suggested_kdrg for s in analyze(current, 'J35.0', [])] == ['D1210']
+    assert analyze(current, 'J35.0', ['Q2169']) == []
+    assert analyze(current, 'O80.0', []) == []
+
+
+def test_input_fingerprint_ignores_identifiers_and_code_order(grouper):
+    record = _random_records(1)[0]
+    record['sub_diagnoses'] = ['I10', 'e11']
+    fingerprint = grouper.input_fingerprint(grouper.input_from_dict(record))
+
+    same = dict(record, patient_id='X', claim_id='Y', sub_diagnoses=['E11', 'I10'])
+    changed = dict(record, los=record['los'] + 1)
+
+    assert grouper.input_fingerprint(grouper.input_from_dict(same)) == fingerprint
+    assert grouper.input_fingerprint(grouper.input_from_dict(changed)) != fingerprint
+    assert grouper.rule_version == KDRGPreGrouper().rule_version
+
+
+def test_codes_only_expands_to_full_detail(grouper):
+    records = _random_records(1000)
+    frame = grouper.group_frame(pd.DataFrame(records), detail_level='codes-only')
+
+    for record, row in zip(records, frame.to_dict('records')):
+        full = asdict(grouper.group_from_dict(record))
+        codes = asdict(grouper.group_from_dict(record, 'codes-only'))
+        assert row == codes
+        assert codes['grouper_path'] == []
+        assert {**codes, **grouper.expand_detail(codes)} == full
+    assert grouper.expand_detail(full) == {'grouper_path': full['grouper_path'], 'warnings': full['warnings']}
+
+
+def test_rule_set_activation_swaps_rules_and_keeps_previous(tmp_path, monkeypatch):
+    from dataclasses import replace
+
+    from config import settings
+    from services.grouper_rulesets import read_active_version, save_rule_set
+
+    monkeypatch.setattr(settings, 'GROUPER_RULES_DIR', str(tmp_path))
+    monkeypatch.setattr(settings, 'GROUPER_RULES_CHECK_SECONDS', 1e-9)
+    grouper = KDRGPreGrouper(cache_size=10)
+    watcher = KDRGPreGrouper(cache_size=10)
+    builtin_version = grouper.rule_version
+    record = _random_records(1)[0]
+    before = grouper.group_from_dict(record)
+
+    save_rule_set(replace(KDRGPreGrouper.builtin_rule_set(), version='2025.1', base_rate=90000))
+    info = grouper.activate_rule_set('2025.1')
+    after = grouper.group_from_dict(record)
+
+    assert before.rule_version == builtin_version
+    assert info['active']['name'] == '2025.1' and info['previous']['rule_version'] == builtin_version
+    assert after.rule_version == grouper.rule_version and after.rule_version.startswith('2025.1:')
+    assert after.base_amount == after.relative_weight * 90000
+    assert grouper.group_from_dict(record, rules=grouper.previous_rules) == before
+    assert set(grouper.group_frame(pd.DataFrame([record]))['rule_version']) == {after.rule_version}
+    # 다른 워커는 ACTIVE 파일을 보고 같은 버전으로 전환
+    assert watcher.group_from_dict(record).rule_version == after.rule_version
+    assert KDRGPreGrouper().rule_version == after.rule_version
+
+    grouper.rollback_rules()
+    assert grouper.rule_version == builtin_version
+    assert read_active_version() == 'builtin'
+
+
+def test_reload_does_not_hide_activation_by_another_worker(tmp_path, monkeypatch):
+    from dataclasses import replace
+
+    from config import settings
+    from services.grouper_rulesets import save_rule_set
+
+    monkeypatch.setattr(settings, 'GROUPER_RULES_DIR', str(tmp_path))
+    monkeypatch.setattr(settings, 'GROUPER_RULES_CHECK_SECONDS', 0)
+    grouper = KDRGPreGrouper(cache_size=0)
+    watcher = KDRGPreGrouper(cache_size=0)
+    save_rule_set(replace(KDRGPreGrouper.builtin_rule_set(), version='2025.1', base_rate=90000))
+    grouper.activate_rule_set('2025.1')
+
+    # 전환 확인 전에 reload해도 현재(내장) 규칙만 다시 읽고 활성 버전 전환은 남겨 둠
+    watcher.reload_rules()
+    assert watcher.rule_set.version == 'builtin'
+    monkeypatch.setattr(settings, 'GROUPER_RULES_CHECK_SECONDS', 1e-9)
+    record = _random_records(1)[0]
+    assert watcher.group_from_dict(record).rule_version == grouper.rule_version
+
+
+def test_invalid_rule_set_keeps_active_rules(tmp_path, monkeypatch):
+    from config import settings
+
+    monkeypatch.setattr(settings, 'GROUPER_RULES_DIR', str(tmp_path))
+    grouper = KDRGPreGrouper(cache_size=0)
+    version = grouper.rule_version
+    (tmp_path / 'broken.json').write_text('{"version": "broken", "base_rate": 1}', encoding='utf-8')
+
+    with pytest.raises(ValueError):
+        grouper.activate_rule_set('broken')
+    with pytest.raises(FileNotFoundError):
+        grouper.activate_rule_set('missing')
+    assert grouper.rule_version == version
+    assert grouper.previous_rules is None
+
+
+def test_group_frame_accepts_arrow_claims(grouper):
+    import pyarrow as pa
+
+    from services.grouper_arrow import claims_frame, is_claims_frame
+
+    records = [
+        dict(record, sub_diagnoses=[dx for dx in record['sub_diagnoses'] if dx]) for record in _random_records(300)
+    ]
+    # 부진단은 쉼표 구분 문자열, 수술은 list<string>
+    table = pa.Table.from_pylist([dict(record, sub_diagnoses=', '.join(record['sub_diagnoses'])) for record in records])
+    frame = claims_frame(table)
+
+    assert is_claims_frame(frame)
+    assert list(frame['sub_diagnoses'].iloc[1]) == records[1]['sub_diagnoses']
+    pd.testing.assert_frame_equal(
+        grouper.group_frame(frame, workers=1), grouper.group_frame(pd.DataFrame(records), workers=1)
+    )
@@ -0,0 +1,411 @@
+import asyncio
+import io
+import json
+from contextlib import asynccontextmanager
+
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.pregrouper import router
+from services.grouping_store import grouping_store
+from services.history_writer import history_writer
+
+
+@asynccontextmanager
+async def _lifespan(app):
+    yield
+    await history_writer.stop()
+
+
+@pytest.fixture
+def pregrouper_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(grouping_store, "db_path", str(tmp_path / "grouping.db"))
+    monkeypatch.setattr(grouping_store, "_initialized", False)
+    app = FastAPI(lifespan=_lifespan)
+    app.include_router(router, prefix="/api/pregrouper")
+    with TestClient(app) as client:
+        yield client
+    asyncio.run(grouping_store.close())
+
+
+def _upload_csv(rows):
+    buffer = io.StringIO()
+    pd.DataFrame(rows).to_csv(buffer, index=False)
+    return {"file": ("claims.csv", buffer.getvalue().encode("utf-8"), "text/csv")}
+
+
+UPLOAD_ROWS = [
+    {
+        "patient_id": "P1", "age": 40, "sex": "M", "admission_date": "2024-01-01",
+        "discharge_date": "2024-01-03", "los": 2, "main_diagnosis": "J35.0",
+        "sub_diagnoses": "", "procedures": "Q2161", "claim_id": "C1",
+    },
+    {
+        "patient_id": "P2", "age": 75, "sex": "F", "admission_date": "2024-01-01",
+        "discharge_date": "2024-01-05", "los": 4, "main_diagnosis": "K80.2",
+        "sub_diagnoses": "I10, E11", "procedures": "Q7651", "claim_id": "C2",
+    },
+]
+
+
+def test_upload_groups_rows(pregrouper_client):
+    response = pregrouper_client.post("/api/pregrouper/upload", files=_upload_csv(UPLOAD_ROWS))
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["success_count"] == 2
+    assert [r["kdrg"] for r in body["results"]] == ["D1210", "H0613"]
+
+
+def test_upload_reports_row_errors(pregrouper_client):
+    rows = UPLOAD_ROWS + [dict(UPLOAD_ROWS[0], patient_id="P3", age="unknown")]
+    response = pregrouper_client.post("/api/pregrouper/upload", files=_upload_csv(rows))
+
+    body = response.json()
+    assert body["success_count"] == 2
+    assert body["errors"][0]["row"] == 4
+
+
+def test_group_batch_returns_results_and_errors(pregrouper_client):
+    records = [
+        {k: v for k, v in row.items() if k not in ("sub_diagnoses", "procedures")}
+        for row in UPLOAD_ROWS
+    ]
+    records[0]["procedures"] = ["Q2161"]
+    response = pregrouper_client.post("/api/pregrouper/group-batch", json={"records": records})
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["success_count"] == 2
+    assert [r["kdrg"] for r in body["results"]] == ["D1210", "F60A1"]
+    assert body["errors"] is None
+
+    history = pregrouper_client.get(f"/api/pregrouper/history/{body['batch_id']}").json()
+    assert len(history["results"]) == 2
+
+    columnar = pregrouper_client.post(
+        "/api/pregrouper/group-batch?layout=columns", json={"records": records}
+    ).json()
+    assert columnar["layout"] == "columns"
+    assert columnar["results"]["kdrg"] == ["D1210", "F60A1"]
+    assert columnar["results"]["patient_id"] == ["P1", "P2"]
+
+
+def test_group_batch_compact_layout_negotiates_compression(pregrouper_client, monkeypatch):
+    from config import settings
+
+    monkeypatch.setattr(settings, "RESPONSE_COMPRESS_MIN_BYTES", 1)
+    records = [
+        {k: v for k, v in row.items() if k not in ("sub_diagnoses", "procedures")}
+        for row in UPLOAD_ROWS * 3
+    ]
+    response = pregrouper_client.post(
+        "/api/pregrouper/group-batch?layout=compact", json={"records": records},
+        headers={"Accept-Encoding": "gzip;q=0.5, br"},
+    )
+
+    assert response.headers["content-encoding"] == "br"
+    results = response.json()["results"]
+    mdc = results["mdc"]
+    assert [mdc["dictionary"][i] for i in mdc["indices"]] == ["C", "F"] * 3
+    assert results["los"] == [2, 4] * 3
+
+    plain = pregrouper_client.post(
+        "/api/pregrouper/group-batch?layout=compact", json={"records": records},
+        headers={"Accept-Encoding": "identity"},
+    )
+    assert "content-encoding" not in plain.headers
+    assert plain.json()["results"] == results
+
+
+def test_upload_stream_ndjson_covers_all_chunks(pregrouper_client, monkeypatch):
+    from config import settings
+
+    monkeypatch.setattr(settings, "GROUPER_CHUNK_SIZE", 2)
+    rows = UPLOAD_ROWS * 3 + [dict(UPLOAD_ROWS[0], patient_id="P9", age="unknown")]
+    response = pregrouper_client.post("/api/pregrouper/upload-stream", files=_upload_csv(rows))
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [line["kdrg"] for line in lines if "kdrg" in line] == ["D1210", "H0613"] * 3
+    assert [line["row"] for line in lines if "error" in line] == [8]
+    summary = lines[-1]["summary"]
+    assert (summary["total"], summary["success_count"], summary["error_count"]) == (7, 6, 1)
+
+    history = pregrouper_client.get(f"/api/pregrouper/history/{summary['history_id']}").json()
+    assert "results" not in history
+
+
+def test_upload_stream_csv_writes_header_once(pregrouper_client, monkeypatch):
+    from config import settings
+
+    monkeypatch.setattr(settings, "GROUPER_CHUNK_SIZE", 1)
+    response = pregrouper_client.post(
+        "/api/pregrouper/upload-stream?output=csv", files=_upload_csv(UPLOAD_ROWS)
+    )
+
+    frame = pd.read_csv(io.StringIO(response.text))
+    assert frame["kdrg"].tolist() == ["D1210", "H0613"]
+
+
+def _regroup_records():
+    return [
+        dict(row, sub_diagnoses=[c.strip() for c in row["sub_diagnoses"].split(",") if c.strip()],
+             procedures=[row["procedures"]])
+        for row in UPLOAD_ROWS
+    ]
+
+
+def test_regroup_reuses_unchanged_claims(pregrouper_client, monkeypatch):
+    from services.pregrouper_service import pre_grouper
+
+    records = _regroup_records()
+    first = pregrouper_client.post("/api/pregrouper/regroup", json={"records": records}).json()
+    assert (first["reused_count"], first["recomputed_count"]) == (0, 2)
+
+    records[1] = dict(records[1], patient_id="P2-new", sub_diagnoses=["E11", "I10"])
+    second = pregrouper_client.post("/api/pregrouper/regroup", json={"records": records}).json()
+    assert (second["reused_count"], second["recomputed_count"]) == (2, 0)
+    assert second["results"][1]["patient_id"] == "P2-new"
+    assert second["results"] == first["results"][:1] + [dict(first["results"][1], patient_id="P2-new")]
+
+    records[0] = dict(records[0], main_diagnosis="J35.1")
+    third = pregrouper_client.post("/api/pregrouper/regroup", json={"records": records}).json()
+    assert (third["reused_count"], third["recomputed_count"]) == (1, 1)
+
+    monkeypatch.setattr(pre_grouper, "rule_version", "changed")
+    fourth = pregrouper_client.post("/api/pregrouper/regroup", json={"records": records}).json()
+    assert (fourth["reused_count"], fourth["recomputed_count"]) == (0, 2)
+
+    forced = pregrouper_client.post("/api/pregrouper/regroup?force=true", json={"records": records}).json()
+    assert forced["recomputed_count"] == 2
+
+
+def test_regroup_stores_the_version_results_were_grouped_with(pregrouper_client, monkeypatch):
+    from services.pregrouper_service import pre_grouper
+
+    grouped_version = pre_grouper.rule_version
+    records = _regroup_records()
+    # 규칙 버전 조회 후 그루핑 전에 규칙이 교체된 경우
+    monkeypatch.setattr(pre_grouper, "rule_version", "stale")
+    first = pregrouper_client.post("/api/pregrouper/regroup", json={"records": records}).json()
+    assert (first["rule_version"], first["rule_versions"]) == (grouped_version, [grouped_version])
+    assert {r["rule_version"] for r in first["results"]} == {grouped_version}
+
+    monkeypatch.setattr(pre_grouper, "rule_version", grouped_version)
+    second = pregrouper_client.post("/api/pregrouper/regroup", json={"records": records}).json()
+    assert (second["reused_count"], second["recomputed_count"]) == (2, 0)
+    assert second["rule_versions"] == [grouped_version]
+
+
+def _code_table(tmp_path, name, weight):
+    """E60A2 상대가치점수만 다른 소형 코드표"""
+    from services.rule_store import KDRGRuleStore, build_rule_store
+
+    codes, extracted = tmp_path / f"{name}_codes.csv", tmp_path / f"{name}_extracted.csv"
+    pd.DataFrame([{"kdrg_code": "E60A2", "aadrg_code": "E60A", "kdrg_name": "", "mdc_code": ""}]).to_csv(
+        codes, index=False)
+    pd.DataFrame([{"kdrg_code": "E60A2", "kdrg_name": "호흡기 내과 - 중등도", "aadrg_code": "E60A",
+                   "aadrg_name": "호흡기", "partition": "M", "mdc_code": "", "cc_level": 2,
+                   "relative_weight": weight, "arithmetic_mean_los": 4.5}]).to_csv(extracted, index=False)
+    build_rule_store(str(tmp_path / f"{name}.bin"), codes, extracted)
+    return KDRGRuleStore(str(tmp_path / f"{name}.bin"))
+
+
+def test_regroup_recomputes_after_code_table_rebuild(pregrouper_client, tmp_path):
+    from services.pregrouper_service import pre_grouper
+
+    records = _regroup_records()
+    original = pre_grouper.rule_store
+    try:
+        pre_grouper.rule_store = _code_table(tmp_path, "before", 1.2345)
+        pre_grouper.reload_rules()
+        first = pregrouper_client.post("/api/pregrouper/regroup", json={"records": records}).json()
+        again = pregrouper_client.post("/api/pregrouper/regroup", json={"records": records}).json()
+        assert (again["reused_count"], again["recomputed_count"]) == (2, 0)
+
+        # 같은 코드표 버전(V4.7)으로 다시 빌드했지만 상대가치점수가 바뀐 경우
+        pre_grouper.rule_store = _code_table(tmp_path, "after", 1.5)
+        pre_grouper.reload_rules()
+        rebuilt = pregrouper_client.post("/api/pregrouper/regroup", json={"records": records}).json()
+        assert (rebuilt["reused_count"], rebuilt["recomputed_count"]) == (0, 2)
+        assert rebuilt["rule_version"] != first["rule_version"]
+    finally:
+        pre_grouper.rule_store = original
+        pre_grouper.reload_rules()
+
+
+def test_regroup_upload_matches_regroup(pregrouper_client):
+    pregrouper_client.post("/api/pregrouper/regroup", json={"records": _regroup_records()})
+    rows = UPLOAD_ROWS + [dict(UPLOAD_ROWS[0], patient_id="P3", claim_id="C3", age="unknown")]
+
+    body = pregrouper_client.post("/api/pregrouper/regroup-upload", files=_upload_csv(rows)).json()
+
+    assert (body["total"], body["reused_count"], body["recomputed_count"]) == (3, 2, 0)
+    assert body["errors"][0]["row"] == 4
+    assert [r["kdrg"] for r in body["results"]] == ["D1210", "H0613"]
+
+
+def test_group_batch_codes_only_expands_on_demand(pregrouper_client):
+    records = [dict(record, los=400) for record in _regroup_records()]
+    full = pregrouper_client.post("/api/pregrouper/group-batch", json={"records": records}).json()
+    codes = pregrouper_client.post(
+        "/api/pregrouper/group-batch?detail_level=codes-only", json={"records": records}
+    ).json()
+
+    assert codes["detail_level"] == "codes-only"
+    assert codes["results"][0]["warnings"] == ["W06:400", "W07"]
+    assert codes["results"][0]["grouper_path"] == []
+
+    details = pregrouper_client.post(
+        "/api/pregrouper/expand-detail", json={"results": codes["results"]}
+    ).json()["details"]
+    assert details == [{"grouper_path": r["grouper_path"], "warnings": r["warnings"]} for r in full["results"]]
+
+
+def test_grouping_job_submit_poll_and_page(pregrouper_client):
+    import time
+
+    rows = UPLOAD_ROWS + [dict(UPLOAD_ROWS[0], patient_id="P3", age="unknown")]
+    job = pregrouper_client.post("/api/pregrouper/jobs/upload", files=_upload_csv(rows)).json()
+    assert job["status"] in ("queued", "running", "completed")
+
+    for _ in range(200):
+        status = pregrouper_client.get(f"/api/pregrouper/jobs/{job['job_id']}").json()
+        if status["status"] == "completed":
+            break
+        time.sleep(0.02)
+    assert (status["status"], status["progress"], status["success_count"]) == ("completed", 100.0, 2)
+    assert status["errors"][0]["row"] == 4
+
+    page = pregrouper_client.get(f"/api/pregrouper/jobs/{job['job_id']}/results?offset=1&limit=5").json()
+    assert [r["kdrg"] for r in page["results"]] == ["H0613"]
+    assert pregrouper_client.post(f"/api/pregrouper/jobs/{job['job_id']}/cancel").json()["status"] == "completed"
+    assert pregrouper_client.get("/api/pregrouper/jobs/unknown").status_code == 404
+
+
+def test_rules_endpoints_report_active_version(pregrouper_client, tmp_path, monkeypatch):
+    from config import settings
+    from services.pregrouper_service import pre_grouper
+
+    monkeypatch.setattr(settings, "GROUPER_RULES_DIR", str(tmp_path))
+    body = pregrouper_client.get("/api/pregrouper/rules").json()
+
+    assert body["active"]["rule_version"] == pre_grouper.rule_version
+    assert body["available"][0]["version"] == "builtin"
+    assert pregrouper_client.post("/api/pregrouper/rules/activate", json={"version": "missing"}).status_code == 404
+    assert pregrouper_client.post("/api/pregrouper/rules/activate", json={"version": "../x"}).status_code == 400
+
+
+def test_compare_versions_upload_reports_differences(pregrouper_client, tmp_path, monkeypatch):
+    from dataclasses import replace
+
+    from config import settings
+    from services.grouper_rulesets import save_rule_set
+    from services.pregrouper_service import KDRGPreGrouper
+
+    monkeypatch.setattr(settings, "GROUPER_RULES_DIR", str(tmp_path))
+    save_rule_set(replace(KDRGPreGrouper.builtin_rule_set(), version="2025.1", base_rate=90000))
+    response = pregrouper_client.post(
+        "/api/pregrouper/compare-versions/upload?versions=builtin,2025.1", files=_upload_csv(UPLOAD_ROWS)
+    )
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["changed_count"] == 2
+    assert [row["kdrg[2025.1]"] for row in body["changes"]] == ["D1210", "H0613"]
+    assert body["totals"]["versions"][1]["amount_delta"] > 0
+    assert pregrouper_client.post(
+        "/api/pregrouper/compare-versions/upload?versions=builtin,missing", files=_upload_csv(UPLOAD_ROWS)
+    ).status_code == 404
+
+
+def _upload_parquet(rows, name="claims.parquet"):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pylist([
+        dict(row, sub_diagnoses=[c.strip() for c in row["sub_diagnoses"].split(",") if c.strip()],
+             procedures=[row["procedures"]])
+        for row in rows
+    ])
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+    return {"file": (name, buffer.getvalue(), "application/vnd.apache.parquet")}
+
+
+def test_upload_parquet_returns_arrow_results(pregrouper_client):
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+
+    response = pregrouper_client.post("/api/pregrouper/upload?output=arrow", files=_upload_parquet(UPLOAD_ROWS))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = ipc.open_stream(response.content).read_all()
+    assert table.column("kdrg").to_pylist() == ["D1210", "H0613"]
+    assert table.column("warnings").type.value_type.value_type == "string"
+
+    history_id = pregrouper_client.get("/api/pregrouper/history").json()["history"][0]["history_id"]
+    exported = pregrouper_client.get(f"/api/pregrouper/history/{history_id}/export?format=parquet")
+    assert pq.read_table(io.BytesIO(exported.content)).column("kdrg").to_pylist() == ["D1210", "H0613"]
+
+
+def test_upload_stream_parquet_to_parquet(pregrouper_client, monkeypatch):
+    import pyarrow.parquet as pq
+    from config import settings
+
+    monkeypatch.setattr(settings, "GROUPER_CHUNK_SIZE", 1)
+    response = pregrouper_client.post(
+        "/api/pregrouper/upload-stream?output=parquet", files=_upload_parquet(UPLOAD_ROWS * 3)
+    )
+
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == 6
+    assert table.column("kdrg").to_pylist()[:2] == ["D1210", "H0613"]
+
+
+def test_upload_stream_reads_excel_in_chunks(pregrouper_client, monkeypatch):
+    import openpyxl
+    from config import settings
+
+    monkeypatch.setattr(settings, "GROUPER_CHUNK_SIZE", 1)
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet("claims")
+    worksheet.append(list(UPLOAD_ROWS[0]))
+    for row in UPLOAD_ROWS:
+        worksheet.append(list(row.values()))
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    response = pregrouper_client.post(
+        "/api/pregrouper/upload-stream",
+        files={"file": ("claims.xlsx", buffer.getvalue(), "application/octet-stream")},
+    )
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["kdrg"] for line in lines[:-1]] == ["D1210", "H0613"]
+    assert lines[-1]["summary"]["total"] == 2
+
+
+def test_group_history_is_written_behind(pregrouper_client):
+    request = {
+        "patient": {
+            "patient_id": "P9", "age": 40, "sex": "M", "admission_date": "2024-01-01",
+            "discharge_date": "2024-01-03", "los": 2,
+        },
+        "diagnosis": {"main_diagnosis": "J35.0"},
+        "procedure": {"procedures": ["Q2161"]},
+    }
+    body = pregrouper_client.post("/api/pregrouper/group", json=request).json()
+
+    # 조회 전에 대기 중인 이력이 저장됨
+    history = pregrouper_client.get(f"/api/pregrouper/history/{body['history_id']}").json()
+    queue = pregrouper_client.get("/api/pregrouper/history-queue").json()["queue"]
+
+    assert history["result"]["kdrg"] == body["result"]["kdrg"]
+    assert history["input"]["patient_id"] == "P9"
+    assert queue["enabled"] and queue["pending"] == 0
+    assert (queue["written"], queue["failed"]) >= (1, 0)
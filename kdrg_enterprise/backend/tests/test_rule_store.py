@@ -0,0 +1,191 @@
+from dataclasses import replace
+
+import pandas as pd
+import pytest
+
+from services import kdrg_reference_data
+from services.pregrouper_service import KDRGPreGrouper
+from services.rule_store import BACKEND_DIR, KDRGRuleStore, build_rule_store, resolve_store_path
+
+
+@pytest.fixture
+def weighted_store(tmp_path):
+    codes = tmp_path / "codes.csv"
+    extracted = tmp_path / "extracted.csv"
+    pd.DataFrame([
+        {"kdrg_code": "D1210", "aadrg_code": "D121", "kdrg_name": "", "mdc_code": ""},
+        {"kdrg_code": "Z9990", "aadrg_code": "Z999", "kdrg_name": "", "mdc_code": ""},
+    ]).to_csv(codes, index=False)
+    pd.DataFrame([
+        {"kdrg_code": "D1210", "kdrg_name": "편도 절제술", "aadrg_code": "D121", "aadrg_name": "편도",
+         "partition": "S", "mdc_code": "", "cc_level": 0, "relative_weight": 0.0, "arithmetic_mean_los": 0.0},
+        {"kdrg_code": "E60A2", "kdrg_name": "호흡기 내과 - 중등도", "aadrg_code": "E60A", "aadrg_name": "호흡기",
+         "partition": "M", "mdc_code": "", "cc_level": 2, "relative_weight": 1.2345, "arithmetic_mean_los": 4.5},
+        # V4.7 D121은 악관절 수술 (그루퍼의 편도 D121과 다른 DRG), 편도는 D162
+        {"kdrg_code": "D1212", "kdrg_name": "악관절 수술 - 중증", "aadrg_code": "D121", "aadrg_name": "악관절 수술",
+         "partition": "S", "mdc_code": "", "cc_level": 2, "relative_weight": 2.5, "arithmetic_mean_los": 8.0},
+        {"kdrg_code": "D1622", "kdrg_name": "단순 편도 및 아데노이드 수술 - 중증", "aadrg_code": "D162",
+         "aadrg_name": "단순 편도 및 아데노이드 수술", "partition": "S", "mdc_code": "", "cc_level": 2,
+         "relative_weight": 0.4567, "arithmetic_mean_los": 1.2},
+        # 특수 중증도 (5-9)
+        {"kdrg_code": "E60A5", "kdrg_name": "호흡기 내과 - 특수", "aadrg_code": "E60A", "aadrg_name": "호흡기",
+         "partition": "M", "mdc_code": "", "cc_level": 5, "relative_weight": 3.0, "arithmetic_mean_los": 6.0},
+    ]).to_csv(extracted, index=False)
+    path = tmp_path / "rules.bin"
+    assert build_rule_store(str(path), codes, extracted, "TEST") == 6
+    return KDRGRuleStore(str(path))
+
+
+def _rebuilt_store(tmp_path, name, **weights):
+    """weighted_store와 같은 원본에서 상대가치점수만 바꿔 다시 빌드한 저장소"""
+    frame = pd.read_csv(tmp_path / "extracted.csv", dtype=str, keep_default_na=False)
+    for code, weight in weights.items():
+        frame.loc[frame["kdrg_code"] == code, "relative_weight"] = weight
+    frame.to_csv(tmp_path / f"{name}.csv", index=False)
+    path = tmp_path / f"{name}.bin"
+    build_rule_store(str(path), tmp_path / "codes.csv", tmp_path / f"{name}.csv", "TEST")
+    return KDRGRuleStore(str(path))
+
+
+def test_rule_store_lookup(weighted_store):
+    record = weighted_store.get("e60a2")
+
+    assert weighted_store.table_version == "TEST"
+    assert record.name == "호흡기 내과 - 중등도"
+    assert (record.partition, record.cc_level, record.mean_los) == ("M", 2, 4.5)
+    assert weighted_store.relative_weight("E60A2") == 1.2345
+    assert weighted_store.relative_weight("D1210") is None  # 0.0 은 값 없음으로 처리
+    assert weighted_store.get("Z9990").name == ""
+    assert weighted_store.get("A0000") is None
+    assert "가나다" not in weighted_store
+
+
+def test_bundled_code_tables_compile(tmp_path):
+    path = tmp_path / "v47.bin"
+    count = build_rule_store(str(path))
+    store = KDRGRuleStore(str(path))
+
+    assert len(store) == count > 30000
+    assert store.get("A0101").name == "간 이식 - 경도"
+    assert store.get("A0000").aadrg_code == "A000"
+
+
+def _mapped_grouper(store, code_map):
+    """kdrg_code_map이 있는 규칙 세트로 코드표를 조회하는 그루퍼"""
+    rule_set = replace(KDRGPreGrouper.builtin_rule_set(), version="mapped", kdrg_code_map=code_map)
+    grouper = KDRGPreGrouper(cache_size=0, rule_set=rule_set)
+    grouper.rule_store = store
+    grouper.reload_rules()
+    return grouper
+
+
+def test_grouper_prefers_code_table_weight(weighted_store):
+    grouper = _mapped_grouper(weighted_store, {"E60A": "E60A"})
+    record = {
+        "patient_id": "P1", "age": 40, "sex": "M", "admission_date": "2024-01-01",
+        "discharge_date": "2024-01-05", "los": 4, "main_diagnosis": "I20.0",
+        "sub_diagnoses": ["I10"], "procedures": [],
+    }
+
+    result = grouper.group_from_dict(record)
+    frame = grouper.group_frame(pd.DataFrame([record]))
+
+    assert result.kdrg == "E60A2"
+    assert result.relative_weight == 1.2345
+    assert frame["relative_weight"].tolist() == [1.2345]
+
+
+def test_grouper_takes_los_bounds_from_code_table(weighted_store):
+    grouper = _mapped_grouper(weighted_store, {"E60A": "E60A"})
+    # E60A2 평균 재원일수 4.5일 → 기준 1-9일 (기본 기준 3-10일이면 10일은 정상)
+    record = {
+        "patient_id": "P1", "age": 40, "sex": "M", "admission_date": "2024-01-01",
+        "discharge_date": "2024-01-11", "los": 10, "main_diagnosis": "I20.0",
+        "sub_diagnoses": ["I10"], "procedures": [],
+    }
+
+    result = grouper.group_from_dict(record)
+    frame = grouper.group_frame(pd.DataFrame([record, {**record, "sub_diagnoses": []}]))
+
+    assert (result.kdrg, result.los_lower, result.los_upper, result.los_outlier) == ("E60A2", 1, 9, "long")
+    assert frame["kdrg"].tolist() == ["E60A2", "E60A0"]
+    assert frame["los_upper"].tolist() == [9, 10]  # 평균 재원일수가 없는 KDRG는 기본 기준
+    assert frame["los_outlier"].tolist() == ["long", "normal"]
+    assert grouper._table_los == {"E60A2": (1, 9), "E60A0": None}
+
+
+def test_grouper_prices_only_from_the_mapped_code_table_entry(weighted_store):
+    record = {
+        "patient_id": "P1", "age": 40, "sex": "M", "admission_date": "2024-01-01",
+        "discharge_date": "2024-01-03", "los": 2, "main_diagnosis": "J35.0",
+        "sub_diagnoses": ["I10"], "procedures": ["Q2161"],
+    }
+    unmapped = KDRGPreGrouper(cache_size=0)
+    unmapped.rule_store = weighted_store
+    unmapped.reload_rules()
+    mapped = _mapped_grouper(weighted_store, {"D121": "D162"})
+
+    plain = unmapped.group_from_dict(record)
+    result = mapped.group_from_dict(record)
+    frame = mapped.group_frame(pd.DataFrame([record]))
+
+    # 그루퍼 편도 D1212는 V4.7 D1212(악관절 수술)의 값을 쓰지 않음
+    assert plain.kdrg == "D1212" and unmapped.table_code(plain.aadrg, plain.severity) is None
+    assert plain.relative_weight != 2.5 and plain.los_upper == 3
+    # 매핑되면 가격을 매긴 코드표 항목이 같은 DRG(편도)
+    entry = weighted_store.get(mapped.table_code(result.aadrg, result.severity))
+    assert (entry.kdrg_code, entry.aadrg_name) == ("D1622", "단순 편도 및 아데노이드 수술")
+    assert (result.relative_weight, result.los_lower, result.los_upper) == (0.4567, 1, 3)
+    assert frame["relative_weight"].tolist() == [0.4567] and frame["los_upper"].tolist() == [3]
+
+
+def test_relative_store_path_is_resolved_from_backend_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    assert resolve_store_path("./data/rules.bin") == str(BACKEND_DIR / "data" / "rules.bin")
+    assert resolve_store_path(str(tmp_path / "rules.bin")) == str(tmp_path / "rules.bin")
+
+
+def test_reference_data_falls_back_to_code_table(weighted_store, monkeypatch):
+    monkeypatch.setattr(kdrg_reference_data, "get_rule_store", lambda: weighted_store)
+
+    info = kdrg_reference_data.get_kdrg_info("E60A2")
+
+    assert info.relative_weight == 1.2345
+    assert (info.los_lower, info.los_upper, info.is_surgical) == (1, 9, False)
+    assert kdrg_reference_data.get_kdrg_info("D1210").relative_weight == 0.72
+    assert kdrg_reference_data.get_kdrg_info("Z9990") is None
+
+
+def test_reference_data_tags_drg7_only_through_code_map(weighted_store, monkeypatch):
+    monkeypatch.setattr(kdrg_reference_data, "get_rule_store", lambda: weighted_store)
+
+    # V4.7 D1212(악관절 수술)는 그루퍼 D12(편도)가 아님
+    assert kdrg_reference_data._kdrg_info_from_code_table("D1212").drg7_code is None
+    assert kdrg_reference_data._kdrg_info_from_code_table("D1622").drg7_code is None
+
+    monkeypatch.setattr(kdrg_reference_data, "pre_grouper", _mapped_grouper(weighted_store, {"D121": "D162"}))
+
+    assert kdrg_reference_data._kdrg_info_from_code_table("D1622").drg7_code == "D12"
+    assert kdrg_reference_data._kdrg_info_from_code_table("D1212").drg7_code is None
+
+
+def test_reference_data_skips_special_cc_levels(weighted_store, monkeypatch):
+    monkeypatch.setattr(kdrg_reference_data, "get_rule_store", lambda: weighted_store)
+
+    assert weighted_store.get("E60A5").cc_level == 5
+    assert kdrg_reference_data.get_kdrg_info("E60A5") is None
+    assert kdrg_reference_data.get_kdrg_info("E60A2").severity == 2
+
+
+def test_rule_version_follows_code_table_contents(weighted_store, tmp_path):
+    same = _rebuilt_store(tmp_path, "same")
+    changed = _rebuilt_store(tmp_path, "changed", E60A2="1.5")
+
+    assert same.content_digest == weighted_store.content_digest
+    assert changed.content_digest != weighted_store.content_digest
+    assert changed.table_version == weighted_store.table_version
+
+    version = _mapped_grouper(weighted_store, {"E60A": "E60A"}).rule_version
+    assert _mapped_grouper(same, {"E60A": "E60A"}).rule_version == version
+    assert _mapped_grouper(changed, {"E60A": "E60A"}).rule_version != version
@@ -0,0 +1,53 @@
+import io
+from datetime import datetime
+
+import openpyxl
+import pandas as pd
+
+from services.spreadsheet_reader import iter_excel, read_excel, sheet_names
+
+
+def _workbook(rows, sheet="claims"):
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet)
+    for row in rows:
+        worksheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+ROWS = [
+    ["patient_id", "age", "admission_date", "code", "code"],
+    ["P1", 40.0, datetime(2024, 1, 1), "A", None],
+    [None, None, None, None, None],
+    ["P2", 75, datetime(2024, 1, 2), "B", "C"],
+    ["P3", 5, datetime(2024, 1, 3), None, None],
+    [None, None, None, None, None],
+]
+
+
+def test_iter_excel_yields_chunks_with_sheet_row_numbers():
+    content = _workbook(ROWS)
+
+    chunks = list(iter_excel(content, "claims.xlsx", chunk_rows=2))
+
+    assert [list(chunk.index) for chunk in chunks] == [[0, 1], [2, 3]]
+    frame = pd.concat(chunks)
+    assert list(frame.columns) == ["patient_id", "age", "admission_date", "code", "code.1"]
+    assert frame["patient_id"].tolist()[2:] == ["P2", "P3"]
+    assert pd.isna(frame["patient_id"].iloc[1])
+    assert frame.loc[0, "age"] == 40
+
+
+def test_read_excel_matches_pandas_and_stops_at_max_rows():
+    content = _workbook(ROWS)
+
+    frame = read_excel(content, "claims.xlsx")
+    expected = pd.read_excel(io.BytesIO(content))
+
+    pd.testing.assert_frame_equal(
+        frame[["patient_id", "age"]], expected[["patient_id", "age"]], check_dtype=False
+    )
+    assert len(read_excel(content, "claims.xlsx", max_rows=1)) <= len(frame)
+    assert sheet_names(content, "claims.xlsx") == ["claims"]